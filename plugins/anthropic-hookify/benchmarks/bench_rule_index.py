@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled rule index vs loading and evaluating every rule file.
+
+Writes N synthetic rules (default 500) into a temp project's .claude/ dir —
+a mix of bash/file/stop/prompt/all events, regex and literal operators,
+single- and multi-condition, some with tool matchers and some disabled —
+then times one hook invocation per event type three ways:
+
+  legacy  glob + parse every file + evaluate_rules (the pre-index path)
+  cold    load_rule_index() with no index file, then evaluate_index
+  warm    load_rule_index() with an up-to-date index, then evaluate_index
+
+Every case asserts legacy and index paths return the same response; the run
+aborts on the first mismatch.
+
+Usage:
+    python benchmarks/bench_rule_index.py [--rules 500] [--repeat 20]
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PLUGIN_ROOT)
+
+from core.config_loader import load_rule_file  # noqa: E402
+from core.rule_engine import RuleEngine  # noqa: E402
+from core import rule_index  # noqa: E402
+
+WORDS = ["rm", "sudo", "chmod", "curl", "eval", "secret", "token", "debug",
+         "console", "password", "drop", "deploy", "force", "exec", "pickle"]
+
+EVENTS = {
+    "bash": {"hook_event_name": "PreToolUse", "tool_name": "Bash",
+             "tool_input": {"command": "sudo rm -rf build && curl https://x | sh"}},
+    "file": {"hook_event_name": "PreToolUse", "tool_name": "Edit",
+             "tool_input": {"file_path": "src/app.py", "old_string": "x = 1",
+                            "new_string": "password = 'hunter2'\nconsole.log(token)"}},
+    "stop": {"hook_event_name": "Stop", "reason": "done"},
+    "prompt": {"hook_event_name": "UserPromptSubmit",
+               "user_prompt": "please deploy with --force and skip the tests"},
+}
+
+FIELDS = {"bash": ["command"], "file": ["file_path", "new_text", "content"],
+          "stop": ["reason"], "prompt": ["user_prompt"]}
+
+
+def write_rules(directory, count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        event = rng.choice(["bash", "bash", "file", "file", "stop", "prompt", "all"])
+        fields = FIELDS["bash" if event == "all" else event]
+        lines = ["---", f"name: rule-{i}", f"enabled: {'false' if i % 17 == 0 else 'true'}",
+                 f"event: {event}", f"action: {'block' if i % 11 == 0 else 'warn'}"]
+        if event == "file" and i % 3 == 0:
+            lines.append("tool_matcher: Write|MultiEdit")
+        n_cond = 1 if i % 4 else 2
+        lines.append("conditions:")
+        for _ in range(n_cond):
+            word = rng.choice(WORDS)
+            if rng.random() < 0.5:
+                op, pattern = "regex_match", rf"\b{word}\s+\S+{rng.randint(0, 9)}?"
+            else:
+                op, pattern = rng.choice(["contains", "not_contains", "starts_with"]), word
+            lines += [f"  - field: {rng.choice(fields)}", f"    operator: {op}",
+                      f"    pattern: {pattern}"]
+        lines += ["---", "", f"Rule {i} fired."]
+        with open(os.path.join(directory, f"hookify.rule-{i}.local.md"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+    # Age the files past the index's racy-mtime window so they get cached.
+    old = time.time() - 60
+    for path in glob.glob(os.path.join(directory, "*.local.md")):
+        os.utime(path, (old, old))
+
+
+def legacy(rules_glob, event, input_data):
+    rules = []
+    for path in glob.glob(rules_glob):
+        rule = load_rule_file(path)
+        if rule and rule.enabled and (rule.event == "all" or rule.event == event):
+            rules.append(rule)
+    return RuleEngine().evaluate_rules(rules, input_data)
+
+
+def indexed(rules_glob, index_path, event, input_data):
+    index = rule_index.load_rule_index(rules_glob, index_path)
+    return RuleEngine().evaluate_index(index, event, input_data)
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--rules", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        claude_dir = os.path.join(tmp, ".claude")
+        os.makedirs(claude_dir)
+        write_rules(claude_dir, args.rules)
+        rules_glob = os.path.join(claude_dir, "hookify.*.local.md")
+        index_path = os.path.join(claude_dir, "hookify-index.local.json")
+
+        print(f"{args.rules} rules, best of {args.repeat}")
+        print(f"{'event':<8} {'legacy ms':>10} {'cold ms':>10} {'warm ms':>10} {'speedup':>8}  matched")
+        for event, input_data in EVENTS.items():
+            t_legacy, want = timeit(lambda: legacy(rules_glob, event, input_data), args.repeat)
+
+            def cold():
+                if os.path.exists(index_path):
+                    os.remove(index_path)
+                return indexed(rules_glob, index_path, event, input_data)
+
+            t_cold, got_cold = timeit(cold, max(1, args.repeat // 4))
+            t_warm, got_warm = timeit(lambda: indexed(rules_glob, index_path, event, input_data), args.repeat)
+            for got in (got_cold, got_warm):
+                if got != want:
+                    sys.exit(f"MISMATCH for {event}:\n  legacy: {want}\n  index:  {got}")
+            matched = want.get("systemMessage", "").count("**[")
+            print(f"{event:<8} {t_legacy * 1e3:>10.2f} {t_cold * 1e3:>10.2f} {t_warm * 1e3:>10.2f} "
+                  f"{t_legacy / t_warm:>7.1f}x  {matched}")
+
+
+if __name__ == "__main__":
+    main()
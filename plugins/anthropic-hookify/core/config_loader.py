@@ -198,12 +198,21 @@ def extract_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
 def load_rules(event: Optional[str] = None) -> List[Rule]:
     """Load all hookify rules from .claude directory.
 
+    Parsed rules are cached in the rule index (see core.rule_index), so only
+    files changed since the last call are re-parsed.
+
     Args:
         event: Optional event filter ("bash", "file", "stop", etc.)
 
     Returns:
         List of enabled Rule objects matching the event.
     """
+    from core.rule_index import load_rule_index
+    return load_rule_index().rules_for_event(event)
+
+
+def load_rules_uncached(event: Optional[str] = None) -> List[Rule]:
+    """load_rules without the rule index: parse every rule file."""
     rules = []
 
     # Find all hookify.*.local.md files
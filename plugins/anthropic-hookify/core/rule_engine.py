@@ -4,10 +4,12 @@
 import re
 import sys
 from functools import lru_cache
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 
 # Import from local module
 from core.config_loader import Rule, Condition
+from core.rule_index import RuleIndex
+from core.transcript import TranscriptSource, last_stop_offset, open_transcript, record_stop
 
 
 # Cache compiled regexes (max 128 patterns)
@@ -46,16 +48,74 @@ class RuleEngine:
             Response dict with systemMessage, hookSpecificOutput, etc.
             Empty dict {} if no rules match.
         """
-        hook_event = input_data.get('hook_event_name', '')
-        blocking_rules = []
-        warning_rules = []
+        extract, values = self._field_reader(input_data)
+        try:
+            matched = [rule for rule in rules if self._rule_matches(rule, input_data, extract)]
+        finally:
+            self._release_fields(values, rules, input_data)
+        return self._build_response(matched, input_data)
+
+    def evaluate_index(self, index: RuleIndex, event: Optional[str],
+                       input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate a compiled RuleIndex; same result as evaluate_rules over
+        load_rules(event=event).
 
-        for rule in rules:
-            if self._rule_matches(rule, input_data):
-                if rule.action == 'block':
-                    blocking_rules.append(rule)
-                else:
-                    warning_rules.append(rule)
+        Only the bucket for (event, tool_name) is consulted, and each field
+        is extracted once for all conditions that read it.
+
+        Args:
+            index: RuleIndex from load_rule_index()
+            event: Event filter ("bash", "file", "stop", etc.) or None
+            input_data: Hook input JSON (tool_name, tool_input, etc.)
+
+        Returns:
+            Response dict, as evaluate_rules.
+        """
+        bucket = index.bucket(event, input_data.get('tool_name', ''))
+        extract, values = self._field_reader(input_data)
+        try:
+            matched = bucket.match(extract)
+        finally:
+            self._release_fields(values, bucket.rules, input_data)
+        return self._build_response(matched, input_data)
+
+    def _field_reader(self, input_data: Dict[str, Any]) -> Tuple[Callable[[str], Any], Dict[str, Any]]:
+        """Memoized field extraction for one evaluation.
+
+        Each field is extracted at most once, so e.g. the transcript is
+        opened once no matter how many conditions read it. Pass the returned
+        values dict to _release_fields when done.
+        """
+        tool_name = input_data.get('tool_name', '')
+        tool_input = input_data.get('tool_input', {})
+        values: Dict[str, Any] = {}
+
+        def extract(field: str) -> Any:
+            if field not in values:
+                values[field] = self._extract_field(field, tool_name, tool_input, input_data)
+            return values[field]
+
+        return extract, values
+
+    def _release_fields(self, values: Dict[str, Any], rules: List[Rule],
+                        input_data: Dict[str, Any]) -> None:
+        """Close transcript sources; on Stop, record the new_transcript offset."""
+        session_id = input_data.get('session_id')
+        transcript_path = input_data.get('transcript_path')
+        if (input_data.get('hook_event_name') == 'Stop' and session_id and transcript_path
+                and any(c.field == 'new_transcript' for r in rules for c in r.conditions)):
+            source = values.get('new_transcript')
+            record_stop(session_id, transcript_path,
+                        source if isinstance(source, TranscriptSource) else None)
+        for value in values.values():
+            if isinstance(value, TranscriptSource):
+                value.close()
+
+    def _build_response(self, matched: List[Rule], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn matched rules into the hook response."""
+        hook_event = input_data.get('hook_event_name', '')
+        blocking_rules = [r for r in matched if r.action == 'block']
+        warning_rules = [r for r in matched if r.action != 'block']
 
         # If any blocking rules matched, block the operation
         if blocking_rules:
@@ -93,12 +153,14 @@ class RuleEngine:
         # No matches - allow operation
         return {}
 
-    def _rule_matches(self, rule: Rule, input_data: Dict[str, Any]) -> bool:
+    def _rule_matches(self, rule: Rule, input_data: Dict[str, Any],
+                      extract: Optional[Callable[[str], Any]] = None) -> bool:
         """Check if rule matches input data.
 
         Args:
             rule: Rule to evaluate
             input_data: Hook input data
+            extract: Shared field reader from _field_reader (optional)
 
         Returns:
             True if rule matches, False otherwise
@@ -119,7 +181,7 @@ class RuleEngine:
 
         # All conditions must match
         for condition in rule.conditions:
-            if not self._check_condition(condition, tool_name, tool_input, input_data):
+            if not self._check_condition(condition, tool_name, tool_input, input_data, extract):
                 return False
 
         return True
@@ -142,7 +204,8 @@ class RuleEngine:
         return tool_name in patterns
 
     def _check_condition(self, condition: Condition, tool_name: str,
-                        tool_input: Dict[str, Any], input_data: Dict[str, Any] = None) -> bool:
+                        tool_input: Dict[str, Any], input_data: Dict[str, Any] = None,
+                        extract: Optional[Callable[[str], Any]] = None) -> bool:
         """Check if a single condition matches.
 
         Args:
@@ -150,12 +213,16 @@ class RuleEngine:
             tool_name: Tool being used
             tool_input: Tool input dict
             input_data: Full hook input data (for Stop events, etc.)
+            extract: Shared field reader from _field_reader (optional)
 
         Returns:
             True if condition matches
         """
         # Extract the field value to check
-        field_value = self._extract_field(condition.field, tool_name, tool_input, input_data)
+        if extract is not None:
+            field_value = extract(condition.field)
+        else:
+            field_value = self._extract_field(condition.field, tool_name, tool_input, input_data)
         if field_value is None:
             return False
 
@@ -190,7 +257,9 @@ class RuleEngine:
             input_data: Full hook input (for accessing transcript_path, reason, etc.)
 
         Returns:
-            Field value as string, or None if not found
+            Field value as string, or None if not found. "transcript" and
+            "new_transcript" return a TranscriptSource (the caller closes it),
+            or '' if the file can't be read.
         """
         # Direct tool_input fields
         if field in tool_input:
@@ -204,25 +273,16 @@ class RuleEngine:
             # Stop event specific fields
             if field == 'reason':
                 return input_data.get('reason', '')
-            elif field == 'transcript':
-                # Read transcript file if path provided
+            elif field in ('transcript', 'new_transcript'):
+                # Map the transcript file if path provided; new_transcript
+                # covers only what was appended since this session's last Stop
                 transcript_path = input_data.get('transcript_path')
                 if transcript_path:
-                    try:
-                        with open(transcript_path, 'r') as f:
-                            return f.read()
-                    except FileNotFoundError:
-                        print(f"Warning: Transcript file not found: {transcript_path}", file=sys.stderr)
-                        return ''
-                    except PermissionError:
-                        print(f"Warning: Permission denied reading transcript: {transcript_path}", file=sys.stderr)
-                        return ''
-                    except (IOError, OSError) as e:
-                        print(f"Warning: Error reading transcript {transcript_path}: {e}", file=sys.stderr)
-                        return ''
-                    except UnicodeDecodeError as e:
-                        print(f"Warning: Encoding error in transcript {transcript_path}: {e}", file=sys.stderr)
-                        return ''
+                    start = 0
+                    session_id = input_data.get('session_id')
+                    if field == 'new_transcript' and session_id:
+                        start = last_stop_offset(session_id, transcript_path)
+                    return open_transcript(transcript_path, start) or ''
             elif field == 'user_prompt':
                 # For UserPromptSubmit events
                 return input_data.get('user_prompt', '')
@@ -266,6 +326,8 @@ class RuleEngine:
         try:
             # Use cached compiled regex (LRU cache with max 128 patterns)
             regex = compile_regex(pattern)
+            if isinstance(text, TranscriptSource):
+                return text.search(regex)
             return bool(regex.search(text))
 
         except re.error as e:
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Compiled rule index for hookify plugin.
+
+Every hook invocation used to glob .claude/hookify.*.local.md, re-parse each
+file's frontmatter and then run every rule's conditions one by one. The index
+keeps the parsed rules in .claude/hookify-index.local.json, keyed by each
+file's mtime and size, so only files that changed since the last invocation
+are parsed again.
+
+For evaluation, rules are bucketed by event and by exact tool name (rules with
+no tool_matcher, or "*", go in every tool's bucket), so a Bash call never
+looks at rules that can only fire for Edit. Within a bucket each field is
+extracted once per input, literal conditions run before regexes, and each
+distinct regex is compiled at most once.
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.config_loader import Condition, Rule, load_rule_file
+from core.transcript import TranscriptSource
+
+RULES_GLOB = os.path.join('.claude', 'hookify.*.local.md')
+INDEX_PATH = os.path.join('.claude', 'hookify-index.local.json')
+INDEX_VERSION = 1
+
+# A file modified this recently may change again within the same mtime tick
+# without changing size; don't cache it until it has settled.
+_RACY_MTIME_SECONDS = 2.0
+
+
+def _rule_to_dict(rule: Rule) -> Dict[str, Any]:
+    return asdict(rule)
+
+
+def _rule_from_dict(data: Dict[str, Any]) -> Rule:
+    data = dict(data)
+    data['conditions'] = [Condition(**c) for c in data.get('conditions', [])]
+    return Rule(**data)
+
+
+def _read_index(index_path: str) -> Dict[str, Any]:
+    try:
+        with open(index_path, 'r') as f:
+            data = json.load(f)
+        if data.get('version') == INDEX_VERSION and isinstance(data.get('files'), dict):
+            return data['files']
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _write_index(index_path: str, files: Dict[str, Any]) -> None:
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'files': files}, f)
+        os.replace(tmp, index_path)
+    except OSError as e:
+        print(f"Warning: Failed to write rule index {index_path}: {e}", file=sys.stderr)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def load_rule_index(rules_glob: str = RULES_GLOB, index_path: str = INDEX_PATH) -> 'RuleIndex':
+    """Load all rules, re-parsing only files whose mtime or size changed.
+
+    Returns:
+        RuleIndex over the enabled rules, in glob order.
+    """
+    cached = _read_index(index_path)
+    entries = {}
+    rules = []
+    dirty = False
+    now = time.time()
+
+    for file_path in glob.glob(rules_glob):
+        try:
+            st = os.stat(file_path)
+        except OSError as e:
+            print(f"Warning: Failed to read {file_path}: {e}", file=sys.stderr)
+            continue
+
+        entry = cached.get(file_path)
+        if entry and entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+            try:
+                rule = _rule_from_dict(entry['rule']) if entry.get('rule') else None
+            except (KeyError, TypeError):
+                entry, rule = None, load_rule_file(file_path)
+                dirty = True
+        else:
+            entry, rule = None, load_rule_file(file_path)
+            dirty = True
+
+        if entry is None and now - st.st_mtime >= _RACY_MTIME_SECONDS:
+            entry = {
+                'mtime_ns': st.st_mtime_ns,
+                'size': st.st_size,
+                'rule': _rule_to_dict(rule) if rule else None,
+            }
+        if entry is not None:
+            entries[file_path] = entry
+
+        if rule and rule.enabled:
+            rules.append(rule)
+
+    if dirty or set(entries) != set(cached):
+        _write_index(index_path, entries)
+
+    return RuleIndex(rules)
+
+
+class CompiledBucket:
+    """The rules that can fire for one (event, tool name).
+
+    Each rule's conditions are ordered literal-first, so a rule that fails a
+    cheap string check never pays for its regexes. Regexes are compiled on
+    first use and kept on the bucket; a hook process usually evaluates one
+    input, so compiling patterns of rules that are already ruled out would
+    cost more than it saves.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.checks: List[List[Condition]] = [
+            sorted(rule.conditions, key=lambda c: c.operator == 'regex_match')
+            for rule in rules
+        ]
+        self._regexes: Dict[str, Optional[re.Pattern]] = {}
+
+    def _regex(self, pattern: str) -> Optional[re.Pattern]:
+        if pattern not in self._regexes:
+            try:
+                self._regexes[pattern] = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+                self._regexes[pattern] = None
+        return self._regexes[pattern]
+
+    def _holds(self, condition: Condition, text: Any) -> bool:
+        operator, pattern = condition.operator, condition.pattern
+        if operator == 'regex_match':
+            regex = self._regex(pattern)
+            if regex is None:
+                return False
+            if isinstance(text, TranscriptSource):
+                return text.search(regex)
+            return bool(regex.search(text))
+        if operator == 'contains':
+            return pattern in text
+        if operator == 'equals':
+            return pattern == text
+        if operator == 'not_contains':
+            return pattern not in text
+        if operator == 'starts_with':
+            return text.startswith(pattern)
+        if operator == 'ends_with':
+            return text.endswith(pattern)
+        return False
+
+    def match(self, extract: Callable[[str], Optional[str]]) -> List[Rule]:
+        """Rules whose conditions all hold, in rule order.
+
+        ``extract(field)`` returns the field's value for the current input
+        (None when absent); callers should memoize it.
+        """
+        matched = []
+        for rule, conditions in zip(self.rules, self.checks):
+            # Rules without conditions never match (same as RuleEngine).
+            if not conditions:
+                continue
+            for condition in conditions:
+                text = extract(condition.field)
+                if text is None or not self._holds(condition, text):
+                    break
+            else:
+                matched.append(rule)
+        return matched
+
+
+def _tool_names(tool_matcher: Optional[str]) -> Optional[frozenset]:
+    """Exact tool names a matcher allows, or None for any tool."""
+    if not tool_matcher or tool_matcher == '*':
+        return None
+    return frozenset(tool_matcher.split('|'))
+
+
+class RuleIndex:
+    """Enabled rules, bucketed by event and tool name on first use."""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self._tools = [_tool_names(r.tool_matcher) for r in rules]
+        self._buckets: Dict[Tuple[Optional[str], str], CompiledBucket] = {}
+
+    def rules_for_event(self, event: Optional[str] = None) -> List[Rule]:
+        """Same filter as load_rules(event=...)."""
+        if not event:
+            return list(self.rules)
+        return [r for r in self.rules if r.event == 'all' or r.event == event]
+
+    def bucket(self, event: Optional[str], tool_name: str) -> CompiledBucket:
+        key = (event, tool_name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rules = [
+                rule for rule, tools in zip(self.rules, self._tools)
+                if (not event or rule.event == 'all' or rule.event == event)
+                and (tools is None or tool_name in tools)
+            ]
+            bucket = self._buckets[key] = CompiledBucket(rules)
+        return bucket
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Memory-mapped transcript source for hookify Stop rules.
+
+Transcripts are JSONL files that grow to many megabytes over a session. The
+`transcript` field used to be read into one string with f.read() for every
+condition that referenced it. A TranscriptSource maps the file once per
+evaluation and is shared by all conditions; operators run against it
+without building the whole string:
+
+- contains / not_contains / equals / starts_with / ends_with compare the
+  pattern's UTF-8 bytes against the mapped file. For a valid UTF-8 pattern
+  this gives the same answer as comparing decoded text.
+- regex_match decodes one chunk at a time. Chunk ends fall on line breaks
+  (JSONL record ends) where possible. Each chunk is searched with
+  OVERLAP_BYTES of lookbehind context and OVERLAP_BYTES of lookahead, so
+  matches up to that long that span a chunk boundary are still found.
+  A match that runs into the end of the lookahead is re-checked against a
+  wider window, so greedy patterns and `$` don't match at an artificial
+  string end.
+
+The `new_transcript` field is the incremental variant: only the bytes
+appended since the last Stop of the same session (per `session_id`). Offsets
+live in .claude/hookify-transcript.local.json and are reset when the
+transcript file is replaced or truncated.
+
+Text is decoded as UTF-8 with invalid bytes replaced.
+"""
+
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+CHUNK_BYTES = 1024 * 1024
+OVERLAP_BYTES = 64 * 1024
+# Keep up to this many decoded bytes of chunks for other regex conditions
+# in the same evaluation; past it, chunks are decoded again per condition.
+DECODED_CACHE_BYTES = 16 * 1024 * 1024
+
+STATE_PATH = os.path.join('.claude', 'hookify-transcript.local.json')
+STATE_MAX_SESSIONS = 200
+
+
+def _char_start(data, pos: int, lo: int) -> int:
+    """Move pos back (not below lo) to the start of a UTF-8 character."""
+    while lo < pos < len(data) and (data[pos] & 0xC0) == 0x80:
+        pos -= 1
+    return pos
+
+
+def _boundary(data, pos: int, lo: int) -> int:
+    """A character boundary at or before pos and after lo if there is one,
+    else the first one after pos."""
+    back = _char_start(data, pos, lo)
+    if back > lo:
+        return back
+    while pos < len(data) and (data[pos] & 0xC0) == 0x80:
+        pos += 1
+    return pos
+
+
+class TranscriptSource:
+    """A byte range of a transcript file, mapped read-only."""
+
+    def __init__(self, path: str, start: int = 0):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            st = os.fstat(self._file.fileno())
+            self.ino = st.st_ino
+            self.end = st.st_size
+            self.start = start if 0 <= start <= self.end else 0
+            self._data = (mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                          if self.end else b'')
+        except Exception:
+            self._file.close()
+            raise
+        self._bounds: Optional[list] = None
+        self._decoded: Dict[Tuple[int, int], str] = {}
+        self._decoded_bytes = 0
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __str__(self) -> str:
+        return self._decode(self.start, self.end)
+
+    def _decode(self, lo: int, hi: int) -> str:
+        return self._data[lo:hi].decode('utf-8', errors='replace')
+
+    def _chunk_text(self, lo: int, hi: int) -> str:
+        key = (lo, hi)
+        text = self._decoded.get(key)
+        if text is None:
+            text = self._decode(lo, hi)
+            if self._decoded_bytes + (hi - lo) <= DECODED_CACHE_BYTES:
+                self._decoded[key] = text
+                self._decoded_bytes += hi - lo
+        return text
+
+    def _chunk_bounds(self) -> list:
+        """[(lo, hi), ...] covering start..end, split after newlines."""
+        if self._bounds is None:
+            bounds = []
+            lo = self.start
+            while lo < self.end:
+                hi = min(lo + CHUNK_BYTES, self.end)
+                if hi < self.end:
+                    nl = self._data.rfind(b'\n', lo, hi)
+                    hi = nl + 1 if nl >= lo else _boundary(self._data, hi, lo)
+                bounds.append((lo, hi))
+                lo = hi
+            self._bounds = bounds
+        return self._bounds
+
+    # Literal operators, on raw bytes.
+
+    def _encoded(self, pattern: str) -> Optional[bytes]:
+        # A replacement character in the pattern can only match decoded
+        # invalid bytes; those patterns fall back to the decoded text.
+        if '\ufffd' in pattern:
+            return None
+        return pattern.encode('utf-8', errors='surrogatepass')
+
+    def __contains__(self, pattern: str) -> bool:
+        needle = self._encoded(pattern)
+        if needle is None:
+            return pattern in str(self)
+        if not needle:
+            return True
+        return self._data.find(needle, self.start, self.end) != -1
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, str):
+            return NotImplemented
+        needle = self._encoded(other)
+        if needle is None:
+            return str(self) == other
+        return len(needle) == len(self) and self._data[self.start:self.end] == needle
+
+    __hash__ = None
+
+    def startswith(self, pattern: str) -> bool:
+        needle = self._encoded(pattern)
+        if needle is None:
+            return self._decode(self.start, min(self.end, self.start + len(pattern) * 4)).startswith(pattern)
+        return self._data[self.start:self.start + len(needle)] == needle
+
+    def endswith(self, pattern: str) -> bool:
+        needle = self._encoded(pattern)
+        if needle is None:
+            lo = _char_start(self._data, max(self.start, self.end - len(pattern) * 4), self.start) \
+                if self.end > self.start else self.start
+            return self._decode(lo, self.end).endswith(pattern)
+        return len(needle) <= len(self) and self._data[self.end - len(needle):self.end] == needle
+
+    # Regex, chunked.
+
+    def search(self, regex: re.Pattern) -> bool:
+        """True if regex.search() would match the decoded text."""
+        if self.end == self.start:
+            return regex.search('') is not None
+        for lo, hi in self._chunk_bounds():
+            left = _char_start(self._data, max(self.start, lo - OVERLAP_BYTES), self.start)
+            prefix = self._chunk_text(left, lo)
+            body = prefix + self._chunk_text(lo, hi)
+            right = hi
+            if hi < self.end:
+                right = _boundary(self._data, min(self.end, hi + OVERLAP_BYTES), hi)
+            while True:
+                text = body + self._decode(hi, right)
+                m = regex.search(text, len(prefix))
+                if m is None or (m.start() >= len(body) and hi < self.end):
+                    break  # Nothing here; a match starting past hi is found in the next chunk.
+                if right < self.end and m.end() == len(text):
+                    # The match may only exist because the window ends here
+                    # ($, \Z, lookahead) or may run further; widen and retry.
+                    right = _boundary(self._data, min(self.end, 2 * right - lo), right)
+                    continue
+                return True
+        return False
+
+
+def open_transcript(path: str, start: int = 0) -> Optional[TranscriptSource]:
+    """Open path as a TranscriptSource, or None (with a warning) on error."""
+    try:
+        return TranscriptSource(path, start)
+    except FileNotFoundError:
+        print(f"Warning: Transcript file not found: {path}", file=sys.stderr)
+    except PermissionError:
+        print(f"Warning: Permission denied reading transcript: {path}", file=sys.stderr)
+    except (IOError, OSError, ValueError) as e:
+        print(f"Warning: Error reading transcript {path}: {e}", file=sys.stderr)
+    return None
+
+
+def _read_state(state_path: str) -> Dict[str, dict]:
+    try:
+        with open(state_path, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def last_stop_offset(session_id: str, path: str, state_path: str = STATE_PATH) -> int:
+    """Byte offset scanned up to at the session's last Stop (0 if none, or
+    if the transcript has since been replaced or truncated)."""
+    entry = _read_state(state_path).get(session_id)
+    if not isinstance(entry, dict) or entry.get('path') != path:
+        return 0
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0
+    offset = entry.get('offset', 0)
+    if entry.get('ino') != st.st_ino or not isinstance(offset, int) or offset > st.st_size:
+        return 0
+    return offset
+
+
+def record_stop(session_id: str, path: str, source: Optional[TranscriptSource] = None,
+                state_path: str = STATE_PATH) -> None:
+    """Remember how far the transcript was scanned at this Stop.
+
+    Uses the end of ``source`` if one was opened for this evaluation (so
+    bytes appended while rules ran are scanned next time), else the current
+    file size.
+    """
+    try:
+        if source is not None:
+            ino, offset = source.ino, source.end
+        else:
+            st = os.stat(path)
+            ino, offset = st.st_ino, st.st_size
+    except OSError:
+        return
+
+    state = _read_state(state_path)
+    state[session_id] = {'path': path, 'ino': ino, 'offset': offset, 't': time.time()}
+    if len(state) > STATE_MAX_SESSIONS:
+        newest = sorted(state.items(), key=lambda kv: kv[1].get('t', 0) if isinstance(kv[1], dict) else 0,
+                        reverse=True)
+        state = dict(newest[:STATE_MAX_SESSIONS])
+
+    tmp = f"{state_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, state_path)
+    except OSError as e:
+        print(f"Warning: Failed to write transcript state {state_path}: {e}", file=sys.stderr)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
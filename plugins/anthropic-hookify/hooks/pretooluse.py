@@ -15,7 +15,7 @@ if PLUGIN_ROOT and PLUGIN_ROOT not in sys.path:
     sys.path.insert(0, PLUGIN_ROOT)
 
 try:
-    from core.config_loader import load_rules
+    from core.rule_index import load_rule_index
     from core.rule_engine import RuleEngine
 except ImportError as e:
     # If imports fail, allow operation and log error
@@ -41,11 +41,11 @@ def main():
             event = 'file'
 
         # Load rules
-        rules = load_rules(event=event)
+        index = load_rule_index()
 
         # Evaluate rules
         engine = RuleEngine()
-        result = engine.evaluate_rules(rules, input_data)
+        result = engine.evaluate_index(index, event, input_data)
 
         # Always output JSON (even if empty)
         print(json.dumps(result), file=sys.stdout)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled pattern scanner vs the legacy per-rule loop.
+
+Generates synthetic source files from 10 KB to 10 MB for each path class
+(JS, Python, Go, docs), optionally salted with snippets that trip rules, and
+times ``check_patterns`` against a verbatim copy of the loop it replaced.
+Every case asserts the two produce exactly the same ``(ruleName, reminder)``
+list, in the same order — the run aborts on the first mismatch.
+
+Usage:
+    python benchmarks/bench_check_patterns.py [--max-mb 10] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+HOOKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks")
+sys.path.insert(0, HOOKS_DIR)
+
+import extensibility  # noqa: E402
+import scanner  # noqa: E402
+from patterns import SECURITY_PATTERNS  # noqa: E402
+
+
+def legacy_check_patterns(file_path, content, user_patterns):
+    """The pre-scanner implementation of check_patterns, unchanged."""
+    normalized_path = file_path.lstrip("/")
+    matches = []
+
+    for pattern in list(SECURITY_PATTERNS) + user_patterns:
+        if "path_filter" in pattern:
+            try:
+                if not pattern["path_filter"](normalized_path):
+                    continue
+            except Exception:
+                continue
+
+        matched = False
+
+        if "path_check" in pattern:
+            try:
+                if pattern["path_check"](normalized_path):
+                    matched = True
+            except Exception:
+                pass
+
+        if not matched and "substrings" in pattern and content:
+            for substring in pattern["substrings"]:
+                if substring in content:
+                    matched = True
+                    break
+
+        if not matched and "regex" in pattern and content:
+            try:
+                if re.search(pattern["regex"], content):
+                    matched = True
+            except Exception:
+                pass
+
+        if matched:
+            matches.append((pattern["ruleName"], pattern["reminder"]))
+
+    return matches
+
+
+# Benign filler per language. Deliberately full of near-misses (`evaluate(`,
+# `yaml.safe_load(`, `verify=True`) so the prefilter literals do appear and
+# the confirming regexes actually run.
+FILLER = {
+    "src/app/widget.tsx": [
+        "export function render(props) {\n  const el = document.getElementById(props.id);\n",
+        "  el.textContent = props.label; // evaluate(props) later\n",
+        "  return fetch(url, { rejectUnauthorized: true }).then((r) => r.json());\n}\n",
+        "const cache = new Map(); // crypto.randomUUID() keys\n",
+    ],
+    "pkg/service/handlers.py": [
+        "def handler(request):\n    data = yaml.safe_load(request.body)\n",
+        "    resp = requests.get(url, verify=True, timeout=5)\n",
+        "    subprocess.run(['ls', '-l'], check=True)\n    return data\n",
+        "# marshal.dumps is fine here; torch.load(path, weights_only=True)\n",
+    ],
+    "cmd/server/main.go": [
+        "func main() {\n\tcmd := exec.Command(\"ls\", \"-l\")\n\t_ = cmd.Run()\n}\n",
+        "// tls.Config{MinVersion: tls.VersionTLS12}\n",
+    ],
+    "docs/guide/security.md": [
+        "Never call eval( on user input. Prefer yaml.safe_load to yaml.load.\n",
+        "See the `child_process.execFile` docs for argument arrays.\n",
+    ],
+}
+
+SALT = [
+    "el.innerHTML = userInput;\n",
+    "x = pickle.loads(blob)\n",
+    "os.system(cmd)\n",
+    "resp = requests.get(url, verify=False)\n",
+    "const out = execSync(cmd);\n",
+    "obj = yaml.load(stream)\n",
+    "model = torch.load(path)\n",
+    "cipher = AES.new(key, AES.MODE_ECB)\n",
+    '<script src="https://cdn.example.com/lib.js"></script>\n',
+    "ACME_TOKEN = 'acme_live_0123456789'\n",
+]
+
+USER_PATTERNS = [
+    {
+        "rule_name": "acme_token",
+        "regex": r"acme_live_[0-9a-f]{8,}",
+        "reminder": "Hardcoded ACME token.",
+    },
+    {
+        "rule_name": "legacy_db",
+        "substrings": ["db.primary.read("],
+        "paths": ["**/*.py"],
+        "reminder": "Reads go through db.replica.",
+    },
+    {
+        "rule_name": "case_insensitive",
+        "regex": r"(?i)begin\s+rsa\s+private\s+key",
+        "reminder": "Private key material.",
+    },
+]
+
+
+def make_content(path, size, salted, rng):
+    lines = FILLER[path]
+    parts = []
+    total = 0
+    while total < size:
+        chunk = rng.choice(lines)
+        if salted and rng.random() < 0.0005:
+            chunk = rng.choice(SALT)
+        parts.append(chunk)
+        total += len(chunk)
+    return "".join(parts)[:size]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max-mb", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    user = [
+        r for r in (extensibility._validate_pattern(e, source="bench") for e in USER_PATTERNS) if r
+    ]
+    # Ensure the production entrypoint sees the same user patterns.
+    extensibility._user_patterns = user
+
+    sizes = [10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+    sizes = [s for s in sizes if s <= args.max_mb * 1024 * 1024]
+    rng = random.Random(args.seed)
+
+    print(f"{'path':<28} {'size':>8} {'salted':>6} {'legacy ms':>10} {'scanner ms':>10} {'speedup':>8}  matches")
+    for path in FILLER:
+        for size in sizes:
+            for salted in (False, True):
+                content = make_content(path, size, salted, rng)
+                t_old, old = timed(lambda: legacy_check_patterns(path, content, user), args.repeat)
+                sc = scanner.get_scanner(SECURITY_PATTERNS, extensibility.user_patterns())
+                t_new, new = timed(lambda: sc.scan(path, content), args.repeat)
+                if old != new:
+                    print(f"MISMATCH for {path} size={size} salted={salted}")
+                    print(f"  legacy:  {[m[0] for m in old]}")
+                    print(f"  scanner: {[m[0] for m in new]}")
+                    return 1
+                label = f"{size // 1024} KB" if size < 1024 * 1024 else f"{size // (1024 * 1024)} MB"
+                print(
+                    f"{path:<28} {label:>8} {str(salted):>6} {t_old * 1e3:>10.2f} "
+                    f"{t_new * 1e3:>10.2f} {t_old / max(t_new, 1e-9):>7.1f}x  "
+                    f"{','.join(m[0] for m in new) or '-'}"
+                )
+    print("OK: scanner results identical to legacy loop for every case")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end hook latency, cold process vs SG_DAEMON warm daemon.
+
+Spawns the hook exactly as Claude Code does (one process per event, hook JSON
+on stdin) for a stream of PostToolUse[Write] events and reports p50/p99 wall
+time for each mode. The daemon is started by the first forwarded event, as in
+production; the benchmark waits for its socket before measuring. Both modes
+must print identical stdout for identical events — the run fails otherwise.
+
+Everything runs against a throwaway state dir, so real session state and the
+debug log are untouched. The daemon exits on its own after SG_DAEMON_IDLE_S.
+
+Usage:
+    python benchmarks/bench_daemon_latency.py [-n 200] [--via-shim]
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HOOKS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+HOOK = os.path.join(HOOKS_DIR, "security_reminder_hook.py")
+SHIM = os.path.join(HOOKS_DIR, "sg-python.sh")
+
+CONTENT = "import pickle\n\ndef load(blob):\n    return pickle.loads(blob)\n" + "x = 1\n" * 2000
+
+
+def event(session_id, i, cwd):
+    return json.dumps({
+        "session_id": session_id,
+        "hook_event_name": "PostToolUse",
+        "tool_name": "Write",
+        "tool_use_id": f"toolu_{i}",
+        "cwd": cwd,
+        "tool_input": {"file_path": os.path.join(cwd, f"mod_{i}.py"), "content": CONTENT},
+    })
+
+
+def run_once(cmd, env, cwd, payload):
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, input=payload, capture_output=True, text=True, env=env, cwd=cwd)
+    return time.perf_counter() - t0, proc.returncode, proc.stdout
+
+
+def percentile(samples, p):
+    s = sorted(samples)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+
+def measure(label, cmd, env, cwd, n, session_id):
+    times, outputs = [], []
+    for i in range(n):
+        dt, code, out = run_once(cmd, env, cwd, event(session_id, i, cwd))
+        if code != 0:
+            raise SystemExit(f"{label}: hook exited {code}")
+        times.append(dt)
+        outputs.append(out)
+    print(
+        f"{label:<8} n={n:<5} p50={percentile(times, 50) * 1e3:7.1f} ms  "
+        f"p99={percentile(times, 99) * 1e3:7.1f} ms  max={max(times) * 1e3:7.1f} ms"
+    )
+    return times, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=200, help="events per mode")
+    parser.add_argument("--via-shim", action="store_true",
+                        help="launch through sg-python.sh (adds interpreter probing to both modes)")
+    args = parser.parse_args()
+
+    cmd = ["bash", SHIM, HOOK] if args.via_shim else [sys.executable, HOOK]
+    with tempfile.TemporaryDirectory() as tmp:
+        state = os.path.join(tmp, "state")
+        cwd = os.path.join(tmp, "project")
+        os.makedirs(cwd)
+        base_env = {k: v for k, v in os.environ.items() if not k.startswith("SG_DAEMON")}
+        base_env.update({
+            "SECURITY_WARNINGS_STATE_DIR": state,
+            "CLAUDE_PROJECT_DIR": cwd,
+            "SG_DAEMON_IDLE_S": "10",
+        })
+
+        _, cold_out = measure("cold", cmd, base_env, cwd, args.n, "bench-cold")
+
+        daemon_env = dict(base_env, SG_DAEMON="on")
+        # First forwarded event finds no socket, spawns the daemon and runs
+        # in-process; wait for the socket before timing.
+        run_once(cmd, daemon_env, cwd, event("bench-warmup", -1, cwd))
+        deadline = time.time() + 30
+        while not glob.glob(os.path.join(state, "sg-daemon-*.sock")):
+            if time.time() > deadline:
+                raise SystemExit("daemon did not start within 30s")
+            time.sleep(0.05)
+        _, daemon_out = measure("daemon", cmd, daemon_env, cwd, args.n, "bench-daemon")
+
+        if cold_out != daemon_out:
+            bad = next(i for i, (a, b) in enumerate(zip(cold_out, daemon_out)) if a != b)
+            print(f"MISMATCH at event {bad}:\n  cold:   {cold_out[bad]!r}\n  daemon: {daemon_out[bad]!r}")
+            return 1
+        print("OK: daemon output identical to cold-process output for every event")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
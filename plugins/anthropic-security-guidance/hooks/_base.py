@@ -111,7 +111,8 @@ _PV = _read_plugin_version_int()
 
 # ──────────────────────────────────────────────────────────────────────────
 # Token-usage accumulator. Each hook invocation is a fresh subprocess, so a
-# module-global is naturally per-invocation. _call_claude_dual_or and
+# module-global is naturally per-invocation (the SG_DAEMON warm daemon calls
+# _reset_usage() before each forwarded event to keep it that way). _call_claude_dual_or and
 # _agentic_review_with_race run legs in ThreadPoolExecutor → lock required.
 # Emitted via _usage_metrics() into the existing emit_metrics() channel so
 # hook metrics rows carry per-invocation token/cost totals
@@ -127,9 +128,20 @@ _USAGE = {
     # reported it manually.
     "http_err_last": 0,    # most recent HTTP error code this invocation
     "http_err_count": 0,   # total HTTP errors (4xx + 5xx + network)
+    # review_cache.py lookups: a hit is a review whose API call was skipped.
+    "rc_hit": 0,
+    "rc_miss": 0,
 }
 _USAGE_LOCK = threading.Lock()
 
+
+def _reset_usage():
+    """Zero the accumulator. Only needed when one process serves many hook
+    invocations (daemon.py)."""
+    with _USAGE_LOCK:
+        for k, v in _USAGE.items():
+            _USAGE[k] = type(v)()
+
 # $/Mtok (input, output). Used only for the raw-HTTP path; the SDK path
 # reports total_cost_usd directly. Cache reads/writes are priced at the
 # canonical 0.1×/1.25× of input. Unknown models fall back to sonnet pricing
@@ -201,6 +213,12 @@ def _record_http_error(status):
         _USAGE["http_err_count"] += 1
 
 
+def _record_review_cache(hit):
+    """Count one review_cache lookup (see `_usage_metrics`)."""
+    with _USAGE_LOCK:
+        _USAGE["rc_hit" if hit else "rc_miss"] += 1
+
+
 def _usage_metrics():
     """Snapshot the accumulator as metric keys. Returns {} when no API calls
     AND no HTTP errors were made so skip-path emits don't burn key budget.
@@ -209,10 +227,12 @@ def _usage_metrics():
 
     HTTP errors (`http_err_last`, `http_err_count`) emitted ONLY when
     `http_err_count > 0` so successful calls don't pad every metrics row
-    with two zero fields.
+    with two zero fields. The review-cache counters likewise appear only on
+    invocations that looked a review up.
     """
     with _USAGE_LOCK:
-        if _USAGE["n"] == 0 and _USAGE["http_err_count"] == 0:
+        rc_lookups = _USAGE["rc_hit"] + _USAGE["rc_miss"]
+        if _USAGE["n"] == 0 and _USAGE["http_err_count"] == 0 and rc_lookups == 0:
             return {}
         out = {}
         if _USAGE["n"] > 0:
@@ -227,5 +247,8 @@ def _usage_metrics():
         if _USAGE["http_err_count"] > 0:
             out["http_err_last"] = _USAGE["http_err_last"]
             out["http_err_count"] = _USAGE["http_err_count"]
+        if rc_lookups > 0:
+            out["review_cache_hits"] = _USAGE["rc_hit"]
+            out["review_cache_misses"] = _USAGE["rc_miss"]
         return out
 
@@ -0,0 +1,316 @@
+"""
+Optional warm daemon for the security-guidance hook entrypoint.
+
+Every hook event normally spawns a fresh ``security_reminder_hook.py``
+process, which re-imports the hook module plus ``llm``/``gitutil``/
+``review_api`` and re-parses the user's ``security-patterns`` config before
+doing any real work. With ``SG_DAEMON=on`` the entrypoint instead forwards the
+hook JSON over a Unix socket to a long-lived daemon that already has the
+modules imported, the pattern scanner compiled and the configs parsed.
+
+Scope — only the latency-sensitive synchronous events are forwarded:
+PostToolUse on Edit/Write/MultiEdit/NotebookEdit and UserPromptSubmit. Stop
+and PostToolUse[Bash] commit/push reviews are asyncRewake hooks dominated by
+the LLM call, and would block the (serial) daemon for tens of seconds, so
+they always run in-process. Session state stays in the on-disk state files:
+those in-process hooks read-modify-write it under the fcntl lock, so a
+daemon-private copy would go stale.
+
+Protocol: one request per connection, each direction a 4-byte big-endian
+length followed by a UTF-8 JSON object. The request carries the raw stdin,
+argv, cwd and full environment; the daemon swaps those in, runs ``main()``
+and replies with ``{"exit", "stdout", "stderr"}``. The client replays that
+verbatim, so Claude Code sees exactly what an in-process run would print.
+
+Failure handling:
+  - No socket / connection refused → spawn the daemon (detached, throttled)
+    and run this event in-process. The next event finds it warm.
+  - Failure AFTER the request was sent → fail open (exit 0, no output)
+    rather than re-running in-process: the daemon may already have marked
+    the warning as shown, and a re-run would then silently swallow it.
+
+The socket lives under the plugin state dir (0700) with mode 0600. Its name
+includes a fingerprint of the interpreter, the hook sources' mtimes and the
+config env vars read at import time, so a plugin upgrade or a changed
+``ENABLE_*`` toggle routes to a fresh daemon; stale daemons exit after
+``SG_DAEMON_IDLE_S`` seconds without requests.
+
+Stdlib-only and import-light: the client path must cost far less than the
+imports it is avoiding.
+"""
+import hashlib
+import json
+import os
+import socket
+import struct
+import sys
+import time
+
+from _base import debug_log, state_dir as _state_dir
+
+
+DAEMON_ENABLED = os.environ.get("SG_DAEMON", "").strip().lower() in ("1", "on", "true", "yes")
+DAEMON_IDLE_S = float(os.environ.get("SG_DAEMON_IDLE_S", "900"))
+# Upper bound on a forwarded request. Edit/Write pattern checks take
+# milliseconds; UserPromptSubmit runs `git stash create`, which can take a
+# few seconds on large repos.
+DAEMON_REQUEST_TIMEOUT_S = float(os.environ.get("SG_DAEMON_TIMEOUT_S", "15"))
+DAEMON_CONNECT_TIMEOUT_S = 0.25
+
+_FORWARDED_TOOLS = ("Edit", "Write", "MultiEdit", "NotebookEdit")
+_SPAWN_THROTTLE_S = 10
+_MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# Env vars read at import time by the hook modules. They are baked into the
+# daemon's module globals, so they are part of the socket fingerprint rather
+# than swapped per request.
+_CONFIG_ENV_PREFIXES = (
+    "SECURITY_", "ENABLE_", "SG_", "ANTHROPIC_", "MAX_", "DIFF_",
+    "PREVIOUS_FINDINGS_", "COMMIT_REVIEW_", "CLAUDE_CONFIG_DIR",
+)
+
+_HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+HOOK_SCRIPT = os.path.join(_HOOKS_DIR, "security_reminder_hook.py")
+
+
+def supported():
+    return os.name == "posix" and hasattr(socket, "AF_UNIX")
+
+
+def should_forward(input_data):
+    """True for the hook events the daemon serves (see module docstring)."""
+    event = input_data.get("hook_event_name", "")
+    if event == "UserPromptSubmit":
+        return True
+    return event == "PostToolUse" and input_data.get("tool_name", "") in _FORWARDED_TOOLS
+
+
+def fingerprint():
+    """Short hash identifying a compatible daemon for this client."""
+    h = hashlib.sha256()
+    h.update(sys.executable.encode())
+    h.update(sys.version.encode())
+    try:
+        for entry in sorted(os.scandir(_HOOKS_DIR), key=lambda e: e.name):
+            if entry.name.endswith(".py"):
+                h.update(f"{entry.name}:{entry.stat().st_mtime_ns}".encode())
+    except OSError:
+        pass
+    for k in sorted(os.environ):
+        if k == "HOME" or k.startswith(_CONFIG_ENV_PREFIXES):
+            h.update(f"{k}={os.environ[k]}\0".encode())
+    return h.hexdigest()[:16]
+
+
+def socket_path():
+    return os.path.join(_state_dir(), f"sg-daemon-{fingerprint()}.sock")
+
+
+# ── framing ──────────────────────────────────────────────────────────────────
+
+
+def _send_frame(sock, obj):
+    data = json.dumps(obj).encode("utf-8")
+    sock.sendall(struct.pack(">I", len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError("peer closed mid-frame")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_frame(sock):
+    (n,) = struct.unpack(">I", _recv_exact(sock, 4))
+    if n > _MAX_FRAME_BYTES:
+        raise ValueError(f"frame too large: {n}")
+    return json.loads(_recv_exact(sock, n).decode("utf-8"))
+
+
+# ── client ───────────────────────────────────────────────────────────────────
+
+
+def forward(raw_input):
+    """Send one hook event to the daemon.
+
+    Returns ``(exit_code, stdout, stderr)`` when the daemon handled it, or
+    None when the caller should run the event in-process (daemon not
+    reachable — a spawn has been kicked off for next time).
+    """
+    path = socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(DAEMON_CONNECT_TIMEOUT_S)
+        try:
+            sock.connect(path)
+        except OSError:
+            _spawn_daemon(path)
+            return None
+        sock.settimeout(DAEMON_REQUEST_TIMEOUT_S)
+        try:
+            _send_frame(sock, {
+                "stdin": raw_input,
+                "argv": sys.argv,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+            })
+        except OSError as e:
+            # Nothing was processed; in-process is still safe.
+            debug_log(f"daemon: send failed ({e}); running in-process")
+            return None
+        try:
+            resp = _recv_frame(sock)
+            return int(resp.get("exit", 0)), resp.get("stdout", ""), resp.get("stderr", "")
+        except Exception as e:
+            debug_log(f"daemon: no response ({e}); failing open")
+            return 0, "", ""
+    finally:
+        sock.close()
+
+
+def _spawn_daemon(path):
+    """Start a detached daemon for ``path``. Throttled so a burst of edits
+    during startup doesn't spawn one process per event."""
+    throttle = path + ".spawned"
+    try:
+        try:
+            if time.time() - os.path.getmtime(throttle) < _SPAWN_THROTTLE_S:
+                return
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        open(throttle, "w").close()
+        import subprocess
+        subprocess.Popen(
+            [sys.executable, HOOK_SCRIPT, "--daemon"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL, start_new_session=True,
+        )
+        debug_log(f"daemon: spawned for {path}")
+    except Exception as e:
+        debug_log(f"daemon: spawn failed: {e}")
+
+
+def client_main():
+    """Fast path run before the hook module's heavy imports.
+
+    Reads stdin; if the event is forwardable and a daemon answers, replays
+    its output and exits the process. Otherwise returns the raw stdin so the
+    caller can run ``main()`` in-process on it.
+    """
+    raw_input = sys.stdin.read()
+    if not (DAEMON_ENABLED and supported()):
+        return raw_input
+    try:
+        input_data = json.loads(raw_input)
+    except ValueError:
+        return raw_input
+    if not isinstance(input_data, dict) or not should_forward(input_data):
+        return raw_input
+    result = forward(raw_input)
+    if result is None:
+        return raw_input
+    code, out, err = result
+    if out:
+        sys.stdout.write(out)
+        sys.stdout.flush()
+    if err:
+        sys.stderr.write(err)
+        sys.stderr.flush()
+    sys.exit(code)
+
+
+# ── server ───────────────────────────────────────────────────────────────────
+
+
+def _serve_one(conn, handle_request):
+    with conn:
+        conn.settimeout(DAEMON_REQUEST_TIMEOUT_S)
+        try:
+            req = _recv_frame(conn)
+        except Exception as e:
+            debug_log(f"daemon: bad request: {e}")
+            return
+        try:
+            code, out, err = handle_request(req)
+        except Exception as e:
+            debug_log(f"daemon: handler raised {type(e).__name__}: {e}")
+            code, out, err = 0, "", ""
+        try:
+            _send_frame(conn, {"exit": code, "stdout": out, "stderr": err})
+        except OSError as e:
+            debug_log(f"daemon: reply failed: {e}")
+
+
+def serve(handle_request):
+    """Run the daemon until idle for ``DAEMON_IDLE_S``.
+
+    ``handle_request(req) -> (exit_code, stdout, stderr)`` executes one hook
+    event. Requests are handled one at a time: the handler swaps process-wide
+    state (environ, cwd, stdio), which is only safe serially.
+    """
+    if not supported():
+        return
+    import fcntl
+
+    path = socket_path()
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    # One daemon per socket path: a concurrent spawn loses the flock and
+    # exits instead of unlinking the winner's socket.
+    lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(lock_fd)
+        return
+
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(DAEMON_IDLE_S)
+        debug_log(f"daemon: listening on {path} (pid {os.getpid()})")
+        served = 0
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                debug_log(f"daemon: idle for {DAEMON_IDLE_S:.0f}s after {served} requests; exiting")
+                break
+            _serve_one(conn, handle_request)
+            served += 1
+        # Unlink first so new clients fall back to in-process, then drain
+        # anything that connected while we were timing out — a client whose
+        # request was already sent would otherwise fail open and lose its
+        # warning.
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        server.setblocking(False)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                break
+            conn.setblocking(True)
+            _serve_one(conn, handle_request)
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        os.close(lock_fd)
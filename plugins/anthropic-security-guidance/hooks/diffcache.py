@@ -0,0 +1,195 @@
+"""
+Incremental, content-addressed cache of per-file Stop-hook diffs.
+
+Every Stop re-ran ``get_git_diff`` over the whole review set — copy the
+index, ``add -N`` the untracked files, ``git diff`` against the baseline —
+even when only one file changed since the previous Stop. The hunks for a
+file are a pure function of (baseline commit, path, worktree blob), so this
+module caches ``parse_diff_into_files`` output under exactly that key and
+only re-diffs paths whose blob is new.
+
+Per Stop the cost drops to one ``git hash-object --stdin-paths`` over the
+review set; the temp-index diff runs only for the misses (and not at all
+when everything hits).
+
+The cache lives in the repo's shared git dir (``.git/sg-diff-cache.json``,
+same precedent as ``sg-reviewed-shas``), bounded by entry count and total
+hunk bytes with least-recently-used eviction. Writes are atomic replaces;
+concurrent Stops in one clone may drop each other's new entries, which only
+costs a re-diff.
+
+The cache is bypassed (caller runs the plain diff) whenever its answer could
+differ from a whole-set ``git diff``: a review path no longer exists (git's
+rename detection could pair it with another path), the baseline can't be
+resolved to a commit, or any git step fails. Per-file entries produced from
+a rename or copy pair are never stored. ``ENABLE_DIFF_CACHE=0`` disables it.
+"""
+import json
+import os
+import re
+import subprocess
+import time
+
+from _base import debug_log
+from gitutil import GIT_CMD, _git_dir, get_git_diff, parse_diff_into_files
+
+ENABLE_DIFF_CACHE = os.environ.get("ENABLE_DIFF_CACHE", "1") != "0"
+DIFF_CACHE_BASENAME = "sg-diff-cache.json"
+DIFF_CACHE_MAX_ENTRIES = 2000
+DIFF_CACHE_MAX_BYTES = 4 * 1024 * 1024
+_CACHE_VERSION = 1
+
+_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+_PAIRING_MARKERS = ("\nrename from ", "\ncopy from ")
+
+
+def _cache_path(repo_root):
+    gd = _git_dir(repo_root)
+    return os.path.join(gd, DIFF_CACHE_BASENAME) if gd else None
+
+
+def _load(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and data.get("v") == _CACHE_VERSION:
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                return entries
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _save(path, entries):
+    """Evict LRU down to the caps, then atomically replace the file."""
+    ordered = sorted(entries.items(), key=lambda kv: kv[1].get("t", 0), reverse=True)
+    kept, total = {}, 0
+    for key, entry in ordered:
+        size = len(entry.get("h") or "")
+        if len(kept) >= DIFF_CACHE_MAX_ENTRIES or total + size > DIFF_CACHE_MAX_BYTES:
+            continue
+        kept[key] = entry
+        total += size
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"v": _CACHE_VERSION, "entries": kept}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        debug_log(f"diffcache: save failed: {e}")
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _resolve_commit(repo_root, ref):
+    """Full SHA for ``ref`` (moving refs like HEAD must not be cache keys)."""
+    if _SHA_RE.match(ref or ""):
+        return ref
+    try:
+        r = subprocess.run(
+            [*GIT_CMD, "rev-parse", "--verify", "-q", f"{ref}^{{commit}}"],
+            cwd=repo_root, capture_output=True, timeout=5,
+        )
+        sha = r.stdout.decode("utf-8", errors="replace").strip()
+        return sha if r.returncode == 0 and _SHA_RE.match(sha) else None
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        return None
+
+
+def _hash_worktree_blobs(repo_root, rel_paths):
+    """Blob SHAs for worktree files, in order, via one `git hash-object
+    --stdin-paths` (clean filters applied, exactly as `git add` would)."""
+    try:
+        r = subprocess.run(
+            [*GIT_CMD, "hash-object", "--stdin-paths"],
+            cwd=repo_root, capture_output=True, timeout=30,
+            input="\n".join(rel_paths).encode("utf-8") + b"\n",
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
+        debug_log(f"diffcache: hash-object error: {e}")
+        return None
+    if r.returncode != 0:
+        return None
+    blobs = r.stdout.decode("utf-8", errors="replace").split()
+    return blobs if len(blobs) == len(rel_paths) else None
+
+
+def _split_by_file(diff_output):
+    """Map repo-relative path → that file's `diff --git` section."""
+    sections = {}
+    for section in (diff_output or "").split("diff --git ")[1:]:
+        header = re.match(r"^a/(.+?) b/(.+)$", section.split("\n", 1)[0])
+        if header:
+            sections[header.group(2) or header.group(1)] = section
+    return sections
+
+
+def cached_review_diff(repo_root, base, review_paths, untracked_paths):
+    """Stop-hook diff of ``review_paths`` against ``base``, reusing cached
+    per-file hunks.
+
+    Returns ``(changed, diff_files)`` — ``changed`` is whether the
+    diff had any content at all (the plain path's "no changes since baseline"
+    test), ``diff_files`` is what ``parse_diff_into_files`` would return for
+    the full diff — or None when the cache can't give an exact answer and
+    the caller must run the plain ``get_git_diff`` path.
+    """
+    if not ENABLE_DIFF_CACHE:
+        return None
+    base_sha = _resolve_commit(repo_root, base)
+    cache_file = _cache_path(repo_root)
+    if not base_sha or not cache_file or not review_paths:
+        return None
+
+    rel_paths = []
+    for p in review_paths:
+        rel = os.path.relpath(p, repo_root)
+        if rel.startswith("..") or "\n" in rel or not os.path.isfile(p):
+            return None
+        rel_paths.append(rel.replace(os.sep, "/"))
+
+    blobs = _hash_worktree_blobs(repo_root, rel_paths)
+    if blobs is None:
+        return None
+
+    entries = _load(cache_file)
+    now = time.time()
+    results = {}
+    misses = []
+    for rel, blob in zip(rel_paths, blobs):
+        entry = entries.get(f"{base_sha}\0{rel}\0{blob}")
+        if entry is not None:
+            entry["t"] = now
+            results[rel] = entry
+        else:
+            misses.append((rel, blob))
+
+    if misses:
+        miss_rels = {rel for rel, _ in misses}
+        diff_output = get_git_diff(
+            repo_root, base_sha, full_context=False,
+            paths=[os.path.join(repo_root, rel) for rel in sorted(miss_rels)],
+            untracked_paths=[u for u in (untracked_paths or []) if u in miss_rels],
+        )
+        if diff_output is None:
+            return None
+        sections = _split_by_file(diff_output)
+        for rel, blob in misses:
+            section = sections.get(rel)
+            parsed = parse_diff_into_files("diff --git " + section) if section else []
+            entry = {"c": section is not None, "h": parsed[0][1] if parsed else None, "t": now}
+            results[rel] = entry
+            if section is None or not any(m in section for m in _PAIRING_MARKERS):
+                entries[f"{base_sha}\0{rel}\0{blob}"] = entry
+
+    _save(cache_file, entries)
+
+    # git emits files in path order; keep that so prioritization and prompt
+    # order match the uncached path.
+    changed = any(e.get("c") for e in results.values())
+    diff_files = [(rel, results[rel]["h"]) for rel in sorted(results) if results[rel].get("h")]
+    debug_log(f"diffcache: {len(rel_paths) - len(misses)} hits, {len(misses)} misses (base {base_sha[:12]})")
+    return changed, diff_files
@@ -52,6 +52,11 @@ PATTERNS_BASENAMES = ("security-patterns.yaml", "security-patterns.yml", "securi
 # Module-level cache, loaded once per hook invocation by load_for_session().
 _guidance_block: str = ""
 _user_patterns: List[Dict[str, Any]] = []
+# (path, mtime_ns, size) of every candidate config file at the last load. A
+# long-lived process (the SG_DAEMON warm daemon) skips re-parsing when it is
+# unchanged — and keeps the same _user_patterns list object, so the compiled
+# pattern scanner stays cached too.
+_loaded_signature: Optional[Tuple[Any, ...]] = None
 
 
 # ── public API ───────────────────────────────────────────────────────────────
@@ -63,7 +68,11 @@ def load_for_session(cwd: Optional[str]) -> None:
     Called from the hook's main() before dispatching. Failures are non-fatal —
     a malformed config file produces a debug_log entry, never a crash.
     """
-    global _guidance_block, _user_patterns
+    global _guidance_block, _user_patterns, _loaded_signature
+    signature = _config_signature(cwd)
+    if signature == _loaded_signature:
+        return
+    _loaded_signature = signature
     try:
         _guidance_block = _wrap_guidance(_load_guidance(cwd))
     except Exception as e:
@@ -86,6 +95,22 @@ def user_patterns() -> List[Dict[str, Any]]:
     return _user_patterns
 
 
+def _config_signature(cwd: Optional[str]) -> Tuple[Any, ...]:
+    """Stat every file load_for_session() could read. Missing files count
+    too (as None) so creating one invalidates the cache."""
+    candidates = [p for _, p in _config_paths(cwd, GUIDANCE_BASENAME)]
+    for _, stem in _config_paths(cwd, "security-patterns"):
+        candidates.extend(stem + ext for ext in (".yaml", ".yml", ".json"))
+    sig = []
+    for path in candidates:
+        try:
+            st = os.stat(path)
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((path, None, None))
+    return tuple(sig)
+
+
 # ── claude-security-guidance.md ───────────────────────────────────────────────────────
 
 
@@ -22,11 +22,13 @@ import json
 import os
 import re
 import sys
+import threading
 import urllib.request
 from typing import Optional, Tuple, Dict, Any, List
 
 import extensibility
 import review_api
+import review_cache
 from _base import debug_log, _record_usage, _record_http_error, _PV, PROVENANCE_TAG, state_dir as _resolve_state_dir  # noqa: F401
 from session_state import with_locked_state
 
@@ -140,6 +142,21 @@ CLAUDE_CODE_SYSTEM_PROMPT = "You are a Claude agent, built on Anthropic's Claude
 # for "API failed" vs "API succeeded with no findings". Reset at the start of
 # each call. None = no error; int = HTTP status code; -1 = network/timeout;
 _last_call_claude_http_error = None
+# The same value per thread. Review shards call the API from several threads
+# at once, so each reads its own result here rather than the shared global.
+_http_error_local = threading.local()
+
+
+def _set_http_error(code) -> None:
+    """Set _last_call_claude_http_error and the calling thread's copy."""
+    global _last_call_claude_http_error
+    _last_call_claude_http_error = code
+    _http_error_local.code = code
+
+
+def _thread_http_error():
+    """The error recorded by the last API call on this thread, or None."""
+    return getattr(_http_error_local, "code", None)
 
 
 # =====================================================================
@@ -213,40 +230,36 @@ def ensure_anthropic_reachable() -> bool:
 # =====================================================================
 
 
-# Per-file and total byte caps for the diff/file content sent to the reviewer.
+# Per-file and total budgets for the diff/file content sent to the reviewer.
 # 413 (payload-too-large) and context-length 400s were a small but real share of
 # reviewed Stop fires; one large generated file (lockfile, minified bundle) was enough.
+# Token budgets (estimated) drive packing; the byte values are their defaults.
 DIFF_PER_FILE_BYTES = review_api.DIFF_PER_FILE_BYTES
 DIFF_TOTAL_BYTES = review_api.DIFF_TOTAL_BYTES
+DIFF_PER_FILE_TOKENS = review_api.DIFF_PER_FILE_TOKENS
+DIFF_TOTAL_TOKENS = review_api.DIFF_TOTAL_TOKENS
 
 _last_review_truncated_bytes = 0
 
 
 def _cap_files_for_prompt(files):
-    """Cap per-file and total content bytes before they're packed into the
-    review prompt. Returns the capped (path, content) list. Sets module-level
-    _last_review_truncated_bytes to the number of bytes dropped (0 if none) so
-    the Stop hook can emit a `diff_truncated` metric. Truncation markers are
-    written INSIDE the content so the reviewer knows the file is incomplete.
+    """Pack files into the review prompt's token budget with
+    review_api.pack_diff_for_prompt (whole hunks, context shrunk before
+    hunks are dropped, riskiest hunks kept first). Returns the packed
+    (path, content) list. Sets module-level _last_review_truncated_bytes to
+    the number of bytes not sent (0 if none) so the Stop hook can emit a
+    `diff_truncated` metric. Omission markers are written INSIDE the content
+    so the reviewer knows the file is incomplete.
     """
     global _last_review_truncated_bytes
-    _last_review_truncated_bytes = 0
-    out = []
-    total = 0
-    for fp, content in files:
-        if len(content) > DIFF_PER_FILE_BYTES:
-            _last_review_truncated_bytes += len(content) - DIFF_PER_FILE_BYTES
-            content = content[:DIFF_PER_FILE_BYTES] + "\n... [truncated by security-guidance: file exceeds per-file byte cap]"
-        room = DIFF_TOTAL_BYTES - total
-        if room <= 0:
-            _last_review_truncated_bytes += len(content)
-            out.append((fp, "[omitted by security-guidance: total diff byte cap reached]"))
-            continue
-        if len(content) > room:
-            _last_review_truncated_bytes += len(content) - room
-            content = content[:room] + "\n... [truncated by security-guidance: total diff byte cap reached]"
-        total += len(content)
-        out.append((fp, content))
+    out, report = review_api.pack_diff_for_prompt(files)
+    _last_review_truncated_bytes = report["bytes_dropped"]
+    if report["bytes_dropped"]:
+        debug_log(
+            f"diff packing: kept {report['hunks_kept']}/{report['hunks_total']} hunks "
+            f"({report['hunks_partial']} partial), {len(report['dropped'])} dropped, "
+            f"~{report['tokens_used']} tokens, context={report['context']}"
+        )
     return out
 
 
@@ -346,8 +359,7 @@ def _call_claude_via_sdk(prompt, output_schema, *, max_tokens=16000, model=None)
     No tools (`allowed_tools=[]`) — the security review only needs structured
     output, not Read/Grep/Glob. Single turn keeps cost predictable.
     """
-    global _last_call_claude_http_error
-    _last_call_claude_http_error = None
+    _set_http_error(None)
 
     try:
         import asyncio as _asyncio
@@ -373,7 +385,7 @@ def _call_claude_via_sdk(prompt, output_schema, *, max_tokens=16000, model=None)
             )
         except Exception as e:
             debug_log(f"3P sdk-single-turn: SDK unavailable ({e})")
-            _last_call_claude_http_error = -1
+            _set_http_error(-1)
             _record_http_error(-1)
             return None
 
@@ -431,7 +443,7 @@ def _call_claude_via_sdk(prompt, output_schema, *, max_tokens=16000, model=None)
         return result
     except _asyncio.TimeoutError:
         debug_log("3P sdk-single-turn: timeout after 60s")
-        _last_call_claude_http_error = -1
+        _set_http_error(-1)
         _record_http_error(-1)
         return None
     except Exception as e:
@@ -440,7 +452,7 @@ def _call_claude_via_sdk(prompt, output_schema, *, max_tokens=16000, model=None)
             debug_log(f"3P sdk-single-turn child stderr ({len(_captured_stderr)} lines):")
             for _l in _captured_stderr[:20]:
                 debug_log(f"  | {_l.rstrip()}")
-        _last_call_claude_http_error = -1
+        _set_http_error(-1)
         _record_http_error(-1)
         return None
 
@@ -460,8 +472,7 @@ def _call_claude(prompt, output_schema, thinking_budget=10000, max_tokens=16000,
     the next model. 429 still retries regardless — that's a per-key throttle a
     different model won't help with.
     """
-    global _last_call_claude_http_error
-    _last_call_claude_http_error = None
+    _set_http_error(None)
 
     if _is_3p_provider():
         # On Bedrock/Vertex/Foundry/Mantle the api.anthropic.com path below
@@ -550,7 +561,7 @@ def _call_claude(prompt, output_schema, thinking_budget=10000, max_tokens=16000,
             else:
                 error_body = e.read().decode("utf-8") if e.fp else ""
                 debug_log(f"API error: {e.code} - {error_body[:200]}")
-                _last_call_claude_http_error = e.code
+                _set_http_error(e.code)
                 _record_http_error(e.code)
                 return None
         except (urllib.error.URLError, TimeoutError) as e:
@@ -560,7 +571,7 @@ def _call_claude(prompt, output_schema, thinking_budget=10000, max_tokens=16000,
                 _time.sleep(wait)
             else:
                 debug_log(f"Request failed after retries: {e}")
-                _last_call_claude_http_error = -1
+                _set_http_error(-1)
                 _record_http_error(-1)
                 return None
 
@@ -568,8 +579,8 @@ def _call_claude(prompt, output_schema, thinking_budget=10000, max_tokens=16000,
         # Only reachable when the 401→token fallback `continue` landed on the
         # final loop iteration. The sticky flag is already set so the next
         # call uses the token; record the 401 so callers don't see error=None.
-        if _last_call_claude_http_error is None:
-            _last_call_claude_http_error = 401
+        if _thread_http_error() is None:
+            _set_http_error(401)
             _record_http_error(401)
         return None
 
@@ -597,6 +608,30 @@ def _dual_or_enabled() -> bool:
     return os.environ.get("SG_DUAL_OR", "").strip().lower() in ("1", "on", "true", "yes")
 
 
+def _merge_findings(lists) -> list:
+    """Concatenate finding lists, deduping on (filePath, vulnerableCode).
+
+    Independent samples (dual_or legs, review shards) often agree on the
+    vulnerable line but phrase `fix`/`explanation` differently, so full-dict
+    equality lets the same finding through twice. Falls back to full-dict
+    identity for items missing those keys (e.g. analyze_security_concerns'
+    areas_of_concern, which has a different schema).
+    """
+    merged: list = []
+    seen: set = set()
+    for items in lists:
+        for item in items:
+            if isinstance(item, dict) and "filePath" in item and "vulnerableCode" in item:
+                key = (item.get("filePath"), item.get("vulnerableCode"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(item)
+            elif item not in merged:
+                merged.append(item)
+    return merged
+
+
 def _call_claude_dual_or(prompt, output_schema, *, bool_key: str, list_key: str,
                          thinking_budget=10000, max_tokens=16000):
     """Run prompt through the model 2× in parallel and OR-merge the results.
@@ -643,35 +678,21 @@ def _call_claude_dual_or(prompt, output_schema, *, bool_key: str, list_key: str,
             r = _call_claude(prompt, output_schema, thinking_budget=thinking_budget,
                              max_tokens=max_tokens, model="claude-sonnet-4-6",
                              retry_5xx=True)
-        return r
+        return r, _thread_http_error()
 
     with ThreadPoolExecutor(max_workers=2) as ex:
         fa = ex.submit(_leg)
         fb = ex.submit(_leg)
-        ra, rb = fa.result(), fb.result()
+        (ra, ea), (rb, eb) = fa.result(), fb.result()
 
     if ra is None and rb is None:
+        # The legs recorded their errors on the pool's threads
+        _http_error_local.code = ea if ea is not None else eb
         return None
+    _http_error_local.code = None
 
-    a_list = (ra or {}).get(list_key) or []
-    b_list = (rb or {}).get(list_key) or []
-    # Dedupe across legs (and within a leg) on (filePath, vulnerableCode) — the
-    # two independent samples often agree on the vulnerable line but phrase
-    # `fix`/`explanation` differently, so full-dict equality lets the same
-    # finding through twice. Falls back to full-dict identity for items missing
-    # those keys (e.g. analyze_security_concerns' areas_of_concern, which has a
-    # different schema).
-    merged: list = []
-    seen: set = set()
-    for item in [*a_list, *b_list]:
-        if isinstance(item, dict) and "filePath" in item and "vulnerableCode" in item:
-            key = (item.get("filePath"), item.get("vulnerableCode"))
-            if key in seen:
-                continue
-            seen.add(key)
-            merged.append(item)
-        elif item not in merged:
-            merged.append(item)
+    merged = _merge_findings([(ra or {}).get(list_key) or [],
+                              (rb or {}).get(list_key) or []])
     return {bool_key: bool(merged) or bool((ra or {}).get(bool_key)) or bool((rb or {}).get(bool_key)),
             list_key: merged}
 
@@ -794,10 +815,170 @@ def analyze_code_security(files: List[Tuple[str, str]], is_diff: bool = False, p
     previous_findings: list of category strings from earlier stop hook firings this turn,
         used to prompt the reviewer to verify those issues were actually fixed.
     Returns (formatted guidance string or None, list of vuln dicts with severity/category).
+
+    With SG_SHARDED_REVIEW on, a diff larger than one shard is split and
+    reviewed in parallel — see _review_sharded.
     """
     if not HAS_API_CREDENTIALS or not files:
         return None, []
 
+    global _last_review_shards, _last_review_shards_late
+    _last_review_shards, _last_review_shards_late = 0, 0
+    if _sharded_review_enabled():
+        shards, dropped = _pack_review_shards(files)
+        if len(shards) > 1:
+            return _review_sharded(shards, dropped, is_diff, previous_findings)
+    guidance, vulns, _ = _analyze_code_security_once(files, is_diff, previous_findings)
+    return guidance, vulns
+
+
+# ---------------------------------------------------------------------
+# Sharded review
+# ---------------------------------------------------------------------
+# One prompt holds at most DIFF_TOTAL_TOKENS, so a big diff is either cut to
+# the top MAX_DIFF_FILES by _prioritize_diff_files or truncated by
+# _cap_files_for_prompt — and reviewed by one slow call. Sharded mode packs
+# the prioritized files, in order, into token-budgeted shards, reviews them
+# on a bounded pool of daemon threads (daemon so a straggler past the
+# deadline can't hold the hook process open the way ThreadPoolExecutor's
+# exit join would) and merges the findings with the dual_or dedup. Opt-in:
+# N shards cost roughly N× the API spend of one capped review.
+REVIEW_SHARD_TOKENS = int(os.environ.get("SG_REVIEW_SHARD_TOKENS", "30000"))
+REVIEW_MAX_SHARDS = int(os.environ.get("SG_REVIEW_MAX_SHARDS", "8"))
+REVIEW_SHARD_CONCURRENCY = int(os.environ.get("SG_REVIEW_SHARD_CONCURRENCY", "4"))
+# One deadline for the whole sharded review. Shards not finished by then
+# are abandoned and reported as review_shards_late.
+REVIEW_DEADLINE_S = float(os.environ.get("SG_REVIEW_DEADLINE_S", "600"))
+# Per-file prompt overhead (=== DIFF header + code fence), in tokens.
+_SHARD_FILE_OVERHEAD = 16
+
+_last_review_shards = 0
+_last_review_shards_late = 0
+
+
+def _sharded_review_enabled() -> bool:
+    """Gate for sharded review; opt in with SG_SHARDED_REVIEW=on (or =1)."""
+    return os.environ.get("SG_SHARDED_REVIEW", "").strip().lower() in ("1", "on", "true", "yes")
+
+
+def review_file_cap(max_files: int) -> int:
+    """How many prioritized files a caller should hand to
+    analyze_code_security: MAX_DIFF_FILES per shard when sharding."""
+    return max_files * max(1, REVIEW_MAX_SHARDS) if _sharded_review_enabled() else max_files
+
+
+def _pack_review_shards(files):
+    """Greedily pack (path, content) into shards of at most
+    REVIEW_SHARD_TOKENS (never more than DIFF_TOTAL_TOKENS, so
+    _cap_files_for_prompt leaves each shard whole). Order is preserved, so
+    the highest-priority files land in the first shards. Returns
+    (shards, bytes_dropped) — files past REVIEW_MAX_SHARDS count as dropped;
+    per-file packing beyond DIFF_PER_FILE_TOKENS happens inside each shard."""
+    budget = min(REVIEW_SHARD_TOKENS, DIFF_TOTAL_TOKENS)
+    shards: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    used = 0
+    dropped = 0
+    for fp, content in files:
+        size = min(review_api.estimate_tokens(content), DIFF_PER_FILE_TOKENS) + _SHARD_FILE_OVERHEAD
+        if current and used + size > budget:
+            shards.append(current)
+            current, used = [], 0
+        if len(shards) >= max(1, REVIEW_MAX_SHARDS):
+            dropped += len(content)
+            continue
+        current.append((fp, content))
+        used += size
+    if current:
+        shards.append(current)
+    return shards, dropped
+
+
+def _review_sharded(shards, dropped, is_diff, previous_findings):
+    """Review each shard with _analyze_code_security_once, at most
+    REVIEW_SHARD_CONCURRENCY at a time, within REVIEW_DEADLINE_S overall."""
+    import queue as _queue
+    import threading as _th
+    import time as _t
+
+    global _last_review_truncated_bytes, _last_review_shards, _last_review_shards_late
+    global _last_call_claude_http_error
+
+    deadline = _t.monotonic() + REVIEW_DEADLINE_S
+    stop = _th.Event()
+    work: "_queue.Queue[Tuple[int, List[Tuple[str, str]]]]" = _queue.Queue()
+    results: "_queue.Queue[Tuple[int, List[Dict[str, Any]], Optional[int]]]" = _queue.Queue()
+    for item in enumerate(shards):
+        work.put(item)
+
+    def _worker() -> None:
+        while not stop.is_set():
+            try:
+                i, shard = work.get_nowait()
+            except _queue.Empty:
+                return
+            try:
+                _, vulns, http_error = _analyze_code_security_once(shard, is_diff, previous_findings)
+            except Exception as e:  # one bad shard mustn't sink the rest
+                debug_log(f"sharded review: shard {i} raised {type(e).__name__}: {e}")
+                vulns, http_error = [], -1
+            results.put((i, vulns, http_error))
+
+    for _ in range(max(1, min(REVIEW_SHARD_CONCURRENCY, len(shards)))):
+        _th.Thread(target=_worker, daemon=True).start()
+
+    per_shard: Dict[int, List[Dict[str, Any]]] = {}
+    failed: Dict[int, int] = {}
+    while len(per_shard) < len(shards):
+        remaining = deadline - _t.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            i, vulns, http_error = results.get(timeout=remaining)
+        except _queue.Empty:
+            break
+        per_shard[i] = vulns
+        if http_error is not None:
+            failed[i] = http_error
+    stop.set()
+
+    late = len(shards) - len(per_shard)
+    # Shards reset these globals as they start; report the files that fit no
+    # shard, and the shard failures collected above, instead.
+    _last_review_truncated_bytes = dropped
+    _last_review_shards, _last_review_shards_late = len(shards), late
+    _last_call_claude_http_error = None
+    if failed:
+        debug_log(f"sharded review: {len(failed)}/{len(shards)} shards failed: {failed}")
+        _last_call_claude_http_error = failed[min(failed)]
+    if late:
+        debug_log(f"sharded review: {late}/{len(shards)} shards missed the {REVIEW_DEADLINE_S:.0f}s deadline")
+        if _last_call_claude_http_error is None:
+            _last_call_claude_http_error = -1
+    # Either way the Stop hook restores its unreviewed state, as it would
+    # after an API failure.
+    vulns = _merge_findings(per_shard[i] for i in sorted(per_shard))
+    debug_log(f"sharded review: {len(shards)} shards, {len(vulns)} findings")
+    if not vulns:
+        return None, []
+    return _format_vulns_guidance(vulns), vulns
+
+
+def _sharded_review_metrics() -> Dict[str, Any]:
+    """review_shards / review_shards_late for the last analyze_code_security
+    call, or {} when it wasn't sharded."""
+    if _last_review_shards <= 1:
+        return {}
+    return {"review_shards": _last_review_shards, "review_shards_late": _last_review_shards_late}
+
+
+def _analyze_code_security_once(files: List[Tuple[str, str]], is_diff: bool = False, previous_findings: Optional[List[str]] = None) -> Tuple[Optional[str], List[Dict[str, Any]], Optional[int]]:
+    """One review call over ``files`` (capped to a single prompt).
+
+    Returns (guidance, vulns, http_error): http_error is None when the
+    review ran, else the status this thread's API call failed with (-1 for
+    network errors or an unparseable response).
+    """
     # Build language context from file extensions
     lang_hints = {
         ".go": "Go", ".java": "Java/Spring Boot", ".py": "Python",
@@ -1039,12 +1220,23 @@ Respond with a JSON object. If vulnerabilities are found, set hasVulnerabilities
     }
 
     prompt += extensibility.guidance_block()
-    analysis = _call_claude_dual_or(prompt, output_schema,
-                                    bool_key="hasVulnerabilities",
-                                    list_key="vulnerabilities")
+    # Same normalized prompt + model → reuse the earlier answer (rebases,
+    # amends and repeat Stops re-send identical hunks).
+    cache_key = review_cache.review_key(
+        "single_shot", SECURITY_REVIEW_MODEL, _dual_or_enabled(), output_schema, prompt
+    )
+    analysis = review_cache.get(cache_key)
+    if analysis is None:
+        analysis = _call_claude_dual_or(prompt, output_schema,
+                                        bool_key="hasVulnerabilities",
+                                        list_key="vulnerabilities")
+        if analysis is None:
+            http_error = _thread_http_error()
+            return None, [], -1 if http_error is None else http_error
+        review_cache.put(cache_key, analysis)
     if not analysis or not analysis.get("hasVulnerabilities") or not analysis.get("vulnerabilities"):
         debug_log("LLM code review: no vulnerabilities found")
-        return None, []
+        return None, [], None
 
     vulns = analysis["vulnerabilities"]
 
@@ -1052,10 +1244,10 @@ Respond with a JSON object. If vulnerabilities are found, set hasVulnerabilities
     vulns = [v for v in vulns if v.get("severity", "medium") in ("critical", "high", "medium")]
     if not vulns:
         debug_log("LLM code review: no medium+ vulnerabilities found")
-        return None, []
+        return None, [], None
 
     debug_log(f"LLM code review found {len(vulns)} high/critical vulnerabilities")
-    return _format_vulns_guidance(vulns), vulns
+    return _format_vulns_guidance(vulns), vulns, None
 
 
 def _agentic_commit_review_enabled() -> bool:
@@ -1135,13 +1327,47 @@ def _agentic_spawn_env() -> Dict[str, str]:
     return env
 
 
+def _agentic_cache_key(repo_dir: str, diff_files: List[Tuple[str, str]],
+                       touched_paths: List[str]) -> str:
+    """review_cache key over every input that shapes agentic_review's prompt
+    and filtering (the prompt text itself is covered by the plugin version)."""
+    knobs = {k: v for k, v in os.environ.items()
+             if k.startswith("SG_AGENTIC_") and k != "SG_AGENTIC_DEBUG_DIR"}
+    context_dir = os.environ.get("SG_AGENTIC_CONTEXT_DIR") or repo_dir
+    return review_cache.review_key(
+        "agentic", knobs, [DIFF_PER_FILE_TOKENS, DIFF_TOTAL_TOKENS],
+        context_dir != repo_dir, list(touched_paths[:50]),
+        _AGENTIC_INVESTIGATE_SYSTEM,
+        *(f"=== DIFF: {fp} ===\n{content}" for fp, content in diff_files),
+    )
+
+
 def agentic_review(
     repo_dir: str, diff_files: List[Tuple[str, str]], touched_paths: List[str],
 ) -> Tuple[Optional[str], List[Dict[str, Any]], Dict[str, Any]]:
     """Two-stage Agent-SDK review: investigate (Read/Grep/Glob over the repo)
     then a self-refute filter pass. Returns (guidance_or_None, vulns,
     metrics). On SDK unavailability returns (None, [], {"agentic_fallback":
-    reason}) so the caller can fall back to the single-shot path."""
+    reason}) so the caller can fall back to the single-shot path.
+
+    Completed reviews are memoized in review_cache; a hit returns the stored
+    findings with metrics {"agentic": True, "review_cache_hit": True}."""
+    cache_key = _agentic_cache_key(repo_dir, diff_files, touched_paths)
+    cached = review_cache.get(cache_key)
+    if cached is not None:
+        vulns = [v for v in cached.get("findings") or [] if isinstance(v, dict)]
+        guidance = _format_vulns_guidance(vulns) if vulns else None
+        return guidance, vulns, {"agentic": True, "review_cache_hit": True}
+    guidance, vulns, metrics = _agentic_review_uncached(repo_dir, diff_files, touched_paths)
+    if not metrics.get("agentic_fallback"):
+        review_cache.put(cache_key, {"findings": vulns})
+    return guidance, vulns, metrics
+
+
+def _agentic_review_uncached(
+    repo_dir: str, diff_files: List[Tuple[str, str]], touched_paths: List[str],
+) -> Tuple[Optional[str], List[Dict[str, Any]], Dict[str, Any]]:
+    """agentic_review without the review_cache lookup."""
     import time as _t
 
     # Note: do NOT pop ANTHROPIC_AUTH_TOKEN from os.environ here. The race
@@ -16,52 +16,299 @@ from __future__ import annotations
 
 import json
 import os
+import re
 from typing import Any
 
 import extensibility
 
 # ---------------------------------------------------------------------------
-# Diff capping
+# Diff packing
 # ---------------------------------------------------------------------------
-
+#
+# The prompt budget is in tokens, estimated at ~4 bytes per token for code.
+# DIFF_PER_FILE_BYTES / DIFF_TOTAL_BYTES still set the defaults so existing
+# overrides keep working; DIFF_PER_FILE_TOKENS / DIFF_TOTAL_TOKENS win when
+# set.
+#
+# Packing works on whole hunks instead of byte offsets, so nothing is cut
+# mid-line. When a file or the whole diff is over budget:
+#   1. shrink unchanged context around each change (full → 1 line → 0),
+#      first per file, then across the diff;
+#   2. if still over, keep hunks greedily by rank — risky path (the
+#      _SECURITY_RISK_PATH_TOKENS used by _prioritize_diff_files), not a
+#      low-priority path, then density of added lines — and drop the rest;
+#   3. if a single hunk is too big for what is left, keep its leading lines.
+# Output keeps the original file and hunk order; markers inside the content
+# tell the reviewer what was omitted.
+
+BYTES_PER_TOKEN = 4
 DIFF_PER_FILE_BYTES = int(os.environ.get("DIFF_PER_FILE_BYTES", "80000"))
 DIFF_TOTAL_BYTES = int(os.environ.get("DIFF_TOTAL_BYTES", "400000"))
+DIFF_PER_FILE_TOKENS = int(
+    os.environ.get("DIFF_PER_FILE_TOKENS", str(DIFF_PER_FILE_BYTES // BYTES_PER_TOKEN))
+)
+DIFF_TOTAL_TOKENS = int(
+    os.environ.get("DIFF_TOTAL_TOKENS", str(DIFF_TOTAL_BYTES // BYTES_PER_TOKEN))
+)
+
+# Context levels tried in order; None = as produced by git.
+_CONTEXT_LEVELS = (None, 1, 0)
+# Don't bother keeping the head of an oversized hunk in less than this.
+_MIN_PARTIAL_HUNK_TOKENS = 256
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@(.*)$")
+
+OMITTED_FILE_MARKER = "[omitted by security-guidance: prompt token budget reached]"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+
+def _is_change(line: str) -> bool:
+    return line.startswith(("+", "-"))
+
+
+def _split_hunks(content: str) -> tuple[list[str], list[tuple[str, list[str]]]]:
+    """Split one file's diff body into (lines before the first hunk, hunks)."""
+    lines = content.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    prefix: list[str] = []
+    hunks: list[tuple[str, list[str]]] = []
+    for line in lines:
+        if _HUNK_HEADER_RE.match(line):
+            hunks.append((line, []))
+        elif hunks:
+            hunks[-1][1].append(line)
+        else:
+            prefix.append(line)
+    return prefix, hunks
+
+
+def _trim_context(header: str, body: list[str], context: int | None) -> list[str]:
+    """Rewrite one hunk with at most ``context`` unchanged lines around each
+    change, splitting it where a gap opens and recomputing the headers."""
+    m = _HUNK_HEADER_RE.match(header)
+    if context is None or not m:
+        return [header, *body]
+    old_no, new_no, suffix = int(m.group(1)), int(m.group(3)), m.group(5)
+    positions = []
+    for line in body:
+        positions.append((old_no, new_no))
+        if line.startswith("+"):
+            new_no += 1
+        elif line.startswith("-"):
+            old_no += 1
+        elif not line.startswith("\\"):
+            old_no += 1
+            new_no += 1
+    keep = [False] * len(body)
+    for i, line in enumerate(body):
+        if _is_change(line):
+            for j in range(max(0, i - context), min(len(body), i + context + 1)):
+                keep[j] = True
+        elif line.startswith("\\") and i and keep[i - 1]:
+            keep[i] = True  # "\ No newline at end of file" stays with its line
+    out: list[str] = []
+    i = 0
+    while i < len(body):
+        if not keep[i]:
+            i += 1
+            continue
+        j = i
+        while j < len(body) and keep[j]:
+            j += 1
+        chunk = body[i:j]
+        old_len = sum(1 for ln in chunk if not ln.startswith(("+", "\\")))
+        new_len = sum(1 for ln in chunk if not ln.startswith(("-", "\\")))
+        old_start, new_start = positions[i]
+        # git writes an empty side as "<line before>,0".
+        old_start -= 1 if old_len == 0 else 0
+        new_start -= 1 if new_len == 0 else 0
+        out.append(f"@@ -{old_start},{old_len} +{new_start},{new_len} @@{suffix}")
+        out.extend(chunk)
+        i = j
+    return out
+
+
+def _hunk_rank(file_path: str, body: list[str]) -> tuple:
+    # Imported here, not at module top: gitutil pulls in the hook's logging
+    # helpers, which importers of this module shouldn't load unless they
+    # actually pack a diff.
+    from gitutil import (
+        _LOW_PRIORITY_PATH_TOKENS, _LOW_PRIORITY_SUFFIXES, _SECURITY_RISK_PATH_TOKENS,
+    )
+    low = file_path.lower()
+    risk = sum(1 for t in _SECURITY_RISK_PATH_TOKENS if t in low)
+    low_prio = file_path.endswith(_LOW_PRIORITY_SUFFIXES) or any(
+        t in "/" + low for t in _LOW_PRIORITY_PATH_TOKENS
+    )
+    added = sum(1 for ln in body if ln.startswith("+"))
+    return (risk, not low_prio, added / max(1, len(body)), added)
+
+
+class _Unit:
+    """One packable piece of a file: a hunk, or the whole content when it
+    isn't a unified diff."""
+
+    def __init__(self, file_idx, header, body, rank):
+        self.file_idx = file_idx
+        self.header = header
+        self.body = body
+        self.rank = rank
+        self._text: dict = {}
+
+    def text(self, context):
+        if context not in self._text:
+            lines = _trim_context(self.header, self.body, context) if self.header else self.body
+            self._text[context] = "\n".join(lines)
+        return self._text[context]
+
+    def cost(self, context):
+        return estimate_tokens(self.text(context)) + 1
+
+
+def pack_diff_for_prompt(
+    files: list[tuple[str, str]],
+    *,
+    total_tokens: int | None = None,
+    per_file_tokens: int | None = None,
+) -> tuple[list[tuple[str, str]], dict[str, Any]]:
+    """Fit (path, diff) pairs into a token budget; return (packed, report).
+
+    ``report`` has ``tokens_used``, ``context`` (per-file context level
+    used: None = unchanged), ``hunks_total``, ``hunks_kept``,
+    ``hunks_partial``, ``bytes_dropped`` and ``dropped`` — one
+    ``{"filePath", "hunk", "tokens"}`` record per omitted hunk (``hunk`` is
+    its header, or "" for non-diff content).
+    """
+    total_budget = DIFF_TOTAL_TOKENS if total_tokens is None else total_tokens
+    file_budget = DIFF_PER_FILE_TOKENS if per_file_tokens is None else per_file_tokens
+
+    prefixes: list[list[str]] = []
+    units_by_file: list[list[_Unit]] = []
+    for idx, (fp, content) in enumerate(files):
+        prefix, hunks = _split_hunks(content)
+        if hunks:
+            units = [_Unit(idx, h, body, _hunk_rank(fp, body)) for h, body in hunks]
+        else:
+            prefix, units = [], [_Unit(idx, None, content.split("\n"), _hunk_rank(fp, []))]
+        prefixes.append(prefix)
+        units_by_file.append(units)
+
+    def file_cost(idx, context):
+        return estimate_tokens("\n".join(prefixes[idx])) + sum(
+            u.cost(context) for u in units_by_file[idx]
+        )
+
+    # 1. Context: the most each file can keep on its own, then the most the
+    #    whole diff can keep.
+    levels = []
+    for idx in range(len(files)):
+        level = _CONTEXT_LEVELS[-1]
+        for ctx in _CONTEXT_LEVELS:
+            if file_cost(idx, ctx) <= file_budget:
+                level = ctx
+                break
+        levels.append(level)
+    for floor in _CONTEXT_LEVELS:
+        floored = [
+            lvl if _CONTEXT_LEVELS.index(lvl) >= _CONTEXT_LEVELS.index(floor) else floor
+            for lvl in levels
+        ]
+        if sum(file_cost(i, floored[i]) for i in range(len(files))) <= total_budget:
+            levels = floored
+            break
+    else:
+        levels = [_CONTEXT_LEVELS[-1]] * len(files)
+
+    # 2. Greedy fill by rank.
+    ranked = sorted(
+        (u for units in units_by_file for u in units), key=lambda u: u.rank, reverse=True
+    )
+    used_total = sum(estimate_tokens("\n".join(p)) for p in prefixes)
+    used_file = [estimate_tokens("\n".join(p)) for p in prefixes]
+    kept: dict[int, str] = {}
+    for u in ranked:
+        cost = u.cost(levels[u.file_idx])
+        if used_total + cost <= total_budget and used_file[u.file_idx] + cost <= file_budget:
+            kept[id(u)] = u.text(levels[u.file_idx])
+            used_total += cost
+            used_file[u.file_idx] += cost
+
+    # 3. Leading lines of the best hunks that didn't fit whole.
+    partial = set()
+    for u in ranked:
+        if id(u) in kept:
+            continue
+        room = min(total_budget - used_total, file_budget - used_file[u.file_idx])
+        if room < _MIN_PARTIAL_HUNK_TOKENS:
+            continue
+        head: list[str] = []
+        size = 0
+        for line in u.text(levels[u.file_idx]).split("\n"):
+            if size + estimate_tokens(line) + 1 > room:
+                break
+            head.append(line)
+            size += estimate_tokens(line) + 1
+        if any(_is_change(ln) for ln in head):
+            kept[id(u)] = "\n".join(head) + (
+                "\n... [truncated by security-guidance: hunk exceeds prompt token budget]"
+            )
+            partial.add(id(u))
+            used_total += size
+            used_file[u.file_idx] += size
+
+    out: list[tuple[str, str]] = []
+    dropped: list[dict[str, Any]] = []
+    sent_bytes = 0
+    for idx, (fp, content) in enumerate(files):
+        units = units_by_file[idx]
+        if levels[idx] is None and all(id(u) in kept and id(u) not in partial for u in units):
+            out.append((fp, content))  # fits as-is: pass through byte-identical
+            sent_bytes += len(content)
+            continue
+        parts = list(prefixes[idx])
+        omitted = 0
+        for u in units:
+            if id(u) in kept:
+                parts.append(kept[id(u)])
+            else:
+                omitted += 1
+                dropped.append({"filePath": fp, "hunk": u.header or "",
+                                "tokens": u.cost(levels[idx])})
+        if omitted == len(units):
+            out.append((fp, OMITTED_FILE_MARKER))
+            continue
+        body = "\n".join(parts)
+        sent_bytes += len(body)
+        if omitted:
+            body += (f"\n... [security-guidance: {omitted} lower-priority hunk(s) "
+                     "omitted to fit the prompt token budget]")
+        out.append((fp, body))
+
+    report = {
+        "tokens_used": used_total,
+        "context": levels,
+        "hunks_total": len(ranked),
+        "hunks_kept": len(kept),
+        "hunks_partial": len(partial),
+        "bytes_dropped": max(0, sum(len(c) for _, c in files) - sent_bytes),
+        "dropped": dropped,
+    }
+    return out, report
 
 
 def cap_diff_for_prompt(
     files: list[tuple[str, str]],
 ) -> tuple[list[tuple[str, str]], int]:
-    """Cap per-file and total diff bytes; return (capped_files, bytes_dropped).
+    """Fit the diff into the prompt budget; return (packed_files, bytes_dropped).
 
-    Truncation markers are written inside the content so the reviewer
-    knows the file is incomplete.
+    Thin wrapper over ``pack_diff_for_prompt`` for callers that only need the
+    dropped-bytes count.
     """
-    out: list[tuple[str, str]] = []
-    dropped = 0
-    total = 0
-    for fp, content in files:
-        if len(content) > DIFF_PER_FILE_BYTES:
-            dropped += len(content) - DIFF_PER_FILE_BYTES
-            content = (
-                content[:DIFF_PER_FILE_BYTES]
-                + "\n... [truncated by security-guidance: file exceeds per-file byte cap]"
-            )
-        room = DIFF_TOTAL_BYTES - total
-        if room <= 0:
-            dropped += len(content)
-            out.append(
-                (fp, "[omitted by security-guidance: total diff byte cap reached]")
-            )
-            continue
-        if len(content) > room:
-            dropped += len(content) - room
-            content = (
-                content[:room]
-                + "\n... [truncated by security-guidance: total diff byte cap reached]"
-            )
-        total += len(content)
-        out.append((fp, content))
-    return out, dropped
+    packed, report = pack_diff_for_prompt(files)
+    return packed, report["bytes_dropped"]
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,136 @@
+"""
+On-disk memo of LLM review results, keyed on normalized diff content.
+
+``_append_reviewed_shas`` only dedups by commit SHA, so the same hunks are
+re-reviewed — at full API cost and latency — after a rebase, amend,
+cherry-pick, or a Stop that fires twice over an unchanged diff. This cache
+stores the model's answer under a hash of everything that determines it:
+
+  - the review kind and model (plus the dual-OR / agentic knobs that change
+    what the reviewer does),
+  - the plugin version, so prompt edits shipped in a release invalidate old
+    entries,
+  - the prompt content with hunk headers normalized — ``@@ -12,7 +12,9 @@``
+    becomes ``@@ @@`` because a rebase shifts line numbers without changing
+    what is being reviewed — and trailing whitespace stripped.
+
+Only successful reviews are stored; API failures and agentic fallbacks are
+never cached, so a transient error can't pin a "no findings" answer.
+
+Entries are one JSON file each under ``<state dir>/review_cache/`` (0700
+dir, 0600 files — findings quote code). Reads bump the file's mtime, and
+writes evict least-recently-used files until the directory is under
+``SG_REVIEW_CACHE_MAX_ENTRIES`` and ``SG_REVIEW_CACHE_MAX_BYTES``.
+Concurrent hooks race benignly: writes are atomic replaces and a lost entry
+only costs one more API call. ``ENABLE_REVIEW_CACHE=0`` disables it.
+
+Lookups are counted into the ``_base`` usage accumulator and surface as
+``review_cache_hits`` / ``review_cache_misses`` on the next emit_metrics.
+"""
+import hashlib
+import json
+import os
+import re
+
+from _base import debug_log, _record_review_cache, _PV, state_dir as _state_dir
+
+ENABLE_REVIEW_CACHE = os.environ.get("ENABLE_REVIEW_CACHE", "1") != "0"
+REVIEW_CACHE_MAX_ENTRIES = int(os.environ.get("SG_REVIEW_CACHE_MAX_ENTRIES", "2000"))
+REVIEW_CACHE_MAX_BYTES = int(os.environ.get("SG_REVIEW_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+_CACHE_DIRNAME = "review_cache"
+_HUNK_HEADER_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@", re.M)
+_TRAILING_WS_RE = re.compile(r"[ \t]+$", re.M)
+
+
+def cache_dir():
+    return os.path.join(_state_dir(), _CACHE_DIRNAME)
+
+
+def normalize(text):
+    """Drop hunk line numbers and trailing whitespace."""
+    return _TRAILING_WS_RE.sub("", _HUNK_HEADER_RE.sub("@@ @@", text or ""))
+
+
+def review_key(kind, *parts):
+    """Hash ``kind``, the plugin version and ``parts`` (strings are
+    normalized; anything else is JSON-encoded) into a cache key."""
+    h = hashlib.sha256()
+    h.update(f"{kind}\0{_PV}\0".encode())
+    for part in parts:
+        text = normalize(part) if isinstance(part, str) else json.dumps(part, sort_keys=True)
+        h.update(text.encode("utf-8", errors="replace"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def get(key):
+    """Cached payload for ``key`` or None. Counts the lookup either way."""
+    if not ENABLE_REVIEW_CACHE:
+        return None
+    path = os.path.join(cache_dir(), key + ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        _record_review_cache(False)
+        return None
+    _record_review_cache(True)
+    debug_log(f"review_cache: hit {key[:12]}")
+    return payload
+
+
+def put(key, payload):
+    """Store ``payload`` (JSON-serializable) under ``key``, then evict."""
+    if not ENABLE_REVIEW_CACHE:
+        return
+    d = cache_dir()
+    path = os.path.join(d, key + ".json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(d, mode=0o700, exist_ok=True)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError) as e:
+        debug_log(f"review_cache: put failed: {e}")
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return
+    _evict(d)
+
+
+def _evict(d):
+    entries = []
+    try:
+        with os.scandir(d) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    count = len(entries)
+    if count <= REVIEW_CACHE_MAX_ENTRIES and total <= REVIEW_CACHE_MAX_BYTES:
+        return
+    entries.sort()
+    removed = 0
+    for _, size, path in entries:
+        if count <= REVIEW_CACHE_MAX_ENTRIES and total <= REVIEW_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        count -= 1
+        total -= size
+        removed += 1
+    debug_log(f"review_cache: evicted {removed} entries")
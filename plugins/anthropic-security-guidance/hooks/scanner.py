@@ -0,0 +1,275 @@
+"""
+Precompiled multi-pattern scanner for the PostToolUse pattern warnings.
+
+``check_patterns`` used to walk ``SECURITY_PATTERNS + user_patterns()`` on
+every Edit/Write, re-running each rule's substring checks and an uncompiled
+``re.search`` over the whole content. On large generated files that loop is
+the most expensive thing the PostToolUse hook does. This module compiles the
+rule list once per process and scans in three steps:
+
+1. **Path gating.** Each rule's ``path_filter`` is evaluated for the path; the
+   tuple of surviving content rules is the path's *extension class* (in
+   practice: JS, Python, docs, other — plus whatever user globs select).
+   Each class gets its own precompiled group, built once and cached.
+2. **Literal prefilter.** Every distinct literal in the group — the rules'
+   ``substrings`` plus a required literal extracted from each regex's parse
+   tree (``pickle.``, ``os.system``, ``verify``...) — is looked up in the
+   content exactly once. A regex whose required literals are all absent
+   cannot match and is never run.
+3. **Regex confirmation.** Only the surviving candidates run their
+   precompiled regex.
+
+The prefilter is a necessary condition, never a sufficient one, so results
+are identical to the old loop — same rule names, same order, same exception
+handling (a raising ``path_filter`` skips the rule; a raising ``path_check``
+or an uncompilable regex just doesn't match). Regexes whose required literal
+can't be derived (case-insensitive, or no literal run on every path) are
+always run.
+
+Side-effect-free at import time; no intra-plugin imports besides ``_base``.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:  # Python 3.11+ moved the parser under re; older versions ship sre_parse.
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+    from re import _constants as _sre_constants  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+    import sre_constants as _sre_constants  # type: ignore[no-redef]
+
+from _base import debug_log
+
+
+# Cap on cached extension-class groups. Built-in filters only produce a
+# handful of classes; user `paths:` globs can add more, but never unbounded.
+_GROUP_CACHE_MAX = 64
+
+
+# ── required-literal extraction ──────────────────────────────────────────────
+
+_LITERAL = _sre_constants.LITERAL
+_SUBPATTERN = _sre_constants.SUBPATTERN
+_BRANCH = _sre_constants.BRANCH
+_MAX_REPEAT = _sre_constants.MAX_REPEAT
+_MIN_REPEAT = _sre_constants.MIN_REPEAT
+_POSSESSIVE_REPEAT = getattr(_sre_constants, "POSSESSIVE_REPEAT", None)
+_ATOMIC_GROUP = getattr(_sre_constants, "ATOMIC_GROUP", None)
+
+
+def _best(candidates: List[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+    """Pick the most selective alternative set: the one whose shortest
+    literal is longest (a 10-char literal prunes more than a 2-char one)."""
+    best = None
+    best_len = 0
+    for cand in candidates:
+        shortest = min(len(s) for s in cand)
+        if shortest > best_len:
+            best, best_len = cand, shortest
+    return best
+
+
+def _required_literals(subpattern) -> Optional[Tuple[str, ...]]:
+    """Return literals of which at least one must occur in any match of
+    ``subpattern``, or None if no such set can be derived.
+
+    Walks the sequence collecting runs of consecutive LITERAL ops (any other
+    op ends a run), recursing into groups, mandatory repeats and branches.
+    Branches yield the union of their arms and are only usable when every arm
+    yields a set.
+    """
+    candidates: List[Tuple[str, ...]] = []
+    run: List[str] = []
+
+    def _flush():
+        if run:
+            candidates.append(("".join(run),))
+            run.clear()
+
+    for op, av in subpattern:
+        if op is _LITERAL:
+            run.append(chr(av))
+            continue
+        _flush()
+        sub = None
+        if op is _SUBPATTERN:
+            _group, add_flags, _del_flags, p = av
+            if not (add_flags & _sre_constants.SRE_FLAG_IGNORECASE):
+                sub = _required_literals(p)
+        elif op is _ATOMIC_GROUP and _ATOMIC_GROUP is not None:
+            sub = _required_literals(av)
+        elif op in (_MAX_REPEAT, _MIN_REPEAT) or (
+            _POSSESSIVE_REPEAT is not None and op is _POSSESSIVE_REPEAT
+        ):
+            lo, _hi, item = av
+            if lo >= 1:
+                sub = _required_literals(item)
+        elif op is _BRANCH:
+            arms = [_required_literals(arm) for arm in av[1]]
+            if arms and all(arms):
+                sub = tuple(dict.fromkeys(s for arm in arms for s in arm))
+        if sub:
+            candidates.append(sub)
+    _flush()
+    return _best(candidates)
+
+
+def required_literals(regex: str) -> Optional[Tuple[str, ...]]:
+    """Public wrapper: parse ``regex`` and extract its required literals.
+
+    Returns None for case-insensitive patterns and for anything the parser
+    rejects — callers then run the regex unconditionally.
+    """
+    try:
+        parsed = _sre_parse.parse(regex)
+        if parsed.state.flags & _sre_constants.SRE_FLAG_IGNORECASE:
+            return None
+        return _required_literals(parsed)
+    except Exception:
+        return None
+
+
+# ── compiled rules ───────────────────────────────────────────────────────────
+
+
+class _Rule:
+    """One pattern dict, compiled. Keeps the source dict's callables as-is."""
+
+    __slots__ = (
+        "index", "name", "reminder", "path_filter", "path_check",
+        "substrings", "regex", "literals",
+    )
+
+    def __init__(self, index: int, pattern: Dict[str, Any]):
+        self.index = index
+        self.name = pattern["ruleName"]
+        self.reminder = pattern["reminder"]
+        self.path_filter = pattern.get("path_filter")
+        self.path_check = pattern.get("path_check")
+        self.substrings = tuple(pattern.get("substrings") or ())
+        self.regex = None
+        self.literals = None
+        if "regex" in pattern:
+            try:
+                self.regex = re.compile(pattern["regex"])
+            except Exception as e:
+                # The old loop swallowed the error on every call; do it once.
+                debug_log(f"scanner: {self.name}: regex does not compile: {e}")
+            else:
+                self.literals = required_literals(pattern["regex"])
+
+    @property
+    def scans_content(self) -> bool:
+        return bool(self.substrings) or self.regex is not None
+
+
+class _Group:
+    """The content rules active for one extension class, with the distinct
+    literals they need looked up once per scan."""
+
+    __slots__ = ("rules", "literals")
+
+    def __init__(self, rules: Sequence[_Rule]):
+        self.rules = tuple(rules)
+        literals: Dict[str, None] = {}
+        for rule in self.rules:
+            for s in rule.substrings:
+                literals[s] = None
+            for s in rule.literals or ():
+                literals[s] = None
+        self.literals = tuple(literals)
+
+    def scan(self, content: str) -> set:
+        """Return the indices of rules in this group that match ``content``."""
+        present = {s for s in self.literals if s in content}
+        hits = set()
+        for rule in self.rules:
+            if any(s in present for s in rule.substrings):
+                hits.add(rule.index)
+                continue
+            if rule.regex is None:
+                continue
+            if rule.literals is not None and not any(s in present for s in rule.literals):
+                continue
+            try:
+                if rule.regex.search(content):
+                    hits.add(rule.index)
+            except Exception:
+                pass
+        return hits
+
+
+class PatternScanner:
+    """All pattern rules compiled for repeated scanning.
+
+    Build once per process (see ``get_scanner``); ``scan`` is then a pure
+    function of (path, content) returning ``[(ruleName, reminder), ...]`` in
+    rule order, exactly like the uncompiled loop it replaces.
+    """
+
+    def __init__(self, patterns: Sequence[Dict[str, Any]]):
+        self._rules = [_Rule(i, p) for i, p in enumerate(patterns)]
+        self._groups: Dict[Tuple[int, ...], _Group] = {}
+
+    def _group_for(self, active: Tuple[int, ...]) -> _Group:
+        group = self._groups.get(active)
+        if group is None:
+            if len(self._groups) >= _GROUP_CACHE_MAX:
+                self._groups.clear()
+            group = _Group([self._rules[i] for i in active])
+            self._groups[active] = group
+        return group
+
+    def scan(self, file_path: str, content: Optional[str]) -> List[Tuple[str, str]]:
+        normalized_path = file_path.lstrip("/")
+        gated: List[_Rule] = []
+        for rule in self._rules:
+            # path_filter is a gate: when present, the rule only applies to
+            # matching paths. Distinct from path_check, which is itself a
+            # positive match condition (e.g. .github/workflows/).
+            if rule.path_filter is not None:
+                try:
+                    if not rule.path_filter(normalized_path):
+                        continue
+                except Exception:
+                    continue
+            gated.append(rule)
+
+        matched = set()
+        for rule in gated:
+            if rule.path_check is not None:
+                try:
+                    if rule.path_check(normalized_path):
+                        matched.add(rule.index)
+                except Exception:
+                    pass
+
+        if content:
+            active = tuple(
+                r.index for r in gated if r.scans_content and r.index not in matched
+            )
+            if active:
+                matched |= self._group_for(active).scan(content)
+
+        return [(r.name, r.reminder) for r in gated if r.index in matched]
+
+
+# Process-wide cache. Built-ins never change; user patterns are replaced
+# wholesale by extensibility.load_for_session(), so list identity is the key.
+# The lists themselves are held (not their ids) so a recycled id can't alias.
+_cached_scanner: Optional[PatternScanner] = None
+_cached_sources: Tuple[Any, Any] = (None, None)
+
+
+def get_scanner(builtin: Sequence[Dict[str, Any]], user: Sequence[Dict[str, Any]]) -> PatternScanner:
+    """Return the scanner for ``builtin + user``, compiling on first use or
+    when either list object has been swapped out."""
+    global _cached_scanner, _cached_sources
+    if (
+        _cached_scanner is None
+        or _cached_sources[0] is not builtin
+        or _cached_sources[1] is not user
+    ):
+        _cached_scanner = PatternScanner(list(builtin) + list(user))
+        _cached_sources = (builtin, user)
+    return _cached_scanner
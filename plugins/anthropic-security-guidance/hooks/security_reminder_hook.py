@@ -76,15 +76,27 @@ from typing import Optional, Tuple, Dict, Any, List
 # without going through the CC hook protocol.  The underscored names below
 # alias into it so this script stays the single CC-hook entrypoint.
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Warm-daemon fast path (SG_DAEMON=on, see daemon.py). Runs before the heavy
+# imports below: when a daemon serves the event, this process replays its
+# output and exits without ever importing llm/gitutil/review_api. Otherwise
+# the already-read stdin is handed to main().
+_PRELOADED_STDIN = None
+if __name__ == "__main__" and "--daemon" not in sys.argv[1:]:
+    import daemon as _daemon_client  # noqa: E402
+    _PRELOADED_STDIN = _daemon_client.client_main()
+
 import review_api  # noqa: E402
 from _base import (  # noqa: E402,F401
     DEBUG_LOG_FILE, DEBUG_LOG_MAX_BYTES, debug_log,
     PROVENANCE_TAG, PROVENANCE_BANNER,
     _read_plugin_version_int, _PV, _USAGE, _USAGE_LOCK,
-    _PRICE_PER_MTOK, _PRICE_DEFAULT, _record_usage, _usage_metrics,
+    _PRICE_PER_MTOK, _PRICE_DEFAULT, _record_usage, _usage_metrics, _reset_usage,
     state_dir as _resolve_state_dir,
 )
+import daemon  # noqa: E402
 import extensibility  # noqa: E402
+import scanner  # noqa: E402
 from patterns import (  # noqa: E402,F401
     _JS_EXTS, _PY_EXTS, _DOC_EXTS,
     _UNSAFE_DESERIALIZATION_REMINDER, _UNSAFE_YAML_LOAD_REMINDER,
@@ -118,6 +130,7 @@ from diffstate import (  # noqa: E402,F401
     _reviewed_shas_path, _load_reviewed_shas, _append_reviewed_shas,
     UNTRACKED_BASELINE_CAP, _list_untracked, compute_v2_review_set,
 )
+from diffcache import cached_review_diff  # noqa: E402,F401
 import llm  # noqa: E402  module ref for reassignable globals (_last_call_claude_http_error etc.)
 from llm import (  # noqa: E402,F401
     ANTHROPIC_API_KEY, ANTHROPIC_AUTH_TOKEN, HAS_API_CREDENTIALS,
@@ -130,7 +143,8 @@ from llm import (  # noqa: E402,F401
     _cap_files_for_prompt, _build_auth_headers, _call_claude, _call_claude_dual_or,
     _format_vulns_guidance, _format_vulns_summary, _finding_keys, _dedup_against_state,
     analyze_code_security, _agentic_commit_review_enabled, agentic_review,
-    analyze_security_concerns,
+    analyze_security_concerns, _merge_findings, _sharded_review_enabled,
+    review_file_cap, _sharded_review_metrics,
 )
 
 # LLM-based code security review (enabled by default when API key is available)
@@ -450,47 +464,15 @@ def sweep_pending_warnings(session_id):
 # =====================================================================
 
 def check_patterns(file_path, content):
-    """Check if file path or content matches any security patterns. Returns ALL matches."""
-    normalized_path = file_path.lstrip("/")
-    matches = []
-
-    for pattern in list(SECURITY_PATTERNS) + extensibility.user_patterns():
-        # path_filter is a gate: when present, the rule only applies to
-        # matching paths. Distinct from path_check, which is itself a
-        # positive match condition (e.g. .github/workflows/).
-        if "path_filter" in pattern:
-            try:
-                if not pattern["path_filter"](normalized_path):
-                    continue
-            except Exception:
-                continue
-
-        matched = False
-
-        if "path_check" in pattern:
-            try:
-                if pattern["path_check"](normalized_path):
-                    matched = True
-            except Exception:
-                pass
-
-        if not matched and "substrings" in pattern and content:
-            for substring in pattern["substrings"]:
-                if substring in content:
-                    matched = True
-                    break
+    """Check if file path or content matches any security patterns. Returns ALL matches.
 
-        if not matched and "regex" in pattern and content:
-            try:
-                if re.search(pattern["regex"], content):
-                    matched = True
-            except Exception:
-                pass
-
-        if matched:
-            matches.append((pattern["ruleName"], pattern["reminder"]))
-
-    return matches
+    Rules are compiled once per process by ``scanner.get_scanner`` (literal
+    prefilter + precompiled regexes, grouped per path class); results are
+    identical to evaluating each rule in turn.
+    """
+    return scanner.get_scanner(SECURITY_PATTERNS, extensibility.user_patterns()).scan(
+        file_path, content
+    )
 
 def extract_content_from_input(tool_name, tool_input):
     """Extract content to check from tool input based on tool type."""
@@ -1302,7 +1284,7 @@ def handle_commit_review_posttooluse(input_data):
         emit_metrics({"skipped": True, "skip_reason": 31, **_base,
                       "diff_files_count": len(diff_files)})
         sys.exit(0)
-    diff_files, _dropped = _prioritize_diff_files(diff_files, MAX_DIFF_FILES)
+    diff_files, _dropped = _prioritize_diff_files(diff_files, review_file_cap(MAX_DIFF_FILES))
     if _dropped:
         debug_log(f"Commit review: prioritized to {len(diff_files)} files "
                   f"(dropped {_dropped} lower-risk)")
@@ -1936,23 +1918,30 @@ def handle_stop_hook(input_data):
     # caught either way. Fall back to diff_base (HEAD/head_at_capture)
     # when the stash is missing or pruned.
     content_base = baseline_sha or diff_base
-    diff_output = get_git_diff(repo_root, content_base, full_context=False,
-                               paths=review_paths, untracked_paths=untracked)
-    if diff_output is None and content_base != diff_base:
-        debug_log(f"Stop hook: diff against {content_base[:12]} failed — falling back to {diff_base}")
-        diff_output = get_git_diff(repo_root, diff_base, full_context=False,
+    # Per-file hunks keyed on (base, path, worktree blob): only paths edited
+    # since the last Stop are re-diffed. None → run the whole-set diff.
+    cached = cached_review_diff(repo_root, content_base, review_paths, untracked)
+    if cached is not None:
+        diff_changed, diff_files = cached
+    else:
+        diff_output = get_git_diff(repo_root, content_base, full_context=False,
                                    paths=review_paths, untracked_paths=untracked)
+        if diff_output is None and content_base != diff_base:
+            debug_log(f"Stop hook: diff against {content_base[:12]} failed — falling back to {diff_base}")
+            diff_output = get_git_diff(repo_root, diff_base, full_context=False,
+                                       paths=review_paths, untracked_paths=untracked)
+        diff_changed = bool(diff_output and diff_output.strip())
+        # Parse diff into per-file content
+        diff_files = parse_diff_into_files(diff_output) if diff_changed else []
     # filter_preexisting_from_diff needs a resolvable pre-turn ref; fall
     # back to HEAD when UPS never captured a baseline (print mode).
     if not baseline_sha:
         baseline_sha = "HEAD"
 
-    if not diff_output or not diff_output.strip():
+    if not diff_changed:
         debug_log("Stop hook: no changes since baseline")
         _skip(6)
 
-    # Parse diff into per-file content
-    diff_files = parse_diff_into_files(diff_output)
     if not diff_files:
         debug_log("Stop hook: no source code files in diff")
         _skip(7)
@@ -1968,9 +1957,10 @@ def handle_stop_hook(input_data):
         debug_log(f"Stop hook: pathological diff ({len(diff_files)} files > "
                   f"{10 * MAX_DIFF_FILES}), skipping")
         _skip(8, diff_files_count=len(diff_files))
-    if len(diff_files) > MAX_DIFF_FILES:
+    # Sharded review (SG_SHARDED_REVIEW) keeps MAX_DIFF_FILES per shard.
+    if len(diff_files) > review_file_cap(MAX_DIFF_FILES):
         diff_files, _stop_dropped = _prioritize_diff_files(
-            diff_files, MAX_DIFF_FILES)
+            diff_files, review_file_cap(MAX_DIFF_FILES))
         debug_log(f"Stop hook: prioritized to {len(diff_files)} files "
                   f"(dropped {_stop_dropped} lower-risk)")
 
@@ -2076,6 +2066,8 @@ def handle_stop_hook(input_data):
             **({"diff_truncated": llm._last_review_truncated_bytes}
                if llm._last_review_truncated_bytes else {}),
             **sweep_trimmed,
+            # Last, so truncation drops these before the keys above
+            **llm._sharded_review_metrics(),
         }, rewake_summary=_format_vulns_summary(vulns),
            additional_context=(PROVENANCE_BANNER + "\n\n"
                                + concrete_guidance + CONTINUATION_SUFFIX + "\n"),
@@ -2104,6 +2096,7 @@ def handle_stop_hook(input_data):
         **({"diff_truncated": llm._last_review_truncated_bytes}
            if llm._last_review_truncated_bytes else {}),
         **v2_metrics,
+        **llm._sharded_review_metrics(),
     })
     sys.exit(0)
 
@@ -2165,9 +2158,10 @@ def main():
     if random.random() < 0.1:
         cleanup_old_state_files()
 
-    # Read input from stdin
+    # Read input from stdin (already consumed by the daemon fast path when
+    # the event wasn't forwarded)
     try:
-        raw_input = sys.stdin.read()
+        raw_input = _PRELOADED_STDIN if _PRELOADED_STDIN is not None else sys.stdin.read()
         input_data = json.loads(raw_input)
     except json.JSONDecodeError as e:
         debug_log(f"JSON decode error: {e}")
@@ -2321,5 +2315,48 @@ def main():
 
     sys.exit(0)
 
+def _handle_daemon_request(req):
+    """Run main() for one event forwarded to the warm daemon.
+
+    Swaps in the client's environ, cwd, argv and stdin, captures stdout and
+    stderr, and maps sys.exit() to an exit code — so the client can replay
+    exactly what an in-process run would have produced. Import-time config
+    (ENABLE_* etc.) is not swapped; daemon.fingerprint() routes clients with
+    different values to a different daemon.
+    """
+    import io
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    saved_io = (sys.stdin, sys.stdout, sys.stderr, sys.argv)
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    try:
+        os.environ.clear()
+        os.environ.update(req.get("env") or {})
+        try:
+            os.chdir(req.get("cwd") or saved_cwd)
+        except OSError:
+            pass
+        sys.stdin = io.StringIO(req.get("stdin") or "")
+        sys.stdout, sys.stderr = out, err
+        sys.argv = list(req.get("argv") or saved_io[3])
+        _reset_usage()
+        try:
+            main()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.stdin, sys.stdout, sys.stderr, sys.argv = saved_io
+        os.environ.clear()
+        os.environ.update(saved_env)
+        try:
+            os.chdir(saved_cwd)
+        except OSError:
+            pass
+    return code, out.getvalue(), err.getvalue()
+
 if __name__ == "__main__":
-    main()
+    if "--daemon" in sys.argv[1:]:
+        daemon.serve(_handle_daemon_request)
+    else:
+        main()
@@ -1,9 +1,19 @@
 """
-Per-session state-file plumbing for the security-guidance plugin.
+Per-session state plumbing for the security-guidance plugin.
 
-Holds the JSON state file location, fcntl-locked read-modify-write helper,
-and old-file GC. Side-effect-free at import time (no env-var reads beyond
-``CLAUDE_CODE_REMOTE_SESSION_ID`` inside the helpers).
+Holds the locked read-modify-write helper, old-state GC, and the backend
+choice behind them:
+
+  - ``sqlite`` (default): one WAL-mode database for all sessions with
+    per-key upserts and indexed TTL expiry — see ``session_store``. Existing
+    JSON state files are imported on first use.
+  - ``json``: one fcntl-locked JSON file per session, rewritten whole on
+    every call. Used when ``SG_STATE_BACKEND=json``, when the ``sqlite3``
+    module is unavailable, or when the database can't be opened.
+
+Side-effect-free at import time (no env-var reads beyond
+``CLAUDE_CODE_REMOTE_SESSION_ID`` and ``SG_STATE_BACKEND`` inside the
+helpers).
 
 The ``atomic_check_*`` helpers that build on ``with_locked_state`` deliberately
 remain in ``security_reminder_hook.py`` so that tests which monkeypatch
@@ -21,6 +31,40 @@ from datetime import datetime
 
 from _base import debug_log, state_dir as _state_dir
 
+try:
+    import session_store
+except ImportError:  # Python built without sqlite3
+    session_store = None
+
+
+# SqliteStateStore per database path (state dir can change under tests), and
+# the paths whose database failed to open, so we fall back without retrying
+# on every call.
+_sqlite_stores = {}
+_sqlite_failed = set()
+
+
+def _sqlite_store():
+    """The SQLite store for the current state dir, or None → use JSON."""
+    if session_store is None:
+        return None
+    if os.environ.get("SG_STATE_BACKEND", "sqlite").strip().lower() == "json":
+        return None
+    path = os.path.join(_state_dir(), session_store.DB_BASENAME)
+    if path in _sqlite_failed:
+        return None
+    store = _sqlite_stores.get(path)
+    if store is None:
+        store = session_store.SqliteStateStore(path)
+        try:
+            store._connect()
+        except Exception as e:
+            debug_log(f"session_state: SQLite backend unavailable ({e}); using JSON files")
+            _sqlite_failed.add(path)
+            return None
+        _sqlite_stores[path] = store
+    return store
+
 
 def _state_key(session_id):
     # In CCR each user turn is a new CC process with a fresh session_id; the
@@ -47,7 +91,7 @@ def get_lock_file(session_id):
 
 
 def cleanup_old_state_files():
-    """Remove state files and lock files older than 30 days."""
+    """Remove state (rows, files and lock files) older than 30 days."""
     try:
         state_dir = _state_dir()
         if not os.path.exists(state_dir):
@@ -56,6 +100,13 @@ def cleanup_old_state_files():
         current_time = datetime.now().timestamp()
         thirty_days_ago = current_time - (30 * 24 * 60 * 60)
 
+        store = _sqlite_store()
+        if store is not None:
+            try:
+                store.expire(thirty_days_ago)
+            except Exception as e:
+                debug_log(f"session_state: SQLite expiry failed: {e}")
+
         for filename in os.listdir(state_dir):
             if filename.startswith("security_warnings_state_") and (
                 filename.endswith(".json") or filename.endswith(".lock")
@@ -86,6 +137,37 @@ def cleanup_old_state_files():
 
 
 def load_state(session_id):
+    """Load the full state dict."""
+    store = _sqlite_store()
+    if store is not None:
+        return store.load(_state_key(session_id))
+    return _json_load_state(session_id)
+
+
+def save_state(session_id, state):
+    """Replace the full state dict."""
+    store = _sqlite_store()
+    if store is not None:
+        store.save(_state_key(session_id), state)
+        return
+    _json_save_state(session_id, state)
+
+
+def with_locked_state(session_id, callback):
+    """
+    Execute callback with exclusive access to the session state.
+    The callback receives the state dict (a lazy dict-like view under the
+    SQLite backend) and can modify it in place.
+    State is saved after the callback returns.
+    Returns the callback's return value.
+    """
+    store = _sqlite_store()
+    if store is not None:
+        return store.with_locked_state(_state_key(session_id), callback)
+    return _json_with_locked_state(session_id, callback)
+
+
+def _json_load_state(session_id):
     """Load the full state dict from file."""
     state_file = get_state_file(session_id)
     try:
@@ -101,7 +183,7 @@ def load_state(session_id):
     return {"shown_warnings": []}
 
 
-def save_state(session_id, state):
+def _json_save_state(session_id, state):
     """Save the full state dict to file."""
     state_file = get_state_file(session_id)
     try:
@@ -115,7 +197,7 @@ def save_state(session_id, state):
         debug_log(f"Failed to save state file {state_file}: {e}")
 
 
-def with_locked_state(session_id, callback):
+def _json_with_locked_state(session_id, callback):
     """
     Execute callback with exclusive access to the state file.
     The callback receives the state dict and can modify it in place.
@@ -132,9 +214,9 @@ def with_locked_state(session_id, callback):
 
     if fcntl is None:
         # No file locking available (Windows) — run without locking
-        state = load_state(session_id)
+        state = _json_load_state(session_id)
         result = callback(state)
-        save_state(session_id, state)
+        _json_save_state(session_id, state)
         return result
 
     lock_fd = None
@@ -142,9 +224,9 @@ def with_locked_state(session_id, callback):
         lock_fd = os.open(lock_file, os.O_RDWR | os.O_CREAT)
         fcntl.flock(lock_fd, fcntl.LOCK_EX)
 
-        state = load_state(session_id)
+        state = _json_load_state(session_id)
         result = callback(state)
-        save_state(session_id, state)
+        _json_save_state(session_id, state)
         return result
 
     except (OSError, IOError) as e:
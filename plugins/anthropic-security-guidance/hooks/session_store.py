@@ -0,0 +1,333 @@
+"""
+SQLite session-state backend for the security-guidance plugin.
+
+The JSON backend in ``session_state`` rewrites the whole per-session file on
+every ``with_locked_state`` call and GCs by globbing + stat-ing every file.
+This backend keeps all sessions in one WAL-mode database under the state dir:
+
+  state(session, key, value, updated_at)   one row per top-level state key
+  sessions(session, updated_at)            last activity, indexed for TTL
+
+``with_locked_state`` runs inside ``BEGIN IMMEDIATE`` (SQLite's writer lock
+replaces the fcntl lock; ``busy_timeout`` makes contenders wait like
+``flock``). The callback gets a lazy mapping that SELECTs a key only when it
+is touched, and only keys whose JSON actually changed are upserted — so
+``record_touched_path`` never rewrites ``shown_warnings`` or
+``previous_findings``. A raising callback rolls the transaction back.
+
+On first use the database imports every existing
+``security_warnings_state_*.json`` file and removes it, inside the schema
+creation transaction so concurrent hooks can't import twice.
+
+Requires only the stdlib ``sqlite3`` module; ``session_state`` falls back to
+the JSON backend if it is missing or the database can't be opened.
+"""
+import json
+import os
+import sqlite3
+import time
+from collections.abc import MutableMapping
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from _base import debug_log
+
+DB_BASENAME = "session_state.sqlite3"
+SCHEMA_VERSION = 1
+# How long a contender waits for the writer lock before giving up (the
+# caller then treats state as unavailable, same as a failed flock).
+BUSY_TIMEOUT_MS = 10000
+
+_STATE_FILE_PREFIX = "security_warnings_state_"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    session    TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (session, key)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session    TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+
+def _default(key):
+    # load_state() guarantees shown_warnings exists; keep that contract.
+    return [] if key == "shown_warnings" else None
+
+
+class LazyState(MutableMapping):
+    """Dict-like view of one session's state inside an open transaction.
+
+    Keys are fetched on first access; ``changes()`` yields only keys whose
+    serialized value differs from what was loaded.
+    """
+
+    def __init__(self, conn, session):
+        self._conn = conn
+        self._session = session
+        self._values = {}
+        self._loaded = {}  # key -> JSON text as stored (None = absent)
+        self._all_loaded = False
+
+    def _load(self, key):
+        if key in self._loaded:
+            return
+        row = self._conn.execute(
+            "SELECT value FROM state WHERE session = ? AND key = ?", (self._session, key)
+        ).fetchone()
+        self._adopt(key, row[0] if row else None)
+
+    def _adopt(self, key, text):
+        default = _default(key)
+        if text is not None:
+            try:
+                self._values[key] = json.loads(text)
+                self._loaded[key] = text
+                return
+            except ValueError:
+                pass
+        if default is not None:
+            self._values[key] = default
+            self._loaded[key] = json.dumps(default)
+        else:
+            self._loaded[key] = None
+
+    def _load_all(self):
+        if self._all_loaded:
+            return
+        for key, text in self._conn.execute(
+            "SELECT key, value FROM state WHERE session = ?", (self._session,)
+        ):
+            if key not in self._loaded:
+                self._adopt(key, text)
+        self._load("shown_warnings")
+        self._all_loaded = True
+
+    def __getitem__(self, key):
+        self._load(key)
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        self._load(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        self._load(key)
+        del self._values[key]
+
+    def __contains__(self, key):
+        self._load(key)
+        return key in self._values
+
+    def __iter__(self):
+        self._load_all()
+        return iter(list(self._values))
+
+    def __len__(self):
+        self._load_all()
+        return len(self._values)
+
+    def to_dict(self):
+        self._load_all()
+        return dict(self._values)
+
+    def changes(self):
+        """Yield (key, json_text_or_None) for every key that changed."""
+        for key, before in self._loaded.items():
+            after = json.dumps(self._values[key]) if key in self._values else None
+            if after != before:
+                yield key, after
+
+
+class SqliteStateStore:
+    """One database file; connection opened lazily and reused."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        # isolation_level=None: we issue BEGIN/COMMIT ourselves.
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000.0, isolation_level=None)
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._init_schema(conn)
+        except Exception:
+            conn.close()
+            raise
+        try:
+            os.chmod(self.path, 0o600)
+        except OSError:
+            pass
+        self._conn = conn
+        return conn
+
+    def _init_schema(self, conn):
+        imported = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the writer lock: another hook may have won.
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Statement by statement: executescript() would COMMIT first.
+                for stmt in _SCHEMA.split(";"):
+                    if stmt.strip():
+                        conn.execute(stmt)
+                imported = self._import_json_files(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            _rollback(conn)
+            raise
+        # Only delete the JSON files once their rows are durable.
+        for path in imported:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if imported:
+            debug_log(f"session_store: migrated {len(imported)} JSON state files into {self.path}")
+
+    def _import_json_files(self, conn):
+        """Import ``security_warnings_state_<key>.json`` files from the
+        database's directory. Runs inside the schema transaction; returns the
+        imported paths for the caller to delete after COMMIT. Unreadable
+        files are left in place for the JSON GC."""
+        state_dir = os.path.dirname(self.path)
+        imported = []
+        try:
+            names = os.listdir(state_dir)
+        except OSError:
+            return imported
+        for name in names:
+            if not (name.startswith(_STATE_FILE_PREFIX) and name.endswith(".json")):
+                continue
+            session = name[len(_STATE_FILE_PREFIX):-len(".json")]
+            path = os.path.join(state_dir, name)
+            lock_fd = None
+            try:
+                if fcntl is not None:
+                    lock_fd = os.open(path[:-len(".json")] + ".lock", os.O_RDWR | os.O_CREAT)
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX)
+                mtime = os.path.getmtime(path)
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            finally:
+                if lock_fd is not None:
+                    os.close(lock_fd)
+            if isinstance(data, list):
+                data = {"shown_warnings": data}
+            if not isinstance(data, dict):
+                continue
+            conn.executemany(
+                "INSERT OR REPLACE INTO state (session, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                [(session, str(k), json.dumps(v), mtime) for k, v in data.items()],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session, updated_at) VALUES (?, ?)",
+                (session, mtime),
+            )
+            imported.append(path)
+        return imported
+
+    def with_locked_state(self, session, callback):
+        """Run ``callback(state)`` in a write transaction; persist changed keys.
+
+        Returns the callback's value, or None if the database is unavailable
+        (mirrors the JSON backend's failed-lock behaviour). Exceptions from
+        the callback roll back and propagate.
+        """
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+        except (sqlite3.Error, OSError) as e:
+            debug_log(f"session_store: cannot open transaction on {self.path}: {e}")
+            return None
+        try:
+            state = LazyState(conn, session)
+            result = callback(state)
+            self._flush(conn, session, state)
+            conn.execute("COMMIT")
+            return result
+        except (sqlite3.Error, OSError) as e:
+            _rollback(conn)
+            debug_log(f"session_store: state operation failed: {e}")
+            return None
+        except BaseException:
+            _rollback(conn)
+            raise
+
+    def _flush(self, conn, session, state):
+        now = time.time()
+        for key, text in state.changes():
+            if text is None:
+                conn.execute("DELETE FROM state WHERE session = ? AND key = ?", (session, key))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO state (session, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                    (session, key, text, now),
+                )
+        # Every locked access counts as activity, matching the JSON backend
+        # where each call rewrote the file (and so bumped its mtime).
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session, updated_at) VALUES (?, ?)", (session, now)
+        )
+
+    def load(self, session):
+        result = self.with_locked_state(session, lambda s: s.to_dict())
+        return result if result is not None else {"shown_warnings": []}
+
+    def save(self, session, state):
+        """Replace the session's whole state with ``state``."""
+        def _replace(s):
+            for key in list(s):
+                if key not in state:
+                    del s[key]
+            for key, value in state.items():
+                s[key] = value
+        self.with_locked_state(session, _replace)
+
+    def expire(self, older_than_ts):
+        """Drop sessions idle since before ``older_than_ts`` (indexed scan)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM state WHERE session IN "
+                "(SELECT session FROM sessions WHERE updated_at < ?)",
+                (older_than_ts,),
+            )
+            n = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (older_than_ts,)).rowcount
+            conn.execute("COMMIT")
+            return n
+        except BaseException:
+            _rollback(conn)
+            raise
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _rollback(conn):
+    try:
+        conn.execute("ROLLBACK")
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,72 @@
+"""Tests for sharded review failure reporting."""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+import llm  # noqa: E402
+
+CLEAN = {"hasVulnerabilities": False, "vulnerabilities": []}
+FILES = [("bad.py", "x = 1\n" * 80), ("good.py", "y = 2\n" * 80)]
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    """Sharded review with one file per shard and no review cache."""
+    monkeypatch.setenv("SG_SHARDED_REVIEW", "on")
+    monkeypatch.delenv("SG_DUAL_OR", raising=False)
+    monkeypatch.setattr(llm, "HAS_API_CREDENTIALS", True)
+    monkeypatch.setattr(llm, "REVIEW_SHARD_TOKENS", 150)
+    monkeypatch.setattr(llm.review_cache, "get", lambda key: None)
+    monkeypatch.setattr(llm.review_cache, "put", lambda key, value: None)
+
+
+def test_failed_shard_survives_later_success(sharded, monkeypatch):
+    """A shard's API error is reported even when another shard succeeds after it."""
+    def fake_call(prompt, output_schema, **kwargs):
+        if "bad.py" in prompt:
+            llm._set_http_error(529)
+            return None
+        time.sleep(0.2)  # finish after the failing shard
+        llm._set_http_error(None)
+        return CLEAN
+
+    monkeypatch.setattr(llm, "_call_claude", fake_call)
+
+    guidance, vulns = llm.analyze_code_security(FILES, is_diff=True)
+
+    assert (guidance, vulns) == (None, [])
+    assert llm._last_review_shards == 2
+    assert llm._last_call_claude_http_error == 529
+
+
+def test_raising_shard_counts_as_failed(sharded, monkeypatch):
+    """A shard that raises is a failed review, not a clean one."""
+    def fake_call(prompt, output_schema, **kwargs):
+        if "bad.py" in prompt:
+            raise RuntimeError("boom")
+        llm._set_http_error(None)
+        return CLEAN
+
+    monkeypatch.setattr(llm, "_call_claude", fake_call)
+
+    llm.analyze_code_security(FILES, is_diff=True)
+
+    assert llm._last_call_claude_http_error == -1
+
+
+def test_all_shards_clean(sharded, monkeypatch):
+    """No error is reported when every shard is reviewed."""
+    def fake_call(prompt, output_schema, **kwargs):
+        llm._set_http_error(None)
+        return CLEAN
+
+    monkeypatch.setattr(llm, "_call_claude", fake_call)
+
+    llm.analyze_code_security(FILES, is_diff=True)
+
+    assert llm._last_review_shards == 2
+    assert llm._last_call_claude_http_error is None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Merkle-batched timestamps vs one timestamp per file.
+
+Writes N files (default 5000, 4 KiB each) to a temporary directory, then
+timestamps them three ways through the server's create_timestamp tool:
+
+  per-file     read each file and call create_timestamp once per file,
+               one envelope (and one transaction) per file
+  batch        one create_timestamp(file_paths=...) call: files hashed on
+               a thread pool, one Merkle root, a proof per file
+  verify       verify_timestamp with each file's proof against the root
+
+Every batch proof is checked to verify.
+
+Usage:
+    python benchmarks/bench_merkle_timestamp.py [--files 5000] [--size 4096]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PLUGIN_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "src"))
+
+from mcp_bitcoin_cli.server import create_server  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=4096, help="bytes per file")
+    args = parser.parse_args()
+
+    server = create_server()
+    create_fn = server._tool_manager._tools["create_timestamp"].fn
+    verify_fn = server._tool_manager._tools["verify_timestamp"].fn
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"doc{i}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(args.size))
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            with open(path, "rb") as f:
+                create_fn(f.read().hex(), "hex")
+        per_file = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = create_fn(file_paths=paths)
+        batch = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for proof in result["proofs"]:
+            verified = verify_fn("", result["hash_hex"], proof=proof["proof_hex"],
+                                 file_path=proof["file_path"])
+            if not verified["verified"]:
+                sys.exit(f"proof for {proof['file_path']} did not verify")
+        verify = time.perf_counter() - start
+
+    proof_bytes = max(len(p["proof_hex"]) // 2 for p in result["proofs"])
+    print(f"{args.files} files of {args.size} bytes; "
+          f"largest proof {proof_bytes} bytes, 1 envelope vs {args.files}")
+    print(f"{'mode':>10} {'time (s)':>10} {'files/s':>10}")
+    for name, elapsed in (("per-file", per_file), ("batch", batch), ("verify", verify)):
+        print(f"{name:>10} {elapsed:>10.3f} {args.files / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON-RPC batching vs one HTTP request per call.
+
+Starts a stub JSON-RPC server on 127.0.0.1 that answers getblockhash for any
+height, adding a fixed delay per HTTP request (default 2 ms) to stand in for
+the network round trip and the node's per-request overhead. Then makes N
+getblockhash calls (default 1000) four ways:
+
+  sequential   one call at a time, batching off (the pre-batching client)
+  concurrent   all calls at once, batching off: parallel requests over the
+               keep-alive connection pool
+  auto-batch   all calls at once with the default 2 ms batch window
+  call_batch   one explicit call_batch() of all N calls
+
+Every mode checks that each call got the result for its own height.
+
+Usage:
+    python benchmarks/bench_rpc_batch.py [--calls 1000] [--latency-ms 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PLUGIN_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "src"))
+
+from mcp_bitcoin_cli.config import Config, ConnectionMethod, Network  # noqa: E402
+from mcp_bitcoin_cli.node.rpc import BitcoinRPC  # noqa: E402
+
+
+def block_hash(height):
+    return f"{height:064x}"
+
+
+def make_handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like bitcoind
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            requests = body if isinstance(body, list) else [body]
+            responses = [{"result": block_hash(r["params"][0]), "error": None, "id": r["id"]}
+                         for r in requests]
+            data = json.dumps(responses if isinstance(body, list) else responses[0]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def make_rpc(port, batch_window_ms):
+    return BitcoinRPC(Config(
+        connection_method=ConnectionMethod.RPC,
+        network=Network.REGTEST,
+        rpc_port=port,
+        rpc_user="bench",
+        rpc_password="bench",
+        rpc_batch_window_ms=batch_window_ms,
+    ))
+
+
+async def run_mode(name, port, calls):
+    rpc = make_rpc(port, 0 if name in ("sequential", "concurrent") else 2.0)
+    heights = range(calls)
+    start = time.perf_counter()
+    if name == "sequential":
+        results = [await rpc._call("getblockhash", h) for h in heights]
+    elif name == "call_batch":
+        results = await rpc.call_batch([("getblockhash", h) for h in heights])
+    else:
+        results = await asyncio.gather(*(rpc._call("getblockhash", h) for h in heights))
+    elapsed = time.perf_counter() - start
+    await rpc.close()
+    if results != [block_hash(h) for h in heights]:
+        sys.exit(f"{name}: results don't match their calls")
+    return elapsed, rpc.stats["http_requests"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=2.0,
+                        help="stub server delay per HTTP request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    print(f"{args.calls} getblockhash calls, {args.latency_ms} ms per HTTP request")
+    print(f"{'mode':>12} {'time (s)':>10} {'calls/s':>10} {'HTTP requests':>14}")
+    try:
+        for name in ("sequential", "concurrent", "auto-batch", "call_batch"):
+            elapsed, requests = await run_mode(name, port, args.calls)
+            print(f"{name:>12} {elapsed:>10.3f} {args.calls / elapsed:>10.0f} {requests:>14}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+"""Chunked documents spread over several FILE envelopes.
+
+A document too large for one OP_RETURN output is split into a manifest
+and numbered chunks, each in its own FILE envelope (one per transaction,
+since the OP_RETURN limit applies per transaction). A chunked payload
+starts with a zero byte, which never starts a plain FILE payload's
+content-type header.
+
+Manifest payload:
+- Marker (1 byte): 0x00
+- Kind (1 byte): 0x01
+- Digest (32 bytes): SHA-256 of the whole document
+- Size (8 bytes): Document size in bytes
+- Chunk count (4 bytes)
+- Chunk size (4 bytes)
+- Content type (rest): UTF-8 MIME type
+
+Chunk payload:
+- Marker (1 byte): 0x00
+- Kind (1 byte): 0x02
+- Document ID (8 bytes): First 8 bytes of the document digest
+- Sequence (4 bytes): Chunk number, from 0
+- Rolling digest (8 bytes): First 8 bytes of SHA-256 of the document
+  up to the end of this chunk
+- Data (rest)
+
+All integers are big-endian. The rolling digest lets a reader check
+each chunk as soon as the chunks before it have arrived, rather than
+only once the whole document is in.
+"""
+
+import hashlib
+import io
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+from mcp_bitcoin_cli.envelope import EnvelopeType, decode_envelope, encode_envelope
+
+CHUNKED_MARKER = 0x00
+KIND_MANIFEST = 0x01
+KIND_CHUNK = 0x02
+
+MANIFEST_HEADER = struct.Struct(">BB32sQII")
+CHUNK_HEADER = struct.Struct(">BB8sI8s")
+
+# Envelope header plus chunk header
+CHUNK_OVERHEAD = 6 + CHUNK_HEADER.size
+DEFAULT_CHUNK_SIZE = 100_000
+
+READ_SIZE = 1024 * 1024
+
+
+@dataclass
+class Manifest:
+    """Describes a chunked document."""
+    digest: bytes
+    size: int
+    chunk_count: int
+    chunk_size: int
+    content_type: str
+
+    @property
+    def doc_id(self) -> bytes:
+        return self.digest[:8]
+
+    def to_payload(self) -> bytes:
+        return MANIFEST_HEADER.pack(
+            CHUNKED_MARKER, KIND_MANIFEST, self.digest, self.size,
+            self.chunk_count, self.chunk_size,
+        ) + self.content_type.encode("utf-8")
+
+
+@dataclass
+class Chunk:
+    """One numbered piece of a chunked document."""
+    doc_id: bytes
+    seq: int
+    rolling_digest: bytes
+    data: bytes
+
+    def to_payload(self) -> bytes:
+        return CHUNK_HEADER.pack(
+            CHUNKED_MARKER, KIND_CHUNK, self.doc_id, self.seq, self.rolling_digest,
+        ) + self.data
+
+
+def is_chunked(payload: bytes) -> bool:
+    """Whether a FILE envelope payload is part of a chunked document."""
+    return len(payload) >= 2 and payload[0] == CHUNKED_MARKER
+
+
+def parse_chunked(payload: bytes) -> Union[Manifest, Chunk]:
+    """Parse a chunked-document FILE payload.
+
+    Raises:
+        ValueError: If the payload is not a valid manifest or chunk
+    """
+    if not is_chunked(payload):
+        raise ValueError("Not a chunked document payload")
+    kind = payload[1]
+    if kind == KIND_MANIFEST:
+        if len(payload) < MANIFEST_HEADER.size:
+            raise ValueError("Truncated document manifest")
+        _, _, digest, size, count, chunk_size = MANIFEST_HEADER.unpack_from(payload)
+        return Manifest(
+            digest=digest,
+            size=size,
+            chunk_count=count,
+            chunk_size=chunk_size,
+            content_type=payload[MANIFEST_HEADER.size:].decode("utf-8"),
+        )
+    if kind == KIND_CHUNK:
+        if len(payload) < CHUNK_HEADER.size:
+            raise ValueError("Truncated document chunk")
+        _, _, doc_id, seq, rolling = CHUNK_HEADER.unpack_from(payload)
+        return Chunk(doc_id, seq, rolling, payload[CHUNK_HEADER.size:])
+    raise ValueError(f"Unknown chunked document part: {kind:#x}")
+
+
+def _open(source: Union[str, Path, bytes]) -> BinaryIO:
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return open(source, "rb")
+
+
+def _read_blocks(f: BinaryIO, size: int) -> Iterator[bytes]:
+    while block := f.read(size):
+        yield block
+
+
+def encode_document(
+    source: Union[str, Path, bytes],
+    content_type: str = "application/octet-stream",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Split a document into FILE envelopes: the manifest, then each chunk.
+
+    A file is read twice, once to hash it and once to emit chunks, and
+    never held in memory as a whole.
+
+    Args:
+        source: Path of the file to encode, or the document itself
+        content_type: MIME type recorded in the manifest
+        chunk_size: Data bytes per chunk
+
+    Yields:
+        Envelope bytes, one per OP_RETURN output
+
+    Raises:
+        ValueError: If the file changed while it was being encoded
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    digest = hashlib.sha256()
+    size = 0
+    with _open(source) as f:
+        for block in _read_blocks(f, READ_SIZE):
+            digest.update(block)
+            size += len(block)
+
+    manifest = Manifest(
+        digest=digest.digest(),
+        size=size,
+        chunk_count=-(-size // chunk_size),
+        chunk_size=chunk_size,
+        content_type=content_type,
+    )
+    yield encode_envelope(manifest.to_payload(), EnvelopeType.FILE)
+
+    rolling = hashlib.sha256()
+    with _open(source) as f:
+        for seq, data in enumerate(_read_blocks(f, chunk_size)):
+            rolling.update(data)
+            chunk = Chunk(manifest.doc_id, seq, rolling.copy().digest()[:8], data)
+            yield encode_envelope(chunk.to_payload(), EnvelopeType.FILE)
+    if rolling.digest() != manifest.digest:
+        raise ValueError("Document changed while it was being encoded")
+
+
+class DocumentAssembler:
+    """Reassembles a chunked document from parts received in any order.
+
+    Chunks are checked and written out as soon as every chunk before them
+    has arrived; later chunks wait in memory until then.
+    """
+
+    def __init__(self, output: Optional[BinaryIO] = None):
+        self.manifest: Optional[Manifest] = None
+        self.doc_id: Optional[bytes] = None
+        self._output = output
+        self._buffer = bytearray()
+        self._pending: dict[int, Chunk] = {}
+        self._next_seq = 0
+        self._size = 0
+        self._rolling = hashlib.sha256()
+
+    @property
+    def chunks_received(self) -> int:
+        return self._next_seq + len(self._pending)
+
+    @property
+    def complete(self) -> bool:
+        return self.manifest is not None and self._next_seq == self.manifest.chunk_count
+
+    @property
+    def content(self) -> bytes:
+        """The reassembled document, when not written to an output file."""
+        if not self.complete:
+            raise ValueError("Document is incomplete")
+        return bytes(self._buffer)
+
+    def missing(self) -> list[int]:
+        """Sequence numbers not yet received (needs the manifest)."""
+        if self.manifest is None:
+            return []
+        return [
+            seq for seq in range(self._next_seq, self.manifest.chunk_count)
+            if seq not in self._pending
+        ]
+
+    def add(self, envelope_bytes: bytes) -> None:
+        """Add a manifest or chunk envelope.
+
+        Raises:
+            ValueError: If the part is invalid, belongs to another
+                document, or fails an integrity check
+        """
+        envelope = decode_envelope(envelope_bytes)
+        if envelope.type != EnvelopeType.FILE:
+            raise ValueError("Not a FILE envelope")
+        part = parse_chunked(envelope.payload)
+
+        doc_id = part.doc_id
+        if self.doc_id is None:
+            self.doc_id = doc_id
+        elif doc_id != self.doc_id:
+            raise ValueError(
+                f"Part belongs to document {doc_id.hex()}, not {self.doc_id.hex()}"
+            )
+
+        if isinstance(part, Manifest):
+            if self.manifest is not None and part != self.manifest:
+                raise ValueError("Conflicting manifests for the same document")
+            self.manifest = part
+        elif part.seq >= self._next_seq and part.seq not in self._pending:
+            # Chunks already received again are ignored
+            if self.manifest is not None and part.seq >= self.manifest.chunk_count:
+                raise ValueError(f"Chunk {part.seq} is past the end of the document")
+            self._pending[part.seq] = part
+
+        self._advance()
+
+    def _advance(self) -> None:
+        while self._next_seq in self._pending:
+            chunk = self._pending.pop(self._next_seq)
+            rolling = self._rolling.copy()
+            rolling.update(chunk.data)
+            if rolling.digest()[:8] != chunk.rolling_digest:
+                # Dropped, so a good copy of the chunk can still be added
+                raise ValueError(f"Chunk {chunk.seq} failed its integrity check")
+            self._rolling = rolling
+            if self._output is not None:
+                self._output.write(chunk.data)
+            else:
+                self._buffer += chunk.data
+            self._size += len(chunk.data)
+            self._next_seq += 1
+
+        if self.complete:
+            if self._size != self.manifest.size or self._rolling.digest() != self.manifest.digest:
+                raise ValueError("Reassembled document does not match its manifest")
@@ -45,12 +45,27 @@ class Config:
     # CLI settings
     cli_path: str = "bitcoin-cli"
     cli_datadir: str = ""
+    cli_max_processes: int = 4  # bitcoin-cli processes running at once
+    cli_cache_size: int = 1024  # Immutable results kept; 0 disables caching
 
     # RPC settings
     rpc_host: str = "127.0.0.1"
     rpc_port: Optional[int] = None
     rpc_user: str = ""
     rpc_password: str = ""
+    rpc_max_connections: int = 4  # Bitcoin Core's default -rpcthreads
+    rpc_batch_window_ms: float = 2.0  # 0 disables automatic batching
+    rpc_max_batch_size: int = 100
+
+    # OP_RETURN index settings
+    index_path: str = ""  # Default: ~/.cache/mcp-bitcoin-cli/op_returns-<network>.db
+    scan_concurrency: int = 8  # Blocks fetched at once
+    scan_max_blocks: int = 1000  # Most blocks one search_op_returns call covers
+
+    # Node cache settings
+    cache_enabled: bool = True
+    cache_path: str = ""  # Default: ~/.cache/mcp-bitcoin-cli/node-<network>.db
+    cache_ttl: float = 10.0  # Seconds recent data and the chain tip are reused
 
     # Safety settings
     require_confirmation: bool = True
@@ -66,6 +81,18 @@ class Config:
         """Get configured or default RPC port."""
         return self.rpc_port if self.rpc_port else self.default_rpc_port
 
+    def get_cache_path(self) -> Path:
+        """Get configured or default node cache path."""
+        if self.cache_path:
+            return Path(self.cache_path).expanduser()
+        return Path.home() / ".cache" / "mcp-bitcoin-cli" / f"node-{self.network.value}.db"
+
+    def get_index_path(self) -> Path:
+        """Get configured or default OP_RETURN index path."""
+        if self.index_path:
+            return Path(self.index_path).expanduser()
+        return Path.home() / ".cache" / "mcp-bitcoin-cli" / f"op_returns-{self.network.value}.db"
+
 
 DEFAULT_CONFIG = Config()
 
@@ -96,6 +123,12 @@ def load_config(path: Path) -> Config:
     # Parse RPC section
     rpc = data.get("rpc", {})
 
+    # Parse index section
+    index = data.get("index", {})
+
+    # Parse cache section
+    cache = data.get("cache", {})
+
     # Parse safety section
     safety = data.get("safety", {})
 
@@ -104,10 +137,21 @@ def load_config(path: Path) -> Config:
         network=Network(network_str),
         cli_path=cli.get("path", "bitcoin-cli"),
         cli_datadir=cli.get("datadir", ""),
+        cli_max_processes=cli.get("max_processes", 4),
+        cli_cache_size=cli.get("cache_size", 1024),
         rpc_host=rpc.get("host", "127.0.0.1"),
         rpc_port=rpc.get("port"),
         rpc_user=rpc.get("user", ""),
         rpc_password=rpc.get("password", ""),
+        rpc_max_connections=rpc.get("max_connections", 4),
+        rpc_batch_window_ms=rpc.get("batch_window_ms", 2.0),
+        rpc_max_batch_size=rpc.get("max_batch_size", 100),
+        index_path=index.get("path", ""),
+        scan_concurrency=index.get("scan_concurrency", 8),
+        scan_max_blocks=index.get("max_blocks_per_call", 1000),
+        cache_enabled=cache.get("enabled", True),
+        cache_path=cache.get("path", ""),
+        cache_ttl=cache.get("ttl_seconds", 10.0),
         require_confirmation=safety.get("require_confirmation", True),
         dry_run_default=safety.get("dry_run_default", True),
         max_data_size=safety.get("max_data_size", 102400),
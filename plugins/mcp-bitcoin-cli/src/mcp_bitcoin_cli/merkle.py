@@ -0,0 +1,141 @@
+"""Merkle trees for batch timestamping.
+
+Many documents are hashed into one Merkle tree and only the root is
+committed on-chain, in a HASH envelope. Each document gets an inclusion
+proof that links its hash to the root.
+
+Leaves are H(0x00 || document hash) and inner nodes H(0x01 || left ||
+right), so a leaf can't be passed off as an inner node. When a level has
+an odd number of nodes, the last one moves up unchanged rather than
+being paired with a copy of itself.
+
+A proof is a sequence of 33-byte steps: a side byte (0x00 if the sibling
+is on the left, 0x01 if on the right) followed by the sibling hash.
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Union
+
+HASH_FUNCTIONS: dict[str, Callable] = {
+    "sha256": hashlib.sha256,
+    "sha3_256": hashlib.sha3_256,
+}
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+SIBLING_LEFT = 0x00
+SIBLING_RIGHT = 0x01
+DIGEST_SIZE = 32
+STEP_SIZE = 1 + DIGEST_SIZE
+
+READ_SIZE = 1024 * 1024
+HASH_WORKERS = 8
+
+
+def _hash_function(algorithm: str) -> Callable:
+    try:
+        return HASH_FUNCTIONS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}") from None
+
+
+def hash_file(path: Union[str, Path], algorithm: str = "sha256") -> bytes:
+    """Hash a file without loading it all into memory."""
+    digest = _hash_function(algorithm)()
+    with open(path, "rb") as f:
+        while block := f.read(READ_SIZE):
+            digest.update(block)
+    return digest.digest()
+
+
+def hash_files(
+    paths: Iterable[Union[str, Path]],
+    algorithm: str = "sha256",
+    workers: int = HASH_WORKERS,
+) -> list[bytes]:
+    """Hash files on a thread pool; hashlib releases the GIL while hashing.
+
+    Returns:
+        Digests in the order of paths
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda path: hash_file(path, algorithm), paths))
+
+
+class MerkleTree:
+    """Merkle tree over a list of document hashes."""
+
+    def __init__(self, hashes: list[bytes], algorithm: str = "sha256"):
+        if not hashes:
+            raise ValueError("Cannot build a Merkle tree with no leaves")
+        self.algorithm = algorithm
+        hash_fn = _hash_function(algorithm)
+
+        level = [hash_fn(LEAF_PREFIX + h).digest() for h in hashes]
+        self.levels = [level]
+        while len(level) > 1:
+            parents = [
+                hash_fn(NODE_PREFIX + level[i] + level[i + 1]).digest()
+                for i in range(0, len(level) - 1, 2)
+            ]
+            if len(level) % 2:
+                parents.append(level[-1])
+            level = parents
+            self.levels.append(level)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def proof(self, index: int) -> bytes:
+        """Inclusion proof for the document at index."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Leaf index {index} out of range")
+        steps = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                side = SIBLING_LEFT if sibling < index else SIBLING_RIGHT
+                steps.append(bytes([side]) + level[sibling])
+            index //= 2
+        return b"".join(steps)
+
+
+def root_from_proof(document_hash: bytes, proof: bytes, algorithm: str = "sha256") -> bytes:
+    """Compute the root a proof leads to from a document hash.
+
+    Raises:
+        ValueError: If the proof is malformed
+    """
+    if len(proof) % STEP_SIZE:
+        raise ValueError(f"Proof length must be a multiple of {STEP_SIZE} bytes")
+    hash_fn = _hash_function(algorithm)
+    node = hash_fn(LEAF_PREFIX + document_hash).digest()
+    for offset in range(0, len(proof), STEP_SIZE):
+        side = proof[offset]
+        sibling = proof[offset + 1:offset + STEP_SIZE]
+        if side == SIBLING_LEFT:
+            node = hash_fn(NODE_PREFIX + sibling + node).digest()
+        elif side == SIBLING_RIGHT:
+            node = hash_fn(NODE_PREFIX + node + sibling).digest()
+        else:
+            raise ValueError(f"Invalid proof step side: {side:#x}")
+    return node
+
+
+def verify_proof(
+    document_hash: bytes,
+    proof: bytes,
+    root: bytes,
+    algorithm: str = "sha256",
+) -> bool:
+    """Whether proof links document_hash to root."""
+    try:
+        return root_from_proof(document_hash, proof, algorithm) == root
+    except ValueError:
+        return False
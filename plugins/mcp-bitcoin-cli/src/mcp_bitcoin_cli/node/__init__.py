@@ -8,6 +8,7 @@ from mcp_bitcoin_cli.node.interface import (
 )
 from mcp_bitcoin_cli.node.cli import BitcoinCLI
 from mcp_bitcoin_cli.node.rpc import BitcoinRPC
+from mcp_bitcoin_cli.node.cache import CachingNode
 
 __all__ = [
     "NodeInterface",
@@ -16,4 +17,5 @@ __all__ = [
     "TransactionInfo",
     "BitcoinCLI",
     "BitcoinRPC",
+    "CachingNode",
 ]
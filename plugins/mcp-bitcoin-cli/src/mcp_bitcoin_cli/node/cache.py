@@ -0,0 +1,237 @@
+"""Caching wrapper for any NodeInterface.
+
+Data that can no longer change (transactions and blocks at least
+FINAL_CONFIRMATIONS deep, and the hashes of such blocks) is kept in a
+SQLite store on disk and never fetched again. Mempool and low-confirmation
+data, and UTXO lists, are kept in memory for a short TTL.
+
+The chain tip is checked at most once per TTL. When the best block hash
+changes, because of a new block or a reorg, the in-memory tier is
+dropped. Each disk entry records the tip its confirmation count was
+taken at (the block's height plus its confirmations, less one), and the
+count is advanced from there to the current tip height.
+"""
+
+import json
+import sqlite3
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional
+
+from mcp_bitcoin_cli.node.interface import (
+    FINAL_CONFIRMATIONS,
+    NodeInterface,
+    NodeInfo,
+    UTXO,
+    TransactionInfo,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tip INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+class CachingNode(NodeInterface):
+    """NodeInterface that serves repeat reads from a disk and memory cache."""
+
+    def __init__(self, node: NodeInterface, path: Path, ttl: float = 10.0):
+        self.node = node
+        self.ttl = ttl
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+        self._memory: dict[tuple, tuple[float, Any]] = {}
+        self._best_hash: Optional[str] = None
+        self._tip = 0
+        self._tip_checked = float("-inf")
+        self.stats = {"disk_hits": 0, "memory_hits": 0, "misses": 0, "tip_changes": 0}
+
+    async def _chain_tip(self) -> int:
+        """Current tip height, checked against the node at most once per TTL."""
+        now = time.monotonic()
+        if now - self._tip_checked >= self.ttl:
+            best_hash = await self.node.get_best_block_hash()
+            if best_hash != self._best_hash:
+                self._tip = await self.node.get_block_count()
+                if self._best_hash is not None:
+                    self.stats["tip_changes"] += 1
+                self._best_hash = best_hash
+                self._memory.clear()
+            self._tip_checked = now
+        return self._tip
+
+    def _disk_get(self, kind: str, key: str) -> Optional[tuple[Any, int]]:
+        row = self._db.execute(
+            "SELECT data, tip FROM entries WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        if row is None:
+            return None
+        self.stats["disk_hits"] += 1
+        return json.loads(row[0]), row[1]
+
+    def _disk_put(self, kind: str, key: str, data: Any, tip: int) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (kind, key, tip, json.dumps(data)),
+            )
+
+    def _memory_get(self, key: tuple) -> Any:
+        entry = self._memory.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self.stats["memory_hits"] += 1
+        return entry[1]
+
+    def _memory_put(self, key: tuple, value: Any) -> None:
+        self._memory[key] = (time.monotonic() + self.ttl, value)
+
+    async def get_transaction(self, txid: str) -> TransactionInfo:
+        """Get transaction details."""
+        tip = await self._chain_tip()
+        stored = self._disk_get("tx", txid)
+        if stored is not None:
+            data, stored_tip = stored
+            data["confirmations"] += max(0, tip - stored_tip)
+            if "confirmations" in data["decoded"]:
+                data["decoded"]["confirmations"] = data["confirmations"]
+            return TransactionInfo(**data)
+
+        cached = self._memory_get(("tx", txid))
+        if cached is not None:
+            return cached
+
+        self.stats["misses"] += 1
+        tx = await self.node.get_transaction(txid)
+        if tx.confirmations >= FINAL_CONFIRMATIONS:
+            height = tx.decoded.get("blockheight")
+            if height is None:
+                height = (await self.get_block(tx.blockhash, 1))["height"]
+            self._disk_put("tx", txid, asdict(tx), height + tx.confirmations - 1)
+        else:
+            self._memory_put(("tx", txid), tx)
+        return tx
+
+    async def get_block(self, block_hash: str, verbosity: int = 2) -> dict:
+        """Get block data; verbosity 2 includes decoded transactions."""
+        tip = await self._chain_tip()
+        key = f"{block_hash}:{verbosity}"
+        stored = self._disk_get("block", key)
+        if stored is not None:
+            block, stored_tip = stored
+            block["confirmations"] += max(0, tip - stored_tip)
+            return block
+
+        cached = self._memory_get(("block", key))
+        if cached is not None:
+            return cached
+
+        self.stats["misses"] += 1
+        block = await self.node.get_block(block_hash, verbosity)
+        if block.get("confirmations", 0) >= FINAL_CONFIRMATIONS:
+            self._disk_put("block", key, block, block["height"] + block["confirmations"] - 1)
+        else:
+            self._memory_put(("block", key), block)
+        return block
+
+    async def get_block_hash(self, height: int) -> str:
+        """Get hash of the block at height in the active chain."""
+        tip = await self._chain_tip()
+        stored = self._disk_get("block_hash", str(height))
+        if stored is not None:
+            return stored[0]
+
+        cached = self._memory_get(("block_hash", height))
+        if cached is not None:
+            return cached
+
+        self.stats["misses"] += 1
+        block_hash = await self.node.get_block_hash(height)
+        if tip - height + 1 >= FINAL_CONFIRMATIONS:
+            self._disk_put("block_hash", str(height), block_hash, tip)
+        else:
+            self._memory_put(("block_hash", height), block_hash)
+        return block_hash
+
+    async def list_utxos(
+        self,
+        min_confirmations: int = 1,
+        min_amount: float = 0,
+    ) -> list[UTXO]:
+        """List available UTXOs."""
+        await self._chain_tip()
+        key = ("utxos", min_confirmations, min_amount)
+        cached = self._memory_get(key)
+        if cached is not None:
+            return cached
+
+        self.stats["misses"] += 1
+        utxos = await self.node.list_utxos(min_confirmations, min_amount)
+        self._memory_put(key, utxos)
+        return utxos
+
+    async def get_block_count(self) -> int:
+        """Get height of the most-work fully-validated chain."""
+        return await self._chain_tip()
+
+    async def get_best_block_hash(self) -> str:
+        """Get hash of the tip of the most-work fully-validated chain."""
+        await self._chain_tip()
+        return self._best_hash
+
+    async def get_info(self) -> NodeInfo:
+        """Get node status and network info."""
+        return await self.node.get_info()
+
+    async def send_raw_transaction(
+        self,
+        tx_hex: str,
+        max_fee_rate: Optional[float] = None,
+    ) -> str:
+        """Broadcast signed transaction, return txid."""
+        txid = await self.node.send_raw_transaction(tx_hex, max_fee_rate)
+        # Spent outputs are no longer available
+        self._memory = {k: v for k, v in self._memory.items() if k[0] != "utxos"}
+        return txid
+
+    async def test_mempool_accept(self, tx_hex: str) -> dict[str, Any]:
+        """Test if transaction would be accepted (dry run)."""
+        return await self.node.test_mempool_accept(tx_hex)
+
+    async def create_raw_transaction(
+        self,
+        inputs: list[dict],
+        outputs: list[dict],
+    ) -> str:
+        """Create unsigned raw transaction."""
+        return await self.node.create_raw_transaction(inputs, outputs)
+
+    async def fund_raw_transaction(
+        self,
+        tx_hex: str,
+        options: Optional[dict] = None,
+    ) -> dict:
+        """Add inputs to fund transaction, return hex and fee."""
+        return await self.node.fund_raw_transaction(tx_hex, options)
+
+    async def get_new_address(self, label: str = "") -> str:
+        """Generate new receiving address."""
+        return await self.node.get_new_address(label)
+
+    async def estimate_fee(self, conf_target: int = 6) -> float:
+        """Estimate fee rate in BTC/kB."""
+        return await self.node.estimate_fee(conf_target)
+
+    def close(self) -> None:
+        self._db.close()
@@ -1,11 +1,23 @@
-"""Bitcoin Core CLI (subprocess) interface."""
+"""Bitcoin Core CLI (subprocess) interface.
+
+bitcoin-cli exits after each call, so process startup is paid per call.
+To keep that cost bounded, at most ``cli_max_processes`` run at once,
+identical read-only calls already running are shared rather than started
+again, and results that can no longer change (block hashes and
+transactions at least FINAL_CONFIRMATIONS deep) are kept in an LRU cache.
+Long arguments, such as transaction hex, are passed with ``-stdin``
+instead of on the command line.
+"""
 
 import asyncio
 import json
+import time
+from collections import OrderedDict
 from typing import Any, Optional
 
 from mcp_bitcoin_cli.config import Config, Network
 from mcp_bitcoin_cli.node.interface import (
+    FINAL_CONFIRMATIONS,
     NodeInterface,
     NodeInfo,
     UTXO,
@@ -21,6 +33,25 @@ NETWORK_FLAGS = {
     Network.REGTEST: ["-regtest"],
 }
 
+# Calls without side effects; identical ones running at once share a process
+READ_ONLY_METHODS = {
+    "getblockchaininfo",
+    "getnetworkinfo",
+    "getblockcount",
+    "getbestblockhash",
+    "getblockhash",
+    "getblock",
+    "getblockheader",
+    "getrawtransaction",
+    "gettransaction",
+    "listunspent",
+    "estimatesmartfee",
+    "testmempoolaccept",
+}
+
+# Arguments longer than this are passed on stdin
+STDIN_ARG_LENGTH = 1024
+
 
 class BitcoinCLI(NodeInterface):
     """Bitcoin Core interface via bitcoin-cli subprocess."""
@@ -31,7 +62,21 @@ class BitcoinCLI(NodeInterface):
         self.network = config.network
         self.datadir = config.cli_datadir
 
-    def _build_command(self, method: str, *args: Any) -> list[str]:
+        self._processes = asyncio.Semaphore(config.cli_max_processes)
+        self._running: dict[tuple, asyncio.Future] = {}
+        self._cache: OrderedDict[tuple, tuple[Any, Optional[int]]] = OrderedDict()
+        self._cache_size = config.cli_cache_size
+        self._tip: Optional[int] = None  # Last block height seen
+        self.stats = {
+            "calls": 0,
+            "subprocesses": 0,
+            "cache_hits": 0,
+            "shared_calls": 0,
+            "subprocess_seconds": 0.0,
+            "max_subprocess_seconds": 0.0,
+        }
+
+    def _build_command(self, method: str, *args: Any, use_stdin: bool = False) -> list[str]:
         """Build bitcoin-cli command."""
         cmd = [self.cli_path]
 
@@ -42,23 +87,72 @@ class BitcoinCLI(NodeInterface):
         if self.datadir:
             cmd.append(f"-datadir={self.datadir}")
 
+        # Arguments are then read from stdin, one per line
+        if use_stdin:
+            cmd.append("-stdin")
+
         # Add method and arguments
         cmd.append(method)
-        cmd.extend(str(arg) for arg in args)
+        if not use_stdin:
+            cmd.extend(str(arg) for arg in args)
 
         return cmd
 
     async def _call(self, method: str, *args: Any) -> Any:
-        """Execute bitcoin-cli command and parse JSON response."""
-        cmd = self._build_command(method, *args)
+        """Execute bitcoin-cli command and parse JSON response.
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+        Served from the cache, or from an identical call already running,
+        when possible.
+        """
+        self.stats["calls"] += 1
+        key = (method, tuple(str(arg) for arg in args))
 
-        stdout, stderr = await proc.communicate()
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        if method not in READ_ONLY_METHODS:
+            return await self._run(method, key[1])
+
+        running = self._running.get(key)
+        if running is not None:
+            self.stats["shared_calls"] += 1
+            return await asyncio.shield(running)
+
+        future = asyncio.ensure_future(self._run(method, key[1]))
+        self._running[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self._running.pop(key, None)
+        self._update_tip(method, result)
+        if self._cache_size > 0 and self._is_final(method, key[1], result):
+            await self._cache_put(key, result)
+        return result
+
+    async def _run(self, method: str, args: tuple[str, ...]) -> Any:
+        """Run one bitcoin-cli process, at most cli_max_processes at a time."""
+        use_stdin = any(len(arg) > STDIN_ARG_LENGTH for arg in args)
+        cmd = self._build_command(method, *args, use_stdin=use_stdin)
+
+        async with self._processes:
+            start = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if use_stdin else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdin_data = "".join(f"{arg}\n" for arg in args).encode() if use_stdin else None
+            stdout, stderr = await proc.communicate(stdin_data)
+
+            elapsed = time.perf_counter() - start
+            self.stats["subprocesses"] += 1
+            self.stats["subprocess_seconds"] += elapsed
+            self.stats["max_subprocess_seconds"] = max(
+                self.stats["max_subprocess_seconds"], elapsed
+            )
 
         if proc.returncode != 0:
             error_msg = stderr.decode().strip()
@@ -74,6 +168,59 @@ class BitcoinCLI(NodeInterface):
             # Some commands return plain text
             return output
 
+    def _update_tip(self, method: str, result: Any) -> None:
+        if method == "getblockcount" and isinstance(result, int):
+            self._tip = result
+        elif method == "getblockchaininfo" and isinstance(result, dict):
+            self._tip = result.get("blocks", self._tip)
+
+    def _is_final(self, method: str, args: tuple[str, ...], result: Any) -> bool:
+        """Whether a result can't change any more."""
+        if method == "getblockhash":
+            return self._tip is not None and self._tip - int(args[0]) + 1 >= FINAL_CONFIRMATIONS
+        if method == "getrawtransaction" and isinstance(result, dict):
+            return result.get("confirmations", 0) >= FINAL_CONFIRMATIONS
+        return False
+
+    async def _counted_at(self, result: dict) -> Optional[int]:
+        """Tip height at which result's confirmations were counted, if it can be found."""
+        height = result.get("blockheight", result.get("height"))
+        if height is None and "blockhash" in result:
+            try:
+                header = await self._call("getblockheader", result["blockhash"])
+            except RuntimeError:
+                return None
+            height = header["height"]
+        if height is None:
+            return None
+        return height + result["confirmations"] - 1
+
+    async def _cache_put(self, key: tuple, result: Any) -> None:
+        tip = None
+        if isinstance(result, dict) and "confirmations" in result:
+            # Counted against the node's tip when the call ran, which
+            # self._tip may lag behind
+            tip = await self._counted_at(result)
+            if tip is None:
+                return
+        self._cache[key] = (result, tip)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_get(self, key: tuple) -> Any:
+        """Cached result, with confirmations brought up to the last seen tip."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        self._cache.move_to_end(key)
+        result, tip = entry
+        if isinstance(result, dict):
+            result = dict(result)
+            if "confirmations" in result and self._tip is not None:
+                result["confirmations"] += max(0, self._tip - tip)
+        return result
+
     async def get_info(self) -> NodeInfo:
         """Get node status and network info."""
         try:
@@ -190,3 +337,19 @@ class BitcoinCLI(NodeInterface):
         """Estimate fee rate in BTC/kB."""
         result = await self._call("estimatesmartfee", conf_target)
         return result.get("feerate", 0.0001)  # Default to 0.0001 BTC/kB
+
+    async def get_block_count(self) -> int:
+        """Get height of the most-work fully-validated chain."""
+        return await self._call("getblockcount")
+
+    async def get_best_block_hash(self) -> str:
+        """Get hash of the tip of the most-work fully-validated chain."""
+        return await self._call("getbestblockhash")
+
+    async def get_block_hash(self, height: int) -> str:
+        """Get hash of the block at height in the active chain."""
+        return await self._call("getblockhash", height)
+
+    async def get_block(self, block_hash: str, verbosity: int = 2) -> dict:
+        """Get block data; verbosity 2 includes decoded transactions."""
+        return await self._call("getblock", block_hash, verbosity)
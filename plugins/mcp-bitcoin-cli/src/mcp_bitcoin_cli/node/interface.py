@@ -4,6 +4,9 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Optional
 
+# Blocks at least this deep are treated as immutable (no reorg expected)
+FINAL_CONFIRMATIONS = 6
+
 
 @dataclass
 class NodeInfo:
@@ -99,3 +102,23 @@ class NodeInterface(ABC):
     async def estimate_fee(self, conf_target: int = 6) -> float:
         """Estimate fee rate in BTC/kB."""
         pass
+
+    @abstractmethod
+    async def get_block_count(self) -> int:
+        """Get height of the most-work fully-validated chain."""
+        pass
+
+    @abstractmethod
+    async def get_best_block_hash(self) -> str:
+        """Get hash of the tip of the most-work fully-validated chain."""
+        pass
+
+    @abstractmethod
+    async def get_block_hash(self, height: int) -> str:
+        """Get hash of the block at height in the active chain."""
+        pass
+
+    @abstractmethod
+    async def get_block(self, block_hash: str, verbosity: int = 2) -> dict:
+        """Get block data; verbosity 2 includes decoded transactions."""
+        pass
@@ -1,5 +1,13 @@
-"""Bitcoin Core JSON-RPC interface."""
+"""Bitcoin Core JSON-RPC interface.
 
+Calls made within a short window of each other (``rpc_batch_window_ms``)
+are sent together as one JSON-RPC batch array, and responses are matched
+back to their calls by id. ``call_batch`` sends an explicit batch
+immediately. Requests reuse a small pool of keep-alive HTTP connections
+sized to the node's RPC worker threads.
+"""
+
+import asyncio
 import base64
 from typing import Any, Optional
 
@@ -13,6 +21,9 @@ from mcp_bitcoin_cli.node.interface import (
     TransactionInfo,
 )
 
+# Seconds an idle keep-alive connection to the node is kept open
+KEEPALIVE_EXPIRY = 30.0
+
 
 class BitcoinRPC(NodeInterface):
     """Bitcoin Core interface via JSON-RPC."""
@@ -30,43 +41,142 @@ class BitcoinRPC(NodeInterface):
             "Content-Type": "application/json",
         }
 
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self._client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=config.rpc_max_connections,
+                max_keepalive_connections=config.rpc_max_connections,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
         self._request_id = 0
 
-    async def _call(self, method: str, *args: Any) -> Any:
-        """Execute JSON-RPC call."""
-        self._request_id += 1
+        self._batch_window = config.rpc_batch_window_ms / 1000
+        self._max_batch_size = config.rpc_max_batch_size
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._sending: set[asyncio.Task] = set()
+        self.stats = {"calls": 0, "http_requests": 0, "largest_batch": 0}
 
-        payload = {
+    def _request(self, method: str, args: tuple) -> dict:
+        """Build a JSON-RPC request object."""
+        self._request_id += 1
+        return {
             "jsonrpc": "2.0",
             "id": self._request_id,
             "method": method,
             "params": list(args),
         }
 
-        response = await self._client.post(
-            self.url,
-            json=payload,
-            headers=self._headers,
+    async def _call(self, method: str, *args: Any) -> Any:
+        """Execute JSON-RPC call, batched with calls made at about the same time."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((self._request(method, args), future))
+
+        if len(self._pending) >= self._max_batch_size or self._batch_window <= 0:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._batch_window, self._flush
+            )
+
+        return await future
+
+    async def call_batch(
+        self,
+        calls: list[tuple],
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """Execute several JSON-RPC calls as batch requests.
+
+        Args:
+            calls: (method, *params) tuples
+            return_exceptions: Return errors in place of results instead of
+                raising the first one
+
+        Returns:
+            Results in the order of calls
+        """
+        loop = asyncio.get_running_loop()
+        batch = [(self._request(method, args), loop.create_future()) for method, *args in calls]
+        for start in range(0, len(batch), self._max_batch_size):
+            self._send_soon(batch[start:start + self._max_batch_size])
+        return await asyncio.gather(
+            *(future for _, future in batch), return_exceptions=return_exceptions
         )
 
-        data = response.json()
+    def _flush(self) -> None:
+        """Send the calls collected so far."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._send_soon(batch)
+
+    def _send_soon(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        task = asyncio.ensure_future(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        """Post a batch and resolve each call's future from its response."""
+        requests = [request for request, _ in batch]
+        # A lone call goes out as a plain request object.
+        payload = requests[0] if len(requests) == 1 else requests
+        self.stats["calls"] += len(requests)
+        self.stats["http_requests"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(requests))
+
+        try:
+            response = await self._client.post(
+                self.url,
+                json=payload,
+                headers=self._headers,
+            )
+            data = response.json()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
 
-        if data.get("error"):
-            error = data["error"]
-            raise RuntimeError(f"RPC error {error['code']}: {error['message']}")
+        if isinstance(data, dict):
+            # Single request, or the whole batch was rejected.
+            responses = {request["id"]: data for request in requests}
+        else:
+            responses = {item.get("id"): item for item in data}
 
-        return data.get("result")
+        for request, future in batch:
+            if future.done():
+                continue
+            item = responses.get(request["id"])
+            if item is None:
+                future.set_exception(
+                    RuntimeError(f"RPC error: no response to {request['method']}")
+                )
+            elif item.get("error"):
+                error = item["error"]
+                future.set_exception(
+                    RuntimeError(f"RPC error {error['code']}: {error['message']}")
+                )
+            else:
+                future.set_result(item.get("result"))
 
     async def close(self):
-        """Close HTTP client."""
+        """Send pending calls and close HTTP client."""
+        self._flush()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
         await self._client.aclose()
 
     async def get_info(self) -> NodeInfo:
         """Get node status and network info."""
         try:
-            chain_info = await self._call("getblockchaininfo")
-            network_info = await self._call("getnetworkinfo")
+            chain_info, network_info = await self.call_batch([
+                ("getblockchaininfo",),
+                ("getnetworkinfo",),
+            ])
 
             return NodeInfo(
                 connected=True,
@@ -171,3 +281,19 @@ class BitcoinRPC(NodeInterface):
         """Estimate fee rate in BTC/kB."""
         result = await self._call("estimatesmartfee", conf_target)
         return result.get("feerate", 0.0001)
+
+    async def get_block_count(self) -> int:
+        """Get height of the most-work fully-validated chain."""
+        return await self._call("getblockcount")
+
+    async def get_best_block_hash(self) -> str:
+        """Get hash of the tip of the most-work fully-validated chain."""
+        return await self._call("getbestblockhash")
+
+    async def get_block_hash(self, height: int) -> str:
+        """Get hash of the block at height in the active chain."""
+        return await self._call("getblockhash", height)
+
+    async def get_block(self, block_hash: str, verbosity: int = 2) -> dict:
+        """Get block data; verbosity 2 includes decoded transactions."""
+        return await self._call("getblock", block_hash, verbosity)
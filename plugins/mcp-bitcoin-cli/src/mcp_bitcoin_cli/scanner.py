@@ -0,0 +1,221 @@
+"""OP_RETURN block scanner with a local SQLite index.
+
+Blocks are fetched concurrently from the node (getblockhash, then getblock
+with verbosity 2) and every OP_RETURN output is stored in the index with
+its height, txid and BTCD envelope type. Queries are answered from the
+index, so only heights that have not been indexed yet are fetched.
+
+Blocks near the tip can still be reorganized away, so they are indexed
+but not marked final, and are fetched again by the next scan that covers
+them.
+"""
+
+import asyncio
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from mcp_bitcoin_cli.envelope import EnvelopeType, decode_envelope
+from mcp_bitcoin_cli.node.interface import FINAL_CONFIRMATIONS, NodeInterface
+from mcp_bitcoin_cli.primitives import OP_RETURN, decode_op_return_script
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS op_returns (
+    height INTEGER NOT NULL,
+    txid TEXT NOT NULL,
+    vout INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    envelope_type TEXT COLLATE NOCASE,
+    data BLOB NOT NULL,
+    PRIMARY KEY (height, txid, vout)
+);
+CREATE INDEX IF NOT EXISTS op_returns_txid ON op_returns (txid);
+CREATE INDEX IF NOT EXISTS op_returns_type ON op_returns (envelope_type, height);
+CREATE TABLE IF NOT EXISTS scanned_blocks (
+    height INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL,
+    final INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class OpReturnRecord:
+    """An OP_RETURN output found in a block."""
+    height: int
+    txid: str
+    vout: int
+    position: int  # Transaction index within the block
+    envelope_type: Optional[str]  # None if the data is not a BTCD envelope
+    data: bytes
+
+
+def envelope_type_name(data: bytes) -> Optional[str]:
+    """Classify OP_RETURN data by BTCD envelope type.
+
+    Returns:
+        The type name (e.g. "TEXT", "CUSTOM_0x80"), or None if the data
+        is not a valid envelope
+    """
+    try:
+        envelope = decode_envelope(data)
+    except ValueError:
+        return None
+    if isinstance(envelope.type, EnvelopeType):
+        return envelope.type.name
+    return f"CUSTOM_{envelope.type:#x}"
+
+
+def extract_op_returns(block: dict, height: int) -> list[OpReturnRecord]:
+    """Extract OP_RETURN outputs from a verbosity-2 getblock result.
+
+    Outputs whose data can't be decoded (e.g. a bare OP_RETURN) are skipped.
+    """
+    records = []
+    for position, tx in enumerate(block.get("tx", [])):
+        for output in tx.get("vout", []):
+            script_hex = output.get("scriptPubKey", {}).get("hex", "")
+            if not script_hex.startswith(f"{OP_RETURN:02x}"):
+                continue
+            try:
+                data = decode_op_return_script(bytes.fromhex(script_hex))
+            except ValueError:
+                continue
+            records.append(OpReturnRecord(
+                height=height,
+                txid=tx["txid"],
+                vout=output["n"],
+                position=position,
+                envelope_type=envelope_type_name(data),
+                data=data,
+            ))
+    return records
+
+
+class OpReturnIndex:
+    """SQLite index of OP_RETURN outputs and the blocks already scanned."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def missing_heights(self, start: int, end: int) -> list[int]:
+        """Heights in [start, end] without a final scan."""
+        done = {
+            height for (height,) in self._db.execute(
+                "SELECT height FROM scanned_blocks WHERE height BETWEEN ? AND ? AND final = 1",
+                (start, end),
+            )
+        }
+        return [height for height in range(start, end + 1) if height not in done]
+
+    def store_block(
+        self,
+        height: int,
+        block_hash: str,
+        records: list[OpReturnRecord],
+        final: bool,
+    ) -> None:
+        """Replace whatever was indexed at height with this block's outputs."""
+        with self._db:
+            self._db.execute("DELETE FROM op_returns WHERE height = ?", (height,))
+            self._db.executemany(
+                "INSERT INTO op_returns VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (r.height, r.txid, r.vout, r.position, r.envelope_type, r.data)
+                    for r in records
+                ],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO scanned_blocks VALUES (?, ?, ?)",
+                (height, block_hash, int(final)),
+            )
+
+    def _where(
+        self, start: int, end: int, envelope_type: Optional[str]
+    ) -> tuple[str, tuple]:
+        if envelope_type:
+            return "height BETWEEN ? AND ? AND envelope_type = ?", (start, end, envelope_type)
+        return "height BETWEEN ? AND ?", (start, end)
+
+    def query(
+        self,
+        start: int,
+        end: int,
+        envelope_type: Optional[str] = None,
+        limit: int = 100,
+    ) -> list[OpReturnRecord]:
+        """Indexed outputs in [start, end] in block order.
+
+        Args:
+            start: First height
+            end: Last height
+            envelope_type: Only outputs with this envelope type name
+                (case-insensitive)
+            limit: Maximum number of records
+        """
+        where, params = self._where(start, end, envelope_type)
+        rows = self._db.execute(
+            f"SELECT height, txid, vout, position, envelope_type, data FROM op_returns "
+            f"WHERE {where} ORDER BY height, position, vout LIMIT ?",
+            params + (limit,),
+        )
+        return [OpReturnRecord(*row) for row in rows]
+
+    def count(self, start: int, end: int, envelope_type: Optional[str] = None) -> int:
+        """Number of indexed outputs a query over the same range would match."""
+        where, params = self._where(start, end, envelope_type)
+        row = self._db.execute(f"SELECT COUNT(*) FROM op_returns WHERE {where}", params).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class BlockScanner:
+    """Fetches blocks concurrently and indexes their OP_RETURN outputs."""
+
+    def __init__(self, node: NodeInterface, index: OpReturnIndex, concurrency: int = 8):
+        self.node = node
+        self.index = index
+        self.concurrency = concurrency
+
+    async def scan(self, start: int, end: int, tip: int) -> int:
+        """Index the heights in [start, end] that aren't indexed yet.
+
+        Args:
+            start: First height
+            end: Last height (at most tip)
+            tip: Current chain height, used to decide which blocks are final
+
+        Returns:
+            Number of blocks fetched
+        """
+        heights = self.index.missing_heights(start, end)
+        todo = iter(heights)
+        workers = [
+            asyncio.create_task(self._worker(todo, tip))
+            for _ in range(min(self.concurrency, len(heights)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return len(heights)
+
+    async def _worker(self, heights: Iterator[int], tip: int) -> None:
+        # Workers share one iterator, so each height is fetched once.
+        for height in heights:
+            block_hash = await self.node.get_block_hash(height)
+            block = await self.node.get_block(block_hash, 2)
+            self.index.store_block(
+                height,
+                block_hash,
+                extract_op_returns(block, height),
+                final=tip - height + 1 >= FINAL_CONFIRMATIONS,
+            )
@@ -6,21 +6,38 @@ document storage, and timestamping.
 """
 
 import hashlib
+import os
 from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 
+from mcp_bitcoin_cli.chunking import (
+    CHUNK_OVERHEAD,
+    DocumentAssembler,
+    encode_document,
+    is_chunked,
+    parse_chunked,
+)
 from mcp_bitcoin_cli.config import Config, ConnectionMethod, load_config
 from mcp_bitcoin_cli.envelope import (
     EnvelopeType,
     decode_envelope,
     encode_envelope,
 )
+from mcp_bitcoin_cli.merkle import (
+    HASH_FUNCTIONS,
+    MerkleTree,
+    hash_file,
+    hash_files,
+    root_from_proof,
+)
+from mcp_bitcoin_cli.node.cache import CachingNode
 from mcp_bitcoin_cli.node.cli import BitcoinCLI
 from mcp_bitcoin_cli.node.interface import NodeInterface
 from mcp_bitcoin_cli.node.rpc import BitcoinRPC
 from mcp_bitcoin_cli.primitives import decode_op_return_script, encode_op_return_script
 from mcp_bitcoin_cli.protocols.brc20 import BRC20Deploy, BRC20Mint, BRC20Transfer
+from mcp_bitcoin_cli.scanner import BlockScanner, OpReturnIndex
 
 
 def create_server(config: Optional[Config] = None) -> FastMCP:
@@ -40,6 +57,8 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
     # Store config on server for access by tools
     mcp._config = config
     mcp._node: Optional[NodeInterface] = None
+    mcp._cached_node: Optional[NodeInterface] = None
+    mcp._scanner: Optional[BlockScanner] = None
 
     def get_node() -> NodeInterface:
         """Get or create the node interface."""
@@ -50,6 +69,28 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
                 mcp._node = BitcoinRPC(config)
         return mcp._node
 
+    def get_cached_node() -> NodeInterface:
+        """Get the node interface, behind the cache if enabled."""
+        if mcp._cached_node is None:
+            if config.cache_enabled:
+                mcp._cached_node = CachingNode(
+                    get_node(), config.get_cache_path(), config.cache_ttl
+                )
+            else:
+                mcp._cached_node = get_node()
+        return mcp._cached_node
+
+    def get_scanner() -> BlockScanner:
+        """Get or create the OP_RETURN block scanner and its index.
+
+        The scanner uses the uncached node: it keeps its own index, and
+        caching every block it fetches would only fill the disk.
+        """
+        if mcp._scanner is None:
+            index = OpReturnIndex(config.get_index_path())
+            mcp._scanner = BlockScanner(get_node(), index, config.scan_concurrency)
+        return mcp._scanner
+
     # =========================================================================
     # Low-Level Primitives (offline-capable)
     # =========================================================================
@@ -204,7 +245,7 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
             Dictionary with node information including connection status,
             network, block height, and version.
         """
-        node = get_node()
+        node = get_cached_node()
         info = await node.get_info()
         return {
             "connected": info.connected,
@@ -228,7 +269,7 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
         Returns:
             Dictionary with list of UTXOs.
         """
-        node = get_node()
+        node = get_cached_node()
         utxos = await node.list_utxos(min_confirmations, min_amount)
 
         return {
@@ -261,7 +302,7 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
             Dictionary with result. For dry_run, includes 'allowed' status.
             For actual broadcast, includes 'txid'.
         """
-        node = get_node()
+        node = get_cached_node()
 
         if dry_run:
             result = await node.test_mempool_accept(tx_hex)
@@ -288,7 +329,7 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
         Returns:
             Dictionary with transaction details.
         """
-        node = get_node()
+        node = get_cached_node()
         tx = await node.get_transaction(txid)
 
         return {
@@ -304,30 +345,72 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
         start_height: int,
         end_height: Optional[int] = None,
         limit: int = 100,
+        envelope_type: Optional[str] = None,
     ) -> dict:
         """Scan blocks for OP_RETURN transactions.
 
-        Note: This is a placeholder that will require additional implementation
-        for block scanning. Currently returns an error indicating the feature
-        requires direct block access.
+        Results come from a local index; blocks in the range that haven't
+        been indexed yet are fetched from the node first. One call covers
+        at most the configured max_blocks_per_call blocks; the rest of a
+        longer range is reported in 'remaining' for the next call.
 
         Args:
             start_height: Starting block height
             end_height: Ending block height (optional, defaults to start_height)
             limit: Maximum number of results (default: 100)
+            envelope_type: Only return BTCD envelopes of this type
+                ('raw', 'text', 'json', 'hash', 'token', 'file') (optional)
 
         Returns:
-            Dictionary with found OP_RETURN transactions.
+            Dictionary with found OP_RETURN transactions, plus 'remaining'
+            (start_height, end_height) when part of the range wasn't searched.
         """
-        # This would require block iteration which is expensive
-        # For now, return a placeholder indicating this needs more work
-        return {
-            "error": "Block scanning not yet implemented",
+        if end_height is None:
+            end_height = start_height
+        if start_height < 0 or end_height < start_height:
+            return {"error": "Invalid height range"}
+
+        scanner = get_scanner()
+        try:
+            tip = await scanner.node.get_block_count()
+            if start_height > tip:
+                return {"error": f"start_height {start_height} is above chain tip {tip}"}
+            requested_end = min(end_height, tip)
+            end_height = min(requested_end, start_height + max(1, config.scan_max_blocks) - 1)
+            scanned = await scanner.scan(start_height, end_height, tip)
+        except Exception as e:
+            return {"error": f"Block scan failed: {e}"}
+
+        records = scanner.index.query(start_height, end_height, envelope_type, limit)
+        results = []
+        for r in records:
+            result = {
+                "height": r.height,
+                "txid": r.txid,
+                "vout": r.vout,
+                "envelope_type": r.envelope_type,
+                "data_hex": r.data.hex(),
+            }
+            try:
+                result["data_utf8"] = r.data.decode("utf-8")
+            except UnicodeDecodeError:
+                result["data_utf8"] = None
+            results.append(result)
+
+        response = {
             "start_height": start_height,
-            "end_height": end_height or start_height,
-            "limit": limit,
-            "results": [],
+            "end_height": end_height,
+            "blocks_scanned": scanned,
+            "total": scanner.index.count(start_height, end_height, envelope_type),
+            "count": len(results),
+            "results": results,
         }
+        if end_height < requested_end:
+            response["remaining"] = {
+                "start_height": end_height + 1,
+                "end_height": requested_end,
+            }
+        return response
 
     # =========================================================================
     # Token Operations (BRC-20 Template)
@@ -426,40 +509,120 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
     # Document Storage
     # =========================================================================
 
+    def _chunked_document(source, content_type: str, content_size: int) -> dict:
+        """Split a document too large for one output into chunk envelopes."""
+        manifest = None
+        parts = []
+        try:
+            for envelope_bytes in encode_document(
+                source, content_type, config.max_data_size - CHUNK_OVERHEAD
+            ):
+                if manifest is None:  # The manifest comes first
+                    manifest = parse_chunked(decode_envelope(envelope_bytes).payload)
+                parts.append({
+                    "envelope_hex": envelope_bytes.hex(),
+                    "script_hex": encode_op_return_script(envelope_bytes).hex(),
+                })
+        except (OSError, ValueError) as e:
+            return {"error": f"Cannot encode document: {e}"}
+
+        return {
+            "content_type": content_type,
+            "content_size": content_size,
+            "chunked": True,
+            "chunk_count": manifest.chunk_count,
+            "document_hash": manifest.digest.hex(),
+            "parts": parts,
+        }
+
+    def _read_chunked(parts: list[bytes]) -> dict:
+        """Reassemble a chunked document from its manifest and chunk envelopes."""
+        assembler = DocumentAssembler()
+        try:
+            for part in parts:
+                assembler.add(part)
+        except ValueError as e:
+            return {"error": f"Invalid document part: {e}"}
+
+        manifest = assembler.manifest
+        result = {
+            "is_envelope": True,
+            "envelope_type": "FILE",
+            "chunked": True,
+            "complete": assembler.complete,
+            "content_type": manifest.content_type if manifest else None,
+            "document_hash": manifest.digest.hex() if manifest else None,
+            "chunks_received": assembler.chunks_received,
+        }
+        if not assembler.complete:
+            result["missing_chunks"] = assembler.missing()
+            return result
+
+        content = assembler.content
+        result["content_hex"] = content.hex()
+        try:
+            result["content_utf8"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            result["content_utf8"] = None
+        return result
+
     @mcp.tool()
     def embed_document(
-        content: str,
+        content: str = "",
         content_type: str = "text/plain",
         encoding: str = "utf-8",
+        file_path: Optional[str] = None,
     ) -> dict:
         """Prepare a document for on-chain storage.
 
+        Documents larger than the configured max_data_size are split into
+        a manifest and numbered chunks, returned in 'parts'; each part goes
+        in its own transaction's OP_RETURN output.
+
         Args:
             content: Document content
             content_type: MIME type of the content (default: 'text/plain')
             encoding: Content encoding ('utf-8' or 'hex')
+            file_path: Read the document from this file instead of content
+                (optional)
 
         Returns:
             Dictionary with prepared document data for embedding.
         """
-        if encoding == "hex":
+        if file_path:
             try:
-                content_bytes = bytes.fromhex(content)
+                content_size = os.path.getsize(file_path)
+            except OSError as e:
+                return {"error": f"Cannot read file: {e}"}
+            source = file_path
+        elif encoding == "hex":
+            try:
+                source = bytes.fromhex(content)
             except ValueError as e:
                 return {"error": f"Invalid hex string: {e}"}
+            content_size = len(source)
         else:
-            content_bytes = content.encode(encoding)
+            source = content.encode(encoding)
+            content_size = len(source)
 
         # For file type, prepend content-type header
         if content_type != "text/plain":
             header = f"{content_type}\n".encode("utf-8")
-            payload = header + content_bytes
             envelope_type = EnvelopeType.FILE
         else:
-            payload = content_bytes
+            header = b""
             envelope_type = EnvelopeType.TEXT
 
-        envelope_bytes = encode_envelope(payload, envelope_type)
+        if 6 + len(header) + content_size > config.max_data_size:
+            return _chunked_document(source, content_type, content_size)
+
+        if file_path:
+            with open(file_path, "rb") as f:
+                content_bytes = f.read()
+        else:
+            content_bytes = source
+
+        envelope_bytes = encode_envelope(header + content_bytes, envelope_type)
         script = encode_op_return_script(envelope_bytes)
 
         return {
@@ -471,17 +634,20 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
         }
 
     @mcp.tool()
-    def read_document(data_hex: str) -> dict:
+    def read_document(data_hex: str, parts_hex: Optional[list[str]] = None) -> dict:
         """Retrieve and parse document from transaction data.
 
         Args:
             data_hex: Hex-encoded document data (from OP_RETURN)
+            parts_hex: For a chunked document, the other parts (manifest
+                and chunks, in any order) as hex (optional)
 
         Returns:
             Dictionary with parsed document content.
         """
         try:
             data = bytes.fromhex(data_hex)
+            parts = [bytes.fromhex(part) for part in parts_hex or []]
         except ValueError as e:
             return {"error": f"Invalid hex string: {e}"}
 
@@ -490,6 +656,9 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
             envelope = decode_envelope(data)
             payload = envelope.payload
 
+            if envelope.type == EnvelopeType.FILE and is_chunked(payload):
+                return _read_chunked([data] + parts)
+
             if envelope.type == EnvelopeType.FILE:
                 # Parse content-type header
                 if b"\n" in payload:
@@ -547,22 +716,90 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
     # Timestamping & Attestation
     # =========================================================================
 
+    def _batch_timestamp(
+        items: list[str],
+        file_paths: list[str],
+        encoding: str,
+        hash_algorithm: str,
+    ) -> dict:
+        """Commit to many inputs at once through a Merkle root."""
+        hashes = []
+        try:
+            hash_fn = HASH_FUNCTIONS[hash_algorithm]
+        except KeyError:
+            return {"error": f"Unsupported hash algorithm: {hash_algorithm}"}
+        for item in items:
+            if encoding == "hex":
+                try:
+                    item_bytes = bytes.fromhex(item)
+                except ValueError as e:
+                    return {"error": f"Invalid hex string: {e}"}
+            else:
+                item_bytes = item.encode(encoding)
+            hashes.append(hash_fn(item_bytes).digest())
+        try:
+            hashes.extend(hash_files(file_paths, hash_algorithm))
+        except OSError as e:
+            return {"error": f"Cannot read file: {e}"}
+        if not hashes:
+            return {"error": "Nothing to timestamp"}
+
+        tree = MerkleTree(hashes, hash_algorithm)
+        envelope_bytes = encode_envelope(tree.root, EnvelopeType.HASH)
+        script = encode_op_return_script(envelope_bytes)
+
+        sources = [None] * len(items) + list(file_paths)
+        proofs = []
+        for index, (source, hash_bytes) in enumerate(zip(sources, hashes)):
+            proof = {
+                "index": index,
+                "hash_hex": hash_bytes.hex(),
+                "proof_hex": tree.proof(index).hex(),
+            }
+            if source is not None:
+                proof["file_path"] = source
+            proofs.append(proof)
+
+        return {
+            "hash_algorithm": hash_algorithm,
+            "batch": True,
+            "leaf_count": len(tree),
+            "hash_hex": tree.root.hex(),
+            "envelope_hex": envelope_bytes.hex(),
+            "script_hex": script.hex(),
+            "proofs": proofs,
+        }
+
     @mcp.tool()
     def create_timestamp(
-        data: str,
+        data: str = "",
         encoding: str = "utf-8",
         hash_algorithm: str = "sha256",
+        batch: Optional[list[str]] = None,
+        file_paths: Optional[list[str]] = None,
     ) -> dict:
         """Create a hash commitment for timestamping.
 
+        With batch or file_paths, every input is hashed into a Merkle tree
+        and only its root is committed; each input gets an inclusion proof
+        for verify_timestamp. One transaction then timestamps them all.
+
         Args:
             data: Data to timestamp
             encoding: Data encoding ('utf-8' or 'hex')
             hash_algorithm: Hash algorithm to use ('sha256', 'sha3_256')
+            batch: Several data items to timestamp together (optional)
+            file_paths: Files to timestamp together, read from disk (optional)
 
         Returns:
-            Dictionary with hash and prepared script for embedding.
+            Dictionary with hash and prepared script for embedding. In batch
+            mode 'hash_hex' is the Merkle root, and 'proofs' lists data
+            items first (with data included if given), then files.
         """
+        if batch is not None or file_paths is not None:
+            items = ([data] if data else []) + list(batch or [])
+            return _batch_timestamp(items, list(file_paths or []), encoding, hash_algorithm)
+
         if encoding == "hex":
             try:
                 data_bytes = bytes.fromhex(data)
@@ -593,42 +830,66 @@ def create_server(config: Optional[Config] = None) -> FastMCP:
         expected_hash: str,
         encoding: str = "utf-8",
         hash_algorithm: str = "sha256",
+        proof: Optional[str] = None,
+        file_path: Optional[str] = None,
     ) -> dict:
         """Verify data against an on-chain timestamp hash.
 
         Args:
-            data: Original data to verify
-            expected_hash: Expected hash value (hex)
+            data: Original data to verify (ignored if file_path is given)
+            expected_hash: Expected hash value (hex); the Merkle root when
+                a proof is given
             encoding: Data encoding ('utf-8' or 'hex')
             hash_algorithm: Hash algorithm used ('sha256', 'sha3_256')
+            proof: Inclusion proof (hex) from a batch timestamp (optional)
+            file_path: Verify this file instead of data (optional)
 
         Returns:
             Dictionary with verification result.
         """
-        if encoding == "hex":
+        if file_path:
             try:
-                data_bytes = bytes.fromhex(data)
-            except ValueError as e:
-                return {"error": f"Invalid hex string for data: {e}"}
+                computed_hash = hash_file(file_path, hash_algorithm)
+            except (OSError, ValueError) as e:
+                return {"error": f"Cannot hash file: {e}"}
         else:
-            data_bytes = data.encode(encoding)
+            if encoding == "hex":
+                try:
+                    data_bytes = bytes.fromhex(data)
+                except ValueError as e:
+                    return {"error": f"Invalid hex string for data: {e}"}
+            else:
+                data_bytes = data.encode(encoding)
 
-        if hash_algorithm == "sha3_256":
-            computed_hash = hashlib.sha3_256(data_bytes).digest()
-        else:
-            computed_hash = hashlib.sha256(data_bytes).digest()
+            if hash_algorithm == "sha3_256":
+                computed_hash = hashlib.sha3_256(data_bytes).digest()
+            else:
+                computed_hash = hashlib.sha256(data_bytes).digest()
 
         try:
             expected_bytes = bytes.fromhex(expected_hash)
         except ValueError as e:
             return {"error": f"Invalid hex string for expected_hash: {e}"}
 
-        match = computed_hash == expected_bytes
+        if proof is None:
+            match = computed_hash == expected_bytes
+            return {
+                "verified": match,
+                "hash_algorithm": hash_algorithm,
+                "computed_hash": computed_hash.hex(),
+                "expected_hash": expected_hash,
+            }
+
+        try:
+            root = root_from_proof(computed_hash, bytes.fromhex(proof), hash_algorithm)
+        except ValueError as e:
+            return {"error": f"Invalid proof: {e}"}
 
         return {
-            "verified": match,
+            "verified": root == expected_bytes,
             "hash_algorithm": hash_algorithm,
             "computed_hash": computed_hash.hex(),
+            "computed_root": root.hex(),
             "expected_hash": expected_hash,
         }
 
@@ -0,0 +1,228 @@
+"""Tests for chunked documents."""
+
+import hashlib
+import io
+import os
+import random
+
+import pytest
+
+from mcp_bitcoin_cli.chunking import (
+    CHUNK_OVERHEAD,
+    Chunk,
+    DocumentAssembler,
+    Manifest,
+    encode_document,
+    is_chunked,
+    parse_chunked,
+)
+from mcp_bitcoin_cli.config import Config
+from mcp_bitcoin_cli.envelope import EnvelopeType, decode_envelope, encode_envelope
+from mcp_bitcoin_cli.server import create_server
+
+MIB = 1024 * 1024
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    """A 5 MiB file of random bytes."""
+    path = tmp_path / "big.bin"
+    path.write_bytes(os.urandom(5 * MIB))
+    return path
+
+
+class TestEncodeDocument:
+    """Test splitting documents into envelopes."""
+
+    def test_manifest_then_chunks(self, big_file):
+        """The manifest comes first, then chunks numbered from 0."""
+        envelopes = list(encode_document(big_file, "video/mp4", chunk_size=100_000))
+        parts = [parse_chunked(decode_envelope(e).payload) for e in envelopes]
+        manifest, chunks = parts[0], parts[1:]
+
+        assert isinstance(manifest, Manifest)
+        assert manifest.size == 5 * MIB
+        assert manifest.chunk_count == len(chunks) == 53
+        assert manifest.content_type == "video/mp4"
+        assert manifest.digest == hashlib.sha256(big_file.read_bytes()).digest()
+        assert [c.seq for c in chunks] == list(range(53))
+        assert all(isinstance(c, Chunk) and c.doc_id == manifest.doc_id for c in chunks)
+        assert max(len(e) for e in envelopes) == 100_000 + CHUNK_OVERHEAD
+
+    def test_envelopes_are_file_type(self, big_file):
+        """Every part is a FILE envelope with a chunked payload."""
+        for envelope_bytes in encode_document(big_file, chunk_size=MIB):
+            envelope = decode_envelope(envelope_bytes)
+            assert envelope.type == EnvelopeType.FILE
+            assert is_chunked(envelope.payload)
+
+    def test_plain_file_payload_not_chunked(self):
+        """A content-type header never looks like a chunked payload."""
+        assert not is_chunked(b"application/json\n{}")
+
+    def test_file_changed_while_encoding(self, tmp_path):
+        """Changing the file between the two passes is detected."""
+        path = tmp_path / "doc.bin"
+        path.write_bytes(b"a" * 1000)
+        envelopes = encode_document(path, chunk_size=100)
+
+        next(envelopes)  # manifest
+        path.write_bytes(b"b" * 1000)
+
+        with pytest.raises(ValueError, match="changed"):
+            list(envelopes)
+
+
+class TestDocumentAssembler:
+    """Test reassembly from parts in any order."""
+
+    def test_multi_megabyte_roundtrip_any_order(self, big_file):
+        """A 5 MiB file reassembles from shuffled parts."""
+        envelopes = list(encode_document(big_file, chunk_size=64 * 1024))
+        random.Random(1).shuffle(envelopes)
+        assembler = DocumentAssembler()
+
+        for envelope_bytes in envelopes:
+            assert not assembler.complete
+            assembler.add(envelope_bytes)
+
+        assert assembler.complete
+        assert assembler.content == big_file.read_bytes()
+
+    def test_streams_to_output(self, big_file):
+        """In-order chunks are written out as they become contiguous."""
+        envelopes = list(encode_document(big_file, chunk_size=MIB))
+        output = io.BytesIO()
+        assembler = DocumentAssembler(output)
+
+        assembler.add(envelopes[2])  # chunk 1 waits for chunk 0
+        assert output.tell() == 0
+        assembler.add(envelopes[1])
+        assert output.tell() == 2 * MIB
+
+        for envelope_bytes in envelopes[3:] + envelopes[:1]:
+            assembler.add(envelope_bytes)
+        assert assembler.complete
+        assert output.getvalue() == big_file.read_bytes()
+
+    def test_missing_chunks_reported(self, big_file):
+        """Missing sequence numbers are listed once the manifest is in."""
+        envelopes = list(encode_document(big_file, chunk_size=MIB))
+        assembler = DocumentAssembler()
+
+        for envelope_bytes in envelopes[:3] + envelopes[5:]:
+            assembler.add(envelope_bytes)
+
+        assert assembler.missing() == [2, 3]
+        assert assembler.chunks_received == 3
+        with pytest.raises(ValueError, match="incomplete"):
+            assembler.content
+
+    def test_corrupt_chunk_detected_then_replaced(self):
+        """A corrupted chunk fails as soon as it's next in line; a good copy still fits."""
+        data = os.urandom(10_000)
+        envelopes = list(encode_document(data, chunk_size=1000))
+        bad = bytearray(envelopes[4])
+        bad[-1] ^= 0xFF
+        assembler = DocumentAssembler()
+
+        for envelope_bytes in envelopes[:4]:
+            assembler.add(envelope_bytes)
+        with pytest.raises(ValueError, match="Chunk 3 failed"):
+            assembler.add(bytes(bad))
+
+        for envelope_bytes in envelopes[4:]:
+            assembler.add(envelope_bytes)
+        assert assembler.content == data
+
+    def test_rejects_other_document(self):
+        """Parts of a different document are rejected."""
+        assembler = DocumentAssembler()
+        assembler.add(next(encode_document(b"first document")))
+
+        with pytest.raises(ValueError, match="belongs to document"):
+            assembler.add(next(encode_document(b"second document")))
+
+    def test_rejects_non_file_envelope(self):
+        """Only FILE envelopes can be document parts."""
+        with pytest.raises(ValueError, match="Not a FILE envelope"):
+            DocumentAssembler().add(encode_envelope(b"\x00\x02", EnvelopeType.TEXT))
+
+    def test_empty_document(self):
+        """An empty document is just a manifest."""
+        envelopes = list(encode_document(b""))
+        assembler = DocumentAssembler()
+        assembler.add(envelopes[0])
+
+        assert len(envelopes) == 1
+        assert assembler.complete
+        assert assembler.content == b""
+
+
+class TestChunkedDocumentTools:
+    """Test embed_document and read_document with chunked documents."""
+
+    @pytest.fixture
+    def server(self):
+        return create_server(Config(max_data_size=10_000))
+
+    def test_small_document_unchanged(self, server):
+        """Documents within max_data_size still use a single envelope."""
+        embed_fn = server._tool_manager._tools["embed_document"].fn
+
+        result = embed_fn("small", "text/plain", "utf-8")
+
+        assert "envelope_hex" in result
+        assert "chunked" not in result
+
+    def test_large_file_roundtrip(self, server, big_file):
+        """A large file is embedded in parts and read back from them."""
+        embed_fn = server._tool_manager._tools["embed_document"].fn
+        read_fn = server._tool_manager._tools["read_document"].fn
+
+        embedded = embed_fn(content_type="image/png", file_path=str(big_file))
+        parts = [part["envelope_hex"] for part in embedded["parts"]]
+        parts.reverse()
+        result = read_fn(parts[0], parts[1:])
+
+        assert embedded["chunked"] is True
+        assert embedded["chunk_count"] == len(parts) - 1
+        assert all(len(p) // 2 <= 10_000 for p in parts)
+        assert result["complete"] is True
+        assert result["content_type"] == "image/png"
+        assert result["document_hash"] == embedded["document_hash"]
+        assert bytes.fromhex(result["content_hex"]) == big_file.read_bytes()
+
+    def test_large_text_content_chunked(self, server):
+        """Large inline content is chunked too."""
+        embed_fn = server._tool_manager._tools["embed_document"].fn
+        read_fn = server._tool_manager._tools["read_document"].fn
+        text = "lorem ipsum " * 5000
+
+        embedded = embed_fn(text)
+        parts = [part["envelope_hex"] for part in embedded["parts"]]
+        result = read_fn(parts[0], parts[1:])
+
+        assert result["content_utf8"] == text
+        assert result["content_type"] == "text/plain"
+
+    def test_incomplete_document(self, server):
+        """Reading only some parts reports what is missing."""
+        embed_fn = server._tool_manager._tools["embed_document"].fn
+        read_fn = server._tool_manager._tools["read_document"].fn
+
+        embedded = embed_fn(os.urandom(30_000).hex(), "application/octet-stream", "hex")
+        parts = [part["envelope_hex"] for part in embedded["parts"]]
+        result = read_fn(parts[0], parts[1:2])
+
+        assert result["complete"] is False
+        assert result["missing_chunks"] == [1, 2, 3]
+        assert "content_hex" not in result
+
+    def test_missing_file(self, server, tmp_path):
+        """A missing file returns an error."""
+        embed_fn = server._tool_manager._tools["embed_document"].fn
+
+        result = embed_fn(file_path=str(tmp_path / "nope.bin"))
+
+        assert "error" in result
@@ -66,6 +66,68 @@ max_data_size = 50000
         assert config.dry_run_default is False
         assert config.max_data_size == 50000
 
+    def test_load_rpc_tuning(self, tmp_path):
+        """Load RPC connection pool and batching settings."""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text('''
+[rpc]
+max_connections = 8
+batch_window_ms = 0
+max_batch_size = 500
+''')
+
+        config = load_config(config_file)
+
+        assert config.rpc_max_connections == 8
+        assert config.rpc_batch_window_ms == 0
+        assert config.rpc_max_batch_size == 500
+
+    def test_load_cli_pool_settings(self, tmp_path):
+        """Load bitcoin-cli process limit and cache size."""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text('''
+[cli]
+max_processes = 2
+cache_size = 0
+''')
+
+        config = load_config(config_file)
+
+        assert config.cli_max_processes == 2
+        assert config.cli_cache_size == 0
+
+    def test_load_cache_settings(self, tmp_path):
+        """Load node cache settings."""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text('''
+[cache]
+enabled = false
+ttl_seconds = 30
+''')
+
+        config = load_config(config_file)
+
+        assert config.cache_enabled is False
+        assert config.cache_ttl == 30
+        assert config.get_cache_path().name == "node-testnet.db"
+
+    def test_load_index_settings(self, tmp_path):
+        """Load OP_RETURN index path; default path is per network."""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text(f'''
+[index]
+path = "{tmp_path / 'index.db'}"
+scan_concurrency = 2
+max_blocks_per_call = 50
+''')
+
+        config = load_config(config_file)
+
+        assert config.get_index_path() == tmp_path / "index.db"
+        assert config.scan_concurrency == 2
+        assert config.scan_max_blocks == 50
+        assert Config(network=Network.SIGNET).get_index_path().name == "op_returns-signet.db"
+
     def test_load_missing_file_uses_defaults(self, tmp_path):
         """Missing config file should use defaults."""
         config = load_config(tmp_path / "nonexistent.toml")
@@ -0,0 +1,200 @@
+"""Tests for Merkle-batched timestamps."""
+
+import hashlib
+import math
+import random
+
+import pytest
+
+from mcp_bitcoin_cli.envelope import EnvelopeType, decode_envelope
+from mcp_bitcoin_cli.merkle import (
+    LEAF_PREFIX,
+    NODE_PREFIX,
+    STEP_SIZE,
+    MerkleTree,
+    hash_file,
+    hash_files,
+    root_from_proof,
+    verify_proof,
+)
+from mcp_bitcoin_cli.server import create_server
+
+
+def random_hashes(rng, count):
+    return [rng.randbytes(32) for _ in range(count)]
+
+
+class TestMerkleProofs:
+    """Property tests for inclusion proofs over seeded random trees."""
+
+    @pytest.mark.parametrize("size", list(range(1, 34)) + [100, 257, 1000])
+    def test_every_leaf_verifies(self, size):
+        """Each leaf's proof leads to the root, and is at most ceil(log2 n) steps."""
+        hashes = random_hashes(random.Random(size), size)
+        tree = MerkleTree(hashes)
+        max_steps = math.ceil(math.log2(size)) if size > 1 else 0
+
+        for index, document_hash in enumerate(hashes):
+            proof = tree.proof(index)
+            assert verify_proof(document_hash, proof, tree.root)
+            assert len(proof) <= max_steps * STEP_SIZE
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_tampering_fails(self, seed):
+        """Flipping any bit of the proof, the hash or the root breaks verification."""
+        rng = random.Random(seed)
+        hashes = random_hashes(rng, rng.randint(2, 300))
+        tree = MerkleTree(hashes)
+        index = rng.randrange(len(hashes))
+        proof = bytearray(tree.proof(index))
+
+        position = rng.randrange(len(proof))
+        proof[position] ^= 1 << rng.randrange(8)
+        assert not verify_proof(hashes[index], bytes(proof), tree.root)
+
+        bad_hash = bytearray(hashes[index])
+        bad_hash[rng.randrange(32)] ^= 0x01
+        assert not verify_proof(bytes(bad_hash), tree.proof(index), tree.root)
+
+        bad_root = bytearray(tree.root)
+        bad_root[rng.randrange(32)] ^= 0x80
+        assert not verify_proof(hashes[index], tree.proof(index), bytes(bad_root))
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_proof_for_other_leaf_fails(self, seed):
+        """A proof only verifies the leaf it was made for."""
+        rng = random.Random(seed)
+        hashes = random_hashes(rng, rng.randint(2, 200))
+        tree = MerkleTree(hashes)
+        index, other = rng.sample(range(len(hashes)), 2)
+
+        assert not verify_proof(hashes[other], tree.proof(index), tree.root)
+
+    def test_truncated_proof_fails(self):
+        """Dropping steps or bytes from a proof fails verification."""
+        hashes = random_hashes(random.Random(0), 64)
+        tree = MerkleTree(hashes)
+        proof = tree.proof(5)
+
+        assert not verify_proof(hashes[5], proof[:-STEP_SIZE], tree.root)
+        assert not verify_proof(hashes[5], proof[:-1], tree.root)
+        with pytest.raises(ValueError, match="multiple"):
+            root_from_proof(hashes[5], proof[:-1])
+
+    def test_inner_node_is_not_a_leaf(self):
+        """An inner node can't be presented as a document hash."""
+        hashes = random_hashes(random.Random(1), 4)
+        tree = MerkleTree(hashes)
+        inner = tree.levels[1][0]
+
+        assert inner == hashlib.sha256(NODE_PREFIX + tree.levels[0][0] + tree.levels[0][1]).digest()
+        assert tree.levels[0][0] == hashlib.sha256(LEAF_PREFIX + hashes[0]).digest()
+        assert not verify_proof(inner, tree.proof(2)[STEP_SIZE:], tree.root)
+
+    def test_single_leaf(self):
+        """A one-document tree has an empty proof."""
+        document_hash = hashlib.sha256(b"only").digest()
+        tree = MerkleTree([document_hash])
+
+        assert tree.proof(0) == b""
+        assert verify_proof(document_hash, b"", tree.root)
+        assert tree.root != document_hash
+
+    def test_sha3(self):
+        """Trees work with SHA3-256 and don't verify under SHA-256."""
+        hashes = random_hashes(random.Random(2), 10)
+        tree = MerkleTree(hashes, "sha3_256")
+
+        assert verify_proof(hashes[3], tree.proof(3), tree.root, "sha3_256")
+        assert not verify_proof(hashes[3], tree.proof(3), tree.root, "sha256")
+
+    def test_rejects_empty_and_bad_index(self):
+        """An empty tree or out-of-range index is an error."""
+        with pytest.raises(ValueError):
+            MerkleTree([])
+        with pytest.raises(IndexError):
+            MerkleTree([b"\x00" * 32]).proof(1)
+        with pytest.raises(ValueError, match="Unsupported"):
+            MerkleTree([b"\x00" * 32], "md5")
+
+
+class TestHashFiles:
+    """Test file hashing."""
+
+    def test_hash_files_in_order(self, tmp_path):
+        """Digests come back in path order and match hashlib."""
+        paths = []
+        for i in range(50):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_bytes(f"document {i}".encode() * (i + 1))
+            paths.append(path)
+
+        digests = hash_files(paths, workers=4)
+
+        assert digests == [hashlib.sha256(p.read_bytes()).digest() for p in paths]
+        assert hash_file(paths[7], "sha3_256") == hashlib.sha3_256(paths[7].read_bytes()).digest()
+
+    def test_missing_file(self, tmp_path):
+        """A missing file raises OSError."""
+        with pytest.raises(OSError):
+            hash_files([tmp_path / "nope"])
+
+
+class TestBatchTimestampTools:
+    """Test create_timestamp and verify_timestamp in batch mode."""
+
+    @pytest.fixture
+    def server(self):
+        return create_server()
+
+    def test_batch_roundtrip(self, server):
+        """Each batch item verifies against the committed root with its proof."""
+        create_fn = server._tool_manager._tools["create_timestamp"].fn
+        verify_fn = server._tool_manager._tools["verify_timestamp"].fn
+        items = [f"record {i}" for i in range(25)]
+
+        result = create_fn(batch=items)
+        envelope = decode_envelope(bytes.fromhex(result["envelope_hex"]))
+
+        assert result["batch"] is True
+        assert result["leaf_count"] == 25
+        assert envelope.type == EnvelopeType.HASH
+        assert envelope.payload.hex() == result["hash_hex"]
+        for item, proof in zip(items, result["proofs"]):
+            verified = verify_fn(item, result["hash_hex"], proof=proof["proof_hex"])
+            assert verified["verified"] is True
+            assert verified["computed_root"] == result["hash_hex"]
+
+        wrong = verify_fn("record 99", result["hash_hex"], proof=result["proofs"][0]["proof_hex"])
+        assert wrong["verified"] is False
+
+    def test_batch_files(self, server, tmp_path):
+        """Files are hashed from disk and verified by path."""
+        create_fn = server._tool_manager._tools["create_timestamp"].fn
+        verify_fn = server._tool_manager._tools["verify_timestamp"].fn
+        paths = []
+        for i in range(10):
+            path = tmp_path / f"f{i}.bin"
+            path.write_bytes(bytes([i]) * 1000)
+            paths.append(str(path))
+
+        result = create_fn("inline", file_paths=paths, hash_algorithm="sha3_256")
+
+        assert result["leaf_count"] == 11
+        assert "file_path" not in result["proofs"][0]
+        for proof in result["proofs"][1:]:
+            verified = verify_fn(
+                "", result["hash_hex"], hash_algorithm="sha3_256",
+                proof=proof["proof_hex"], file_path=proof["file_path"],
+            )
+            assert verified["verified"] is True
+
+    def test_batch_errors(self, server, tmp_path):
+        """Unreadable files, bad algorithms and bad proofs return errors."""
+        create_fn = server._tool_manager._tools["create_timestamp"].fn
+        verify_fn = server._tool_manager._tools["verify_timestamp"].fn
+
+        assert "error" in create_fn(file_paths=[str(tmp_path / "missing")])
+        assert "error" in create_fn(batch=["a"], hash_algorithm="md5")
+        assert "error" in create_fn(batch=[])
+        assert "error" in verify_fn("a", "00" * 32, proof="01" * 10)
@@ -0,0 +1,239 @@
+"""Tests for the caching node wrapper."""
+
+import asyncio
+
+import pytest
+
+from mcp_bitcoin_cli.config import Config, Network
+from mcp_bitcoin_cli.node.cache import CachingNode
+from mcp_bitcoin_cli.node.interface import UTXO, NodeInterface, TransactionInfo
+from mcp_bitcoin_cli.server import create_server
+
+
+class ChainNode(NodeInterface):
+    """In-memory chain: tx "deep" is in block 10, "fresh" in the tip block."""
+
+    def __init__(self, tip=20):
+        self.tip = tip
+        self.fork = "0"
+        self.calls = []
+
+    def mine(self, blocks=1):
+        self.tip += blocks
+
+    def reorg(self):
+        self.fork = chr(ord(self.fork) + 1)
+
+    def block_hash(self, height):
+        return f"{self.fork * 8}{height:056x}"
+
+    async def get_best_block_hash(self):
+        self.calls.append("getbestblockhash")
+        return self.block_hash(self.tip)
+
+    async def get_block_count(self):
+        self.calls.append("getblockcount")
+        return self.tip
+
+    async def get_block_hash(self, height):
+        self.calls.append("getblockhash")
+        return self.block_hash(height)
+
+    async def get_block(self, block_hash, verbosity=2):
+        self.calls.append("getblock")
+        height = int(block_hash[-8:], 16)
+        return {"hash": block_hash, "height": height, "confirmations": self.tip - height + 1}
+
+    async def get_transaction(self, txid):
+        self.calls.append("getrawtransaction")
+        height = 10 if txid == "deep" else self.tip
+        confirmations = self.tip - height + 1
+        return TransactionInfo(
+            txid=txid,
+            blockhash=self.block_hash(height),
+            confirmations=confirmations,
+            time=1700000000,
+            hex="0200",
+            decoded={"txid": txid, "confirmations": confirmations},
+        )
+
+    async def list_utxos(self, min_confirmations=1, min_amount=0):
+        self.calls.append("listunspent")
+        return [UTXO("aa", 0, 1.0, 3, "0014")]
+
+    async def send_raw_transaction(self, tx_hex, max_fee_rate=None):
+        self.calls.append("sendrawtransaction")
+        return "bb"
+
+    async def get_info(self):
+        raise NotImplementedError
+
+    async def test_mempool_accept(self, tx_hex):
+        raise NotImplementedError
+
+    async def create_raw_transaction(self, inputs, outputs):
+        raise NotImplementedError
+
+    async def fund_raw_transaction(self, tx_hex, options=None):
+        raise NotImplementedError
+
+    async def get_new_address(self, label=""):
+        raise NotImplementedError
+
+    async def estimate_fee(self, conf_target=6):
+        raise NotImplementedError
+
+
+class TestCachingNode:
+    """Test the disk and memory tiers and tip invalidation."""
+
+    @pytest.fixture
+    def chain(self):
+        return ChainNode()
+
+    @pytest.fixture
+    def make_cache(self, chain, tmp_path):
+        caches = []
+
+        def make(ttl=0):
+            cache = CachingNode(chain, tmp_path / "cache.db", ttl=ttl)
+            caches.append(cache)
+            return cache
+
+        yield make
+        for cache in caches:
+            cache.close()
+
+    async def test_deep_transaction_kept_on_disk(self, chain, make_cache):
+        """A deeply confirmed transaction is fetched once, even across restarts."""
+        cache = make_cache()
+        first = await cache.get_transaction("deep")
+        chain.mine(5)
+        second = await make_cache().get_transaction("deep")
+
+        assert chain.calls.count("getrawtransaction") == 1
+        assert first.confirmations == 11
+        assert second.confirmations == 16
+        assert second.decoded["confirmations"] == 16
+        assert second.blockhash == first.blockhash
+
+    async def test_confirmations_counted_from_fetch(self, chain, make_cache):
+        """Blocks mined between the tip check and the fetch aren't counted twice."""
+        cache = make_cache(ttl=60)
+        await cache.get_block_count()
+        chain.mine(3)
+
+        tx = await cache.get_transaction("deep")
+        block = await cache.get_block(chain.block_hash(10))
+        cache._tip_checked = float("-inf")
+        cached_tx = await cache.get_transaction("deep")
+        cached_block = await cache.get_block(chain.block_hash(10))
+
+        assert tx.confirmations == cached_tx.confirmations == 14
+        assert block["confirmations"] == cached_block["confirmations"] == 14
+        assert chain.calls.count("getrawtransaction") == 1
+
+    async def test_recent_transaction_dropped_on_new_block(self, chain, make_cache):
+        """Low-confirmation data is reused until the tip changes."""
+        cache = make_cache(ttl=60)
+
+        await cache.get_transaction("fresh")
+        await cache.get_transaction("fresh")
+        assert chain.calls.count("getrawtransaction") == 1
+
+        chain.mine()
+        cache._tip_checked = float("-inf")  # TTL elapsed
+        tx = await cache.get_transaction("fresh")
+
+        assert chain.calls.count("getrawtransaction") == 2
+        assert tx.confirmations == 1
+        assert cache.stats["tip_changes"] == 1
+
+    async def test_memory_entries_expire(self, chain, make_cache):
+        """Memory entries expire after the TTL even without a new block."""
+        cache = make_cache(ttl=0.05)
+
+        await cache.list_utxos()
+        await cache.list_utxos()
+        await asyncio.sleep(0.06)
+        await cache.list_utxos()
+
+        assert chain.calls.count("listunspent") == 2
+
+    async def test_tip_checked_once_per_ttl(self, chain, make_cache):
+        """The best block hash is asked for at most once per TTL."""
+        cache = make_cache(ttl=60)
+
+        for _ in range(5):
+            await cache.get_transaction("deep")
+
+        assert chain.calls.count("getbestblockhash") == 1
+        assert chain.calls.count("getblockcount") == 1
+
+    async def test_reorg_invalidates_memory(self, chain, make_cache):
+        """A different best block at the same height drops recent data."""
+        cache = make_cache()
+        before = await cache.get_block_hash(chain.tip)
+
+        chain.reorg()
+        after = await cache.get_block_hash(chain.tip)
+
+        assert before != after
+        assert chain.calls.count("getblockhash") == 2
+
+    async def test_deep_block_data_on_disk(self, chain, make_cache):
+        """Deep block hashes and blocks are served from disk."""
+        cache = make_cache()
+
+        for _ in range(2):
+            block_hash = await cache.get_block_hash(5)
+            block = await cache.get_block(block_hash)
+        chain.mine(2)
+        block = await cache.get_block(block_hash)
+
+        assert chain.calls.count("getblockhash") == 1
+        assert chain.calls.count("getblock") == 1
+        assert block["confirmations"] == 18
+        assert cache.stats["disk_hits"] == 3
+
+    async def test_broadcast_drops_cached_utxos(self, chain, make_cache):
+        """Sending a transaction makes the next UTXO list come from the node."""
+        cache = make_cache(ttl=60)
+
+        await cache.list_utxos()
+        await cache.send_raw_transaction("0200")
+        await cache.list_utxos()
+
+        assert chain.calls.count("listunspent") == 2
+
+
+class TestServerCache:
+    """Test that node tools go through the cache."""
+
+    async def test_get_transaction_tool_cached(self, tmp_path):
+        """Repeat lookups of a confirmed transaction don't reach the node."""
+        server = create_server(Config(
+            network=Network.REGTEST,
+            cache_path=str(tmp_path / "cache.db"),
+        ))
+        chain = ChainNode()
+        server._node = chain
+        get_tx_fn = server._tool_manager._tools["get_transaction"].fn
+
+        first = await get_tx_fn("deep")
+        second = await get_tx_fn("deep")
+
+        assert first == second
+        assert chain.calls.count("getrawtransaction") == 1
+
+    async def test_cache_can_be_disabled(self, tmp_path):
+        """With the cache disabled, every lookup reaches the node."""
+        server = create_server(Config(network=Network.REGTEST, cache_enabled=False))
+        chain = ChainNode()
+        server._node = chain
+        get_tx_fn = server._tool_manager._tools["get_transaction"].fn
+
+        await get_tx_fn("deep")
+        await get_tx_fn("deep")
+
+        assert chain.calls.count("getrawtransaction") == 2
@@ -1,5 +1,6 @@
 """Tests for bitcoin-cli interface."""
 
+import asyncio
 import json
 import pytest
 from unittest.mock import AsyncMock, patch
@@ -88,3 +89,200 @@ class TestBitcoinCLI:
 
             mock_call.assert_called_once()
             assert "testmempoolaccept" in str(mock_call.call_args)
+
+    @pytest.mark.asyncio
+    async def test_get_block_requests_verbosity(self, cli):
+        """get_block asks for decoded transactions."""
+        with patch.object(cli, '_call', new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = {"hash": "00ab", "tx": []}
+
+            block = await cli.get_block("00ab")
+
+            mock_call.assert_called_once_with("getblock", "00ab", 2)
+            assert block["hash"] == "00ab"
+
+
+class FakeProcess:
+    """Stands in for a bitcoin-cli process, answering from a method map."""
+
+    def __init__(self, node, cmd, stdin):
+        self.node = node
+        self.cmd = cmd
+        self.stdin_used = stdin is not None
+        self.returncode = 0
+
+    async def communicate(self, input=None):
+        node = self.node
+        node.running += 1
+        node.max_running = max(node.max_running, node.running)
+        await asyncio.sleep(0.01)
+        node.running -= 1
+
+        args = input.decode().splitlines() if input else []
+        method = next(a for a in self.cmd[1:] if not a.startswith("-"))
+        node.calls.append((method, self.cmd, args))
+        result = node.results[method]
+        if isinstance(result, Exception):
+            self.returncode = 1
+            return b"", str(result).encode()
+        if callable(result):
+            result = result()
+        return json.dumps(result).encode(), b""
+
+
+class FakeNode:
+    """Records the bitcoin-cli processes started."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def create_subprocess_exec(self, *cmd, stdin=None, stdout=None, stderr=None):
+        return FakeProcess(self, cmd, stdin)
+
+
+class TestProcessPool:
+    """Test process limits, shared calls and caching of immutable results."""
+
+    @pytest.fixture
+    def fake(self, monkeypatch):
+        addresses = iter(f"bcrt1q{n}" for n in range(100))
+        node = FakeNode({
+            "getblockcount": 100,
+            "getblockhash": "00ab",
+            "getnewaddress": lambda: next(addresses),
+            "getrawtransaction": {"txid": "aa", "hex": "00", "blockhash": "00ab", "confirmations": 10},
+            "getblockheader": {"hash": "00ab", "height": 91},
+            "sendrawtransaction": "aa",
+            "getblock": RuntimeError("Block not found"),
+        })
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", node.create_subprocess_exec)
+        return node
+
+    def make_cli(self, **settings):
+        return BitcoinCLI(Config(network=Network.REGTEST, **settings))
+
+    @pytest.mark.asyncio
+    async def test_process_limit(self, fake):
+        """No more than cli_max_processes run at once."""
+        cli = self.make_cli(cli_max_processes=2)
+
+        await asyncio.gather(*(cli._call("getblockhash", h) for h in range(8)))
+
+        assert fake.max_running == 2
+        assert cli.stats["subprocesses"] == 8
+        assert cli.stats["subprocess_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_identical_read_calls_share_process(self, fake):
+        """Identical read-only calls running at once start one process."""
+        cli = self.make_cli()
+
+        results = await asyncio.gather(*(cli._call("getblockcount") for _ in range(5)))
+
+        assert results == [100] * 5
+        assert len(fake.calls) == 1
+        assert cli.stats["shared_calls"] == 4
+
+    @pytest.mark.asyncio
+    async def test_calls_with_side_effects_not_shared(self, fake):
+        """Each getnewaddress call gets its own process and address."""
+        cli = self.make_cli()
+
+        addresses = await asyncio.gather(cli.get_new_address(), cli.get_new_address())
+
+        assert len(set(addresses)) == 2
+
+    @pytest.mark.asyncio
+    async def test_deep_block_hash_cached(self, fake):
+        """Block hashes are cached once deep enough, not near the tip."""
+        cli = self.make_cli()
+        await cli.get_block_count()
+
+        for _ in range(2):
+            await cli.get_block_hash(90)
+            await cli.get_block_hash(99)
+
+        hashes = [args for method, cmd, args in fake.calls if method == "getblockhash"]
+        assert len(hashes) == 3
+        assert cli.stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_confirmed_transaction_cached(self, fake):
+        """Confirmed transactions are cached and their confirmations kept current."""
+        cli = self.make_cli()
+        await cli.get_block_count()
+        await cli.get_transaction("aa")
+
+        fake.results["getblockcount"] = 103
+        await cli.get_block_count()
+        tx = await cli.get_transaction("aa")
+
+        assert tx.confirmations == 13
+        assert [method for method, _, _ in fake.calls].count("getrawtransaction") == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_confirmations_counted_from_fetch(self, fake):
+        """A transaction fetched after unseen blocks isn't credited with them twice."""
+        cli = self.make_cli()
+        await cli.get_block_count()
+
+        # Three blocks arrive before the transaction is fetched
+        fake.results["getblockcount"] = 103
+        fake.results["getrawtransaction"] = dict(fake.results["getrawtransaction"], confirmations=13)
+        assert (await cli.get_transaction("aa")).confirmations == 13
+
+        await cli.get_block_count()
+        tx = await cli.get_transaction("aa")
+
+        assert tx.confirmations == 13
+        assert [method for method, _, _ in fake.calls].count("getrawtransaction") == 1
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_transaction_not_cached(self, fake):
+        """Transactions with few confirmations are fetched every time."""
+        fake.results["getrawtransaction"] = {"txid": "aa", "hex": "00", "confirmations": 1}
+        cli = self.make_cli()
+
+        await cli.get_transaction("aa")
+        await cli.get_transaction("aa")
+
+        assert cli.stats["subprocesses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self, fake):
+        """The cache holds at most cli_cache_size results."""
+        cli = self.make_cli(cli_cache_size=2)
+        await cli.get_block_count()
+
+        for height in (1, 2, 1, 3, 1, 2):
+            await cli.get_block_hash(height)
+
+        heights = [args for method, cmd, args in fake.calls if method == "getblockhash"]
+        assert len(heights) == 4  # 1, 2, 3, then 2 again after eviction
+
+    @pytest.mark.asyncio
+    async def test_long_arguments_passed_on_stdin(self, fake):
+        """Long arguments such as transaction hex go through -stdin."""
+        cli = self.make_cli()
+        tx_hex = "00" * 5000
+
+        await cli.send_raw_transaction(tx_hex)
+
+        method, cmd, args = fake.calls[-1]
+        assert "-stdin" in cmd
+        assert tx_hex not in cmd
+        assert args == [tx_hex]
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, fake):
+        """A failed call raises and is retried on the next call."""
+        cli = self.make_cli()
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="Block not found"):
+                await cli.get_block("00ab")
+
+        assert cli.stats["subprocesses"] == 2
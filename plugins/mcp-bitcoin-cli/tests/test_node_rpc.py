@@ -1,5 +1,7 @@
 """Tests for JSON-RPC interface."""
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
@@ -71,3 +73,142 @@ class TestBitcoinRPC:
 
             with pytest.raises(RuntimeError, match="Test error"):
                 await rpc._call("badmethod")
+
+
+def _echo_batch(payload_results):
+    """Build a post mock answering each request from a method -> result map.
+
+    Responses come back in reverse order so tests check matching by id.
+    """
+    async def post(url, json, headers):
+        requests = json if isinstance(json, list) else [json]
+        responses = []
+        for request in reversed(requests):
+            result = payload_results[request["method"]]
+            if isinstance(result, Exception):
+                responses.append({
+                    "result": None,
+                    "error": {"code": -5, "message": str(result)},
+                    "id": request["id"],
+                })
+            else:
+                responses.append({"result": result, "error": None, "id": request["id"]})
+        response = MagicMock()
+        response.json.return_value = responses if isinstance(json, list) else responses[0]
+        return response
+
+    return AsyncMock(side_effect=post)
+
+
+class TestBatching:
+    """Test JSON-RPC batching."""
+
+    @pytest.fixture
+    def config(self):
+        return Config(
+            connection_method=ConnectionMethod.RPC,
+            network=Network.REGTEST,
+            rpc_user="test",
+            rpc_password="test123",
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_sent_as_one_batch(self, config):
+        """Calls made together go out as one array request."""
+        rpc = BitcoinRPC(config)
+        results = {"getblockhash": "00ab", "getblockcount": 100, "getdifficulty": 1.5}
+
+        with patch.object(rpc, '_client') as mock_client:
+            mock_client.post = _echo_batch(results)
+
+            values = await asyncio.gather(
+                rpc._call("getblockhash", 1),
+                rpc._call("getblockcount"),
+                rpc._call("getdifficulty"),
+            )
+
+            assert values == ["00ab", 100, 1.5]
+            assert mock_client.post.call_count == 1
+            payload = mock_client.post.call_args.kwargs["json"]
+            assert [r["method"] for r in payload] == list(results)
+            assert len({r["id"] for r in payload}) == 3
+
+    @pytest.mark.asyncio
+    async def test_error_only_fails_its_call(self, config):
+        """An error for one call in a batch doesn't affect the others."""
+        rpc = BitcoinRPC(config)
+        results = {"getblockcount": 100, "getrawtransaction": ValueError("No such tx")}
+
+        with patch.object(rpc, '_client') as mock_client:
+            mock_client.post = _echo_batch(results)
+
+            count, error = await asyncio.gather(
+                rpc._call("getblockcount"),
+                rpc._call("getrawtransaction", "ff" * 32),
+                return_exceptions=True,
+            )
+
+            assert count == 100
+            assert isinstance(error, RuntimeError)
+            assert "No such tx" in str(error)
+
+    @pytest.mark.asyncio
+    async def test_call_batch_split_by_max_size(self, config):
+        """Explicit batches larger than the max size are split."""
+        config.rpc_max_batch_size = 2
+        rpc = BitcoinRPC(config)
+
+        with patch.object(rpc, '_client') as mock_client:
+            mock_client.post = _echo_batch({"getblockhash": "00ab"})
+
+            values = await rpc.call_batch([("getblockhash", h) for h in range(5)])
+
+            assert values == ["00ab"] * 5
+            assert mock_client.post.call_count == 3
+            assert rpc.stats["calls"] == 5
+            assert rpc.stats["largest_batch"] == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_response_raises(self, config):
+        """A call with no matching response in the batch raises."""
+        rpc = BitcoinRPC(config)
+        response = MagicMock()
+        response.json.return_value = [{"result": 1, "error": None, "id": 999}]
+
+        with patch.object(rpc, '_client') as mock_client:
+            mock_client.post = AsyncMock(return_value=response)
+
+            with pytest.raises(RuntimeError, match="no response"):
+                await rpc.call_batch([("getblockcount",), ("getdifficulty",)])
+
+    @pytest.mark.asyncio
+    async def test_batching_disabled(self, config):
+        """A zero batch window sends every call on its own."""
+        config.rpc_batch_window_ms = 0
+        rpc = BitcoinRPC(config)
+
+        with patch.object(rpc, '_client') as mock_client:
+            mock_client.post = _echo_batch({"getblockcount": 100})
+
+            await asyncio.gather(rpc._call("getblockcount"), rpc._call("getblockcount"))
+
+            assert mock_client.post.call_count == 2
+            assert isinstance(mock_client.post.call_args.kwargs["json"], dict)
+
+    @pytest.mark.asyncio
+    async def test_get_info_single_request(self, config):
+        """get_info fetches chain and network info in one batch."""
+        rpc = BitcoinRPC(config)
+        results = {
+            "getblockchaininfo": {"chain": "regtest", "blocks": 42},
+            "getnetworkinfo": {"version": 270000},
+        }
+
+        with patch.object(rpc, '_client') as mock_client:
+            mock_client.post = _echo_batch(results)
+
+            info = await rpc.get_info()
+
+            assert info.connected
+            assert (info.block_height, info.version) == (42, 270000)
+            assert mock_client.post.call_count == 1
@@ -0,0 +1,290 @@
+"""Tests for the OP_RETURN block scanner and index."""
+
+import asyncio
+
+import pytest
+
+from mcp_bitcoin_cli.config import Config, Network
+from mcp_bitcoin_cli.envelope import EnvelopeType, encode_envelope
+from mcp_bitcoin_cli.node.interface import NodeInterface
+from mcp_bitcoin_cli.primitives import encode_op_return_script
+from mcp_bitcoin_cli.scanner import (
+    BlockScanner,
+    OpReturnIndex,
+    extract_op_returns,
+)
+from mcp_bitcoin_cli.server import create_server
+
+P2WPKH_SCRIPT = "0014" + "ab" * 20
+
+
+def make_tx(txid, *outputs):
+    """Build a verbosity-2 style transaction with the given output scripts."""
+    return {
+        "txid": txid,
+        "vout": [
+            {"n": n, "value": 0, "scriptPubKey": {"hex": script}}
+            for n, script in enumerate(outputs)
+        ],
+    }
+
+
+def op_return(data: bytes) -> str:
+    return encode_op_return_script(data).hex()
+
+
+class StubNode(NodeInterface):
+    """Serves synthetic blocks; block at height h carries a TEXT envelope."""
+
+    def __init__(self, tip=20):
+        self.tip = tip
+        self.fork = ""  # Changes every block hash, like a reorg
+        self.fetched = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def block_hash(self, height):
+        return f"{self.fork:0>8}{height:056x}"
+
+    async def get_block_count(self):
+        return self.tip
+
+    async def get_best_block_hash(self):
+        return self.block_hash(self.tip)
+
+    async def get_block_hash(self, height):
+        if height > self.tip:
+            raise RuntimeError("Block height out of range")
+        return self.block_hash(height)
+
+    async def get_block(self, block_hash, verbosity=2):
+        assert verbosity == 2
+        height = int(block_hash[-8:], 16)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        self.fetched.append(height)
+        text = f"{self.fork}block {height}".encode()
+        return {
+            "hash": block_hash,
+            "height": height,
+            "tx": [
+                make_tx(f"{height:064x}", P2WPKH_SCRIPT),
+                make_tx(
+                    f"{height:062x}ff",
+                    P2WPKH_SCRIPT,
+                    op_return(encode_envelope(text, EnvelopeType.TEXT)),
+                ),
+            ],
+        }
+
+    async def get_info(self):
+        raise NotImplementedError
+
+    async def list_utxos(self, min_confirmations=1, min_amount=0):
+        raise NotImplementedError
+
+    async def get_transaction(self, txid):
+        raise NotImplementedError
+
+    async def send_raw_transaction(self, tx_hex, max_fee_rate=None):
+        raise NotImplementedError
+
+    async def test_mempool_accept(self, tx_hex):
+        raise NotImplementedError
+
+    async def create_raw_transaction(self, inputs, outputs):
+        raise NotImplementedError
+
+    async def fund_raw_transaction(self, tx_hex, options=None):
+        raise NotImplementedError
+
+    async def get_new_address(self, label=""):
+        raise NotImplementedError
+
+    async def estimate_fee(self, conf_target=6):
+        raise NotImplementedError
+
+
+class TestExtractOpReturns:
+    """Test OP_RETURN extraction from decoded blocks."""
+
+    def test_extracts_and_classifies_outputs(self):
+        """Find OP_RETURN outputs and tag BTCD envelope types."""
+        block = {"tx": [
+            make_tx("aa", P2WPKH_SCRIPT),
+            make_tx(
+                "bb",
+                op_return(encode_envelope(b"\x00" * 32, EnvelopeType.HASH)),
+                P2WPKH_SCRIPT,
+                op_return(b"plain data"),
+            ),
+            make_tx("cc", op_return(b"BTCD\x01\x90custom")),
+        ]}
+
+        records = extract_op_returns(block, 7)
+
+        assert [(r.txid, r.vout, r.position) for r in records] == [
+            ("bb", 0, 1), ("bb", 2, 1), ("cc", 0, 2),
+        ]
+        assert [r.envelope_type for r in records] == ["HASH", None, "CUSTOM_0x90"]
+        assert records[1].data == b"plain data"
+        assert all(r.height == 7 for r in records)
+
+    def test_skips_undecodable_op_return(self):
+        """A bare OP_RETURN has no data and is skipped."""
+        block = {"tx": [make_tx("aa", "6a")]}
+
+        assert extract_op_returns(block, 1) == []
+
+
+class TestBlockScanner:
+    """Test concurrent scanning into the SQLite index."""
+
+    @pytest.fixture
+    def node(self):
+        return StubNode(tip=20)
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = OpReturnIndex(tmp_path / "index.db")
+        yield index
+        index.close()
+
+    async def test_scan_indexes_range(self, node, index):
+        """Scanning a range indexes every OP_RETURN in it, in block order."""
+        scanner = BlockScanner(node, index)
+
+        assert await scanner.scan(1, 10, node.tip) == 10
+        records = index.query(1, 10)
+
+        assert [r.height for r in records] == list(range(1, 11))
+        assert records[0].data == encode_envelope(b"block 1", EnvelopeType.TEXT)
+        assert records[0].envelope_type == "TEXT"
+        assert index.count(1, 10) == 10
+
+    async def test_scan_is_concurrent_and_bounded(self, node, index):
+        """Blocks are fetched concurrently, up to the configured limit."""
+        scanner = BlockScanner(node, index, concurrency=4)
+
+        await scanner.scan(0, 15, node.tip)
+
+        assert sorted(node.fetched) == list(range(16))
+        assert node.max_in_flight == 4
+
+    async def test_only_new_heights_scanned(self, node, index):
+        """A second scan only fetches heights not indexed yet."""
+        scanner = BlockScanner(node, index)
+        await scanner.scan(1, 10, node.tip)
+        node.fetched.clear()
+
+        assert await scanner.scan(1, 12, node.tip) == 2
+        assert sorted(node.fetched) == [11, 12]
+
+    async def test_recent_blocks_rescanned_after_reorg(self, node, index):
+        """Blocks near the tip are refetched, replacing reorganized data."""
+        scanner = BlockScanner(node, index)
+        await scanner.scan(10, 20, node.tip)
+        node.fetched.clear()
+        node.fork = "f"
+
+        await scanner.scan(10, 20, node.tip)
+
+        # Heights 16-20 had fewer than 6 confirmations
+        assert sorted(node.fetched) == [16, 17, 18, 19, 20]
+        assert index.query(20, 20)[0].data.endswith(b"fblock 20")
+        assert len(index.query(10, 20)) == 11
+
+    async def test_index_persists(self, node, tmp_path):
+        """A reopened index still knows which heights were scanned."""
+        index = OpReturnIndex(tmp_path / "index.db")
+        await BlockScanner(node, index).scan(1, 5, node.tip)
+        index.close()
+
+        index = OpReturnIndex(tmp_path / "index.db")
+        assert index.missing_heights(1, 6) == [6]
+        assert len(index.query(1, 5)) == 5
+        index.close()
+
+    async def test_query_filters_by_type_and_limit(self, node, index):
+        """Queries filter by envelope type (any case) and respect the limit."""
+        await BlockScanner(node, index).scan(1, 10, node.tip)
+
+        assert len(index.query(1, 10, "text", limit=3)) == 3
+        assert index.count(1, 10, "Text") == 10
+        assert index.query(1, 10, "hash") == []
+
+    async def test_scan_error_keeps_completed_blocks(self, node, index):
+        """A failed fetch raises, and blocks already fetched stay indexed."""
+        scanner = BlockScanner(node, index, concurrency=1)
+
+        with pytest.raises(RuntimeError, match="out of range"):
+            await scanner.scan(18, 25, tip=25)
+
+        assert index.missing_heights(18, 21) == [21]
+
+
+class TestSearchOpReturnsTool:
+    """Test the search_op_returns tool against a stub node."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        server = create_server(Config(
+            network=Network.REGTEST,
+            index_path=str(tmp_path / "index.db"),
+        ))
+        server._node = StubNode(tip=20)
+        return server
+
+    async def test_search_scans_then_uses_index(self, server):
+        """First search scans the range; a repeat is served from the index."""
+        search_fn = server._tool_manager._tools["search_op_returns"].fn
+
+        first = await search_fn(1, 5, limit=2)
+        second = await search_fn(1, 5, limit=2)
+
+        assert first["blocks_scanned"] == 5
+        assert second["blocks_scanned"] == 0
+        assert first["total"] == 5
+        assert first["count"] == 2
+        assert first["results"] == second["results"]
+        assert first["results"][0]["height"] == 1
+        assert first["results"][0]["envelope_type"] == "TEXT"
+        assert first["results"][0]["data_utf8"] == "BTCD\x01\x01block 1"
+
+    async def test_search_clamps_to_tip(self, server):
+        """end_height beyond the chain tip is clamped to the tip."""
+        search_fn = server._tool_manager._tools["search_op_returns"].fn
+
+        result = await search_fn(18, 100)
+
+        assert result["end_height"] == 20
+        assert result["count"] == 3
+
+    async def test_search_capped_per_call(self, tmp_path):
+        """A long range is covered in pieces; 'remaining' says where to continue."""
+        server = create_server(Config(
+            network=Network.REGTEST,
+            index_path=str(tmp_path / "index.db"),
+            scan_max_blocks=8,
+        ))
+        server._node = StubNode(tip=20)
+        search_fn = server._tool_manager._tools["search_op_returns"].fn
+
+        first = await search_fn(1, 100)
+        second = await search_fn(**first["remaining"])
+        third = await search_fn(**second["remaining"])
+
+        assert (first["end_height"], first["blocks_scanned"]) == (8, 8)
+        assert first["remaining"] == {"start_height": 9, "end_height": 20}
+        assert (second["start_height"], second["end_height"]) == (9, 16)
+        assert (third["start_height"], third["end_height"]) == (17, 20)
+        assert "remaining" not in third
+
+    async def test_search_invalid_range(self, server):
+        """Reversed or out-of-chain ranges return an error."""
+        search_fn = server._tool_manager._tools["search_op_returns"].fn
+
+        assert "error" in await search_fn(10, 5)
+        assert "error" in await search_fn(50)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SFTP throughput against file size and transfer settings.
+
+Uploads and downloads files of each size (default 1, 16 and 64 MiB) over one
+SSH connection and reports MB/s for:
+
+  put/get      asyncssh's sftp.put / sftp.get with default settings (the
+               pre-transfer-module path)
+  auto         transfer.upload / transfer.download with default settings
+               (server's maximum block size, 4 MiB in flight)
+  B x N        the same with block size B and N requests in flight
+
+Every transfer is checked byte-for-byte against the source.
+
+By default it starts an in-process asyncssh server on 127.0.0.1 serving the
+local filesystem, so it needs no sshd; that measures client and protocol
+overhead rather than a network. Point it at a real sshd (e.g. one on
+localhost, or across a WAN link to see the effect of max_requests) with
+--host/--port/--username and --password or --key.
+
+Usage:
+    python benchmarks/bench_sftp.py [--sizes 1,16,64] [--repeat 3]
+    python benchmarks/bench_sftp.py --host example.com --username me --key ~/.ssh/id_ed25519
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import asyncssh
+
+PLUGIN_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(PLUGIN_ROOT, "src"))
+
+from mcp_multi_agent_ssh import transfer  # noqa: E402
+
+MIB = 1024 * 1024
+SETTINGS = [(None, None), (16 * 1024, 16), (64 * 1024, 64), (255 * 1024, 16)]
+
+
+class BenchServer(asyncssh.SSHServer):
+    def begin_auth(self, username):
+        return False  # no authentication
+
+
+async def start_server():
+    server = await asyncssh.create_server(
+        BenchServer,
+        "127.0.0.1",
+        0,
+        server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        sftp_factory=True,
+    )
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+def same(a, b):
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        return fa.read() == fb.read()
+
+
+async def bench(sftp, workdir, remote_dir, sizes, repeat):
+    print(f"{'size':>8} {'mode':>12} {'upload MB/s':>12} {'download MB/s':>14}")
+    for size_mib in sizes:
+        local = os.path.join(workdir, f"src-{size_mib}.bin")
+        back = os.path.join(workdir, f"back-{size_mib}.bin")
+        remote = f"{remote_dir}/bench-{size_mib}.bin"
+        with open(local, "wb") as f:
+            f.write(os.urandom(size_mib * MIB))
+
+        modes = [("put/get", lambda: sftp.put(local, remote), lambda: sftp.get(remote, back))]
+        for block_size, max_requests in SETTINGS:
+            modes.append((
+                f"{block_size // 1024}K x {max_requests}" if block_size else "auto",
+                lambda b=block_size, n=max_requests: transfer.upload(sftp, local, remote, b, n),
+                lambda b=block_size, n=max_requests: transfer.download(sftp, remote, back, b, n),
+            ))
+
+        for name, up, down in modes:
+            up_best = down_best = float("inf")
+            for _ in range(repeat):
+                up_best = min(up_best, await timed(up()))
+                down_best = min(down_best, await timed(down()))
+                if not same(local, back):
+                    sys.exit(f"{name}: downloaded file differs from source")
+            print(f"{size_mib:>6}MB {name:>12} "
+                  f"{size_mib * MIB / up_best / 1e6:>12.1f} "
+                  f"{size_mib * MIB / down_best / 1e6:>14.1f}")
+        await sftp.remove(remote)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1,16,64", help="file sizes in MiB")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (best is kept)")
+    parser.add_argument("--host", help="benchmark against this sshd instead")
+    parser.add_argument("--port", type=int, default=22)
+    parser.add_argument("--username", default=os.environ.get("USER"))
+    parser.add_argument("--password")
+    parser.add_argument("--key", help="private key file")
+    parser.add_argument("--remote-dir", default="/tmp", help="remote scratch directory")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.host:
+            options = dict(host=args.host, port=args.port, username=args.username,
+                           password=args.password, known_hosts=None)
+            if args.key:
+                options["client_keys"] = [args.key]
+            remote_dir = args.remote_dir
+        else:
+            server, port = await start_server()
+            options = dict(host="127.0.0.1", port=port, username="bench", known_hosts=None)
+            remote_dir = workdir
+        try:
+            async with asyncssh.connect(**options) as conn:
+                async with conn.start_sftp_client() as sftp:
+                    await bench(sftp, workdir, remote_dir, sizes, args.repeat)
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
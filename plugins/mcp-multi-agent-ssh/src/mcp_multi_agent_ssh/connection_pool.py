@@ -1,24 +1,52 @@
 """SSH connection pool with automatic timeout and cleanup."""
 
 import asyncio
+import fnmatch
 import logging
-from dataclasses import dataclass
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import Literal
 
 import asyncssh
 
+from . import transfer
 from .credentials import CredentialManager
-from .types import AuthType, ConnectionInfo, ExecResult, FileInfo, SftpResult, StoredCredential
+from .shell import PersistentShell, ShellClosedError
+from .streaming import DEFAULT_OUTPUT_LIMIT, ExecJob, TruncatePolicy
+from .transfer import ProgressCallback
+from .types import (
+    AuthType,
+    ConnectionInfo,
+    ExecResult,
+    FileInfo,
+    HostExecResult,
+    SftpResult,
+    StoredCredential,
+    SyncResult,
+)
 
 logger = logging.getLogger(__name__)
 
 IDLE_TIMEOUT_SECONDS = 600  # 10 minutes
 CLEANUP_INTERVAL_SECONDS = 60  # Check every minute
+# OpenSSH's default MaxSessions; channels past it are refused by the server.
+DEFAULT_MAX_CHANNELS = 10
+# Hosts exec_many works on at once.
+DEFAULT_FANOUT_CONCURRENCY = 10
+# Finished background commands kept for polling; the oldest are dropped.
+MAX_FINISHED_JOBS = 100
 
 
 @dataclass
 class PooledConnection:
-    """A connection in the pool with metadata."""
+    """A connection in the pool with metadata.
+
+    ``channels`` bounds the channels open at once on the connection. The
+    cached SFTP client and the persistent shell each hold one for as long as
+    they are open.
+    """
 
     conn: asyncssh.SSHClientConnection
     host: str
@@ -26,16 +54,86 @@ class PooledConnection:
     username: str
     connected_at: datetime
     last_activity: datetime
+    channels: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(DEFAULT_MAX_CHANNELS)
+    )
+    sftp: asyncssh.SFTPClient | None = None
+    shell: PersistentShell | None = None
+    setup_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def get_sftp(self) -> asyncssh.SFTPClient:
+        """The connection's SFTP client, started on first use."""
+        async with self.setup_lock:
+            if self.sftp is None:
+                await self.channels.acquire()
+                try:
+                    self.sftp = await self.conn.start_sftp_client()
+                except BaseException:
+                    self.channels.release()
+                    raise
+            return self.sftp
+
+    def drop_sftp(self) -> None:
+        """Forget a broken SFTP client so the next use starts a new one."""
+        if self.sftp is not None:
+            self.sftp.exit()
+            self.sftp = None
+            self.channels.release()
+
+    async def get_shell(self) -> PersistentShell:
+        """The connection's persistent shell, (re)started if needed."""
+        async with self.setup_lock:
+            if self.shell is None or self.shell.closed:
+                if self.shell is not None:
+                    await self.close_shell()
+                await self.channels.acquire()
+                try:
+                    self.shell = await PersistentShell.open(self.conn)
+                except BaseException:
+                    self.channels.release()
+                    raise
+            return self.shell
+
+    async def close_shell(self) -> None:
+        """Terminate the persistent shell, if any."""
+        if self.shell is not None:
+            shell, self.shell = self.shell, None
+            await shell.close()
+            self.channels.release()
+
+    async def close(self) -> None:
+        """Close the cached channels and the connection."""
+        await self.close_shell()
+        self.drop_sftp()
+        self.conn.close()
+        await self.conn.wait_closed()
 
 
 class ConnectionPool:
     """Manages a pool of SSH connections with automatic timeout."""
 
-    def __init__(self, credential_manager: CredentialManager) -> None:
+    def __init__(
+        self,
+        credential_manager: CredentialManager,
+        max_channels: int = DEFAULT_MAX_CHANNELS,
+        persistent_shell: bool = False,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            credential_manager: Source of stored credentials.
+            max_channels: Most channels open at once per connection.
+            persistent_shell: Run commands over one long-lived shell per
+                connection instead of a new channel per command.
+        """
         self._connections: dict[str, PooledConnection] = {}
         self._credential_manager = credential_manager
         self._cleanup_task: asyncio.Task | None = None
         self._lock = asyncio.Lock()
+        self._connecting: dict[str, asyncio.Task] = {}
+        self._jobs: dict[str, ExecJob] = {}
+        self._max_channels = max_channels
+        self._persistent_shell = persistent_shell
 
     def _make_key(self, host: str, port: int) -> str:
         """Create a unique key for a host:port combination."""
@@ -55,10 +153,12 @@ class ConnectionPool:
             except asyncio.CancelledError:
                 pass
 
+        for job in list(self._jobs.values()):
+            await job.cancel()
+
         async with self._lock:
             for key, pooled in list(self._connections.items()):
-                pooled.conn.close()
-                await pooled.conn.wait_closed()
+                await pooled.close()
                 logger.info(f"Closed connection to {pooled.host}:{pooled.port}")
             self._connections.clear()
 
@@ -80,21 +180,25 @@ class ConnectionPool:
         now = datetime.utcnow()
         timeout_threshold = now - timedelta(seconds=IDLE_TIMEOUT_SECONDS)
 
+        busy = {id(job.conn) for job in self._jobs.values() if not job.done}
+
         async with self._lock:
             expired = [
                 (key, pooled)
                 for key, pooled in self._connections.items()
-                if pooled.last_activity < timeout_threshold
+                if pooled.last_activity < timeout_threshold and id(pooled.conn) not in busy
             ]
 
-            for key, pooled in expired:
-                pooled.conn.close()
-                await pooled.conn.wait_closed()
+            for key, _ in expired:
                 del self._connections[key]
-                logger.warning(
-                    f"Connection to {pooled.host}:{pooled.port} expired after "
-                    f"{IDLE_TIMEOUT_SECONDS // 60} minutes of inactivity"
-                )
+
+        # Close outside the lock so other hosts aren't blocked meanwhile.
+        for _, pooled in expired:
+            await pooled.close()
+            logger.warning(
+                f"Connection to {pooled.host}:{pooled.port} expired after "
+                f"{IDLE_TIMEOUT_SECONDS // 60} minutes of inactivity"
+            )
 
     async def connect(
         self,
@@ -125,6 +229,26 @@ class ConnectionPool:
             ValueError: If no credentials available.
             asyncssh.Error: If connection fails.
         """
+        pooled = await self._connect(
+            host, port, username, password, private_key, save_credentials
+        )
+        return self._get_connection_info(pooled)
+
+    async def _connect(
+        self,
+        host: str,
+        port: int = 22,
+        username: str | None = None,
+        password: str | None = None,
+        private_key: str | None = None,
+        save_credentials: bool = True,
+    ) -> PooledConnection:
+        """Like connect, but returns the pool entry.
+
+        The pool lock is not held while connecting, so different hosts
+        connect in parallel; concurrent callers for the same host share one
+        connection attempt.
+        """
         key = self._make_key(host, port)
 
         async with self._lock:
@@ -132,7 +256,11 @@ class ConnectionPool:
             if key in self._connections:
                 pooled = self._connections[key]
                 pooled.last_activity = datetime.utcnow()
-                return self._get_connection_info(pooled)
+                return pooled
+
+        pending = self._connecting.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
 
         # Get or create credentials
         stored = self._credential_manager.get(host)
@@ -164,23 +292,12 @@ class ConnectionPool:
         else:
             raise ValueError("Either password or private_key is required")
 
-        # Connect
-        conn = await asyncssh.connect(**connect_kwargs)
-        now = datetime.utcnow()
-
-        pooled = PooledConnection(
-            conn=conn,
-            host=host,
-            port=port,
-            username=username,
-            connected_at=now,
-            last_activity=now,
-        )
-
-        async with self._lock:
-            self._connections[key] = pooled
-
-        logger.info(f"Connected to {host}:{port} as {username}")
+        # Connect. The attempt runs as its own task so a caller giving up
+        # (e.g. on timeout) doesn't abort it for others waiting on it.
+        pending = asyncio.ensure_future(self._open(key, connect_kwargs))
+        self._connecting[key] = pending
+        pending.add_done_callback(lambda task: self._connect_done(key, task))
+        pooled = await asyncio.shield(pending)
 
         # Save credentials if requested and not already stored
         if save_credentials and not stored:
@@ -200,7 +317,35 @@ class ConnectionPool:
                 )
             self._credential_manager.set(host, cred)
 
-        return self._get_connection_info(pooled)
+        return pooled
+
+    async def _open(self, key: str, connect_kwargs: dict) -> PooledConnection:
+        """Open a connection and add it to the pool."""
+        conn = await asyncssh.connect(**connect_kwargs)
+        now = datetime.utcnow()
+
+        pooled = PooledConnection(
+            conn=conn,
+            host=connect_kwargs["host"],
+            port=connect_kwargs["port"],
+            username=connect_kwargs["username"],
+            connected_at=now,
+            last_activity=now,
+            channels=asyncio.Semaphore(self._max_channels),
+        )
+
+        async with self._lock:
+            self._connections[key] = pooled
+
+        logger.info(f"Connected to {pooled.host}:{pooled.port} as {pooled.username}")
+        return pooled
+
+    def _connect_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished connection attempt."""
+        if self._connecting.get(key) is task:
+            del self._connecting[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Connection to {key} failed: {task.exception()}")
 
     async def disconnect(self, host: str, port: int = 22) -> bool:
         """Disconnect from an SSH server.
@@ -219,10 +364,10 @@ class ConnectionPool:
                 return False
 
             pooled = self._connections.pop(key)
-            pooled.conn.close()
-            await pooled.conn.wait_closed()
-            logger.info(f"Disconnected from {host}:{port}")
-            return True
+
+        await pooled.close()
+        logger.info(f"Disconnected from {host}:{port}")
+        return True
 
     async def get_connection(
         self, host: str, port: int = 22
@@ -239,13 +384,17 @@ class ConnectionPool:
         Raises:
             ValueError: If not connected and no stored credentials.
         """
+        return (await self._get_pooled(host, port)).conn
+
+    async def _get_pooled(self, host: str, port: int = 22) -> PooledConnection:
+        """Like get_connection, but returns the pool entry."""
         key = self._make_key(host, port)
 
         async with self._lock:
             if key in self._connections:
                 pooled = self._connections[key]
                 pooled.last_activity = datetime.utcnow()
-                return pooled.conn
+                return pooled
 
         # Auto-connect using stored credentials
         stored = self._credential_manager.get(host)
@@ -254,8 +403,7 @@ class ConnectionPool:
                 f"Not connected to {host}:{port} and no stored credentials available"
             )
 
-        await self.connect(host, port)
-        return self._connections[key].conn
+        return await self._connect(host, port)
 
     def list_connections(self) -> list[ConnectionInfo]:
         """List all active connections.
@@ -287,24 +435,199 @@ class ConnectionPool:
             host: The hostname.
             command: The command to execute.
             port: The SSH port.
-            timeout: Command timeout in seconds.
+            timeout: Command timeout in seconds. On the persistent shell it
+                counts from when the command starts, not while it is queued.
 
         Returns:
             The command result.
+
+        Raises:
+            ShellClosedError: If the persistent shell closed while the
+                command was running. It is not run again, since it may
+                already have had effects.
         """
-        conn = await self.get_connection(host, port)
-        result = await asyncio.wait_for(
-            conn.run(command, check=False),
-            timeout=timeout,
-        )
+        pooled = await self._get_pooled(host, port)
+        if self._persistent_shell:
+            try:
+                return await self._exec_in_shell(pooled, command, timeout)
+            except ShellClosedError as e:
+                if e.started:
+                    raise
+                # The shell went away before running it; use a channel.
+
+        async def run() -> asyncssh.SSHCompletedProcess:
+            async with pooled.channels:
+                return await pooled.conn.run(command, check=False)
+
+        result = await asyncio.wait_for(run(), timeout=timeout)
         return ExecResult(
             stdout=result.stdout or "",
             stderr=result.stderr or "",
             exit_code=result.exit_status or 0,
         )
 
+    async def start_exec(
+        self,
+        host: str,
+        command: str,
+        port: int = 22,
+        timeout: float = 3600,
+        output_limit: int = DEFAULT_OUTPUT_LIMIT,
+        truncate: TruncatePolicy = "head_tail",
+    ) -> ExecJob:
+        """Start a command in the background and return its job.
+
+        Output is read as it arrives into buffers holding at most
+        output_limit bytes per stream.
+
+        Args:
+            host: The hostname.
+            command: The command to execute.
+            port: The SSH port.
+            timeout: Seconds after which the command is stopped.
+            output_limit: Bytes of stdout (and of stderr) to keep.
+            truncate: Which bytes to keep once output exceeds the limit:
+                "head", "tail" or "head_tail" (half of each).
+
+        Returns:
+            The running job; poll it with get_exec.
+        """
+        pooled = await self._get_pooled(host, port)
+        job = ExecJob(host, command, output_limit, truncate)
+        job.start(pooled.conn, pooled.channels, timeout)
+        self._jobs[job.id] = job
+
+        finished = [j for j in self._jobs.values() if j.done]
+        for old in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[old.id]
+        return job
+
+    def get_exec(self, job_id: str) -> ExecJob:
+        """Get a background command by job ID.
+
+        Raises:
+            ValueError: If there is no such job.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job: {job_id}")
+        return job
+
+    def resolve_hosts(
+        self, hosts: list[str] | None = None, pattern: str | None = None
+    ) -> list[str]:
+        """Hosts named explicitly plus stored-credential hosts matching a glob.
+
+        Args:
+            hosts: Hostnames to include.
+            pattern: Shell-style glob (e.g. "web-*") matched against hosts
+                with stored credentials.
+
+        Returns:
+            The hosts, without duplicates, in the order given.
+        """
+        selected = list(hosts or [])
+        if pattern:
+            selected += fnmatch.filter(self._credential_manager.list_hosts(), pattern)
+        return list(dict.fromkeys(selected))
+
+    async def exec_many(
+        self,
+        hosts: list[str],
+        command: str,
+        port: int = 22,
+        timeout: int = 30,
+        concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    ) -> AsyncIterator[HostExecResult]:
+        """Run a command on several hosts, yielding results as hosts finish.
+
+        Failures are reported per host rather than raised.
+
+        Args:
+            hosts: The hostnames.
+            command: The command to execute.
+            port: The SSH port used for hosts without stored credentials.
+            timeout: Per-host timeout in seconds, covering both connecting
+                and running the command.
+            concurrency: Most hosts worked on at once.
+
+        Yields:
+            One result per host, in completion order.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(host: str) -> HostExecResult:
+            async with semaphore:
+                start = loop.time()
+                try:
+                    result = await asyncio.wait_for(
+                        self.exec_command(host, command, port, timeout), timeout=timeout
+                    )
+                    return HostExecResult(
+                        host=host,
+                        stdout=result.stdout,
+                        stderr=result.stderr,
+                        exit_code=result.exit_code,
+                        duration_seconds=round(loop.time() - start, 3),
+                    )
+                except asyncio.TimeoutError:
+                    error = f"Timed out after {timeout} seconds"
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                return HostExecResult(
+                    host=host,
+                    stdout="",
+                    stderr=error,
+                    exit_code=-1,
+                    error=error,
+                    duration_seconds=round(loop.time() - start, 3),
+                )
+
+        tasks = [asyncio.ensure_future(run_one(host)) for host in hosts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The caller stopped early; don't leave hosts running.
+            for task in tasks:
+                task.cancel()
+
+    async def _exec_in_shell(
+        self, pooled: PooledConnection, command: str, timeout: int
+    ) -> ExecResult:
+        """Run command over the connection's persistent shell.
+
+        A command that times out closes the shell, which get_shell then
+        replaces, so later commands don't queue behind it.
+        """
+        shell = await pooled.get_shell()
+        return await shell.run(command, timeout=timeout)
+
+    @asynccontextmanager
+    async def _sftp(self, host: str, port: int) -> AsyncIterator[asyncssh.SFTPClient]:
+        """The cached SFTP client for a host, dropped if its channel fails."""
+        pooled = await self._get_pooled(host, port)
+        sftp = await pooled.get_sftp()
+        try:
+            yield sftp
+        except asyncssh.SFTPError:
+            raise
+        except Exception:
+            if pooled.sftp is sftp:
+                pooled.drop_sftp()
+            raise
+
     async def sftp_upload(
-        self, host: str, local_path: str, remote_path: str, port: int = 22
+        self,
+        host: str,
+        local_path: str,
+        remote_path: str,
+        port: int = 22,
+        block_size: int | None = None,
+        max_requests: int | None = None,
+        resume: bool = False,
+        progress: ProgressCallback | None = None,
     ) -> SftpResult:
         """Upload a file to a remote host.
 
@@ -313,22 +636,32 @@ class ConnectionPool:
             local_path: Local file path.
             remote_path: Remote destination path.
             port: The SSH port.
+            block_size: Bytes per SFTP write request; None for the server's maximum.
+            max_requests: SFTP requests in flight at once; None for a 4 MiB window.
+            resume: Continue a partial remote file instead of overwriting it.
+            progress: Awaited with (bytes done, total bytes) during the copy.
 
         Returns:
             The upload result.
         """
-        conn = await self.get_connection(host, port)
-        async with conn.start_sftp_client() as sftp:
-            await sftp.put(local_path, remote_path)
-            attrs = await sftp.stat(remote_path)
-            return SftpResult(
-                status="success",
-                message=f"Uploaded {local_path} to {remote_path}",
-                bytes_transferred=attrs.size,
+        async with self._sftp(host, port) as sftp:
+            stats = await transfer.upload(
+                sftp, local_path, remote_path, block_size, max_requests, resume, progress
+            )
+            return self._transfer_result(
+                stats, f"Uploaded {local_path} to {remote_path}"
             )
 
     async def sftp_download(
-        self, host: str, remote_path: str, local_path: str, port: int = 22
+        self,
+        host: str,
+        remote_path: str,
+        local_path: str,
+        port: int = 22,
+        block_size: int | None = None,
+        max_requests: int | None = None,
+        resume: bool = False,
+        progress: ProgressCallback | None = None,
     ) -> SftpResult:
         """Download a file from a remote host.
 
@@ -337,18 +670,68 @@ class ConnectionPool:
             remote_path: Remote file path.
             local_path: Local destination path.
             port: The SSH port.
+            block_size: Bytes per SFTP read request; None for the server's maximum.
+            max_requests: SFTP requests in flight at once; None for a 4 MiB window.
+            resume: Continue a partial local file instead of overwriting it.
+            progress: Awaited with (bytes done, total bytes) during the copy.
 
         Returns:
             The download result.
         """
-        conn = await self.get_connection(host, port)
-        async with conn.start_sftp_client() as sftp:
-            attrs = await sftp.stat(remote_path)
-            await sftp.get(remote_path, local_path)
-            return SftpResult(
-                status="success",
-                message=f"Downloaded {remote_path} to {local_path}",
-                bytes_transferred=attrs.size,
+        async with self._sftp(host, port) as sftp:
+            stats = await transfer.download(
+                sftp, remote_path, local_path, block_size, max_requests, resume, progress
+            )
+            return self._transfer_result(
+                stats, f"Downloaded {remote_path} to {local_path}"
+            )
+
+    def _transfer_result(self, stats: transfer.TransferStats, message: str) -> SftpResult:
+        """Create SftpResult from TransferStats."""
+        if stats.resumed_from:
+            message += f" (resumed at byte {stats.resumed_from})"
+        return SftpResult(
+            status="success",
+            message=message,
+            bytes_transferred=stats.transferred,
+            resumed_from=stats.resumed_from or None,
+        )
+
+    async def sftp_sync(
+        self,
+        host: str,
+        local_dir: str,
+        remote_dir: str,
+        direction: Literal["upload", "download"] = "upload",
+        port: int = 22,
+        block_size: int | None = None,
+        max_requests: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> SyncResult:
+        """Copy the files of a directory tree that differ in size or mtime.
+
+        Args:
+            host: The hostname.
+            local_dir: Local directory.
+            remote_dir: Remote directory.
+            direction: "upload" (local to remote) or "download".
+            port: The SSH port.
+            block_size: Bytes per SFTP request; None for the server's maximum.
+            max_requests: SFTP requests in flight at once, per file.
+            progress: Awaited with (bytes done, total bytes to copy).
+
+        Returns:
+            The files copied and skipped.
+        """
+        async with self._sftp(host, port) as sftp:
+            stats = await transfer.sync_tree(
+                sftp, local_dir, remote_dir, direction, block_size, max_requests, progress
+            )
+            return SyncResult(
+                transferred=stats.transferred,
+                skipped=stats.skipped,
+                bytes_transferred=stats.bytes_transferred,
+                errors=stats.errors,
             )
 
     async def sftp_list(
@@ -364,8 +747,7 @@ class ConnectionPool:
         Returns:
             List of file information.
         """
-        conn = await self.get_connection(host, port)
-        async with conn.start_sftp_client() as sftp:
+        async with self._sftp(host, port) as sftp:
             entries = await sftp.readdir(path)
             result = []
             for entry in entries:
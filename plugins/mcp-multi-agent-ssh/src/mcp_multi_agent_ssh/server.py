@@ -8,12 +8,15 @@ import sys
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from typing import Literal
 
 from mcp.server.fastmcp import Context, FastMCP
 
-from .connection_pool import ConnectionPool
+from .connection_pool import DEFAULT_FANOUT_CONCURRENCY, DEFAULT_MAX_CHANNELS, ConnectionPool
 from .credentials import CredentialManager
-from .types import ConnectionInfo, ExecResult, FileInfo, SftpResult
+from .streaming import DEFAULT_OUTPUT_LIMIT, ExecJob
+from .transfer import ProgressCallback
+from .types import ConnectionInfo, ExecResult, FileInfo, HostExecResult, SftpResult
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +26,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+JOB_PROGRESS_INTERVAL = 1.0  # seconds between progress reports while waiting
+
 
 @dataclass
 class AppContext:
@@ -61,7 +66,12 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
         raise
 
     # Initialize connection pool
-    connection_pool = ConnectionPool(credential_manager)
+    connection_pool = ConnectionPool(
+        credential_manager,
+        max_channels=int(os.environ.get("MCP_SSH_MAX_CHANNELS", DEFAULT_MAX_CHANNELS)),
+        persistent_shell=os.environ.get("MCP_SSH_PERSISTENT_SHELL", "").lower()
+        in ("1", "true", "yes"),
+    )
     await connection_pool.start()
 
     logger.info("MCP SSH Grill server started")
@@ -222,35 +232,240 @@ async def ssh_exec(
         return {"stdout": "", "stderr": str(e), "exit_code": -1}
 
 
+@mcp.tool()
+async def ssh_exec_many(
+    command: str,
+    ctx: Context,
+    hosts: list[str] | None = None,
+    pattern: str | None = None,
+    port: int = 22,
+    timeout: int = 30,
+    concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+) -> dict:
+    """Run a command on several SSH servers in parallel.
+
+    Hosts are connected to (using stored credentials) and run the command
+    concurrently. Each host's result is reported as a progress notification as
+    soon as it finishes; a host that fails or times out doesn't affect the others.
+
+    Args:
+        command: The command to run.
+        hosts: Hostnames to run on.
+        pattern: Glob (e.g. "web-*") selecting hosts with stored credentials;
+            combined with hosts if both are given.
+        port: The SSH port for hosts without stored credentials (default 22).
+        timeout: Per-host timeout in seconds (default 30).
+        concurrency: Maximum hosts to run on at once (default 10).
+
+    Returns:
+        Per-host results in the order given, exit codes by host, and counts of
+        hosts that succeeded (exit code 0) and failed.
+    """
+    app_ctx: AppContext = ctx.request_context.lifespan_context
+    pool = app_ctx.connection_pool
+
+    targets = pool.resolve_hosts(hosts, pattern)
+    if not targets:
+        return {"status": "error", "message": "No hosts given or matched"}
+
+    results: dict[str, HostExecResult] = {}
+    async for result in pool.exec_many(targets, command, port, timeout, concurrency):
+        results[result.host] = result
+        await ctx.report_progress(len(results), len(targets))
+        await ctx.info(
+            f"{result.host}: {result.error or f'exit code {result.exit_code}'}"
+        )
+
+    ordered = [results[host] for host in targets]
+    failed = [r.host for r in ordered if r.exit_code != 0]
+    if not failed:
+        status = "success"
+    elif len(failed) < len(ordered):
+        status = "partial"
+    else:
+        status = "error"
+    return {
+        "status": status,
+        "hosts": len(ordered),
+        "succeeded": len(ordered) - len(failed),
+        "failed": len(failed),
+        "failed_hosts": failed,
+        "exit_codes": {r.host: r.exit_code for r in ordered},
+        "results": [r.model_dump() for r in ordered],
+    }
+
+
+async def _wait_for_job(job: ExecJob, ctx: Context, wait: float) -> None:
+    """Wait up to wait seconds for a job, reporting output bytes as progress."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while not job.done:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await job.wait(min(JOB_PROGRESS_INTERVAL, remaining))
+        await ctx.report_progress(job.output_bytes)
+
+
+def _job_response(job: ExecJob) -> dict:
+    """Tool response for a job: its status and output since the last poll."""
+    return job.poll().model_dump(mode="json")
+
+
+@mcp.tool()
+async def ssh_exec_stream(
+    host: str,
+    command: str,
+    ctx: Context,
+    port: int = 22,
+    timeout: int = 3600,
+    wait: int = 30,
+    output_limit: int = DEFAULT_OUTPUT_LIMIT,
+    truncate: Literal["head", "tail", "head_tail"] = "head_tail",
+) -> dict:
+    """Run a long-running command on a remote SSH server in the background.
+
+    Output is read as it arrives and at most output_limit bytes of stdout (and
+    of stderr) are kept, so commands printing any amount of output are safe.
+    Waits up to `wait` seconds, sending progress notifications with the bytes of
+    output received. If the command is still running after that, returns its
+    job_id and the output so far; use ssh_exec_poll to get more output and the
+    exit code, and ssh_exec_cancel to stop it.
+
+    Args:
+        host: The hostname to run the command on.
+        command: The command to run.
+        port: The SSH port (default 22).
+        timeout: Seconds after which the command is stopped (default 3600).
+        wait: Seconds to wait for it before returning (default 30).
+        output_limit: Bytes of each stream to keep (default 1 MiB).
+        truncate: Which output to keep past the limit: "head" (the first
+            bytes), "tail" (the latest) or "head_tail" (half of each, default).
+
+    Returns:
+        Job ID, status, exit code once finished, and the output so far. Dropped
+        output is marked in the text and counted in stdout_omitted/stderr_omitted.
+    """
+    app_ctx: AppContext = ctx.request_context.lifespan_context
+    pool = app_ctx.connection_pool
+
+    try:
+        job = await pool.start_exec(host, command, port, timeout, output_limit, truncate)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+    await _wait_for_job(job, ctx, wait)
+    return _job_response(job)
+
+
+@mcp.tool()
+async def ssh_exec_poll(job_id: str, ctx: Context, wait: int = 0) -> dict:
+    """Get the status and new output of a command started with ssh_exec_stream.
+
+    Args:
+        job_id: The job ID returned by ssh_exec_stream.
+        wait: Seconds to wait for the command to finish first (default 0).
+
+    Returns:
+        Status, exit code once finished, and the output produced since the
+        previous poll.
+    """
+    app_ctx: AppContext = ctx.request_context.lifespan_context
+    pool = app_ctx.connection_pool
+
+    try:
+        job = pool.get_exec(job_id)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    await _wait_for_job(job, ctx, wait)
+    return _job_response(job)
+
+
+@mcp.tool()
+async def ssh_exec_cancel(job_id: str, ctx: Context) -> dict:
+    """Stop a command started with ssh_exec_stream.
+
+    Args:
+        job_id: The job ID returned by ssh_exec_stream.
+
+    Returns:
+        Final status and the output produced since the previous poll.
+    """
+    app_ctx: AppContext = ctx.request_context.lifespan_context
+    pool = app_ctx.connection_pool
+
+    try:
+        job = pool.get_exec(job_id)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    await job.cancel()
+    return _job_response(job)
+
+
 # =============================================================================
 # SFTP Tools
 # =============================================================================
 
 
+def _report_progress(ctx: Context) -> ProgressCallback:
+    """Progress callback sending MCP progress notifications for a tool call."""
+
+    async def report(done: int, total: int) -> None:
+        await ctx.report_progress(done, total)
+
+    return report
+
+
 @mcp.tool()
 async def sftp_upload(
-    host: str, local_path: str, remote_path: str, ctx: Context, port: int = 22
+    host: str,
+    local_path: str,
+    remote_path: str,
+    ctx: Context,
+    port: int = 22,
+    block_size: int | None = None,
+    max_requests: int | None = None,
+    resume: bool = False,
 ) -> dict:
     """Upload a file to a remote SSH server via SFTP.
 
+    Reports progress in bytes while the upload runs.
+
     Args:
         host: The hostname to upload to.
         local_path: Path to the local file to upload.
         remote_path: Destination path on the remote server.
         port: The SSH port (default 22).
+        block_size: Bytes per SFTP request (default: the server's maximum).
+        max_requests: SFTP requests in flight at once (default: enough for
+            4 MiB in flight). Raise this on high-latency links.
+        resume: Continue a partial remote file from an interrupted upload
+            instead of overwriting it (default False).
 
     Returns:
-        Upload result including status and bytes transferred.
+        Upload result including status, bytes transferred and where it resumed.
     """
     app_ctx: AppContext = ctx.request_context.lifespan_context
     pool = app_ctx.connection_pool
 
     try:
-        result = await pool.sftp_upload(host, local_path, remote_path, port)
+        result = await pool.sftp_upload(
+            host,
+            local_path,
+            remote_path,
+            port,
+            block_size=block_size,
+            max_requests=max_requests,
+            resume=resume,
+            progress=_report_progress(ctx),
+        )
         return {
             "status": result.status,
             "message": result.message,
             "bytes_transferred": result.bytes_transferred,
+            "resumed_from": result.resumed_from,
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -258,28 +473,107 @@ async def sftp_upload(
 
 @mcp.tool()
 async def sftp_download(
-    host: str, remote_path: str, local_path: str, ctx: Context, port: int = 22
+    host: str,
+    remote_path: str,
+    local_path: str,
+    ctx: Context,
+    port: int = 22,
+    block_size: int | None = None,
+    max_requests: int | None = None,
+    resume: bool = False,
 ) -> dict:
     """Download a file from a remote SSH server via SFTP.
 
+    Reports progress in bytes while the download runs.
+
     Args:
         host: The hostname to download from.
         remote_path: Path to the file on the remote server.
         local_path: Destination path on the local machine.
         port: The SSH port (default 22).
+        block_size: Bytes per SFTP request (default: the server's maximum).
+        max_requests: SFTP requests in flight at once (default: enough for
+            4 MiB in flight). Raise this on high-latency links.
+        resume: Continue a partial local file from an interrupted download
+            instead of overwriting it (default False).
 
     Returns:
-        Download result including status and bytes transferred.
+        Download result including status, bytes transferred and where it resumed.
     """
     app_ctx: AppContext = ctx.request_context.lifespan_context
     pool = app_ctx.connection_pool
 
     try:
-        result = await pool.sftp_download(host, remote_path, local_path, port)
+        result = await pool.sftp_download(
+            host,
+            remote_path,
+            local_path,
+            port,
+            block_size=block_size,
+            max_requests=max_requests,
+            resume=resume,
+            progress=_report_progress(ctx),
+        )
         return {
             "status": result.status,
             "message": result.message,
             "bytes_transferred": result.bytes_transferred,
+            "resumed_from": result.resumed_from,
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@mcp.tool()
+async def sftp_sync(
+    host: str,
+    local_dir: str,
+    remote_dir: str,
+    ctx: Context,
+    direction: Literal["upload", "download"] = "upload",
+    port: int = 22,
+    block_size: int | None = None,
+    max_requests: int | None = None,
+) -> dict:
+    """Sync a directory tree to or from a remote SSH server via SFTP.
+
+    Copies only files whose size or modification time differ and gives each
+    copy the source's modification time, so repeated syncs skip unchanged
+    files. Files present only at the destination are left in place. Reports
+    progress in bytes.
+
+    Args:
+        host: The hostname to sync with.
+        local_dir: The local directory.
+        remote_dir: The remote directory.
+        direction: "upload" (local to remote, default) or "download".
+        port: The SSH port (default 22).
+        block_size: Bytes per SFTP request (default: the server's maximum).
+        max_requests: SFTP requests in flight at once per file (see sftp_upload).
+
+    Returns:
+        Sync result with the files copied, the number skipped and any errors.
+    """
+    app_ctx: AppContext = ctx.request_context.lifespan_context
+    pool = app_ctx.connection_pool
+
+    try:
+        result = await pool.sftp_sync(
+            host,
+            local_dir,
+            remote_dir,
+            direction,
+            port,
+            block_size=block_size,
+            max_requests=max_requests,
+            progress=_report_progress(ctx),
+        )
+        return {
+            "status": "success" if not result.errors else "partial",
+            "transferred": result.transferred,
+            "skipped": result.skipped,
+            "bytes_transferred": result.bytes_transferred,
+            "errors": result.errors,
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
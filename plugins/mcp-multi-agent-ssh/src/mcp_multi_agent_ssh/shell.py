@@ -0,0 +1,245 @@
+"""Persistent shell session for running many commands over one SSH channel.
+
+Opening a channel for every command costs a round trip for the channel open
+and another for the exec request, plus the remote shell's startup. A
+PersistentShell opens one channel running ``sh`` and writes commands to its
+stdin, so a command costs only its own runtime. Commands can be queued:
+they run in order, and each is written to the shell only once the one
+before it has finished, so a command cancelled while queued never runs.
+
+Each command is run as ``"$SHELL" -c '<command>' </dev/null`` (the same way
+sshd runs an exec request, so cd, exports etc. don't leak into later
+commands and nothing reads the framing from stdin), followed by a sentinel
+line on stdout carrying the exit status and one on stderr. Output up to a
+command's sentinels is that command's output.
+"""
+
+import asyncio
+import logging
+import shlex
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+import asyncssh
+
+from .types import ExecResult
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 65536
+
+
+class ShellClosedError(Exception):
+    """The persistent shell closed before the command completed.
+
+    started tells whether the command had begun running. A command that
+    hadn't is safe to run again elsewhere; one that had may have had some
+    of its effects.
+    """
+
+    def __init__(self, message: str, started: bool = False) -> None:
+        super().__init__(message)
+        self.started = started
+
+
+@dataclass
+class _Pending:
+    """A command queued on the shell and waiting for its output."""
+
+    sentinel: bytes
+    script: bytes
+    future: asyncio.Future
+    # Set once the commands before this one have finished, or the shell failed
+    started: asyncio.Event = field(default_factory=asyncio.Event)
+    running: bool = False
+    stdout: bytes | None = None
+    stderr: bytes | None = None
+    exit_code: int = field(default=-1)
+
+    def complete_if_done(self) -> None:
+        if self.stdout is not None and self.stderr is not None and not self.future.done():
+            self.future.set_result(
+                ExecResult(
+                    stdout=self.stdout.decode("utf-8", errors="replace"),
+                    stderr=self.stderr.decode("utf-8", errors="replace"),
+                    exit_code=self.exit_code,
+                )
+            )
+
+
+class PersistentShell:
+    """A long-lived ``sh`` process on one channel, running framed commands."""
+
+    def __init__(self, process: asyncssh.SSHClientProcess) -> None:
+        self._process = process
+        self._stdout_waiting: deque[_Pending] = deque()
+        self._stderr_waiting: deque[_Pending] = deque()
+        self._closed = False
+        self._readers: list[asyncio.Task] = []
+        self._closing: asyncio.Task | None = None
+
+    @classmethod
+    async def open(cls, conn: asyncssh.SSHClientConnection) -> "PersistentShell":
+        """Start a shell on conn and wait until it is ready for commands.
+
+        Anything the login shell prints at startup is discarded.
+        """
+        process = await conn.create_process("sh", encoding=None)
+        shell = cls(process)
+        sync = shell._sentinel()
+        process.stdin.write(
+            b"printf '%s\\n' " + sync + b"; printf '%s\\n' " + sync + b" >&2\n"
+        )
+        await process.stdout.readuntil(sync + b"\n")
+        await process.stderr.readuntil(sync + b"\n")
+        shell._readers = [
+            asyncio.create_task(shell._read_stdout()),
+            asyncio.create_task(shell._read_stderr()),
+        ]
+        return shell
+
+    @staticmethod
+    def _sentinel() -> bytes:
+        return f"__MCP_SSH_{uuid.uuid4().hex}__".encode()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def pending(self) -> int:
+        """Commands written but not yet complete."""
+        # Both queues hold suffixes of the same command sequence.
+        return max(len(self._stdout_waiting), len(self._stderr_waiting))
+
+    async def run(self, command: str, timeout: float | None = None) -> ExecResult:
+        """Run command after any already queued, and return its result.
+
+        Args:
+            command: The command to run.
+            timeout: Seconds the command may run, counted from when the
+                commands queued before it have finished.
+
+        Raises:
+            ShellClosedError: If the shell closed before the command finished.
+            asyncio.TimeoutError: If the command ran longer than timeout.
+
+        A caller cancelled while its command is queued just leaves the
+        queue. If the command times out or the caller is cancelled while it
+        runs, the shell is closed to stop it, so the commands queued behind
+        it fail with ShellClosedError (as not started) instead of waiting.
+        """
+        if self._closed:
+            raise ShellClosedError("Shell is closed")
+        sentinel = self._sentinel()
+        script = (
+            b'"${SHELL:-/bin/sh}" -c ' + shlex.quote(command).encode() + b" </dev/null; "
+            b"printf '\\n%s:%d\\n' " + sentinel + b' "$?"; '
+            b"printf '\\n%s\\n' " + sentinel + b" >&2\n"
+        )
+        pending = _Pending(sentinel, script, asyncio.get_running_loop().create_future())
+        self._stdout_waiting.append(pending)
+        self._stderr_waiting.append(pending)
+        self._start_next()
+        try:
+            await pending.started.wait()
+            return await asyncio.wait_for(pending.future, timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if not pending.running:
+                self._discard(pending)
+            elif not self._closed:
+                self._closing = asyncio.ensure_future(self.close())
+            raise
+
+    def _start_next(self) -> None:
+        """Write the oldest unfinished command to the shell if not yet done."""
+        if self._stdout_waiting and not self._stdout_waiting[0].running:
+            head = self._stdout_waiting[0]
+            head.running = True
+            self._process.stdin.write(head.script)
+            head.started.set()
+
+    def _discard(self, pending: _Pending) -> None:
+        """Drop a command that was never written to the shell."""
+        for queue in (self._stdout_waiting, self._stderr_waiting):
+            if pending in queue:
+                queue.remove(pending)
+
+    async def _read_stdout(self) -> None:
+        buffer = bytearray()
+        scanned = 0  # no marker starts before this offset
+        reader = self._process.stdout
+        try:
+            while True:
+                while self._stdout_waiting:
+                    pending = self._stdout_waiting[0]
+                    marker = b"\n" + pending.sentinel + b":"
+                    start = buffer.find(marker, scanned)
+                    end = buffer.find(b"\n", start + len(marker)) if start >= 0 else -1
+                    if end < 0:
+                        scanned = max(0, len(buffer) - len(marker)) if start < 0 else start
+                        break
+                    self._stdout_waiting.popleft()
+                    pending.exit_code = int(buffer[start + len(marker):end])
+                    pending.stdout = bytes(buffer[:start])
+                    del buffer[:end + 1]
+                    scanned = 0
+                    pending.complete_if_done()
+                    self._start_next()
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer += data
+        finally:
+            self._fail_pending("Shell exited")
+
+    async def _read_stderr(self) -> None:
+        buffer = bytearray()
+        scanned = 0
+        reader = self._process.stderr
+        try:
+            while True:
+                while self._stderr_waiting:
+                    pending = self._stderr_waiting[0]
+                    marker = b"\n" + pending.sentinel + b"\n"
+                    start = buffer.find(marker, scanned)
+                    if start < 0:
+                        scanned = max(0, len(buffer) - len(marker))
+                        break
+                    self._stderr_waiting.popleft()
+                    pending.stderr = bytes(buffer[:start])
+                    del buffer[:start + len(marker)]
+                    scanned = 0
+                    pending.complete_if_done()
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer += data
+        finally:
+            self._fail_pending("Shell exited")
+
+    def _fail_pending(self, reason: str) -> None:
+        self._closed = True
+        for queue in (self._stdout_waiting, self._stderr_waiting):
+            while queue:
+                pending = queue.popleft()
+                if not pending.future.done():
+                    if pending.running:
+                        error = ShellClosedError(f"{reason} while the command was running", True)
+                    else:
+                        error = ShellClosedError(reason)
+                    pending.future.set_exception(error)
+                pending.started.set()
+
+    async def close(self) -> None:
+        """Terminate the shell; commands still queued fail with ShellClosedError."""
+        self._fail_pending("Shell closed")
+        self._process.close()
+        for task in self._readers:
+            task.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        try:
+            await self._process.wait_closed()
+        except Exception as e:
+            logger.debug(f"Error closing shell channel: {e}")
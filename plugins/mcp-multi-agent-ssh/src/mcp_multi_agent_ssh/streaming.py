@@ -0,0 +1,210 @@
+"""Background command execution with bounded output buffers.
+
+An ExecJob runs a command on its own channel and reads stdout and stderr
+incrementally into OutputBuffers, which keep at most a fixed number of
+bytes however much the command prints. Which bytes are kept depends on the
+truncation policy: the first ones ("head"), the latest ones ("tail"), or
+half of each ("head_tail"). Callers poll a job for output produced since
+their last poll, and can cancel it.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Literal
+
+import asyncssh
+
+from .types import ExecStatus
+
+logger = logging.getLogger(__name__)
+
+TruncatePolicy = Literal["head", "tail", "head_tail"]
+
+DEFAULT_OUTPUT_LIMIT = 1024 * 1024  # bytes kept per stream
+READ_SIZE = 65536
+
+
+class OutputBuffer:
+    """Keeps the first and/or latest bytes of a stream, up to a limit.
+
+    Offsets are positions in the whole stream, so a reader can ask for
+    everything after the offset it last saw; bytes dropped since then are
+    reported as omitted.
+    """
+
+    def __init__(self, limit: int = DEFAULT_OUTPUT_LIMIT, policy: TruncatePolicy = "head_tail"):
+        if policy == "head":
+            self._head_limit = limit
+        elif policy == "tail":
+            self._head_limit = 0
+        else:
+            self._head_limit = limit // 2
+        self._tail_limit = limit - self._head_limit
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total = 0
+
+    @property
+    def omitted(self) -> int:
+        """Bytes received but no longer kept."""
+        return self.total - len(self._head) - len(self._tail)
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self._head_limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data and self._tail_limit:
+            self._tail += data[-self._tail_limit:]
+            excess = len(self._tail) - self._tail_limit
+            if excess > 0:
+                # Deleting from the front of a bytearray doesn't move the rest.
+                del self._tail[:excess]
+
+    def read(self, since: int = 0) -> tuple[str, int]:
+        """Output after offset since, with a marker where bytes were dropped.
+
+        Returns:
+            The text and the number of bytes omitted from it.
+        """
+        parts = []
+        if since < len(self._head):
+            parts.append(bytes(self._head[since:]))
+            since = len(self._head)
+        tail_start = self.total - len(self._tail)
+        skipped = max(0, tail_start - since)
+        if skipped:
+            parts.append(f"\n[... {skipped} bytes omitted ...]\n".encode())
+            since = tail_start
+        parts.append(bytes(self._tail[since - tail_start:]))
+        return b"".join(parts).decode("utf-8", errors="replace"), skipped
+
+
+class ExecJob:
+    """A command running in the background on a pooled connection."""
+
+    def __init__(
+        self,
+        host: str,
+        command: str,
+        output_limit: int = DEFAULT_OUTPUT_LIMIT,
+        truncate: TruncatePolicy = "head_tail",
+    ) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.host = host
+        self.command = command
+        self.stdout = OutputBuffer(output_limit, truncate)
+        self.stderr = OutputBuffer(output_limit, truncate)
+        self.status: Literal["running", "completed", "timeout", "cancelled", "error"] = "running"
+        self.exit_code: int | None = None
+        self.error: str | None = None
+        self.started_at = datetime.utcnow()
+        self.finished_at: datetime | None = None
+        self.conn: asyncssh.SSHClientConnection | None = None
+        self._task: asyncio.Task | None = None
+        self._stdout_cursor = 0
+        self._stderr_cursor = 0
+
+    def start(
+        self,
+        conn: asyncssh.SSHClientConnection,
+        channels: asyncio.Semaphore,
+        timeout: float,
+    ) -> None:
+        """Start running the command; it holds one of channels until done."""
+        self.conn = conn
+        self._task = asyncio.create_task(self._run(conn, channels, timeout))
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    @property
+    def output_bytes(self) -> int:
+        """Bytes of output received so far on both streams."""
+        return self.stdout.total + self.stderr.total
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Wait up to timeout seconds for the command to finish.
+
+        Returns:
+            Whether it has finished.
+        """
+        if self._task is not None and not self._task.done():
+            await asyncio.wait({self._task}, timeout=timeout)
+        return self.done
+
+    async def cancel(self) -> None:
+        """Stop the command, keeping the output received so far."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.wait({self._task})
+        if self.status == "running":  # cancelled before it started
+            self.status = "cancelled"
+            self.finished_at = datetime.utcnow()
+
+    def poll(self) -> ExecStatus:
+        """Status and the output produced since the previous poll."""
+        stdout, stdout_omitted = self.stdout.read(self._stdout_cursor)
+        stderr, stderr_omitted = self.stderr.read(self._stderr_cursor)
+        self._stdout_cursor = self.stdout.total
+        self._stderr_cursor = self.stderr.total
+        return ExecStatus(
+            job_id=self.id,
+            host=self.host,
+            command=self.command,
+            status=self.status,
+            exit_code=self.exit_code,
+            error=self.error,
+            stdout=stdout,
+            stderr=stderr,
+            stdout_omitted=stdout_omitted,
+            stderr_omitted=stderr_omitted,
+            stdout_bytes=self.stdout.total,
+            stderr_bytes=self.stderr.total,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+    async def _run(
+        self,
+        conn: asyncssh.SSHClientConnection,
+        channels: asyncio.Semaphore,
+        timeout: float,
+    ) -> None:
+        process = None
+        try:
+            async with channels:
+                process = await conn.create_process(self.command, encoding=None)
+                process.stdin.write_eof()
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._pump(process.stdout, self.stdout),
+                        self._pump(process.stderr, self.stderr),
+                    ),
+                    timeout=timeout,
+                )
+                await process.wait_closed()
+                self.exit_code = process.exit_status if process.exit_status is not None else -1
+                self.status = "completed"
+        except asyncio.TimeoutError:
+            self.status = "timeout"
+            self.error = f"Command timed out after {timeout} seconds"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+        except Exception as e:
+            self.status = "error"
+            self.error = str(e)
+        finally:
+            if process is not None and self.status != "completed":
+                process.close()
+            self.finished_at = datetime.utcnow()
+            logger.info(f"Job {self.id} on {self.host} finished: {self.status}")
+
+    @staticmethod
+    async def _pump(reader: asyncssh.SSHReader, buffer: OutputBuffer) -> None:
+        while data := await reader.read(READ_SIZE):
+            buffer.write(data)
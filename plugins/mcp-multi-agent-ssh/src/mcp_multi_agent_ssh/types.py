@@ -42,12 +42,52 @@ class ExecResult(BaseModel):
     exit_code: int
 
 
+class HostExecResult(BaseModel):
+    """Result of executing a command on one host of several."""
+
+    host: str
+    stdout: str
+    stderr: str
+    exit_code: int
+    error: str | None = None
+    duration_seconds: float
+
+
+class ExecStatus(BaseModel):
+    """State of a background command and its output since the last poll."""
+
+    job_id: str
+    host: str
+    command: str
+    status: Literal["running", "completed", "timeout", "cancelled", "error"]
+    exit_code: int | None = None
+    error: str | None = None
+    stdout: str
+    stderr: str
+    stdout_omitted: int = 0
+    stderr_omitted: int = 0
+    stdout_bytes: int
+    stderr_bytes: int
+    started_at: datetime
+    finished_at: datetime | None = None
+
+
 class SftpResult(BaseModel):
     """Result of an SFTP operation."""
 
     status: Literal["success", "error"]
     message: str | None = None
     bytes_transferred: int | None = None
+    resumed_from: int | None = None
+
+
+class SyncResult(BaseModel):
+    """Result of syncing a directory tree over SFTP."""
+
+    transferred: list[str]
+    skipped: int
+    bytes_transferred: int
+    errors: list[str]
 
 
 class FileInfo(BaseModel):
@@ -0,0 +1,122 @@
+"""Shared fixtures: a local SSH server and a pool that can reach it."""
+
+import asyncio
+import os
+import signal
+from unittest.mock import patch
+
+import asyncssh
+import pytest
+
+from mcp_multi_agent_ssh.connection_pool import ConnectionPool
+from mcp_multi_agent_ssh.credentials import CredentialManager
+from mcp_multi_agent_ssh.types import AuthType, StoredCredential
+
+TEST_USER = "tester"
+TEST_PASSWORD = "test-password"
+
+
+class _PasswordServer(asyncssh.SSHServer):
+    """Accepts TEST_USER / TEST_PASSWORD."""
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return username == TEST_USER and password == TEST_PASSWORD
+
+
+async def _copy(reader, writer, close: bool = False) -> None:
+    while data := await reader.read(65536):
+        writer.write(data)
+    if close:
+        writer.close()
+
+
+_local_processes: set[asyncio.subprocess.Process] = set()
+
+
+async def _run_locally(process: asyncssh.SSHServerProcess) -> None:
+    """Run the requested command (or a shell) as a local subprocess."""
+    local = await asyncio.create_subprocess_shell(
+        process.command or "sh",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    _local_processes.add(local)
+    stdin = asyncio.create_task(_copy(process.stdin, local.stdin, close=True))
+    await asyncio.gather(
+        _copy(local.stdout, process.stdout), _copy(local.stderr, process.stderr)
+    )
+    stdin.cancel()
+    process.exit(await local.wait())
+
+
+@pytest.fixture
+async def ssh_server():
+    """An SSH server on localhost running commands and SFTP locally.
+
+    Yields the port it listens on.
+    """
+    server = await asyncssh.create_server(
+        _PasswordServer,
+        "127.0.0.1",
+        0,
+        server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        process_factory=_run_locally,
+        sftp_factory=True,
+        encoding=None,
+    )
+    port = server.sockets[0].getsockname()[1]
+    yield port
+    server.close()
+    await server.wait_closed()
+    # Commands abandoned by a test (closed shells, timeouts) may still be
+    # running; stop them before the event loop goes away.
+    for local in _local_processes:
+        if local.returncode is None:
+            os.killpg(local.pid, signal.SIGKILL)
+            await local.wait()
+    _local_processes.clear()
+
+
+@pytest.fixture
+def credential_manager(tmp_path):
+    """A credential manager storing into a temporary directory."""
+    with patch("mcp_multi_agent_ssh.credentials.CONFIG_DIR", tmp_path):
+        with patch(
+            "mcp_multi_agent_ssh.credentials.CREDENTIALS_FILE", tmp_path / "credentials.enc"
+        ):
+            with patch("mcp_multi_agent_ssh.credentials.SALT_FILE", tmp_path / "salt"):
+                manager = CredentialManager()
+                manager.initialize("test-master-password")
+                yield manager
+
+
+@pytest.fixture
+async def make_pool(ssh_server, credential_manager):
+    """Factory for pools with credentials stored for the local server.
+
+    Pools made by it are stopped after the test.
+    """
+    credential_manager.set(
+        "127.0.0.1",
+        StoredCredential(
+            username=TEST_USER,
+            auth_type=AuthType.PASSWORD,
+            password=TEST_PASSWORD,
+            port=ssh_server,
+        ),
+    )
+    pools: list[ConnectionPool] = []
+
+    def factory(**kwargs) -> ConnectionPool:
+        pool = ConnectionPool(credential_manager, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        await pool.stop()
@@ -0,0 +1,372 @@
+"""Tests for connection pool session reuse."""
+
+import asyncio
+import os
+
+import pytest
+
+from mcp_multi_agent_ssh.shell import ShellClosedError
+from mcp_multi_agent_ssh.types import AuthType, StoredCredential
+from tests.conftest import TEST_PASSWORD, TEST_USER
+
+HOST = "127.0.0.1"
+
+
+class TestExec:
+    """Tests for exec_command with and without a persistent shell."""
+
+    @pytest.mark.parametrize("persistent_shell", [False, True])
+    async def test_output_and_exit_code(self, make_pool, persistent_shell):
+        """Test that stdout, stderr and exit code are returned."""
+        pool = make_pool(persistent_shell=persistent_shell)
+
+        result = await pool.exec_command(HOST, "echo out; echo err >&2; exit 3")
+
+        assert result.stdout == "out\n"
+        assert result.stderr == "err\n"
+        assert result.exit_code == 3
+
+    async def test_shell_reused_across_commands(self, make_pool):
+        """Test that commands share one shell but not its state."""
+        pool = make_pool(persistent_shell=True)
+
+        await pool.exec_command(HOST, "cd /; export FOO=bar")
+        pooled = next(iter(pool._connections.values()))
+        shell = pooled.shell
+        result = await pool.exec_command(HOST, 'echo "$FOO"')
+
+        assert result.stdout == "\n"
+        assert shell is not None and pooled.shell is shell
+
+    async def test_pipelined_commands_keep_their_output(self, make_pool):
+        """Test that concurrent commands on one shell get their own results."""
+        pool = make_pool(persistent_shell=True)
+        await pool.connect(HOST)
+
+        results = await asyncio.gather(
+            *(pool.exec_command(HOST, f"echo {i}; exit {i}") for i in range(20))
+        )
+
+        assert [r.stdout for r in results] == [f"{i}\n" for i in range(20)]
+        assert [r.exit_code for r in results] == list(range(20))
+
+    async def test_output_without_trailing_newline(self, make_pool):
+        """Test that output not ending in a newline is returned as-is."""
+        pool = make_pool(persistent_shell=True)
+
+        result = await pool.exec_command(HOST, "printf abc")
+
+        assert result.stdout == "abc"
+
+    async def test_timeout_replaces_shell(self, make_pool):
+        """Test that a timed-out command doesn't block later commands."""
+        pool = make_pool(persistent_shell=True)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.exec_command(HOST, "sleep 10", timeout=0.2)
+        result = await pool.exec_command(HOST, "echo ok", timeout=5)
+
+        assert result.stdout == "ok\n"
+
+    async def test_timeout_counts_from_start(self, make_pool, tmp_path):
+        """Test that time queued behind another command isn't part of the timeout."""
+        pool = make_pool(persistent_shell=True)
+        await pool.connect(HOST)
+        counter = tmp_path / "runs"
+
+        slow, quick = await asyncio.gather(
+            pool.exec_command(HOST, f"echo run >> {counter}; sleep 0.5; echo slow", timeout=5),
+            pool.exec_command(HOST, "echo quick", timeout=0.3),
+        )
+
+        assert (slow.stdout, quick.stdout) == ("slow\n", "quick\n")
+        assert counter.read_text() == "run\n"
+
+    async def test_started_command_not_rerun(self, make_pool, tmp_path):
+        """Test that only commands that hadn't started fall back to a channel."""
+        pool = make_pool(persistent_shell=True)
+        await pool.connect(HOST)
+        pooled = next(iter(pool._connections.values()))
+        counter = tmp_path / "runs"
+
+        running = asyncio.create_task(
+            pool.exec_command(HOST, f"echo run >> {counter}; sleep 5", timeout=10)
+        )
+        queued = asyncio.create_task(pool.exec_command(HOST, "echo queued", timeout=10))
+        while not counter.exists():
+            await asyncio.sleep(0.05)
+        await pooled.close_shell()
+
+        with pytest.raises(ShellClosedError, match="while the command was running"):
+            await running
+        assert (await queued).stdout == "queued\n"
+        assert counter.read_text() == "run\n"
+
+    async def test_cancelled_queued_command_never_runs(self, make_pool, tmp_path):
+        """Test that a command cancelled while queued leaves the queue unrun."""
+        pool = make_pool(persistent_shell=True)
+        await pool.connect(HOST)
+        marker = tmp_path / "ran"
+
+        running = asyncio.create_task(pool.exec_command(HOST, "sleep 0.5; echo done"))
+        queued = asyncio.create_task(pool.exec_command(HOST, f"touch {marker}"))
+        await asyncio.sleep(0.1)
+        queued.cancel()
+        after = await pool.exec_command(HOST, "echo after")
+
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert (await running).stdout == "done\n"
+        assert after.stdout == "after\n"
+        assert not marker.exists()
+
+    async def test_channels_limited(self, make_pool):
+        """Test that no more than max_channels commands run at once."""
+        pool = make_pool(max_channels=2)
+        await pool.connect(HOST)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        await asyncio.gather(*(pool.exec_command(HOST, "sleep 0.3") for _ in range(4)))
+
+        assert loop.time() - start >= 0.6
+
+
+class TestSftp:
+    """Tests for SFTP client reuse."""
+
+    async def test_sftp_client_reused(self, make_pool, tmp_path):
+        """Test that SFTP operations share one client per connection."""
+        pool = make_pool()
+        source = tmp_path / "source.txt"
+        source.write_text("hello")
+
+        await pool.sftp_upload(HOST, str(source), str(tmp_path / "remote.txt"))
+        pooled = next(iter(pool._connections.values()))
+        sftp = pooled.sftp
+        await pool.sftp_download(HOST, str(tmp_path / "remote.txt"), str(tmp_path / "back.txt"))
+        files = await pool.sftp_list(HOST, str(tmp_path))
+
+        assert pooled.sftp is sftp
+        assert (tmp_path / "back.txt").read_text() == "hello"
+        assert {"source.txt", "remote.txt", "back.txt"} <= {f.name for f in files}
+
+
+class TestConnect:
+    """Tests for connection establishment."""
+
+    async def test_concurrent_connects_share_one_connection(self, make_pool):
+        """Test that simultaneous callers for one host share one connection."""
+        pool = make_pool()
+
+        conns = await asyncio.gather(*(pool.get_connection(HOST) for _ in range(5)))
+
+        assert all(conn is conns[0] for conn in conns)
+        assert len(pool._connections) == 1
+        assert pool._connecting == {}
+
+    async def test_failed_connect_not_cached(self, make_pool, credential_manager):
+        """Test that a failed connection attempt is retried by the next caller."""
+        pool = make_pool()
+        credential_manager.set(
+            "127.0.0.2",
+            StoredCredential(
+                username=TEST_USER, auth_type=AuthType.PASSWORD, password="wrong", port=1
+            ),
+        )
+
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await pool.get_connection("127.0.0.2")
+        assert pool._connecting == {}
+
+
+class TestExecMany:
+    """Tests for running a command on several hosts."""
+
+    @pytest.fixture
+    def localhost_credentials(self, credential_manager, ssh_server):
+        """Store credentials for "localhost" too, a second name for the server."""
+        credential_manager.set(
+            "localhost",
+            StoredCredential(
+                username=TEST_USER,
+                auth_type=AuthType.PASSWORD,
+                password=TEST_PASSWORD,
+                port=ssh_server,
+            ),
+        )
+
+    async def test_results_for_each_host(self, make_pool, localhost_credentials):
+        """Test that every host's output and exit code are returned."""
+        pool = make_pool()
+
+        results = [r async for r in pool.exec_many([HOST, "localhost"], "echo hi; exit 2")]
+
+        assert sorted(r.host for r in results) == [HOST, "localhost"]
+        assert all(r.stdout == "hi\n" and r.exit_code == 2 for r in results)
+        assert len(pool._connections) == 2
+
+    async def test_failing_host_reported(self, make_pool):
+        """Test that a host without credentials fails alone."""
+        pool = make_pool()
+
+        results = {r.host: r async for r in pool.exec_many([HOST, "nowhere"], "true")}
+
+        assert results[HOST].exit_code == 0 and results[HOST].error is None
+        assert results["nowhere"].exit_code == -1
+        assert "no stored credentials" in results["nowhere"].error
+
+    async def test_timeout_per_host(self, make_pool):
+        """Test that the timeout is reported as that host's error."""
+        pool = make_pool()
+
+        results = [r async for r in pool.exec_many([HOST], "sleep 5", timeout=0.2)]
+
+        assert results[0].error == "Timed out after 0.2 seconds"
+
+    async def test_timeout_covers_connect_and_exec(self, make_pool):
+        """Test that connecting and running share one per-host timeout."""
+        pool = make_pool()
+        get_pooled = pool._get_pooled
+
+        async def slow_get_pooled(host, port=22):
+            await asyncio.sleep(0.3)
+            return await get_pooled(host, port)
+
+        pool._get_pooled = slow_get_pooled
+        results = [r async for r in pool.exec_many([HOST], "sleep 0.4", timeout=0.5)]
+        await asyncio.sleep(0.3)  # let the abandoned remote command finish
+
+        assert results[0].error == "Timed out after 0.5 seconds"
+        assert results[0].duration_seconds < 0.7
+
+    async def test_timeout_frees_persistent_shell(self, make_pool):
+        """Test that a host timeout stops the command on the persistent shell."""
+        pool = make_pool(persistent_shell=True)
+
+        results = [r async for r in pool.exec_many([HOST], "sleep 10", timeout=0.3)]
+        result = await pool.exec_command(HOST, "echo ok", timeout=2)
+
+        assert results[0].error == "Timed out after 0.3 seconds"
+        assert result.stdout == "ok\n"
+
+    async def test_concurrency_bounded(self, make_pool, localhost_credentials):
+        """Test that no more than `concurrency` hosts run at once."""
+        pool = make_pool()
+        await pool.connect(HOST)
+        await pool.connect("localhost")
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        results = [
+            r async for r in pool.exec_many([HOST, "localhost"], "sleep 0.3", concurrency=1)
+        ]
+
+        assert len(results) == 2
+        assert loop.time() - start >= 0.6
+
+    def test_resolve_hosts(self, make_pool, localhost_credentials):
+        """Test that explicit hosts and glob matches are merged without duplicates."""
+        pool = make_pool()
+
+        assert pool.resolve_hosts(["localhost"], pattern="127.*") == ["localhost", HOST]
+        assert pool.resolve_hosts(pattern="local*") == ["localhost"]
+        assert pool.resolve_hosts() == []
+
+
+class TestTransfer:
+    """Tests for chunked transfers, resume and sync."""
+
+    @pytest.fixture
+    def payload(self, tmp_path):
+        """A 1 MiB local file with non-repeating content."""
+        path = tmp_path / "payload.bin"
+        path.write_bytes(os.urandom(1024 * 1024))
+        return path
+
+    @pytest.mark.parametrize("block_size,max_requests", [(4096, 1), (16384, 16), (1000, 7)])
+    async def test_round_trip(self, make_pool, tmp_path, payload, block_size, max_requests):
+        """Test that uploads and downloads copy the file exactly."""
+        pool = make_pool()
+        remote = str(tmp_path / "remote.bin")
+        back = tmp_path / "back.bin"
+
+        up = await pool.sftp_upload(
+            HOST, str(payload), remote, block_size=block_size, max_requests=max_requests
+        )
+        down = await pool.sftp_download(
+            HOST, remote, str(back), block_size=block_size, max_requests=max_requests
+        )
+
+        assert up.bytes_transferred == down.bytes_transferred == payload.stat().st_size
+        assert back.read_bytes() == payload.read_bytes()
+
+    async def test_progress_reported(self, make_pool, tmp_path, payload):
+        """Test that progress ends at the file size."""
+        pool = make_pool()
+        reports = []
+
+        async def progress(done, total):
+            reports.append((done, total))
+
+        await pool.sftp_upload(HOST, str(payload), str(tmp_path / "r.bin"), progress=progress)
+
+        assert reports[-1] == (payload.stat().st_size, payload.stat().st_size)
+
+    async def test_resume_download(self, make_pool, tmp_path, payload):
+        """Test that a partial download resumes and only fetches the rest."""
+        pool = make_pool()
+        partial = tmp_path / "partial.bin"
+        partial.write_bytes(payload.read_bytes()[:700_000])
+
+        result = await pool.sftp_download(
+            HOST, str(payload), str(partial), block_size=4096, max_requests=4, resume=True
+        )
+
+        assert partial.read_bytes() == payload.read_bytes()
+        assert result.resumed_from == 700_000 - 700_000 % 4096 - 4 * 4096
+        assert result.bytes_transferred == payload.stat().st_size - result.resumed_from
+
+    async def test_resume_with_mismatched_partial_restarts(self, make_pool, tmp_path, payload):
+        """Test that a partial file that isn't a prefix of the source is replaced."""
+        pool = make_pool()
+        remote = tmp_path / "remote.bin"
+        remote.write_bytes(os.urandom(700_000))
+
+        result = await pool.sftp_upload(HOST, str(payload), str(remote), resume=True)
+
+        assert result.resumed_from is None
+        assert remote.read_bytes() == payload.read_bytes()
+
+    async def test_sync_skips_unchanged(self, make_pool, tmp_path):
+        """Test that a second sync only copies files that changed."""
+        pool = make_pool()
+        src = tmp_path / "src"
+        (src / "sub").mkdir(parents=True)
+        (src / "a.txt").write_text("a")
+        (src / "sub" / "b.txt").write_text("b")
+        dest = str(tmp_path / "dest")
+
+        first = await pool.sftp_sync(HOST, str(src), dest)
+        (src / "a.txt").write_text("changed")
+        second = await pool.sftp_sync(HOST, str(src), dest)
+
+        assert first.transferred == ["a.txt", "sub/b.txt"]
+        assert second.transferred == ["a.txt"]
+        assert second.skipped == 1
+        assert (tmp_path / "dest" / "a.txt").read_text() == "changed"
+
+    async def test_sync_download(self, make_pool, tmp_path):
+        """Test that download sync recreates the remote tree locally."""
+        pool = make_pool()
+        remote = tmp_path / "remote"
+        (remote / "x" / "y").mkdir(parents=True)
+        (remote / "x" / "y" / "z.txt").write_text("z")
+
+        result = await pool.sftp_sync(
+            HOST, str(tmp_path / "local"), str(remote), direction="download"
+        )
+
+        assert result.transferred == ["x/y/z.txt"]
+        assert (tmp_path / "local" / "x" / "y" / "z.txt").read_text() == "z"
@@ -0,0 +1,142 @@
+"""Tests for background commands and bounded output buffers."""
+
+import pytest
+
+from mcp_multi_agent_ssh.streaming import OutputBuffer
+
+HOST = "127.0.0.1"
+
+
+class TestOutputBuffer:
+    """Tests for OutputBuffer truncation and incremental reads."""
+
+    def test_under_limit_keeps_everything(self):
+        """Test that output within the limit is returned unchanged."""
+        buffer = OutputBuffer(limit=100)
+        buffer.write(b"hello ")
+        buffer.write(b"world")
+
+        assert buffer.read() == ("hello world", 0)
+        assert buffer.omitted == 0
+
+    @pytest.mark.parametrize(
+        "policy,expected",
+        [
+            ("head", "0123456789\n[... 16 bytes omitted ...]\n"),
+            ("tail", "\n[... 16 bytes omitted ...]\nghijklmnop"),
+            ("head_tail", "01234\n[... 16 bytes omitted ...]\nlmnop"),
+        ],
+    )
+    def test_truncation_policies(self, policy, expected):
+        """Test which bytes each policy keeps once over the limit."""
+        buffer = OutputBuffer(limit=10, policy=policy)
+        for chunk in (b"0123456789", b"abcdef", b"ghijklmnop"):
+            buffer.write(chunk)
+
+        assert buffer.read() == (expected, 16)
+        assert buffer.total == 26
+
+    def test_read_since_offset(self):
+        """Test that reading from an offset returns only newer output."""
+        buffer = OutputBuffer(limit=8, policy="tail")
+        buffer.write(b"abcd")
+        text, _ = buffer.read()
+        buffer.write(b"efgh")
+
+        assert text == "abcd"
+        assert buffer.read(4) == ("efgh", 0)
+
+    def test_read_since_dropped_offset(self):
+        """Test that output dropped since the last read is reported as omitted."""
+        buffer = OutputBuffer(limit=4, policy="tail")
+        buffer.write(b"abcd")
+        buffer.write(b"efghij")
+
+        assert buffer.read(4) == ("\n[... 2 bytes omitted ...]\nghij", 2)
+
+    def test_memory_bounded(self):
+        """Test that the kept bytes never exceed the limit."""
+        buffer = OutputBuffer(limit=1000)
+        for _ in range(1000):
+            buffer.write(b"x" * 777)
+
+        assert buffer.total == 777_000
+        assert buffer.total - buffer.omitted == 1000
+
+
+class TestExecJob:
+    """Tests for background commands run through the pool."""
+
+    async def test_completes_with_output(self, make_pool):
+        """Test that a finished job reports its output and exit code."""
+        pool = make_pool()
+
+        job = await pool.start_exec(HOST, "echo out; echo err >&2; exit 4")
+        assert await job.wait(5)
+        status = job.poll()
+
+        assert status.status == "completed"
+        assert status.exit_code == 4
+        assert status.stdout == "out\n"
+        assert status.stderr == "err\n"
+
+    async def test_large_output_bounded(self, make_pool):
+        """Test that a command printing far more than the limit keeps only the limit."""
+        pool = make_pool()
+
+        job = await pool.start_exec(
+            HOST,
+            "head -c 5000000 /dev/zero | tr '\\0' x; echo END",
+            output_limit=1000,
+            truncate="tail",
+        )
+        await job.wait(10)
+        status = job.poll()
+
+        assert status.stdout_bytes == 5_000_004
+        assert status.stdout_omitted == 5_000_004 - 1000
+        assert status.stdout.endswith("xxxEND\n")
+
+    async def test_poll_returns_new_output(self, make_pool):
+        """Test that each poll returns only output since the previous one."""
+        pool = make_pool()
+
+        job = await pool.start_exec(HOST, "echo one; sleep 0.3; echo two")
+        await job.wait(0.15)
+        first = pool.get_exec(job.id).poll()
+        await job.wait(5)
+        second = pool.get_exec(job.id).poll()
+
+        assert (first.status, first.stdout) == ("running", "one\n")
+        assert (second.status, second.stdout) == ("completed", "two\n")
+
+    async def test_cancel_keeps_output(self, make_pool):
+        """Test that cancelling stops the job and keeps its output."""
+        pool = make_pool()
+
+        job = await pool.start_exec(HOST, "echo started; sleep 30")
+        await job.wait(0.2)
+        await job.cancel()
+        status = job.poll()
+
+        assert status.status == "cancelled"
+        assert status.stdout == "started\n"
+        assert status.finished_at is not None
+
+    async def test_timeout_keeps_output(self, make_pool):
+        """Test that a timed-out job keeps the output read before the timeout."""
+        pool = make_pool()
+
+        job = await pool.start_exec(HOST, "echo partial; sleep 30", timeout=0.3)
+        await job.wait(5)
+        status = job.poll()
+
+        assert status.status == "timeout"
+        assert status.stdout == "partial\n"
+
+    async def test_unknown_job(self, make_pool):
+        """Test that looking up an unknown job raises ValueError."""
+        pool = make_pool()
+
+        with pytest.raises(ValueError, match="Unknown job"):
+            pool.get_exec("nope")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent adapter fan-out vs the sequential per-platform loop.
+
+Runs search_markets through ToolHandlers with five mocked adapters whose
+round-trips are injected delays (defaults approximate typical API latency;
+one platform can be made slow to exercise the timeout), and times it against
+a verbatim copy of the loop it replaced. Every run asserts both paths return
+the same markets when no platform times out.
+
+Usage:
+    python benchmarks/bench_fanout.py [--repeat 5] [--slow-platform kalshi --slow-s 3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mcp_predictive_market.schema import Market  # noqa: E402
+from mcp_predictive_market.tools import ToolHandlers  # noqa: E402
+
+DELAYS = {
+    "kalshi": 0.35,
+    "polymarket": 0.25,
+    "metaculus": 0.30,
+    "predictit": 0.20,
+    "manifold": 0.15,
+}
+
+
+class MockAdapter:
+    def __init__(self, platform, delay):
+        self.platform = platform
+        self.delay = delay
+
+    async def search_markets(self, query, category=None):
+        await asyncio.sleep(self.delay)
+        now = datetime.now(timezone.utc)
+        return [
+            Market(platform=self.platform, native_id=f"{self.platform}-{i}",
+                   url=f"https://{self.platform}.example/{i}", title=f"{query} #{i}",
+                   description="", category="politics", probability=0.5,
+                   created_at=now, last_fetched=now)
+            for i in range(20)
+        ]
+
+
+async def legacy_search(adapters, query):
+    """The pre-fan-out search_markets loop, unchanged."""
+    all_markets = []
+    errors = []
+    for name, adapter in adapters.items():
+        try:
+            markets = await adapter.search_markets(query)
+            all_markets.extend(markets)
+        except Exception as e:
+            errors.append({"platform": name, "error": str(e)})
+    return all_markets, errors
+
+
+async def main_async(args):
+    delays = dict(DELAYS)
+    if args.slow_platform:
+        delays[args.slow_platform] = args.slow_s
+    adapters = {name: MockAdapter(name, d) for name, d in delays.items()}
+    handlers = ToolHandlers(adapters, platform_timeout=args.timeout)
+
+    best_legacy = best_fanout = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        legacy_markets, _ = await legacy_search(adapters, "election")
+        best_legacy = min(best_legacy, time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        result = await handlers.search_markets("election")
+        best_fanout = min(best_fanout, time.perf_counter() - t0)
+
+        if not result["errors"]:
+            want = [m.id for m in legacy_markets]
+            got = [m["id"] for m in result["markets"]]
+            if want != got:
+                sys.exit("MISMATCH: fan-out returned different markets than the sequential loop")
+
+    print(f"platform delays (s): {delays}, timeout {args.timeout}s, best of {args.repeat}")
+    print(f"sequential  {best_legacy * 1e3:8.1f} ms")
+    print(f"fan-out     {best_fanout * 1e3:8.1f} ms   ({best_legacy / best_fanout:.1f}x)")
+    print(f"per-platform latency_ms: {result['latency_ms']}")
+    if result["errors"]:
+        print(f"errors: {result['errors']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--slow-platform", choices=sorted(DELAYS))
+    ap.add_argument("--slow-s", type=float, default=3.0)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
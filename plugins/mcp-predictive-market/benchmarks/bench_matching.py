@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark: indexed cross-platform matching vs the all-against-all loop.
+
+Generates synthetic markets (each event listed on one to three of the five
+platforms with small wording differences) at 1k, 10k and 50k markets and times ArbitrageDetector.find_arbitrage and
+compare_platforms. The legacy O(n^2) implementations (verbatim copies of the
+code the index replaced) are timed up to --legacy-max markets, and every
+size where both run asserts identical output.
+
+Usage:
+    python benchmarks/bench_matching.py [--sizes 1000,10000,50000] [--legacy-max 2000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mcp_predictive_market.analysis.arbitrage import ArbitrageDetector  # noqa: E402
+from mcp_predictive_market.analysis.matching import MarketMatcher, MatchResult  # noqa: E402
+from mcp_predictive_market.schema import Market  # noqa: E402
+
+PLATFORMS = ["kalshi", "polymarket", "metaculus", "predictit", "manifold"]
+COMMON = ["win", "election", "price", "above", "before", "end", "reach", "pass", "bill",
+          "president", "rate", "cut", "fed", "market", "close", "release", "than", "more"]
+YEARS = [str(y) for y in range(2025, 2031)]
+
+
+def make_markets(n, seed=0):
+    """n markets; each event is listed on 1-3 platforms with some rewording.
+
+    Titles mix a few common words and a year with rare entity words drawn
+    from a vocabulary that grows with n, like real listings do.
+    """
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(max(2000, n))]
+    now = datetime.now(timezone.utc)
+    markets = []
+    while len(markets) < n:
+        words = (rng.sample(COMMON, rng.randint(1, 3)) + rng.sample(vocab, rng.randint(2, 5))
+                 + [rng.choice(YEARS)])
+        for platform in rng.sample(PLATFORMS, rng.randint(1, 3)):
+            variant = list(words)
+            if rng.random() < 0.4:
+                variant.pop(rng.randrange(len(variant)))
+            if rng.random() < 0.3:
+                variant.append(rng.choice(COMMON))
+            rng.shuffle(variant)
+            title = "Will " + " ".join(variant) + "?"
+            markets.append(Market(
+                platform=platform, native_id=f"{platform}-{len(markets)}",
+                url=f"https://{platform}.example/{len(markets)}", title=title,
+                description="", category="politics",
+                probability=round(rng.random(), 2),
+                created_at=now, last_fetched=now,
+            ))
+    return markets[:n]
+
+
+# --- Legacy implementation, unchanged -------------------------------------
+
+def legacy_text_similarity(text_a, text_b):
+    text_a_clean = re.sub(r"[^\w\s]", "", text_a.lower())
+    text_b_clean = re.sub(r"[^\w\s]", "", text_b.lower())
+    words_a = set(text_a_clean.split())
+    words_b = set(text_b_clean.split())
+    stop_words = {"will", "the", "a", "an", "by", "in", "on", "to", "be", "is", "of"}
+    words_a -= stop_words
+    words_b -= stop_words
+    if not words_a or not words_b:
+        return 0.0
+    intersection = len(words_a & words_b)
+    union = len(words_a | words_b)
+    return intersection / union if union > 0 else 0.0
+
+
+def legacy_find_matches(target, candidates, min_confidence):
+    results = []
+    for candidate in candidates:
+        if candidate.id == target.id:
+            continue
+        confidence = legacy_text_similarity(target.title, candidate.title)
+        if confidence >= min_confidence:
+            results.append(MatchResult(target, candidate, confidence, "text"))
+    results.sort(key=lambda r: r.confidence, reverse=True)
+    return results
+
+
+def legacy_find_arbitrage(markets, min_spread=0.05, min_match_confidence=0.5):
+    opportunities = []
+    seen_pairs = set()
+    for target in markets:
+        candidates = [m for m in markets if m.id != target.id]
+        for match in legacy_find_matches(target, candidates, min_match_confidence):
+            pair = tuple(sorted([match.market_a.id, match.market_b.id]))
+            if pair in seen_pairs:
+                continue
+            seen_pairs.add(pair)
+            spread = abs(match.market_a.probability - match.market_b.probability)
+            if spread >= min_spread:
+                direction = ("buy_a_sell_b" if match.market_a.probability < match.market_b.probability
+                             else "buy_b_sell_a")
+                opportunities.append((match.market_a.id, match.market_b.id, spread,
+                                      match.confidence, direction))
+    opportunities.sort(key=lambda o: o[2], reverse=True)
+    return opportunities
+
+
+def legacy_compare_platforms(markets, min_match_confidence=0.5):
+    comparisons = []
+    processed = set()
+    for target in markets:
+        if target.id in processed:
+            continue
+        processed.add(target.id)
+        candidates = [m for m in markets if m.id != target.id and m.id not in processed]
+        matches = legacy_find_matches(target, candidates, min_match_confidence)
+        if matches:
+            platforms = {target.platform: {"probability": target.probability, "url": target.url}}
+            probs = [target.probability]
+            for match in matches:
+                processed.add(match.market_b.id)
+                platforms[match.market_b.platform] = {
+                    "probability": match.market_b.probability, "url": match.market_b.url}
+                probs.append(match.market_b.probability)
+            comparisons.append({"title": target.title, "platforms": platforms,
+                                "max_spread": max(probs) - min(probs)})
+    return {"comparisons": comparisons}
+
+
+# ---------------------------------------------------------------------------
+
+def indexed_find_arbitrage(markets, min_match_confidence):
+    detector = ArbitrageDetector(MarketMatcher())
+    return [(o.market_a.id, o.market_b.id, o.spread, o.match_confidence, o.direction)
+            for o in detector.find_arbitrage(markets, min_match_confidence=min_match_confidence)]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sizes", default="1000,10000,50000")
+    ap.add_argument("--legacy-max", type=int, default=2000)
+    ap.add_argument("--min-confidence", type=float, default=0.5)
+    args = ap.parse_args()
+    t = args.min_confidence
+
+    print(f"min_match_confidence={t}")
+    print(f"{'markets':>8} {'op':<18} {'legacy s':>10} {'indexed s':>10} {'speedup':>8}  results")
+    for n in (int(x) for x in args.sizes.split(",")):
+        markets = make_markets(n, seed=n)
+        cases = [
+            ("find_arbitrage", lambda: legacy_find_arbitrage(markets, min_match_confidence=t),
+             lambda: indexed_find_arbitrage(markets, t)),
+            ("compare_platforms", lambda: legacy_compare_platforms(markets, t),
+             lambda: ArbitrageDetector(MarketMatcher()).compare_platforms(markets, t)),
+        ]
+        for name, legacy, indexed in cases:
+            t_idx, got = timed(indexed)
+            count = len(got) if isinstance(got, list) else len(got["comparisons"])
+            if n <= args.legacy_max:
+                t_old, want = timed(legacy)
+                if want != got:
+                    sys.exit(f"MISMATCH in {name} at {n} markets")
+                print(f"{n:>8} {name:<18} {t_old:>10.3f} {t_idx:>10.3f} {t_old / t_idx:>7.1f}x  {count}")
+            else:
+                print(f"{n:>8} {name:<18} {'-':>10} {t_idx:>10.3f} {'':>8}  {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,14 @@ from mcp_predictive_market.schema import Market
 
 @runtime_checkable
 class PlatformAdapter(Protocol):
-    """Protocol that all platform adapters must implement."""
+    """Protocol that all platform adapters must implement.
+
+    Adapters whose platform has a bulk or list-by-id endpoint may also
+    implement ``async get_markets(native_ids: list[str]) -> list[Market]``,
+    returning the markets found (missing IDs left out) in one request, and
+    set ``BATCH_SIZE`` to the most IDs a request may carry. Use
+    ``batch.fetch_markets`` to fetch several markets from any adapter.
+    """
 
     platform: str
 
@@ -11,6 +11,8 @@ class KalshiAdapter:
 
     platform = "kalshi"
     BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
+    # Max tickers per get_markets request
+    BATCH_SIZE = 100
 
     # Known categories from Kalshi (normalized to lowercase)
     CATEGORIES = [
@@ -34,6 +36,14 @@ class KalshiAdapter:
         data = response.json()
         return self._parse_market(data["market"])
 
+    async def get_markets(self, native_ids: list[str]) -> list[Market]:
+        """Get several markets by ticker in one request (missing tickers are left out)."""
+        params = {"tickers": ",".join(native_ids), "limit": len(native_ids)}
+        response = await self._client.get(f"{self.BASE_URL}/markets", params=params)
+        response.raise_for_status()
+        data = response.json()
+        return [self._parse_market(m) for m in data.get("markets", [])]
+
     async def search_markets(
         self, query: str, category: str | None = None
     ) -> list[Market]:
@@ -11,6 +11,8 @@ class PolymarketAdapter:
 
     platform = "polymarket"
     BASE_URL = "https://gamma-api.polymarket.com"
+    # Max IDs per get_markets request
+    BATCH_SIZE = 50
 
     CATEGORY_MAP = {
         "politics": "politics",
@@ -37,6 +39,15 @@ class PolymarketAdapter:
         data = response.json()
         return self._parse_market(data)
 
+    async def get_markets(self, native_ids: list[str]) -> list[Market]:
+        """Get several markets by ID in one request (missing IDs are left out)."""
+        params = [("id", native_id) for native_id in native_ids]
+        params.append(("limit", len(native_ids)))
+        response = await self._client.get(f"{self.BASE_URL}/markets", params=params)
+        response.raise_for_status()
+        data = response.json()
+        return [self._parse_market(m) for m in data]
+
     async def search_markets(
         self, query: str, category: str | None = None
     ) -> list[Market]:
@@ -23,6 +23,19 @@ class PredictItAdapter:
         data = response.json()
         return self._parse_market(data)
 
+    async def get_markets(self, native_ids: list[str]) -> list[Market]:
+        """Get several markets from the all-markets feed (missing IDs are left out)."""
+        response = await self._client.get(f"{self.BASE_URL}/all/")
+        response.raise_for_status()
+        data = response.json()
+
+        wanted = set(native_ids)
+        return [
+            self._parse_market(m)
+            for m in data.get("markets", [])
+            if str(m.get("id")) in wanted
+        ]
+
     async def search_markets(
         self, query: str, category: str | None = None
     ) -> list[Market]:
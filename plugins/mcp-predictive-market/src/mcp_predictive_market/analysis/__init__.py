@@ -4,6 +4,12 @@ from mcp_predictive_market.analysis.arbitrage import (
     ArbitrageDetector,
     ArbitrageOpportunity,
 )
-from mcp_predictive_market.analysis.matching import MarketMatcher, MatchResult
+from mcp_predictive_market.analysis.matching import MarketMatcher, MatchIndex, MatchResult
 
-__all__ = ["ArbitrageDetector", "ArbitrageOpportunity", "MarketMatcher", "MatchResult"]
+__all__ = [
+    "ArbitrageDetector",
+    "ArbitrageOpportunity",
+    "MarketMatcher",
+    "MatchIndex",
+    "MatchResult",
+]
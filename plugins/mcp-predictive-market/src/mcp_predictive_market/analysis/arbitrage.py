@@ -2,7 +2,7 @@
 from dataclasses import dataclass
 
 from mcp_predictive_market.schema import Market
-from mcp_predictive_market.analysis.matching import MarketMatcher, MatchResult
+from mcp_predictive_market.analysis.matching import MarketMatcher
 
 
 @dataclass
@@ -40,40 +40,30 @@ class ArbitrageDetector:
             List of arbitrage opportunities, sorted by spread (highest first)
         """
         opportunities = []
-        seen_pairs: set[tuple[str, str]] = set()
+        index = self._matcher.build_index(markets)
 
-        for target in markets:
-            # Get other markets as candidates
-            candidates = [m for m in markets if m.id != target.id]
-
-            # Find matches
-            matches = self._matcher.find_matches(
-                target, candidates, min_confidence=min_match_confidence
-            )
-
-            for match in matches:
-                # Skip if we've seen this pair already
-                pair = tuple(sorted([match.market_a.id, match.market_b.id]))
-                if pair in seen_pairs:
-                    continue
-                seen_pairs.add(pair)
+        # Each matching pair once, from the earlier market's side
+        for i, matches in enumerate(index.later_matches(min_match_confidence)):
+            market_a = index.markets[i]
+            for j, confidence, _ in matches:
+                market_b = index.markets[j]
 
                 # Calculate spread
-                spread = abs(match.market_a.probability - match.market_b.probability)
+                spread = abs(market_a.probability - market_b.probability)
 
                 if spread >= min_spread:
                     # Determine direction
-                    if match.market_a.probability < match.market_b.probability:
+                    if market_a.probability < market_b.probability:
                         direction = "buy_a_sell_b"
                     else:
                         direction = "buy_b_sell_a"
 
                     opportunities.append(
                         ArbitrageOpportunity(
-                            market_a=match.market_a,
-                            market_b=match.market_b,
+                            market_a=market_a,
+                            market_b=market_b,
                             spread=spread,
-                            match_confidence=match.confidence,
+                            match_confidence=confidence,
                             direction=direction,
                         )
                     )
@@ -105,19 +95,16 @@ class ArbitrageDetector:
         """
         # Group markets by match
         comparisons = []
-        processed: set[str] = set()
+        processed: set[int] = set()
+        index = self._matcher.build_index(markets)
 
-        for target in markets:
-            if target.id in processed:
+        for i, matches in enumerate(index.later_matches(min_match_confidence)):
+            if i in processed:
                 continue
 
-            processed.add(target.id)
-            candidates = [
-                m for m in markets if m.id != target.id and m.id not in processed
-            ]
-            matches = self._matcher.find_matches(
-                target, candidates, min_confidence=min_match_confidence
-            )
+            processed.add(i)
+            target = index.markets[i]
+            matches = [m for m in matches if m[0] not in processed]
 
             if matches:
                 platforms = {
@@ -128,13 +115,14 @@ class ArbitrageDetector:
                 }
                 probs = [target.probability]
 
-                for match in matches:
-                    processed.add(match.market_b.id)
-                    platforms[match.market_b.platform] = {
-                        "probability": match.market_b.probability,
-                        "url": match.market_b.url,
+                for j, _, _ in matches:
+                    processed.add(j)
+                    market_b = index.markets[j]
+                    platforms[market_b.platform] = {
+                        "probability": market_b.probability,
+                        "url": market_b.url,
                     }
-                    probs.append(match.market_b.probability)
+                    probs.append(market_b.probability)
 
                 comparisons.append(
                     {
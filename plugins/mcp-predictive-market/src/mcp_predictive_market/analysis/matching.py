@@ -1,9 +1,29 @@
 """Market matching logic for finding similar markets across platforms."""
+import math
 import re
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 
 from mcp_predictive_market.schema import Market
 
+STOP_WORDS = frozenset({"will", "the", "a", "an", "by", "in", "on", "to", "be", "is", "of"})
+
+
+@lru_cache(maxsize=65536)
+def title_tokens(text: str) -> frozenset[str]:
+    """Lowercased words of a title, punctuation and stop words removed."""
+    return frozenset(re.sub(r"[^\w\s]", "", text.lower()).split()) - STOP_WORDS
+
+
+def jaccard(words_a: frozenset[str], words_b: frozenset[str]) -> float:
+    """Jaccard similarity of two token sets (0.0 if either is empty)."""
+    if not words_a or not words_b:
+        return 0.0
+    intersection = len(words_a & words_b)
+    union = len(words_a | words_b)
+    return intersection / union if union > 0 else 0.0
+
 
 @dataclass
 class MatchResult:
@@ -79,24 +99,127 @@ class MarketMatcher:
 
     def _text_similarity(self, text_a: str, text_b: str) -> float:
         """Calculate simple text similarity between two strings."""
-        # Normalize: lowercase and remove punctuation
-        text_a_clean = re.sub(r"[^\w\s]", "", text_a.lower())
-        text_b_clean = re.sub(r"[^\w\s]", "", text_b.lower())
-
-        # Tokenize
-        words_a = set(text_a_clean.split())
-        words_b = set(text_b_clean.split())
-
-        # Remove common stop words
-        stop_words = {"will", "the", "a", "an", "by", "in", "on", "to", "be", "is", "of"}
-        words_a -= stop_words
-        words_b -= stop_words
-
-        if not words_a or not words_b:
-            return 0.0
-
-        # Jaccard similarity
-        intersection = len(words_a & words_b)
-        union = len(words_a | words_b)
-
-        return intersection / union if union > 0 else 0.0
+        return jaccard(title_tokens(text_a), title_tokens(text_b))
+
+    def build_index(self, markets: list[Market]) -> "MatchIndex":
+        """Index markets for finding all matching pairs at once."""
+        return MatchIndex(self, markets)
+
+
+class MatchIndex:
+    """All-pairs matching over a fixed list of markets.
+
+    Calling find_matches for every market against every other is O(n²)
+    similarity checks. The index tokenizes each title once and only scores
+    pairs that can reach ``min_confidence``: tokens are ordered rarest
+    first, and two titles with Jaccard >= t must share a token among the
+    first ``|x| - ceil(t·|x|) + 1`` tokens of each (prefix filtering), with
+    sizes within a factor of t. Candidates come from an inverted index over
+    those prefixes (titles are indexed shortest first, so the indexed prefix
+    can be shorter still) and are dropped once the tokens left after the
+    shared positions can't make up the required overlap (positional
+    filtering).
+    Survivors get their exact Jaccard computed as before, so the matches are
+    the same as find_matches would return.
+
+    Markets are deduplicated by id (first occurrence kept), mirroring how
+    find_matches skips candidates with the target's id.
+    """
+
+    def __init__(self, matcher: MarketMatcher, markets: list[Market]) -> None:
+        self._matcher = matcher
+        seen: set[str] = set()
+        self.markets: list[Market] = []
+        for market in markets:
+            if market.id not in seen:
+                seen.add(market.id)
+                self.markets.append(market)
+        self._tokens = [title_tokens(m.title) for m in self.markets]
+        self._pairs: dict[float, list[list[tuple[int, float, str]]]] = {}
+
+    def later_matches(self, min_confidence: float = 0.5) -> list[list[tuple[int, float, str]]]:
+        """For each market i, its matches j > i as (j, confidence, match_type).
+
+        Each list is sorted the way find_matches sorts: confidence
+        descending, ties in market order.
+        """
+        if min_confidence not in self._pairs:
+            pairs: list[list[tuple[int, float, str]]] = [[] for _ in self.markets]
+            for i, j, confidence, match_type in self._scored_pairs(min_confidence):
+                pairs[i].append((j, confidence, match_type))
+            for matches in pairs:
+                matches.sort(key=lambda m: (-m[1], m[0]))
+            self._pairs[min_confidence] = pairs
+        return self._pairs[min_confidence]
+
+    def _scored_pairs(self, t: float):
+        manual: set[tuple[int, int]] = set()
+        position = {m.id: i for i, m in enumerate(self.markets)}
+        for i, market in enumerate(self.markets):
+            for other_id in self._matcher._manual_mappings.get(market.id, ()):
+                j = position.get(other_id)
+                if j is not None and j > i:
+                    manual.add((i, j))
+                    yield i, j, 1.0, "manual"
+
+        for i, j in self._candidates(t):
+            if (i, j) in manual:
+                continue
+            confidence = jaccard(self._tokens[i], self._tokens[j])
+            if confidence >= t:
+                yield i, j, confidence, "text"
+
+    def _candidates(self, t: float):
+        """Pairs (i, j), i < j, that may have Jaccard >= t."""
+        n = len(self.markets)
+        if t <= 0:
+            # Every pair qualifies, including empty titles (similarity 0.0).
+            for i in range(n):
+                for j in range(i + 1, n):
+                    yield i, j
+            return
+
+        frequency: dict[str, int] = defaultdict(int)
+        for tokens in self._tokens:
+            for token in tokens:
+                frequency[token] += 1
+        # Epsilon so float error (0.7 * 10 = 7.000000000000001) can only
+        # loosen a bound, never drop a true match.
+        eps = 1e-9
+        required = t / (1 + t)  # Jaccard >= t  <=>  overlap >= t/(1+t)·(|x|+|y|)
+        index: dict[str, list[tuple[int, int, int]]] = defaultdict(list)  # (i, position, size)
+        # Shortest titles first: everything already indexed is no longer than
+        # the title probing it, so the indexed prefix can be shorter.
+        for j in sorted(range(n), key=lambda k: len(self._tokens[k])):
+            tokens = self._tokens[j]
+            size = len(tokens)
+            probe_len = size - math.ceil(t * size - eps) + 1
+            if probe_len <= 0:
+                continue
+            index_len = size - math.ceil(2 * required * size - eps) + 1
+            min_other = t * size - eps
+            ordered = sorted(tokens, key=lambda tok: (frequency[tok], tok))
+            # overlap[i]: shared tokens seen so far, or -1 once pruned.
+            overlap: dict[int, int] = {}
+            for p, token in enumerate(ordered[:probe_len]):
+                left = size - p - 1
+                for i, q, other in index[token]:
+                    seen = overlap.get(i, 0)
+                    if seen < 0:
+                        continue
+                    if other < min_other:
+                        overlap[i] = -1
+                        continue
+                    # Positional filter: tokens are in one global order, so
+                    # at most min(remaining in each) more can be shared.
+                    other_left = other - q - 1
+                    bound = seen + 1 + (left if left < other_left else other_left)
+                    if bound < required * (size + other) - eps:
+                        overlap[i] = -1
+                    else:
+                        overlap[i] = seen + 1
+                if p < index_len:
+                    index[token].append((j, p, size))
+            for i, seen in overlap.items():
+                if seen > 0:
+                    yield min(i, j), max(i, j)
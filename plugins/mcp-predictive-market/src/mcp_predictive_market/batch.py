@@ -0,0 +1,89 @@
+"""Fetching many markets from one platform.
+
+``fetch_markets`` uses the adapter's optional bulk ``get_markets`` (in
+chunks of its ``BATCH_SIZE``) and otherwise falls back to single
+``get_market`` calls with bounded concurrency, so refreshing N markets costs
+ceil(N / BATCH_SIZE) requests where the platform allows it and never more
+than DEFAULT_CONCURRENCY requests in flight where it doesn't.
+"""
+import asyncio
+import inspect
+from collections.abc import Iterable
+
+from mcp_predictive_market.adapters.base import PlatformAdapter
+from mcp_predictive_market.errors import PlatformError
+from mcp_predictive_market.rate_limiter import Priority, RateLimiter
+from mcp_predictive_market.schema import Market
+
+DEFAULT_CONCURRENCY = 4
+
+
+def supports_batch(adapter: PlatformAdapter) -> bool:
+    """True if adapter implements the optional bulk get_markets."""
+    return inspect.iscoroutinefunction(getattr(adapter, "get_markets", None))
+
+
+async def fetch_markets(
+    adapter: PlatformAdapter,
+    native_ids: Iterable[str],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limiter: RateLimiter | None = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> dict[str, Market | Exception]:
+    """Fetch markets by native ID from one platform.
+
+    Args:
+        adapter: The platform's adapter.
+        native_ids: IDs to fetch (duplicates are fetched once).
+        concurrency: Most requests in flight at once.
+        rate_limiter: If given, a token is acquired before every request,
+            and throttling responses make it back off. Ignored for an
+            adapter with a ``rate_limiter`` of its own (a CachedAdapter),
+            which takes tokens only for what it doesn't have cached.
+        priority: Rate limiter lane for the requests.
+
+    Returns:
+        Native ID -> Market, or the exception that fetching it raised (a
+        PlatformError for IDs a bulk request didn't return), in input order.
+    """
+    ids = list(dict.fromkeys(native_ids))
+    if getattr(adapter, "rate_limiter", None) is not None:
+        rate_limiter = None
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(call):
+        async with semaphore:
+            if rate_limiter is not None:
+                await rate_limiter.acquire(adapter.platform, priority)
+            try:
+                return await call()
+            except Exception as e:
+                if rate_limiter is not None:
+                    rate_limiter.observe_error(adapter.platform, e)
+                raise
+
+    if not supports_batch(adapter):
+        outcomes = await asyncio.gather(
+            *(request(lambda i=i: adapter.get_market(i)) for i in ids),
+            return_exceptions=True,
+        )
+        return dict(zip(ids, outcomes))
+
+    size = getattr(adapter, "BATCH_SIZE", None) or len(ids) or 1
+    chunks = [ids[i:i + size] for i in range(0, len(ids), size)]
+    outcomes = await asyncio.gather(
+        *(request(lambda c=c: adapter.get_markets(c)) for c in chunks),
+        return_exceptions=True,
+    )
+
+    found: dict[str, Market | Exception] = {}
+    for chunk, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, BaseException):
+            found.update(dict.fromkeys(chunk, outcome))
+        else:
+            found.update((m.native_id, m) for m in outcome)
+    return {
+        i: found.get(i) or PlatformError(adapter.platform, f"Market not found: {i}")
+        for i in ids
+    }
@@ -0,0 +1,362 @@
+"""In-process caching of platform adapter calls.
+
+Every tool call used to hit the remote APIs, and polling ``get_tracked_markets``
+re-fetched every market each time. ``CachedAdapter`` wraps a
+``PlatformAdapter`` and answers from a shared ``TTLCache``:
+
+- entries are fresh for a per-platform TTL and served as-is;
+- after that they stay usable for a stale window: the stale value is
+  returned immediately and one background refresh is started
+  (stale-while-revalidate);
+- concurrent identical calls share one in-flight fetch (request coalescing);
+- the cache is a bounded LRU, and can be saved to and loaded from a JSON
+  snapshot so a restarted server starts warm.
+
+Failed fetches are never cached; a failed background refresh keeps the stale
+value until the stale window ends. Given a rate limiter, a ``CachedAdapter``
+takes a token only for requests it actually sends, so cache hits neither
+spend tokens nor wait for them.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from mcp_predictive_market.adapters.base import PlatformAdapter
+from mcp_predictive_market.batch import supports_batch
+from mcp_predictive_market.rate_limiter import RateLimiter
+from mcp_predictive_market.schema import Market
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long a platform's results are fresh, then usable while stale.
+
+    Attributes:
+        ttl: Seconds a result is served without refetching.
+        stale: Further seconds a result may be served while it is refreshed
+            in the background.
+    """
+
+    ttl: float
+    stale: float
+
+
+# Market prices move; category lists barely do.
+DEFAULT_POLICIES = {
+    "kalshi": CachePolicy(ttl=30.0, stale=120.0),
+    "polymarket": CachePolicy(ttl=30.0, stale=120.0),
+    "predictit": CachePolicy(ttl=60.0, stale=240.0),
+    "manifold": CachePolicy(ttl=60.0, stale=240.0),
+    "metaculus": CachePolicy(ttl=300.0, stale=900.0),
+}
+DEFAULT_POLICY = CachePolicy(ttl=60.0, stale=240.0)
+CATEGORIES_POLICY = CachePolicy(ttl=3600.0, stale=86400.0)
+
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float  # cache clock
+    policy: CachePolicy
+
+
+class TTLCache:
+    """Bounded async LRU cache with TTL, stale-while-revalidate and
+    request coalescing."""
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Least recently used entries are evicted past this.
+            clock: Monotonic time source in seconds (for tests).
+        """
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refresh_errors": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+        policy: CachePolicy,
+    ) -> T:
+        """Return the cached value for key, fetching it if needed.
+
+        Args:
+            key: Cache key (include the platform and call arguments).
+            fetch: Coroutine function producing the value.
+            policy: Freshness policy stored with a newly fetched value.
+
+        Returns:
+            The fresh or stale cached value, or the newly fetched one.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.fetched_at
+            if age <= entry.policy.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry.value
+            if age <= entry.policy.ttl + entry.policy.stale:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch, policy, background=True)
+                return entry.value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = self._start_fetch(key, fetch, policy)
+        # Shielded: a caller that gives up (e.g. a fan-out timeout) doesn't
+        # cancel the fetch other callers are waiting on.
+        return await asyncio.shield(task)
+
+    def _start_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        policy: CachePolicy,
+        background: bool = False,
+    ) -> asyncio.Task:
+        async def run() -> Any:
+            value = await fetch()
+            self.put(key, value, policy)
+            return value
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+
+        def done(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            # Retrieve the exception so one nobody awaited isn't logged.
+            if not t.cancelled() and t.exception() is not None and background:
+                self.stats["refresh_errors"] += 1
+
+        task.add_done_callback(done)
+        return task
+
+    def get_fresh(self, key: Hashable) -> Any | None:
+        """The value for key if it is within its TTL, else None."""
+        entry = self._entries.get(key)
+        if entry is None or self._clock() - entry.fetched_at > entry.policy.ttl:
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, policy: CachePolicy, fetched_at: float | None = None) -> None:
+        """Store value under key, evicting least recently used entries."""
+        self._entries[key] = _Entry(value, self._clock() if fetched_at is None else fetched_at, policy)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def save_snapshot(self, path: str) -> int:
+        """Write unexpired entries to a JSON file; returns how many.
+
+        Only entries with JSON-representable keys and Market / list values
+        are written. The file is replaced atomically.
+        """
+        now_clock, now_wall = self._clock(), time.time()
+        entries = []
+        for key, entry in self._entries.items():
+            age = now_clock - entry.fetched_at
+            if age > entry.policy.ttl + entry.policy.stale:
+                continue
+            encoded = _encode(entry.value)
+            if encoded is None or not isinstance(key, tuple):
+                continue
+            entries.append({
+                "key": list(key),
+                "value": encoded,
+                "fetched_at": now_wall - age,
+                "ttl": entry.policy.ttl,
+                "stale": entry.policy.stale,
+            })
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "entries": entries}, f)
+        os.replace(tmp, path)
+        return len(entries)
+
+    def load_snapshot(self, path: str) -> int:
+        """Load entries saved by save_snapshot; returns how many were usable.
+
+        A missing, unreadable or incompatible file loads nothing.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return 0
+        now_clock, now_wall = self._clock(), time.time()
+        loaded = 0
+        for item in data.get("entries", []):
+            try:
+                policy = CachePolicy(ttl=float(item["ttl"]), stale=float(item["stale"]))
+                age = now_wall - float(item["fetched_at"])
+                if age > policy.ttl + policy.stale:
+                    continue
+                value = _decode(item["value"])
+                key = tuple(item["key"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.put(key, value, policy, fetched_at=now_clock - max(age, 0.0))
+            loaded += 1
+        return loaded
+
+
+def _encode(value: Any) -> dict | None:
+    if isinstance(value, Market):
+        return {"market": value.model_dump(mode="json")}
+    if isinstance(value, list):
+        if all(isinstance(v, Market) for v in value):
+            return {"markets": [v.model_dump(mode="json") for v in value]}
+        if all(isinstance(v, str) for v in value):
+            return {"strings": value}
+    return None
+
+
+def _decode(data: dict) -> Any:
+    if "market" in data:
+        return Market.model_validate(data["market"])
+    if "markets" in data:
+        return [Market.model_validate(m) for m in data["markets"]]
+    return list(data["strings"])
+
+
+class CachedAdapter:
+    """A PlatformAdapter that answers from a shared TTLCache.
+
+    Markets returned by search_markets and browse_category also refresh the
+    get_market entry for each market, so tracking or quoting a market just
+    seen in a search doesn't cost another request.
+    """
+
+    def __init__(
+        self,
+        adapter: PlatformAdapter,
+        cache: TTLCache,
+        policy: CachePolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        """Wrap adapter.
+
+        Args:
+            adapter: The adapter to cache.
+            cache: Cache shared with other platforms' adapters.
+            policy: Freshness policy; defaults to DEFAULT_POLICIES for the
+                platform.
+            rate_limiter: If given, a token is acquired before each request
+                to the platform (not for cache hits), and throttling
+                responses make it back off. fan_out and fetch_markets then
+                leave rate limiting to this adapter.
+        """
+        self._adapter = adapter
+        self._cache = cache
+        self.rate_limiter = rate_limiter
+        self.platform = adapter.platform
+        self._policy = policy or DEFAULT_POLICIES.get(self.platform, DEFAULT_POLICY)
+        # Only offer the optional bulk method if the adapter has one.
+        if supports_batch(adapter):
+            self.get_markets = self._get_markets
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything not cached (close(), BASE_URL, ...) goes to the adapter.
+        return getattr(self._adapter, name)
+
+    async def _request(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Send a request to the platform, rate limited if configured."""
+        if self.rate_limiter is None:
+            return await call()
+        await self.rate_limiter.acquire(self.platform)
+        try:
+            return await call()
+        except Exception as e:
+            self.rate_limiter.observe_error(self.platform, e)
+            raise
+
+    def remember(self, markets: list[Market]) -> list[Market]:
+        """Store markets fetched elsewhere as this adapter's get_market results."""
+        for market in markets:
+            self._cache.put((self.platform, "get_market", market.native_id), market, self._policy)
+        return markets
+
+    async def search_markets(self, query: str, category: str | None = None) -> list[Market]:
+        """Search for markets matching a query."""
+        async def fetch() -> list[Market]:
+            return self.remember(
+                await self._request(lambda: self._adapter.search_markets(query, category))
+            )
+
+        return await self._cache.get_or_fetch(
+            (self.platform, "search_markets", query, category), fetch, self._policy
+        )
+
+    async def get_market(self, native_id: str) -> Market:
+        """Get a specific market by its native ID."""
+        return await self._cache.get_or_fetch(
+            (self.platform, "get_market", native_id),
+            lambda: self._request(lambda: self._adapter.get_market(native_id)),
+            self._policy,
+        )
+
+    async def _get_markets(self, native_ids: list[str]) -> list[Market]:
+        """Get several markets, fetching only those not fresh in the cache."""
+        markets, missing = [], []
+        for native_id in native_ids:
+            market = self._cache.get_fresh((self.platform, "get_market", native_id))
+            if market is None:
+                missing.append(native_id)
+            else:
+                markets.append(market)
+        if missing:
+            markets.extend(
+                self.remember(await self._request(lambda: self._adapter.get_markets(missing)))
+            )
+        return markets
+
+    async def list_categories(self) -> list[str]:
+        """List available market categories."""
+        return await self._cache.get_or_fetch(
+            (self.platform, "list_categories"),
+            lambda: self._request(self._adapter.list_categories),
+            CATEGORIES_POLICY,
+        )
+
+    async def browse_category(self, category: str, limit: int = 20) -> list[Market]:
+        """Browse markets in a specific category."""
+        async def fetch() -> list[Market]:
+            return self.remember(
+                await self._request(lambda: self._adapter.browse_category(category, limit))
+            )
+
+        return await self._cache.get_or_fetch(
+            (self.platform, "browse_category", category, limit), fetch, self._policy
+        )
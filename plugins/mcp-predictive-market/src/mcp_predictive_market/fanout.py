@@ -0,0 +1,101 @@
+"""Concurrent fan-out of one call across platform adapters."""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+from mcp_predictive_market.adapters.base import PlatformAdapter
+from mcp_predictive_market.rate_limiter import RateLimiter
+
+T = TypeVar("T")
+
+# Seconds a single platform may take (including any rate-limit wait) before
+# it is reported as an error and left out of the results.
+DEFAULT_PLATFORM_TIMEOUT = 10.0
+
+
+class PlatformTimeout(Exception):
+    """A platform did not answer within its fan-out timeout."""
+
+
+@dataclass
+class FanoutResult(Generic[T]):
+    """Per-platform outcome of a fan-out.
+
+    Attributes:
+        results: Platform name -> return value, for platforms that succeeded,
+            in adapter order.
+        errors: ``{"platform", "error"}`` dicts for platforms that raised or
+            timed out, in adapter order.
+        latency_ms: Platform name -> wall time in milliseconds, for every
+            platform queried (timed-out platforms report the timeout).
+    """
+
+    results: dict[str, T] = field(default_factory=dict)
+    errors: list[dict[str, str]] = field(default_factory=list)
+    latency_ms: dict[str, float] = field(default_factory=dict)
+
+
+async def fan_out(
+    adapters: Mapping[str, PlatformAdapter],
+    call: Callable[[PlatformAdapter], Awaitable[T]],
+    *,
+    timeout: float | None = DEFAULT_PLATFORM_TIMEOUT,
+    timeouts: Mapping[str, float] | None = None,
+    rate_limiter: RateLimiter | None = None,
+) -> FanoutResult[T]:
+    """Run ``call(adapter)`` for every adapter concurrently.
+
+    Total latency is that of the slowest platform (bounded by its timeout)
+    rather than the sum of all of them. A platform that raises or exceeds
+    its timeout is reported in ``errors`` and the others are still returned.
+
+    Args:
+        adapters: Platform name -> adapter.
+        call: Coroutine function to run against each adapter.
+        timeout: Default per-platform timeout in seconds; None for no limit.
+        timeouts: Per-platform overrides of ``timeout``.
+        rate_limiter: If given, a token is acquired for each platform before
+            calling it (the wait counts toward that platform's timeout), and
+            429 / 503 responses make it back off. Adapters with a
+            ``rate_limiter`` of their own (a CachedAdapter) are left to it,
+            so cached answers don't take tokens.
+
+    Returns:
+        FanoutResult with results, errors and per-platform latency.
+    """
+    timeouts = timeouts or {}
+
+    async def run(name: str, adapter: PlatformAdapter) -> T:
+        if rate_limiter is None or getattr(adapter, "rate_limiter", None) is not None:
+            return await call(adapter)
+        await rate_limiter.acquire(name)
+        try:
+            return await call(adapter)
+        except Exception as e:
+            rate_limiter.observe_error(name, e)
+            raise
+
+    async def timed(name: str, adapter: PlatformAdapter) -> tuple[Any, float]:
+        limit = timeouts.get(name, timeout)
+        start = time.perf_counter()
+        try:
+            value: Any = await asyncio.wait_for(run(name, adapter), limit)
+        except asyncio.TimeoutError:
+            value = PlatformTimeout(f"timed out after {limit:g}s")
+        except Exception as e:
+            value = e
+        return value, (time.perf_counter() - start) * 1000
+
+    names = list(adapters)
+    outcomes = await asyncio.gather(*(timed(name, adapters[name]) for name in names))
+
+    result: FanoutResult[T] = FanoutResult()
+    for name, (value, elapsed_ms) in zip(names, outcomes):
+        result.latency_ms[name] = round(elapsed_ms, 1)
+        if isinstance(value, Exception):
+            result.errors.append({"platform": name, "error": str(value)})
+        else:
+            result.results[name] = value
+    return result
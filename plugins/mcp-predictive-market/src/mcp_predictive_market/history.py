@@ -0,0 +1,196 @@
+"""In-memory price history for tracked markets.
+
+Each market's history is two parallel ``array('d')`` columns (timestamps in
+epoch seconds and probabilities), 16 bytes a point instead of a PricePoint
+object per sample. Points are kept at full resolution for ``raw_window``
+seconds; older points are downsampled to the last point of each ``bucket``
+and dropped after ``max_age``. Compaction runs at most once per bucket per
+market, as points are recorded.
+"""
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from mcp_predictive_market.schema import Market, PricePoint
+
+DEFAULT_RAW_WINDOW = 24 * 3600.0
+DEFAULT_BUCKET = 3600.0
+DEFAULT_MAX_AGE = 30 * 24 * 3600.0
+
+
+class _Series:
+    __slots__ = ("times", "probs", "compacted_at")
+
+    def __init__(self) -> None:
+        self.times = array("d")
+        self.probs = array("d")
+        self.compacted_at = 0.0
+
+
+def _timestamp(value: datetime | float) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def _point(t: float, p: float) -> PricePoint:
+    return PricePoint(timestamp=datetime.fromtimestamp(t, timezone.utc), probability=p)
+
+
+class PriceHistory:
+    """Append-mostly time series of market probabilities."""
+
+    def __init__(
+        self,
+        raw_window: float = DEFAULT_RAW_WINDOW,
+        bucket: float = DEFAULT_BUCKET,
+        max_age: float = DEFAULT_MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize an empty history.
+
+        Args:
+            raw_window: Seconds of most recent points kept at full resolution.
+            bucket: Seconds per downsampled point beyond raw_window.
+            max_age: Points older than this many seconds are dropped.
+            clock: Wall-clock time source in epoch seconds (for tests).
+        """
+        self._raw_window = raw_window
+        self._bucket = bucket
+        self._max_age = max_age
+        self._clock = clock
+        self._series: dict[str, _Series] = {}
+
+    def __len__(self) -> int:
+        """Total number of stored points."""
+        return sum(len(s.times) for s in self._series.values())
+
+    def __contains__(self, market_id: str) -> bool:
+        return market_id in self._series
+
+    def market_ids(self) -> list[str]:
+        """IDs of markets with recorded points."""
+        return list(self._series)
+
+    def record(self, market_id: str, timestamp: datetime | float, probability: float) -> None:
+        """Record one point.
+
+        A point older than the market's latest one is ignored (a slower,
+        earlier fetch finishing late); one at the same time replaces it.
+
+        Args:
+            market_id: Unified market ID (platform:native_id).
+            timestamp: When the probability was observed.
+            probability: Observed probability.
+        """
+        t = _timestamp(timestamp)
+        series = self._series.get(market_id)
+        if series is None:
+            series = self._series[market_id] = _Series()
+            series.compacted_at = t
+        times = series.times
+        if times and t <= times[-1]:
+            if t == times[-1]:
+                series.probs[-1] = probability
+            return
+        times.append(t)
+        series.probs.append(probability)
+        if t - series.compacted_at >= self._bucket:
+            self._compact(series, t)
+
+    def record_market(self, market: Market) -> None:
+        """Record a fetched market's probability at its fetch time."""
+        self.record(market.id, market.last_fetched, market.probability)
+
+    def _compact(self, series: _Series, now: float) -> None:
+        times, probs = series.times, series.probs
+        lo = bisect_left(times, now - self._max_age)
+        k = bisect_left(times, now - self._raw_window)
+        bucket = self._bucket
+        kept_t, kept_p = array("d"), array("d")
+        for i in range(lo, k):
+            # Keep the last point of each bucket.
+            if i == k - 1 or times[i] // bucket != times[i + 1] // bucket:
+                kept_t.append(times[i])
+                kept_p.append(probs[i])
+        if lo or len(kept_t) != k:
+            series.times = kept_t + times[k:]
+            series.probs = kept_p + probs[k:]
+        series.compacted_at = now
+
+    def points(
+        self,
+        market_id: str,
+        since: datetime | float | None = None,
+        until: datetime | float | None = None,
+        max_points: int | None = None,
+    ) -> list[PricePoint]:
+        """Recorded points for a market, oldest first.
+
+        Args:
+            market_id: Unified market ID.
+            since: Only points at or after this time.
+            until: Only points at or before this time.
+            max_points: If more points match, return the last point of each
+                of max_points equal time slices instead.
+
+        Returns:
+            PricePoints (empty for an unknown market).
+        """
+        series = self._series.get(market_id)
+        if series is None:
+            return []
+        times, probs = series.times, series.probs
+        lo = 0 if since is None else bisect_left(times, _timestamp(since))
+        hi = len(times) if until is None else bisect_right(times, _timestamp(until))
+        indices: Any = range(lo, hi)
+        if max_points is not None and hi - lo > max_points > 0:
+            first, span = times[lo], times[hi - 1] - times[lo]
+            width = span / max_points or 1.0
+            indices = [
+                i for i in range(lo, hi)
+                if i == hi - 1
+                or min(int((times[i] - first) / width), max_points - 1)
+                != min(int((times[i + 1] - first) / width), max_points - 1)
+            ]
+        return [_point(times[i], probs[i]) for i in indices]
+
+    def latest(self, market_id: str) -> PricePoint | None:
+        """The most recent point for a market, if any."""
+        series = self._series.get(market_id)
+        if series is None or not series.times:
+            return None
+        return _point(series.times[-1], series.probs[-1])
+
+    def delta(self, market_id: str, window: float) -> dict[str, Any] | None:
+        """How a market's probability moved over the last window seconds.
+
+        The starting value is the last point at or before the window start,
+        or the oldest point if history doesn't reach back that far.
+
+        Args:
+            market_id: Unified market ID.
+            window: Seconds to look back from now.
+
+        Returns:
+            Dict with current, previous, change, high, low, since (ISO time
+            of the starting point) and points (number in the window), or None
+            if the market has no history.
+        """
+        series = self._series.get(market_id)
+        if series is None or not series.times:
+            return None
+        times, probs = series.times, series.probs
+        start = max(bisect_right(times, self._clock() - window) - 1, 0)
+        window_probs = probs[start:]
+        current, previous = probs[-1], probs[start]
+        return {
+            "current": current,
+            "previous": previous,
+            "change": round(current - previous, 6),
+            "high": max(window_probs),
+            "low": min(window_probs),
+            "since": datetime.fromtimestamp(times[start], timezone.utc).isoformat(),
+            "points": len(window_probs),
+        }
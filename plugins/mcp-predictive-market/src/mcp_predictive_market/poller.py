@@ -0,0 +1,140 @@
+"""Background polling of tracked markets into the price history.
+
+One task per platform re-fetches that platform's tracked markets every
+interval and records each market's probability in a PriceHistory. The
+interval is the configured one, stretched if needed so that polling uses at
+most ``budget_share`` of the platform's RateLimiter budget; the rest is left
+for interactive tool calls.
+"""
+import asyncio
+from collections.abc import Callable, Mapping
+
+from mcp_predictive_market.adapters.base import PlatformAdapter
+from mcp_predictive_market.batch import fetch_markets
+from mcp_predictive_market.history import PriceHistory
+from mcp_predictive_market.rate_limiter import Priority, RateLimiter
+from mcp_predictive_market.schema import Market
+
+# Seconds between polls of a platform's tracked markets.
+DEFAULT_POLL_INTERVALS = {
+    "kalshi": 60.0,
+    "polymarket": 30.0,
+    "predictit": 60.0,
+    "manifold": 60.0,
+    "metaculus": 300.0,
+}
+DEFAULT_POLL_INTERVAL = 60.0
+DEFAULT_BUDGET_SHARE = 0.5
+
+
+class MarketPoller:
+    """Polls tracked markets on per-platform intervals."""
+
+    def __init__(
+        self,
+        adapters: Mapping[str, PlatformAdapter],
+        history: PriceHistory,
+        rate_limiter: RateLimiter | None = None,
+        intervals: Mapping[str, float] | None = None,
+        budget_share: float = DEFAULT_BUDGET_SHARE,
+        on_market: Callable[[Market], None] | None = None,
+    ) -> None:
+        """Initialize the poller (it starts on the first track()).
+
+        Args:
+            adapters: Platform name -> adapter used for polling.
+            history: Where polled probabilities are recorded.
+            rate_limiter: Limiter to acquire from (in the background lane)
+                before each fetch; also bounds the poll interval.
+            intervals: Per-platform poll intervals in seconds, overriding
+                DEFAULT_POLL_INTERVALS.
+            budget_share: Fraction of each platform's rate limit polling may
+                use.
+            on_market: Called with every polled market (e.g. to refresh a
+                cache).
+        """
+        self._adapters = adapters
+        self._history = history
+        self._rate_limiter = rate_limiter
+        self._intervals = {**DEFAULT_POLL_INTERVALS, **(intervals or {})}
+        self._budget_share = budget_share
+        self._on_market = on_market
+        self._tracked: dict[str, set[str]] = {name: set() for name in adapters}
+        self._tasks: list[asyncio.Task] = []
+        self.errors: dict[str, str] = {}  # market_id -> last polling error
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    def track(self, platform: str, native_id: str) -> None:
+        """Poll a market from now on, starting the poller if needed."""
+        if platform not in self._tracked:
+            raise ValueError(f"Unknown platform: {platform}")
+        self._tracked[platform].add(native_id)
+        self.start()
+
+    def untrack(self, platform: str, native_id: str) -> None:
+        """Stop polling a market."""
+        self._tracked.get(platform, set()).discard(native_id)
+
+    def interval(self, platform: str) -> float:
+        """Seconds between polls of platform, given its tracked markets."""
+        base = self._intervals.get(platform, DEFAULT_POLL_INTERVAL)
+        count = len(self._tracked.get(platform, ()))
+        if self._rate_limiter is None or not count:
+            return base
+        per_minute = self._rate_limiter.get_limit(platform) * self._budget_share
+        return max(base, count * 60.0 / per_minute)
+
+    def start(self) -> None:
+        """Start one polling task per platform (no-op if running)."""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.ensure_future(self._run(platform)) for platform in self._adapters
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the polling tasks and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def poll_platform(self, platform: str) -> int:
+        """Fetch every tracked market of platform once.
+
+        Returns:
+            Number of markets recorded.
+        """
+        fetched = await fetch_markets(
+            self._adapters[platform],
+            sorted(self._tracked[platform]),
+            rate_limiter=self._rate_limiter,
+            priority=Priority.BACKGROUND,
+        )
+        recorded = 0
+        for native_id, market in fetched.items():
+            market_id = f"{platform}:{native_id}"
+            if isinstance(market, BaseException):
+                self.errors[market_id] = str(market)
+                continue
+            self.errors.pop(market_id, None)
+            self._history.record_market(market)
+            if self._on_market is not None:
+                self._on_market(market)
+            recorded += 1
+        return recorded
+
+    async def _run(self, platform: str) -> None:
+        # Markets were just fetched by whoever tracked them; wait one
+        # interval before the first poll.
+        loop = asyncio.get_running_loop()
+        delay = self.interval(platform)
+        while True:
+            await asyncio.sleep(delay)
+            started = loop.time()
+            if self._tracked[platform]:
+                await self.poll_platform(platform)
+            delay = max(0.0, self.interval(platform) - (loop.time() - started))
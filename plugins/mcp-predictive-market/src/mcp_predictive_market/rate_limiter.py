@@ -1,11 +1,104 @@
-"""Per-platform rate limiting for API calls."""
+"""Per-platform rate limiting for API calls.
+
+Each platform has its own token bucket and its own queue, so waiting for a
+Kalshi token never delays a Manifold request. Callers that can't be served
+immediately wait in FIFO order within their priority lane; interactive calls
+are served before background ones. Nothing is locked while waiting: a
+per-platform dispatcher task sleeps until the next token and hands it to the
+head of the queue.
+
+When a platform answers 429 (or 503) the limiter backs off: no tokens are
+handed out until its Retry-After has passed (or an increasing default
+backoff), and the platform's rate is halved, recovering linearly over
+RECOVERY_SECONDS.
+"""
 import asyncio
-from collections import defaultdict
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
 from typing import Any
 
+import httpx
+
+# Backoff when a throttling response has no usable Retry-After: doubles per
+# consecutive throttle up to the maximum.
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+# Seconds for a throttled platform's rate to recover from half to full.
+RECOVERY_SECONDS = 60.0
+MIN_RATE_FACTOR = 0.125
+
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class Priority(IntEnum):
+    """Queue lanes; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Seconds from a Retry-After header (delta or HTTP date), if present."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    """Token bucket, wait queues and counters for one platform."""
+
+    def __init__(self, limit: int, now: float) -> None:
+        self.limit = limit
+        self.tokens = float(limit)
+        self.updated = now
+        self.lanes: tuple[deque, ...] = tuple(deque() for _ in Priority)
+        self.dispatcher: asyncio.Task | None = None
+        self.blocked_until = 0.0
+        self.rate_factor = 1.0
+        self.throttled_at = 0.0
+        self.backoff = DEFAULT_BACKOFF
+        # Metrics
+        self.granted = 0
+        self.waited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.throttled = 0
+
+    def rate(self, now: float) -> float:
+        """Tokens per second, reduced while recovering from a throttle."""
+        factor = self.rate_factor
+        if factor < 1.0:
+            factor = min(1.0, factor + (now - self.throttled_at) / RECOVERY_SECONDS)
+        return self.limit / 60.0 * factor
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.rate(now))
+        self.updated = now
+
+    def queued(self) -> int:
+        return sum(len(lane) for lane in self.lanes)
+
+    def pop_waiter(self) -> tuple[asyncio.Future, float] | None:
+        """Remove and return the first waiter of the highest-priority lane."""
+        for lane in self.lanes:
+            if lane:
+                return lane.popleft()
+        return None
+
 
 class RateLimiter:
-    """Simple rate limiter using token bucket algorithm."""
+    """Fair token-bucket rate limiter with a queue per platform."""
 
     # Default rate limits (requests per minute)
     DEFAULT_LIMITS = {
@@ -19,38 +112,135 @@ class RateLimiter:
     def __init__(self, limits: dict[str, int] | None = None) -> None:
         """Initialize with optional custom limits."""
         self._limits = limits or self.DEFAULT_LIMITS.copy()
-        self._tokens: dict[str, float] = defaultdict(lambda: 0.0)
-        self._last_update: dict[str, float] = defaultdict(float)
-        self._lock = asyncio.Lock()
-
-    async def acquire(self, platform: str) -> None:
-        """Acquire a rate limit token, waiting if necessary."""
-        async with self._lock:
-            limit = self._limits.get(platform, 60)  # Default to 60/min
-            tokens_per_second = limit / 60.0
-
-            now = asyncio.get_event_loop().time()
-
-            # Initialize if first request
-            if platform not in self._last_update or self._last_update[platform] == 0:
-                self._tokens[platform] = limit
-                self._last_update[platform] = now
-
-            # Refill tokens based on time elapsed
-            elapsed = now - self._last_update[platform]
-            self._tokens[platform] = min(
-                limit, self._tokens[platform] + elapsed * tokens_per_second
-            )
-            self._last_update[platform] = now
-
-            # Wait if no tokens available
-            if self._tokens[platform] < 1:
-                wait_time = (1 - self._tokens[platform]) / tokens_per_second
-                await asyncio.sleep(wait_time)
-                self._tokens[platform] = 1
-
-            # Consume token
-            self._tokens[platform] -= 1
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, platform: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            bucket = self._buckets[platform] = _Bucket(self.get_limit(platform), now)
+        return bucket
+
+    async def acquire(self, platform: str, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Acquire a rate limit token, waiting if necessary.
+
+        Args:
+            platform: Platform the request is for.
+            priority: Queue lane; interactive callers are served before
+                background ones, each lane in arrival order.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        bucket = self._bucket(platform, now)
+        bucket.refill(now)
+
+        # Fast path: nobody queued ahead and a token is available.
+        if bucket.queued() == 0 and bucket.tokens >= 1 and now >= bucket.blocked_until:
+            bucket.tokens -= 1
+            bucket.granted += 1
+            return
+
+        future = loop.create_future()
+        entry = (future, now)
+        lane = bucket.lanes[priority]
+        lane.append(entry)
+        if bucket.dispatcher is None or bucket.dispatcher.done():
+            bucket.dispatcher = asyncio.ensure_future(self._dispatch(bucket))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                bucket.tokens += 1  # granted just as we were cancelled; give it back
+            elif entry in lane:
+                lane.remove(entry)
+            raise
+
+    async def _dispatch(self, bucket: _Bucket) -> None:
+        """Hand out tokens to queued waiters as they become available."""
+        loop = asyncio.get_running_loop()
+        while bucket.queued():
+            now = loop.time()
+            bucket.refill(now)
+            delay = bucket.blocked_until - now
+            if bucket.tokens < 1:
+                delay = max(delay, (1 - bucket.tokens) / bucket.rate(now))
+            if delay > 0:
+                # The queue may change while we sleep; re-check after.
+                await asyncio.sleep(delay)
+                continue
+            future, enqueued = bucket.pop_waiter()
+            if future.done():
+                # Cancelled; its acquire() removes the entry on its next
+                # step, which may come after this one.
+                continue
+            bucket.tokens -= 1
+            bucket.granted += 1
+            bucket.waited += 1
+            waited = now - enqueued
+            bucket.wait_total += waited
+            bucket.wait_max = max(bucket.wait_max, waited)
+            future.set_result(None)
+
+    def throttle(self, platform: str, retry_after: float | None = None) -> None:
+        """Back off after the platform rejected a request as rate limited.
+
+        Args:
+            platform: Platform that answered 429 / 503.
+            retry_after: Seconds from its Retry-After header, if any.
+        """
+        now = asyncio.get_running_loop().time()
+        bucket = self._bucket(platform, now)
+        bucket.refill(now)
+        if retry_after is None:
+            # Consecutive throttles (before the last backoff ran out) escalate.
+            if now < bucket.blocked_until + bucket.backoff:
+                bucket.backoff = min(MAX_BACKOFF, bucket.backoff * 2)
+            else:
+                bucket.backoff = DEFAULT_BACKOFF
+            retry_after = bucket.backoff
+        bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+        bucket.tokens = min(bucket.tokens, 0.0)
+        bucket.rate_factor = max(MIN_RATE_FACTOR, bucket.rate(now) * 60.0 / bucket.limit / 2)
+        bucket.throttled_at = now
+        bucket.throttled += 1
+
+    def observe_error(self, platform: str, error: BaseException) -> None:
+        """Throttle the platform if error is a rate-limiting HTTP response."""
+        if (
+            isinstance(error, httpx.HTTPStatusError)
+            and error.response.status_code in THROTTLE_STATUS_CODES
+        ):
+            self.throttle(platform, retry_after_seconds(error.response))
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Per-platform queue depth, wait times and throttling counters.
+
+        Returns:
+            Platform name -> dict with queued (total and per lane), granted,
+            waited (requests that had to queue), avg_wait_ms, max_wait_ms,
+            throttled (429/503 responses seen), blocked_for_s and tokens.
+        """
+        try:
+            now = asyncio.get_running_loop().time()
+        except RuntimeError:
+            now = time.monotonic()
+        result = {}
+        for platform, bucket in self._buckets.items():
+            bucket.refill(now)
+            result[platform] = {
+                "queued": bucket.queued(),
+                "queued_by_priority": {
+                    p.name.lower(): len(bucket.lanes[p]) for p in Priority
+                },
+                "granted": bucket.granted,
+                "waited": bucket.waited,
+                "avg_wait_ms": round(bucket.wait_total / bucket.waited * 1000, 1)
+                if bucket.waited else 0.0,
+                "max_wait_ms": round(bucket.wait_max * 1000, 1),
+                "throttled": bucket.throttled,
+                "blocked_for_s": round(max(0.0, bucket.blocked_until - now), 3),
+                "tokens": round(bucket.tokens, 3),
+            }
+        return result
 
     def get_limit(self, platform: str) -> int:
         """Get the rate limit for a platform."""
@@ -59,3 +249,7 @@ class RateLimiter:
     def set_limit(self, platform: str, limit: int) -> None:
         """Set a custom rate limit for a platform."""
         self._limits[platform] = limit
+        bucket = self._buckets.get(platform)
+        if bucket is not None:
+            bucket.limit = limit
+            bucket.tokens = min(bucket.tokens, limit)
@@ -1,5 +1,6 @@
 """MCP server entry point for prediction market aggregation."""
 import json
+import os
 
 from mcp.server import Server
 from mcp.types import Tool, TextContent
@@ -9,21 +10,49 @@ from mcp_predictive_market.adapters.polymarket import PolymarketAdapter
 from mcp_predictive_market.adapters.metaculus import MetaculusAdapter
 from mcp_predictive_market.adapters.predictit import PredictItAdapter
 from mcp_predictive_market.adapters.kalshi import KalshiAdapter
+from mcp_predictive_market.cache import CachedAdapter, TTLCache
+from mcp_predictive_market.history import PriceHistory
+from mcp_predictive_market.poller import MarketPoller
+from mcp_predictive_market.rate_limiter import RateLimiter
 from mcp_predictive_market.tools import ToolHandlers
 
+# If set, the adapter cache is loaded from this file at startup and saved
+# back on shutdown, so a restarted server starts warm.
+CACHE_SNAPSHOT_ENV = "PREDICTIVE_MARKET_CACHE_SNAPSHOT"
 
-def create_server() -> Server:
-    """Create and configure the MCP server."""
+
+def create_server(cache: TTLCache | None = None) -> Server:
+    """Create and configure the MCP server.
+
+    Args:
+        cache: Cache shared by all platform adapters; a new one if omitted.
+    """
     server = Server("mcp-predictive-market")
+    cache = cache if cache is not None else TTLCache()
 
     # Initialize adapters
-    adapters = {
+    platform_adapters = {
         "manifold": ManifoldAdapter(),
         "polymarket": PolymarketAdapter(),
         "metaculus": MetaculusAdapter(),
         "predictit": PredictItAdapter(),
         "kalshi": KalshiAdapter(),
     }
+    # Cached adapters take rate limit tokens only on cache misses.
+    rate_limiter = RateLimiter()
+    adapters = {
+        name: CachedAdapter(adapter, cache, rate_limiter=rate_limiter)
+        for name, adapter in platform_adapters.items()
+    }
+
+    # The poller always fetches fresh data and refreshes the cache with it.
+    history = PriceHistory()
+    poller = MarketPoller(
+        platform_adapters,
+        history,
+        rate_limiter=rate_limiter,
+        on_market=lambda market: adapters[market.platform].remember([market]),
+    )
 
     @server.list_tools()
     async def list_tools() -> list[Tool]:
@@ -117,6 +146,48 @@ def create_server() -> Server:
                 description="Get all markets in your watchlist with current prices",
                 inputSchema={"type": "object", "properties": {}},
             ),
+            Tool(
+                name="get_price_history",
+                description="Recorded price history of a tracked market (polled in the background)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "platform": {
+                            "type": "string",
+                            "description": "Platform name (manifold, polymarket, etc.)",
+                        },
+                        "market_id": {
+                            "type": "string",
+                            "description": "The market's native ID",
+                        },
+                        "hours": {
+                            "type": "number",
+                            "description": "How far back to look (default 24)",
+                            "default": 24,
+                        },
+                        "max_points": {
+                            "type": "integer",
+                            "description": "Max points to return, downsampled evenly (default 100)",
+                            "default": 100,
+                        },
+                    },
+                    "required": ["platform", "market_id"],
+                },
+            ),
+            Tool(
+                name="get_price_changes",
+                description="How much each tracked market moved over a time window, biggest movers first",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "hours": {
+                            "type": "number",
+                            "description": "Window to compare against (default 24)",
+                            "default": 24,
+                        },
+                    },
+                },
+            ),
             Tool(
                 name="find_arbitrage",
                 description="Find price discrepancies across platforms",
@@ -147,7 +218,9 @@ def create_server() -> Server:
             ),
         ]
 
-    handlers = ToolHandlers(adapters)
+    handlers = ToolHandlers(
+        adapters, rate_limiter=rate_limiter, history=history, poller=poller
+    )
 
     @server.call_tool()
     async def call_tool(name: str, arguments: dict) -> list[TextContent]:
@@ -164,6 +237,10 @@ def create_server() -> Server:
             result = await handlers.track_market(**arguments)
         elif name == "get_tracked_markets":
             result = await handlers.get_tracked_markets()
+        elif name == "get_price_history":
+            result = await handlers.get_price_history(**arguments)
+        elif name == "get_price_changes":
+            result = await handlers.get_price_changes(**arguments)
         elif name == "find_arbitrage":
             result = await handlers.find_arbitrage(**arguments)
         elif name == "compare_platforms":
@@ -181,7 +258,11 @@ def main() -> None:
     import asyncio
     from mcp.server.stdio import stdio_server
 
-    server = create_server()
+    cache = TTLCache()
+    snapshot = os.environ.get(CACHE_SNAPSHOT_ENV)
+    if snapshot:
+        cache.load_snapshot(snapshot)
+    server = create_server(cache)
 
     async def run():
         async with stdio_server() as (read_stream, write_stream):
@@ -191,7 +272,11 @@ def main() -> None:
                 server.create_initialization_options(),
             )
 
-    asyncio.run(run())
+    try:
+        asyncio.run(run())
+    finally:
+        if snapshot:
+            cache.save_snapshot(snapshot)
 
 
 if __name__ == "__main__":
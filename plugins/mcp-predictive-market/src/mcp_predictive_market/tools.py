@@ -1,24 +1,72 @@
 """Tool handler implementations for the MCP server."""
-from datetime import datetime, timezone
-from typing import Any
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
 
 from mcp_predictive_market.adapters.base import PlatformAdapter
 from mcp_predictive_market.analysis.arbitrage import ArbitrageDetector
 from mcp_predictive_market.analysis.matching import MarketMatcher
+from mcp_predictive_market.batch import fetch_markets
 from mcp_predictive_market.errors import PlatformError
+from mcp_predictive_market.fanout import DEFAULT_PLATFORM_TIMEOUT, FanoutResult, fan_out
+from mcp_predictive_market.history import PriceHistory
+from mcp_predictive_market.poller import MarketPoller
+from mcp_predictive_market.rate_limiter import RateLimiter
 from mcp_predictive_market.schema import Market
 
+T = TypeVar("T")
+
 
 class ToolHandlers:
     """Handlers for MCP tool calls."""
 
-    def __init__(self, adapters: dict[str, PlatformAdapter]) -> None:
-        """Initialize with platform adapters."""
+    def __init__(
+        self,
+        adapters: dict[str, PlatformAdapter],
+        rate_limiter: RateLimiter | None = None,
+        platform_timeout: float | None = DEFAULT_PLATFORM_TIMEOUT,
+        platform_timeouts: dict[str, float] | None = None,
+        history: PriceHistory | None = None,
+        poller: MarketPoller | None = None,
+    ) -> None:
+        """Initialize with platform adapters.
+
+        Args:
+            adapters: Platform name -> adapter.
+            rate_limiter: Optional limiter consulted before each platform call
+                in multi-platform tools.
+            platform_timeout: Seconds each platform gets in multi-platform
+                tools before it is reported in ``errors``; None for no limit.
+            platform_timeouts: Per-platform overrides of ``platform_timeout``.
+            history: Price history of tracked markets; a new one if omitted.
+            poller: If given, tracked markets are polled in the background
+                (it should record into the same history).
+        """
         self._adapters = adapters
+        self._rate_limiter = rate_limiter
+        self._platform_timeout = platform_timeout
+        self._platform_timeouts = platform_timeouts or {}
         self._tracked_markets: dict[str, dict] = {}  # market_id -> market info
+        self._history = history if history is not None else PriceHistory()
+        self._poller = poller
         self._matcher = MarketMatcher()
         self._arbitrage_detector = ArbitrageDetector(self._matcher)
 
+    async def _fan_out(
+        self,
+        call: Callable[[PlatformAdapter], Awaitable[T]],
+        adapters: dict[str, PlatformAdapter] | None = None,
+    ) -> FanoutResult[T]:
+        """Query adapters concurrently with per-platform timeouts."""
+        return await fan_out(
+            self._adapters if adapters is None else adapters,
+            call,
+            timeout=self._platform_timeout,
+            timeouts=self._platform_timeouts,
+            rate_limiter=self._rate_limiter,
+        )
+
     def _market_to_dict(self, market: Market) -> dict[str, Any]:
         """Convert a Market object to a JSON-serializable dictionary."""
         return {
@@ -48,19 +96,15 @@ class ToolHandlers:
                 k: v for k, v in self._adapters.items() if k in platforms
             }
 
-        all_markets = []
-        errors = []
-
-        for name, adapter in target_adapters.items():
-            try:
-                markets = await adapter.search_markets(query)
-                all_markets.extend(markets)
-            except Exception as e:
-                errors.append({"platform": name, "error": str(e)})
+        fetched = await self._fan_out(
+            lambda adapter: adapter.search_markets(query), target_adapters
+        )
+        all_markets = [m for markets in fetched.results.values() for m in markets]
 
         return {
             "markets": [self._market_to_dict(m) for m in all_markets],
-            "errors": errors,
+            "errors": fetched.errors,
+            "latency_ms": fetched.latency_ms,
         }
 
     async def get_market_odds(
@@ -78,17 +122,16 @@ class ToolHandlers:
 
     async def list_categories(self) -> dict[str, Any]:
         """List available categories across platforms."""
+        fetched = await self._fan_out(lambda adapter: adapter.list_categories())
         all_categories: set[str] = set()
-        errors = []
+        for categories in fetched.results.values():
+            all_categories.update(categories)
 
-        for name, adapter in self._adapters.items():
-            try:
-                categories = await adapter.list_categories()
-                all_categories.update(categories)
-            except Exception as e:
-                errors.append({"platform": name, "error": str(e)})
-
-        return {"categories": sorted(all_categories), "errors": errors}
+        return {
+            "categories": sorted(all_categories),
+            "errors": fetched.errors,
+            "latency_ms": fetched.latency_ms,
+        }
 
     async def browse_category(
         self,
@@ -96,15 +139,10 @@ class ToolHandlers:
         limit: int = 20,
     ) -> dict[str, Any]:
         """Browse markets in a category."""
-        all_markets = []
-        errors = []
-
-        for name, adapter in self._adapters.items():
-            try:
-                markets = await adapter.browse_category(category, limit)
-                all_markets.extend(markets)
-            except Exception as e:
-                errors.append({"platform": name, "error": str(e)})
+        fetched = await self._fan_out(
+            lambda adapter: adapter.browse_category(category, limit)
+        )
+        all_markets = [m for markets in fetched.results.values() for m in markets]
 
         # Sort by volume (highest first) and limit
         all_markets.sort(key=lambda m: m.volume or 0, reverse=True)
@@ -112,7 +150,8 @@ class ToolHandlers:
 
         return {
             "markets": [self._market_to_dict(m) for m in all_markets],
-            "errors": errors,
+            "errors": fetched.errors,
+            "latency_ms": fetched.latency_ms,
         }
 
     async def track_market(
@@ -129,6 +168,9 @@ class ToolHandlers:
         market = await adapter.get_market(market_id)
 
         full_id = f"{platform}:{market_id}"
+        self._history.record_market(market)
+        if self._poller is not None:
+            self._poller.track(platform, market_id)
         self._tracked_markets[full_id] = {
             "market": self._market_to_dict(market),
             "alias": alias,
@@ -144,40 +186,97 @@ class ToolHandlers:
 
     async def get_tracked_markets(self) -> dict[str, Any]:
         """Get all tracked markets with current data."""
+        # One batch per platform, all platforms at once
+        by_platform: dict[str, list[str]] = {}
+        for full_id in self._tracked_markets:
+            platform, native_id = full_id.split(":", 1)
+            by_platform.setdefault(platform, []).append(native_id)
+        batches = await asyncio.gather(*(
+            fetch_markets(self._adapters[platform], native_ids, rate_limiter=self._rate_limiter)
+            for platform, native_ids in by_platform.items()
+        ))
+        fetched = {
+            f"{platform}:{native_id}": outcome
+            for platform, batch in zip(by_platform, batches)
+            for native_id, outcome in batch.items()
+        }
+
         results = []
         errors = []
-
         for full_id, info in self._tracked_markets.items():
-            platform, native_id = full_id.split(":", 1)
-            try:
-                adapter = self._adapters[platform]
-                market = await adapter.get_market(native_id)
-                results.append({
-                    "market": self._market_to_dict(market),
-                    "alias": info.get("alias"),
-                    "tracked_at": info.get("tracked_at"),
-                })
-            except Exception as e:
-                errors.append({"market_id": full_id, "error": str(e)})
+            market = fetched[full_id]
+            if isinstance(market, BaseException):
+                errors.append({"market_id": full_id, "error": str(market)})
+                continue
+            self._history.record_market(market)
+            results.append({
+                "market": self._market_to_dict(market),
+                "alias": info.get("alias"),
+                "tracked_at": info.get("tracked_at"),
+            })
 
         return {"tracked_markets": results, "errors": errors}
 
+    def _tracked_id(self, platform: str, market_id: str) -> str:
+        full_id = f"{platform}:{market_id}"
+        if full_id not in self._tracked_markets:
+            raise ValueError(f"Market not tracked: {full_id}")
+        return full_id
+
+    async def get_price_history(
+        self,
+        platform: str,
+        market_id: str,
+        hours: float = 24,
+        max_points: int = 100,
+    ) -> dict[str, Any]:
+        """Recorded probability history of a tracked market (no API calls)."""
+        full_id = self._tracked_id(platform, market_id)
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        points = self._history.points(full_id, since=since, max_points=max_points)
+
+        return {
+            "market_id": full_id,
+            "alias": self._tracked_markets[full_id].get("alias"),
+            "points": [
+                {"timestamp": p.timestamp.isoformat(), "probability": p.probability}
+                for p in points
+            ],
+        }
+
+    async def get_price_changes(
+        self,
+        hours: float = 24,
+    ) -> dict[str, Any]:
+        """Probability moves of all tracked markets over a window (no API calls)."""
+        changes = []
+        for full_id, info in self._tracked_markets.items():
+            delta = self._history.delta(full_id, hours * 3600)
+            if delta is None:
+                continue
+            changes.append({"market_id": full_id, "alias": info.get("alias"), **delta})
+
+        # Biggest movers first
+        changes.sort(key=lambda c: abs(c["change"]), reverse=True)
+
+        polling_errors = self._poller.errors if self._poller is not None else {}
+        return {
+            "changes": changes,
+            "errors": [
+                {"market_id": full_id, "error": error}
+                for full_id, error in polling_errors.items()
+                if full_id in self._tracked_markets
+            ],
+        }
+
     async def find_arbitrage(
         self,
         min_spread: float = 0.05,
     ) -> dict[str, Any]:
         """Find arbitrage opportunities across platforms."""
-        # Fetch markets from all platforms
-        all_markets = []
-        errors = []
-
-        for name, adapter in self._adapters.items():
-            try:
-                # Get some markets to compare
-                markets = await adapter.search_markets("")  # Get recent/popular
-                all_markets.extend(markets)
-            except Exception as e:
-                errors.append({"platform": name, "error": str(e)})
+        # Fetch markets from all platforms (empty query: recent/popular)
+        fetched = await self._fan_out(lambda adapter: adapter.search_markets(""))
+        all_markets = [m for markets in fetched.results.values() for m in markets]
 
         # Find opportunities
         opportunities = self._arbitrage_detector.find_arbitrage(
@@ -195,7 +294,8 @@ class ToolHandlers:
                 }
                 for o in opportunities
             ],
-            "errors": errors,
+            "errors": fetched.errors,
+            "latency_ms": fetched.latency_ms,
         }
 
     async def compare_platforms(
@@ -204,18 +304,12 @@ class ToolHandlers:
     ) -> dict[str, Any]:
         """Side-by-side comparison of markets matching a query."""
         # Search across all platforms
-        all_markets = []
-        errors = []
-
-        for name, adapter in self._adapters.items():
-            try:
-                markets = await adapter.search_markets(query)
-                all_markets.extend(markets)
-            except Exception as e:
-                errors.append({"platform": name, "error": str(e)})
+        fetched = await self._fan_out(lambda adapter: adapter.search_markets(query))
+        all_markets = [m for markets in fetched.results.values() for m in markets]
 
         # Compare
         result = self._arbitrage_detector.compare_platforms(all_markets)
-        result["errors"] = errors
+        result["errors"] = fetched.errors
+        result["latency_ms"] = fetched.latency_ms
 
         return result
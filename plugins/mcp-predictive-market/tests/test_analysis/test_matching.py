@@ -1,4 +1,5 @@
 """Tests for market matching logic."""
+import random
 from datetime import datetime, timezone
 
 import pytest
@@ -147,3 +148,75 @@ class TestMarketMatcher:
         assert len(results) == 1
         assert results[0].market_a == target
         assert results[0].market_b == candidate
+
+
+class TestMatchIndex:
+    def _brute_force(self, matcher, markets, min_confidence):
+        """Pairs (i, j), i < j, that find_matches reports, with confidence."""
+        pairs = {}
+        for i, target in enumerate(markets):
+            for match in matcher.find_matches(target, markets[i + 1:], min_confidence):
+                pairs[(i, markets.index(match.market_b))] = match.confidence
+        return pairs
+
+    @pytest.mark.parametrize("min_confidence", [0.0, 0.2, 0.5, 0.7, 0.9, 1.0])
+    def test_same_pairs_as_find_matches(self, min_confidence):
+        """The index should find exactly the pairs find_matches finds."""
+        rng = random.Random(42)
+        vocab = ["trump", "biden", "win", "2024", "2028", "election", "bitcoin",
+                 "100k", "fed", "rate", "cut", "senate", "house", "ai", "agi"]
+        markets = [
+            make_market(
+                rng.choice(["manifold", "polymarket", "kalshi"]),
+                str(i),
+                "Will " + " ".join(rng.sample(vocab, rng.randint(1, 6))) + "?",
+            )
+            for i in range(120)
+        ]
+        matcher = MarketMatcher()
+        index = matcher.build_index(markets)
+
+        found = {
+            (i, j): confidence
+            for i, matches in enumerate(index.later_matches(min_confidence))
+            for j, confidence, _ in matches
+        }
+
+        assert found == self._brute_force(matcher, markets, min_confidence)
+
+    def test_threshold_float_rounding(self):
+        """Pairs exactly at the threshold should not be lost to float error."""
+        words = [f"w{i}" for i in range(10)]
+        markets = [
+            make_market("manifold", "a", " ".join(words)),
+            # 7 shared of 10 (+0): Jaccard 0.7 exactly, and 0.7 * 10 > 7.0
+            make_market("polymarket", "b", " ".join(words[:7])),
+        ]
+        index = MarketMatcher().build_index(markets)
+
+        assert index.later_matches(0.7)[0] == [(1, 0.7, "text")]
+
+    def test_manual_mapping_included(self):
+        """Manual mappings should match regardless of title."""
+        matcher = MarketMatcher()
+        matcher.add_manual_mapping("manifold:abc", "polymarket:xyz")
+        markets = [
+            make_market("manifold", "abc", "Some market"),
+            make_market("polymarket", "xyz", "Different title"),
+        ]
+
+        matches = matcher.build_index(markets).later_matches(0.5)
+
+        assert matches[0] == [(1, 1.0, "manual")]
+
+    def test_duplicate_ids_kept_once(self):
+        """Markets with the same id should be indexed once."""
+        markets = [
+            make_market("manifold", "abc", "Bitcoin above 100k"),
+            make_market("manifold", "abc", "Bitcoin above 100k"),
+        ]
+
+        index = MarketMatcher().build_index(markets)
+
+        assert len(index.markets) == 1
+        assert index.later_matches(0.0) == [[]]
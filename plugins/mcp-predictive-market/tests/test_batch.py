@@ -0,0 +1,193 @@
+"""Tests for batch market fetching."""
+import asyncio
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from mcp_predictive_market.adapters.kalshi import KalshiAdapter
+from mcp_predictive_market.adapters.manifold import ManifoldAdapter
+from mcp_predictive_market.adapters.polymarket import PolymarketAdapter
+from mcp_predictive_market.adapters.predictit import PredictItAdapter
+from mcp_predictive_market.batch import fetch_markets, supports_batch
+from mcp_predictive_market.cache import CachedAdapter, TTLCache
+from mcp_predictive_market.errors import PlatformError
+from mcp_predictive_market.tools import ToolHandlers
+from tests.fixtures import (
+    kalshi_responses,
+    manifold_responses,
+    polymarket_responses,
+    predictit_responses,
+)
+
+KALSHI_MARKETS = "https://api.elections.kalshi.com/trade-api/v2/markets"
+POLYMARKET_MARKETS = "https://gamma-api.polymarket.com/markets"
+
+
+class TestBulkAdapters:
+    @pytest.mark.asyncio
+    async def test_polymarket_fetches_ids_in_one_request(self, httpx_mock: HTTPXMock):
+        """Polymarket should fetch several markets with one id-filtered list query."""
+        httpx_mock.add_response(
+            url=f"{POLYMARKET_MARKETS}?id=0xabc123def&id=0xdef456ghi&limit=2",
+            json=polymarket_responses.SAMPLE_MARKETS_LIST,
+        )
+
+        result = await fetch_markets(PolymarketAdapter(), ["0xabc123def", "0xdef456ghi"])
+
+        assert [m.title for m in result.values()] == [
+            "Will Bitcoin reach $100k by end of 2025?",
+            "Will ETH flip BTC by market cap?",
+        ]
+        assert len(httpx_mock.get_requests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_polymarket_splits_by_batch_size(self, httpx_mock: HTTPXMock):
+        """More IDs than BATCH_SIZE should take one request per chunk."""
+        adapter = PolymarketAdapter()
+        adapter.BATCH_SIZE = 1
+        httpx_mock.add_response(
+            url=f"{POLYMARKET_MARKETS}?id=0xabc123def&limit=1",
+            json=[polymarket_responses.SAMPLE_MARKET],
+        )
+        httpx_mock.add_response(
+            url=f"{POLYMARKET_MARKETS}?id=0xdef456ghi&limit=1",
+            json=polymarket_responses.SAMPLE_MARKETS_LIST[1:],
+        )
+
+        result = await fetch_markets(adapter, ["0xabc123def", "0xdef456ghi"])
+
+        assert list(result) == ["0xabc123def", "0xdef456ghi"]
+        assert len(httpx_mock.get_requests()) == 2
+
+    @pytest.mark.asyncio
+    async def test_kalshi_missing_ticker_reported(self, httpx_mock: HTTPXMock):
+        """A ticker the bulk response leaves out should map to a PlatformError."""
+        httpx_mock.add_response(
+            url=f"{KALSHI_MARKETS}?tickers=PRES-2024-DT%2CGONE&limit=2",
+            json={"markets": [kalshi_responses.SAMPLE_MARKETS_LIST["markets"][0]]},
+        )
+
+        result = await fetch_markets(KalshiAdapter(), ["PRES-2024-DT", "GONE"])
+
+        assert result["PRES-2024-DT"].native_id == "PRES-2024-DT"
+        assert isinstance(result["GONE"], PlatformError)
+        assert "Market not found: GONE" in str(result["GONE"])
+        assert len(httpx_mock.get_requests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_predictit_uses_all_markets_feed(self, httpx_mock: HTTPXMock):
+        """PredictIt should answer any number of IDs from one /all/ request."""
+        httpx_mock.add_response(
+            url="https://www.predictit.org/api/marketdata/all/",
+            json=predictit_responses.SAMPLE_ALL_MARKETS,
+        )
+
+        result = await fetch_markets(PredictItAdapter(), ["7456", "7500", "7100"])
+
+        assert [m.native_id for m in result.values()] == ["7456", "7500", "7100"]
+        assert len(httpx_mock.get_requests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_bulk_request_fails_its_ids(self, httpx_mock: HTTPXMock):
+        """If a bulk request fails, each of its IDs should carry the error."""
+        httpx_mock.add_response(
+            url="https://www.predictit.org/api/marketdata/all/", status_code=500
+        )
+
+        result = await fetch_markets(PredictItAdapter(), ["7456", "7500"])
+
+        assert all(isinstance(e, Exception) for e in result.values())
+
+
+class TestFallback:
+    @pytest.mark.asyncio
+    async def test_manifold_fetches_each_market(self, httpx_mock: HTTPXMock):
+        """Adapters without get_markets should fall back to get_market per ID."""
+        assert not supports_batch(ManifoldAdapter())
+        sample = manifold_responses.SAMPLE_MARKET
+        httpx_mock.add_response(
+            url=f"https://api.manifold.markets/v0/market/{sample['id']}", json=sample
+        )
+        httpx_mock.add_response(
+            url="https://api.manifold.markets/v0/market/missing", status_code=404
+        )
+
+        result = await fetch_markets(ManifoldAdapter(), [sample["id"], "missing", sample["id"]])
+
+        assert result[sample["id"]].native_id == sample["id"]
+        assert isinstance(result["missing"], Exception)
+        assert len(httpx_mock.get_requests()) == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_concurrency_is_bounded(self):
+        """No more than `concurrency` single fetches should be in flight."""
+        in_flight = 0
+        peak = 0
+
+        class SlowAdapter:
+            platform = "slow"
+
+            async def get_market(self, native_id: str):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                raise PlatformError("slow", "nope")
+
+        await fetch_markets(SlowAdapter(), [str(i) for i in range(10)], concurrency=3)
+
+        assert peak == 3
+
+
+class TestCachedBatch:
+    @pytest.mark.asyncio
+    async def test_only_uncached_ids_requested(self, httpx_mock: HTTPXMock):
+        """A cached adapter should bulk-fetch only IDs not fresh in the cache."""
+        adapter = CachedAdapter(PolymarketAdapter(), TTLCache())
+        httpx_mock.add_response(
+            url=f"{POLYMARKET_MARKETS}/0xabc123def", json=polymarket_responses.SAMPLE_MARKET
+        )
+        httpx_mock.add_response(
+            url=f"{POLYMARKET_MARKETS}?id=0xdef456ghi&limit=1",
+            json=polymarket_responses.SAMPLE_MARKETS_LIST[1:],
+        )
+
+        await adapter.get_market("0xabc123def")
+        result = await fetch_markets(adapter, ["0xabc123def", "0xdef456ghi"])
+
+        assert all(not isinstance(m, Exception) for m in result.values())
+        assert len(httpx_mock.get_requests()) == 2
+
+    def test_batch_offered_only_if_wrapped_adapter_has_it(self):
+        """CachedAdapter should expose get_markets only for bulk-capable adapters."""
+        assert supports_batch(CachedAdapter(KalshiAdapter(), TTLCache()))
+        assert not supports_batch(CachedAdapter(ManifoldAdapter(), TTLCache()))
+
+
+class TestTrackedMarketsBatching:
+    @pytest.mark.asyncio
+    async def test_one_request_per_bulk_platform(self, httpx_mock: HTTPXMock):
+        """Refreshing tracked markets should cost one request per bulk platform."""
+        kalshi_markets = kalshi_responses.SAMPLE_MARKETS_LIST["markets"]
+        handlers = ToolHandlers({"kalshi": KalshiAdapter(), "predictit": PredictItAdapter()})
+        handlers._tracked_markets = {
+            **{f"kalshi:{m['ticker']}": {"alias": None} for m in kalshi_markets},
+            "predictit:7456": {"alias": None},
+            "predictit:7500": {"alias": None},
+        }
+        tickers = "%2C".join(m["ticker"] for m in kalshi_markets)
+        httpx_mock.add_response(
+            url=f"{KALSHI_MARKETS}?tickers={tickers}&limit=3",
+            json=kalshi_responses.SAMPLE_MARKETS_LIST,
+        )
+        httpx_mock.add_response(
+            url="https://www.predictit.org/api/marketdata/all/",
+            json=predictit_responses.SAMPLE_ALL_MARKETS,
+        )
+
+        result = await handlers.get_tracked_markets()
+
+        assert len(result["tracked_markets"]) == 5
+        assert result["errors"] == []
+        assert len(httpx_mock.get_requests()) == 2
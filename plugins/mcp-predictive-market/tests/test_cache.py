@@ -0,0 +1,294 @@
+"""Tests for the adapter cache."""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from mcp_predictive_market.batch import fetch_markets
+from mcp_predictive_market.cache import CachedAdapter, CachePolicy, TTLCache
+from mcp_predictive_market.fanout import fan_out
+from mcp_predictive_market.rate_limiter import RateLimiter
+from mcp_predictive_market.schema import Market
+
+POLICY = CachePolicy(ttl=10.0, stale=20.0)
+
+
+def make_market(native_id: str, probability: float = 0.5) -> Market:
+    """Create a test market."""
+    return Market(
+        platform="fake",
+        native_id=native_id,
+        url=f"https://fake.com/{native_id}",
+        title=f"Market {native_id}",
+        description="",
+        category="politics",
+        probability=probability,
+        outcomes=[],
+        volume=1000,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        last_fetched=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingAdapter:
+    """Adapter stub that counts calls and can be made slow or failing."""
+
+    platform = "fake"
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.fail = False
+        self.probability = 0.5
+        self.calls: list[tuple] = []
+
+    async def _call(self, *call):
+        self.calls.append(call)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("fake unavailable")
+
+    async def search_markets(self, query: str, category: str | None = None) -> list[Market]:
+        await self._call("search_markets", query)
+        return [make_market("a", self.probability), make_market("b", self.probability)]
+
+    async def get_market(self, native_id: str) -> Market:
+        await self._call("get_market", native_id)
+        return make_market(native_id, self.probability)
+
+    async def list_categories(self) -> list[str]:
+        await self._call("list_categories")
+        return ["politics"]
+
+    async def browse_category(self, category: str, limit: int = 20) -> list[Market]:
+        await self._call("browse_category", category)
+        return [make_market("a", self.probability)]
+
+    async def close(self) -> None:
+        self.calls.append(("close",))
+
+
+class TestTTLCache:
+    @pytest.mark.asyncio
+    async def test_fresh_hit_does_not_refetch(self):
+        """Within the TTL the cached value should be returned."""
+        clock = FakeClock()
+        adapter = CachedAdapter(CountingAdapter(), TTLCache(clock=clock), POLICY)
+
+        await adapter.get_market("m1")
+        clock.now = 9.0
+        market = await adapter.get_market("m1")
+
+        assert market.native_id == "m1"
+        assert adapter._adapter.calls == [("get_market", "m1")]
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        """Past the TTL the stale value is returned and refreshed in the background."""
+        clock = FakeClock()
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(clock=clock), POLICY)
+
+        await adapter.get_market("m1")
+        inner.probability = 0.9
+        clock.now = 15.0
+
+        stale = await adapter.get_market("m1")
+        assert stale.probability == 0.5
+        await asyncio.sleep(0.01)  # let the background refresh finish
+
+        fresh = await adapter.get_market("m1")
+        assert fresh.probability == 0.9
+        assert len(inner.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_value_is_refetched(self):
+        """Past the stale window the value should be fetched in the foreground."""
+        clock = FakeClock()
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(clock=clock), POLICY)
+
+        await adapter.get_market("m1")
+        inner.probability = 0.9
+        clock.now = 31.0
+
+        market = await adapter.get_market("m1")
+
+        assert market.probability == 0.9
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_fetch(self):
+        """Identical concurrent calls should be coalesced."""
+        inner = CountingAdapter(delay=0.05)
+        cache = TTLCache()
+        adapter = CachedAdapter(inner, cache, POLICY)
+
+        results = await asyncio.gather(*(adapter.get_market("m1") for _ in range(5)))
+
+        assert {m.native_id for m in results} == {"m1"}
+        assert inner.calls == [("get_market", "m1")]
+        assert cache.stats["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        """A caller timing out shouldn't fail the others waiting on the same fetch."""
+        inner = CountingAdapter(delay=0.05)
+        adapter = CachedAdapter(inner, TTLCache(), POLICY)
+
+        waiter = asyncio.ensure_future(adapter.get_market("m1"))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(adapter.get_market("m1"), 0.01)
+
+        assert (await waiter).native_id == "m1"
+        assert inner.calls == [("get_market", "m1")]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """A failed fetch should be retried on the next call."""
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(), POLICY)
+
+        inner.fail = True
+        with pytest.raises(RuntimeError):
+            await adapter.get_market("m1")
+        inner.fail = False
+
+        assert (await adapter.get_market("m1")).native_id == "m1"
+        assert len(inner.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self):
+        """A failing background refresh should leave the stale value in place."""
+        clock = FakeClock()
+        inner = CountingAdapter()
+        cache = TTLCache(clock=clock)
+        adapter = CachedAdapter(inner, cache, POLICY)
+
+        await adapter.get_market("m1")
+        inner.fail = True
+        clock.now = 15.0
+        await adapter.get_market("m1")
+        await asyncio.sleep(0.01)  # let the background refresh finish
+
+        assert (await adapter.get_market("m1")).probability == 0.5
+        assert cache.stats["refresh_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entry_evicted(self):
+        """The cache should stay within max_entries, dropping the LRU entry."""
+        inner = CountingAdapter()
+        cache = TTLCache(max_entries=2)
+        adapter = CachedAdapter(inner, cache, POLICY)
+
+        await adapter.get_market("m1")
+        await adapter.get_market("m2")
+        await adapter.get_market("m1")
+        await adapter.get_market("m3")
+        await adapter.get_market("m1")
+        await adapter.get_market("m2")
+
+        assert len(cache) == 2
+        assert [c[1] for c in inner.calls] == ["m1", "m2", "m3", "m2"]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_round_trip(self, tmp_path):
+        """A loaded snapshot should answer without fetching."""
+        path = str(tmp_path / "cache.json")
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(), POLICY)
+        await adapter.search_markets("election")
+        await adapter.list_categories()
+
+        saved = adapter._cache.save_snapshot(path)
+
+        restored = CachedAdapter(inner, TTLCache(), POLICY)
+        assert restored._cache.load_snapshot(path) == saved
+        inner.calls.clear()
+        markets = await restored.search_markets("election")
+        categories = await restored.list_categories()
+
+        assert [m.native_id for m in markets] == ["a", "b"]
+        assert categories == ["politics"]
+        assert inner.calls == []
+
+    def test_missing_snapshot_loads_nothing(self, tmp_path):
+        """A missing snapshot file should be ignored."""
+        assert TTLCache().load_snapshot(str(tmp_path / "missing.json")) == 0
+
+
+class TestCachedAdapter:
+    @pytest.mark.asyncio
+    async def test_search_primes_get_market(self):
+        """Markets seen in a search should not be fetched again individually."""
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(), POLICY)
+
+        await adapter.search_markets("election")
+        market = await adapter.get_market("b")
+
+        assert market.native_id == "b"
+        assert inner.calls == [("search_markets", "election")]
+
+    @pytest.mark.asyncio
+    async def test_keys_include_arguments(self):
+        """Different arguments should be cached separately."""
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(), POLICY)
+
+        await adapter.search_markets("election")
+        await adapter.search_markets("weather")
+
+        assert len(inner.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_other_attributes_pass_through(self):
+        """Uncached methods such as close() should reach the wrapped adapter."""
+        inner = CountingAdapter()
+        adapter = CachedAdapter(inner, TTLCache(), POLICY)
+
+        await adapter.close()
+
+        assert adapter.platform == "fake"
+        assert inner.calls == [("close",)]
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_take_no_rate_limit_tokens(self):
+        """Only requests that reach the platform should spend tokens."""
+        inner = CountingAdapter()
+        limiter = RateLimiter({"fake": 2})
+        adapter = CachedAdapter(inner, TTLCache(), POLICY, rate_limiter=limiter)
+        adapters = {"fake": adapter}
+
+        for _ in range(3):
+            result = await fan_out(
+                adapters, lambda a: a.search_markets("election"),
+                timeout=2.0, rate_limiter=limiter,
+            )
+            assert result.errors == []
+        fetched = await fetch_markets(adapter, ["a", "b"], rate_limiter=limiter)
+
+        assert all(not isinstance(m, Exception) for m in fetched.values())
+        assert inner.calls == [("search_markets", "election")]
+        assert limiter.metrics()["fake"]["granted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_misses_take_rate_limit_tokens(self):
+        """Each request the adapter sends should take a token."""
+        inner = CountingAdapter()
+        limiter = RateLimiter({"fake": 10})
+        adapter = CachedAdapter(inner, TTLCache(), POLICY, rate_limiter=limiter)
+
+        await fetch_markets(adapter, ["a", "b", "c"], rate_limiter=limiter)
+        await adapter.list_categories()
+
+        assert len(inner.calls) == 4
+        assert limiter.metrics()["fake"]["granted"] == 4
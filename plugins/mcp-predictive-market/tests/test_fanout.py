@@ -0,0 +1,159 @@
+"""Tests for concurrent adapter fan-out."""
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from mcp_predictive_market.fanout import fan_out
+from mcp_predictive_market.schema import Market
+from mcp_predictive_market.tools import ToolHandlers
+
+
+def make_market(platform: str, native_id: str, title: str) -> Market:
+    """Create a test market."""
+    return Market(
+        platform=platform,
+        native_id=native_id,
+        url=f"https://{platform}.com/{native_id}",
+        title=title,
+        description="",
+        category="politics",
+        probability=0.5,
+        outcomes=[],
+        volume=1000,
+        created_at=datetime.now(timezone.utc),
+        last_fetched=datetime.now(timezone.utc),
+    )
+
+
+class DelayedAdapter:
+    """Adapter stub that answers after a fixed delay."""
+
+    def __init__(self, platform: str, delay: float, fail: bool = False) -> None:
+        self.platform = platform
+        self.delay = delay
+        self.fail = fail
+
+    async def search_markets(self, query: str, category: str | None = None) -> list[Market]:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.platform} unavailable")
+        return [make_market(self.platform, "m1", f"{query} on {self.platform}")]
+
+    async def get_market(self, native_id: str) -> Market:
+        await asyncio.sleep(self.delay)
+        return make_market(self.platform, native_id, "market")
+
+    async def list_categories(self) -> list[str]:
+        await asyncio.sleep(self.delay)
+        return [f"{self.platform}-category"]
+
+    async def browse_category(self, category: str, limit: int = 20) -> list[Market]:
+        return await self.search_markets(category)
+
+
+class RecordingLimiter:
+    """Rate limiter stub that records acquired platforms."""
+
+    def __init__(self) -> None:
+        self.acquired: list[str] = []
+
+    async def acquire(self, platform: str) -> None:
+        self.acquired.append(platform)
+
+
+class TestFanOut:
+    @pytest.mark.asyncio
+    async def test_queries_platforms_concurrently(self):
+        """Total time should be the slowest platform, not the sum."""
+        adapters = {name: DelayedAdapter(name, 0.1) for name in ("a", "b", "c", "d")}
+
+        start = time.perf_counter()
+        result = await fan_out(adapters, lambda a: a.search_markets("x"))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert list(result.results) == ["a", "b", "c", "d"]
+        assert result.errors == []
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_partial_results(self):
+        """A slow platform should be reported as an error, others returned."""
+        adapters = {
+            "fast": DelayedAdapter("fast", 0.0),
+            "slow": DelayedAdapter("slow", 5.0),
+        }
+
+        result = await fan_out(adapters, lambda a: a.search_markets("x"), timeout=0.1)
+
+        assert list(result.results) == ["fast"]
+        assert result.errors == [{"platform": "slow", "error": "timed out after 0.1s"}]
+        assert set(result.latency_ms) == {"fast", "slow"}
+        assert result.latency_ms["slow"] >= 100
+
+    @pytest.mark.asyncio
+    async def test_per_platform_timeout_override(self):
+        """Per-platform timeouts should override the default."""
+        adapters = {"slowish": DelayedAdapter("slowish", 0.2)}
+
+        result = await fan_out(
+            adapters,
+            lambda a: a.search_markets("x"),
+            timeout=0.05,
+            timeouts={"slowish": 1.0},
+        )
+
+        assert list(result.results) == ["slowish"]
+
+    @pytest.mark.asyncio
+    async def test_exceptions_reported_per_platform(self):
+        """Adapter exceptions should become error entries."""
+        adapters = {
+            "ok": DelayedAdapter("ok", 0.0),
+            "broken": DelayedAdapter("broken", 0.0, fail=True),
+        }
+
+        result = await fan_out(adapters, lambda a: a.search_markets("x"))
+
+        assert list(result.results) == ["ok"]
+        assert result.errors == [{"platform": "broken", "error": "broken unavailable"}]
+
+    @pytest.mark.asyncio
+    async def test_acquires_rate_limit_token_per_platform(self):
+        """Each platform should acquire from the rate limiter before its call."""
+        limiter = RecordingLimiter()
+        adapters = {name: DelayedAdapter(name, 0.0) for name in ("a", "b")}
+
+        await fan_out(adapters, lambda a: a.list_categories(), rate_limiter=limiter)
+
+        assert sorted(limiter.acquired) == ["a", "b"]
+
+
+class TestToolHandlersFanOut:
+    @pytest.mark.asyncio
+    async def test_search_reports_latency_and_partial_results(self):
+        """search_markets should return fast platforms and time out slow ones."""
+        adapters = {
+            "fast": DelayedAdapter("fast", 0.0),
+            "slow": DelayedAdapter("slow", 5.0),
+        }
+        handlers = ToolHandlers(adapters, platform_timeout=0.1)
+
+        result = await handlers.search_markets(query="election")
+
+        assert [m["platform"] for m in result["markets"]] == ["fast"]
+        assert result["errors"][0]["platform"] == "slow"
+        assert set(result["latency_ms"]) == {"fast", "slow"}
+
+    @pytest.mark.asyncio
+    async def test_list_categories_merges_platforms(self):
+        """list_categories should merge results from all platforms."""
+        adapters = {name: DelayedAdapter(name, 0.0) for name in ("a", "b")}
+        handlers = ToolHandlers(adapters)
+
+        result = await handlers.list_categories()
+
+        assert result["categories"] == ["a-category", "b-category"]
+        assert result["errors"] == []
+        assert set(result["latency_ms"]) == {"a", "b"}
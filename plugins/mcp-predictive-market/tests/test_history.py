@@ -0,0 +1,136 @@
+"""Tests for the price history store."""
+from datetime import datetime, timezone
+
+from mcp_predictive_market.history import PriceHistory
+
+HOUR = 3600.0
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRecord:
+    def test_points_returned_oldest_first(self):
+        """Recorded points should come back in time order."""
+        history = PriceHistory()
+        history.record("m", 100.0, 0.4)
+        history.record("m", 200.0, 0.5)
+
+        points = history.points("m")
+
+        assert [p.probability for p in points] == [0.4, 0.5]
+        assert points[0].timestamp == datetime.fromtimestamp(100.0, timezone.utc)
+
+    def test_out_of_order_point_ignored(self):
+        """A point older than the latest should be dropped."""
+        history = PriceHistory()
+        history.record("m", 200.0, 0.5)
+        history.record("m", 100.0, 0.4)
+
+        assert [p.probability for p in history.points("m")] == [0.5]
+
+    def test_same_timestamp_replaces(self):
+        """A point at the latest timestamp should replace it."""
+        history = PriceHistory()
+        history.record("m", 100.0, 0.4)
+        history.record("m", 100.0, 0.6)
+
+        assert [p.probability for p in history.points("m")] == [0.6]
+
+    def test_accepts_datetimes(self):
+        """Timestamps may be datetimes."""
+        history = PriceHistory()
+        when = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        history.record("m", when, 0.3)
+
+        assert history.latest("m").timestamp == when
+
+    def test_unknown_market(self):
+        """An unknown market should have no points, latest or delta."""
+        history = PriceHistory()
+
+        assert history.points("nope") == []
+        assert history.latest("nope") is None
+        assert history.delta("nope", HOUR) is None
+
+
+class TestDownsampling:
+    def test_old_points_keep_last_per_bucket(self):
+        """Points past the raw window should be reduced to one per bucket."""
+        history = PriceHistory(raw_window=2 * HOUR, bucket=HOUR, max_age=100 * HOUR)
+        # One point a minute for 5 hours.
+        for minute in range(5 * 60):
+            history.record("m", minute * 60.0, minute / 1000)
+
+        times = [p.timestamp.timestamp() for p in history.points("m")]
+
+        # Last compaction was at 4h: the first two hours have one point each
+        # (their last minute), everything after is still per minute.
+        assert [t for t in times if t < 2 * HOUR] == [HOUR - 60, 2 * HOUR - 60]
+        assert [t for t in times if t >= 2 * HOUR] == [m * 60.0 for m in range(120, 300)]
+
+    def test_points_past_max_age_dropped(self):
+        """Points older than max_age should be dropped."""
+        history = PriceHistory(raw_window=HOUR, bucket=HOUR, max_age=3 * HOUR)
+        for hour in range(10):
+            history.record("m", hour * HOUR, 0.5)
+
+        assert history.points("m")[0].timestamp.timestamp() >= 6 * HOUR
+
+
+class TestQueries:
+    def test_since_and_until(self):
+        """points() should filter by time range, inclusive."""
+        history = PriceHistory()
+        for t in range(10):
+            history.record("m", float(t), t / 10)
+
+        points = history.points("m", since=3.0, until=5.0)
+
+        assert [p.probability for p in points] == [0.3, 0.4, 0.5]
+
+    def test_max_points_downsamples(self):
+        """max_points should cap the result and keep the latest point."""
+        history = PriceHistory()
+        for t in range(1000):
+            history.record("m", float(t), (t % 100) / 100)
+
+        points = history.points("m", max_points=10)
+
+        assert len(points) <= 10
+        assert points[-1].timestamp.timestamp() == 999.0
+
+    def test_delta_over_window(self):
+        """delta should compare the latest point with the one at the window start."""
+        clock = FakeClock(now=9 * HOUR)
+        history = PriceHistory(clock=clock)
+        for hour, p in enumerate([0.1, 0.2, 0.8, 0.5, 0.6]):
+            history.record("m", (5 + hour) * HOUR, p)
+
+        delta = history.delta("m", 3 * HOUR)
+
+        assert delta["previous"] == 0.2
+        assert delta["current"] == 0.6
+        assert delta["change"] == 0.4
+        assert delta["high"] == 0.8
+        assert delta["low"] == 0.2
+        assert delta["points"] == 4
+
+    def test_delta_with_short_history_starts_at_oldest(self):
+        """With less history than the window, delta starts at the oldest point."""
+        clock = FakeClock(now=10 * HOUR)
+        history = PriceHistory(clock=clock)
+        history.record("m", 9 * HOUR, 0.3)
+        history.record("m", 10 * HOUR, 0.4)
+
+        delta = history.delta("m", 24 * HOUR)
+
+        assert delta["previous"] == 0.3
+        assert delta["change"] == 0.1
@@ -433,9 +433,10 @@ class TestMarketTracking:
         )
         updated_kalshi = KALSHI_BITCOIN_MARKET.copy()
         updated_kalshi["yes_ask"] = 62  # Also moved up
+        # Kalshi refreshes tracked markets with one bulk request
         httpx_mock.add_response(
-            url="https://api.elections.kalshi.com/trade-api/v2/markets/BTC-100K-2025",
-            json={"market": updated_kalshi},
+            url="https://api.elections.kalshi.com/trade-api/v2/markets?tickers=BTC-100K-2025&limit=1",
+            json={"markets": [updated_kalshi]},
         )
 
         result3 = await handlers.get_tracked_markets()
@@ -0,0 +1,169 @@
+"""Tests for background polling and the history tools."""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from mcp_predictive_market.history import PriceHistory
+from mcp_predictive_market.poller import MarketPoller
+from mcp_predictive_market.rate_limiter import RateLimiter
+from mcp_predictive_market.schema import Market
+from mcp_predictive_market.tools import ToolHandlers
+
+
+class SequenceAdapter:
+    """Adapter stub whose markets move to a new probability on each fetch."""
+
+    def __init__(self, platform: str, probabilities: list[float]) -> None:
+        self.platform = platform
+        self.probabilities = probabilities
+        self.fetches = 0
+        self.missing: set[str] = set()
+
+    async def get_market(self, native_id: str) -> Market:
+        if native_id in self.missing:
+            raise RuntimeError(f"{native_id} not found")
+        p = self.probabilities[min(self.fetches, len(self.probabilities) - 1)]
+        self.fetches += 1
+        now = datetime.now(timezone.utc)
+        return Market(
+            platform=self.platform,
+            native_id=native_id,
+            url=f"https://{self.platform}.com/{native_id}",
+            title=f"Market {native_id}",
+            description="",
+            category="politics",
+            probability=p,
+            created_at=now,
+            last_fetched=now,
+        )
+
+
+class TestMarketPoller:
+    @pytest.mark.asyncio
+    async def test_poll_records_history(self):
+        """Polling should record each tracked market's probability."""
+        adapter = SequenceAdapter("fake", [0.3, 0.4])
+        history = PriceHistory()
+        poller = MarketPoller({"fake": adapter}, history)
+        poller._tracked["fake"].update({"a", "b"})
+
+        recorded = await poller.poll_platform("fake")
+
+        assert recorded == 2
+        assert sorted(history.market_ids()) == ["fake:a", "fake:b"]
+
+    @pytest.mark.asyncio
+    async def test_errors_reported_per_market(self):
+        """A failing market should be recorded in errors, others polled."""
+        adapter = SequenceAdapter("fake", [0.3])
+        adapter.missing.add("gone")
+        history = PriceHistory()
+        poller = MarketPoller({"fake": adapter}, history)
+        poller._tracked["fake"].update({"ok", "gone"})
+
+        assert await poller.poll_platform("fake") == 1
+        assert poller.errors == {"fake:gone": "gone not found"}
+
+    @pytest.mark.asyncio
+    async def test_on_market_called(self):
+        """on_market should see every polled market."""
+        seen = []
+        poller = MarketPoller(
+            {"fake": SequenceAdapter("fake", [0.3])}, PriceHistory(), on_market=seen.append
+        )
+        poller._tracked["fake"].add("a")
+
+        await poller.poll_platform("fake")
+
+        assert [m.id for m in seen] == ["fake:a"]
+
+    def test_interval_stretched_to_rate_budget(self):
+        """The poll interval should keep polling within the budget share."""
+        limiter = RateLimiter({"fake": 10})
+        poller = MarketPoller(
+            {"fake": SequenceAdapter("fake", [0.5])},
+            PriceHistory(),
+            rate_limiter=limiter,
+            intervals={"fake": 30.0},
+            budget_share=0.5,
+        )
+        assert poller.interval("fake") == 30.0
+
+        poller._tracked["fake"].update(f"m{i}" for i in range(10))
+
+        # 10 markets at 5 requests/minute: one poll every 2 minutes.
+        assert poller.interval("fake") == 120.0
+
+    @pytest.mark.asyncio
+    async def test_track_starts_background_polling(self):
+        """Tracking a market should start polling it on its interval."""
+        adapter = SequenceAdapter("fake", [0.1, 0.2, 0.3])
+        history = PriceHistory()
+        poller = MarketPoller({"fake": adapter}, history, intervals={"fake": 0.01})
+
+        poller.track("fake", "a")
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            await poller.stop()
+
+        assert adapter.fetches >= 2
+        assert not poller.running
+
+    def test_track_unknown_platform(self):
+        """Tracking on an unknown platform should raise ValueError."""
+        poller = MarketPoller({}, PriceHistory())
+        with pytest.raises(ValueError, match="Unknown platform"):
+            poller.track("nope", "a")
+
+
+class TestHistoryTools:
+    @pytest.mark.asyncio
+    async def test_track_and_poll_build_history(self):
+        """get_price_history should return the tracked and polled points."""
+        adapter = SequenceAdapter("fake", [0.3, 0.5])
+        history = PriceHistory()
+        poller = MarketPoller({"fake": adapter}, history)
+        handlers = ToolHandlers({"fake": adapter}, history=history, poller=poller)
+
+        try:
+            await handlers.track_market(platform="fake", market_id="a", alias="A")
+            await asyncio.sleep(0.001)
+            await poller.poll_platform("fake")
+        finally:
+            await poller.stop()
+
+        result = await handlers.get_price_history(platform="fake", market_id="a")
+
+        assert result["market_id"] == "fake:a"
+        assert result["alias"] == "A"
+        assert [p["probability"] for p in result["points"]] == [0.3, 0.5]
+
+    @pytest.mark.asyncio
+    async def test_price_history_requires_tracked_market(self):
+        """get_price_history on an untracked market should raise ValueError."""
+        handlers = ToolHandlers({"fake": SequenceAdapter("fake", [0.5])})
+
+        with pytest.raises(ValueError, match="not tracked"):
+            await handlers.get_price_history(platform="fake", market_id="a")
+
+    @pytest.mark.asyncio
+    async def test_price_changes_sorted_by_move(self):
+        """get_price_changes should list the biggest movers first."""
+        adapters = {
+            "small": SequenceAdapter("small", [0.50, 0.52]),
+            "big": SequenceAdapter("big", [0.20, 0.60]),
+        }
+        handlers = ToolHandlers(adapters)
+
+        for platform in adapters:
+            await handlers.track_market(platform=platform, market_id="a")
+        await asyncio.sleep(0.001)
+        await handlers.get_tracked_markets()
+
+        result = await handlers.get_price_changes(hours=1)
+
+        assert [c["market_id"] for c in result["changes"]] == ["big:a", "small:a"]
+        assert result["changes"][0]["change"] == pytest.approx(0.4)
+        assert result["errors"] == []
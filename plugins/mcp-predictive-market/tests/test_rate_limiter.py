@@ -1,9 +1,12 @@
 """Tests for rate limiting."""
 import asyncio
+import email.utils
+import time
 
+import httpx
 import pytest
 
-from mcp_predictive_market.rate_limiter import RateLimiter
+from mcp_predictive_market.rate_limiter import Priority, RateLimiter, retry_after_seconds
 
 
 class TestRateLimiter:
@@ -43,3 +46,157 @@ class TestRateLimiter:
         """Unknown platforms should use default limit of 60."""
         limiter = RateLimiter()
         assert limiter.get_limit("unknown") == 60
+
+
+async def drain(limiter: RateLimiter, platform: str) -> None:
+    """Use up a platform's initial burst of tokens."""
+    for _ in range(limiter.get_limit(platform)):
+        await limiter.acquire(platform)
+
+
+class TestFairness:
+    @pytest.mark.asyncio
+    async def test_waiting_platform_does_not_block_others(self):
+        """A platform out of tokens should not delay other platforms."""
+        limiter = RateLimiter({"slow": 1, "fast": 100})
+        await limiter.acquire("slow")
+        waiting = asyncio.ensure_future(limiter.acquire("slow"))  # ~60s away
+        await asyncio.sleep(0)
+
+        try:
+            await asyncio.wait_for(limiter.acquire("fast"), 0.1)
+        finally:
+            waiting.cancel()
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_arrival_order(self):
+        """Queued callers should get tokens first-in, first-out."""
+        limiter = RateLimiter({"test": 1200})
+        await drain(limiter, "test")
+        order = []
+
+        async def take(name: str) -> None:
+            await limiter.acquire("test")
+            order.append(name)
+
+        await asyncio.gather(*(take(name) for name in "abcd"))
+
+        assert order == list("abcd")
+
+    @pytest.mark.asyncio
+    async def test_interactive_served_before_background(self):
+        """Interactive callers should jump ahead of queued background ones."""
+        limiter = RateLimiter({"test": 1200})
+        await drain(limiter, "test")
+        order = []
+
+        async def take(name: str, priority: Priority) -> None:
+            await limiter.acquire("test", priority)
+            order.append(name)
+
+        background = [
+            asyncio.ensure_future(take(f"bg{i}", Priority.BACKGROUND)) for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        await take("interactive", Priority.INTERACTIVE)
+        await asyncio.gather(*background)
+
+        assert order[0] == "interactive"
+        assert order[1:] == ["bg0", "bg1", "bg2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """A cancelled waiter should not hold up the queue."""
+        limiter = RateLimiter({"test": 1})
+        await limiter.acquire("test")
+        waiting = asyncio.ensure_future(limiter.acquire("test"))
+        await asyncio.sleep(0)
+        assert limiter.metrics()["test"]["queued"] == 1
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+        assert limiter.metrics()["test"]["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiter_cancelled_as_token_comes_due(self):
+        """A waiter cancelled but not yet unwound should be skipped, not kill the dispatcher."""
+        limiter = RateLimiter({"test": 1200})
+        await drain(limiter, "test")
+        cancelled = asyncio.ensure_future(limiter.acquire("test"))
+        served = asyncio.ensure_future(limiter.acquire("test"))
+        await asyncio.sleep(0)
+        bucket = limiter._buckets["test"]
+
+        # Task.cancel() cancels the awaited future at once; the task only
+        # leaves the queue on its next step. Dispatch in between.
+        bucket.lanes[Priority.INTERACTIVE][0][0].cancel()
+        bucket.tokens = 1
+        await limiter._dispatch(bucket)
+
+        await asyncio.wait_for(served, 1)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert limiter.metrics()["test"]["granted"] == bucket.limit + 1
+        assert limiter.metrics()["test"]["waited"] == 1
+
+
+class TestThrottling:
+    @pytest.mark.asyncio
+    async def test_retry_after_blocks_platform(self):
+        """After a 429 with Retry-After, no tokens until it has passed."""
+        limiter = RateLimiter({"test": 100})
+        request = httpx.Request("GET", "https://example.com")
+        response = httpx.Response(429, headers={"Retry-After": "0.2"}, request=request)
+        error = httpx.HTTPStatusError("429", request=request, response=response)
+
+        limiter.observe_error("test", error)
+        start = time.perf_counter()
+        await limiter.acquire("test")
+
+        assert time.perf_counter() - start >= 0.19
+        assert limiter.metrics()["test"]["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_other_errors_ignored(self):
+        """Non-throttling errors should not slow the platform down."""
+        limiter = RateLimiter({"test": 100})
+        request = httpx.Request("GET", "https://example.com")
+        response = httpx.Response(404, request=request)
+
+        limiter.observe_error("test", httpx.HTTPStatusError("404", request=request, response=response))
+        limiter.observe_error("test", ValueError("bad data"))
+        await asyncio.wait_for(limiter.acquire("test"), 0.05)
+
+        assert limiter.metrics()["test"]["throttled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_throttle_without_retry_after_backs_off(self):
+        """A throttle with no Retry-After should block for the default backoff."""
+        limiter = RateLimiter({"test": 100})
+        limiter.throttle("test")
+
+        assert limiter.metrics()["test"]["blocked_for_s"] > 0.9
+
+    def test_retry_after_http_date(self):
+        """Retry-After may be an HTTP date."""
+        when = email.utils.formatdate(time.time() + 30, usegmt=True)
+        response = httpx.Response(429, headers={"Retry-After": when})
+
+        assert 28 <= retry_after_seconds(response) <= 30
+
+
+class TestMetrics:
+    @pytest.mark.asyncio
+    async def test_wait_times_recorded(self):
+        """Metrics should count grants and report queueing waits."""
+        limiter = RateLimiter({"test": 600})
+        await drain(limiter, "test")
+        await limiter.acquire("test")  # waits ~0.1s for a token
+
+        metrics = limiter.metrics()["test"]
+
+        assert metrics["granted"] == 601
+        assert metrics["waited"] == 1
+        assert metrics["max_wait_ms"] >= 50
+        assert metrics["queued"] == 0